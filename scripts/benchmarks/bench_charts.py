@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Analytics chart benchmark.
+PDF size and build time of an analytics page drawn with the vector charts of
+docgen.charts versus the same charts embedded as PNG screenshots, on the
+statistics of bench_transaction_report.py's synthetic transactions.
+
+The screenshots are the vector charts rasterized at --dpi with the preview
+renderer (docgen.previews), so both sides show the same pixels' worth of
+content; producing them is timed separately ("rasterize s") and not counted
+in the build. PNGs are embedded the way the guides embed screenshots
+(docgen.xobjects.SharedImage). Every page repeats the same charts: the
+vector build writes each chart once as a form, the raster build embeds each
+PNG once as an image XObject.
+
+"cold" builds start with empty caches; "warm" ones reuse the previous
+build's Drawings (vector) or decoded image XObjects (PNG), as later builds in
+one process do.
+"""
+
+import argparse
+import io
+import math
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import mm
+from reportlab.pdfgen.canvas import Canvas
+from reportlab.platypus import PageBreak, SimpleDocTemplate, Spacer
+
+from bench_transaction_report import make_request, make_transactions
+from docgen import charts, xobjects
+from docgen.pdfobj import PdfDocument
+from docgen.previews import PageRenderer
+from docgen.report_columns import TransactionColumns, column_stats
+from docgen.xobjects import SharedImage
+
+WIDTH, HEIGHT = 170*mm, 55*mm
+
+
+def best_of(runs, fn):
+    best = math.inf
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def build(flowables, pages):
+    """PDF bytes of `pages` pages, each showing `flowables`."""
+    story = []
+    for page in range(pages):
+        if page:
+            story.append(PageBreak())
+        for flowable in flowables():
+            story += [flowable, Spacer(1, 4*mm)]
+    buffer = io.BytesIO()
+    SimpleDocTemplate(buffer, pagesize=A4, topMargin=15*mm, bottomMargin=15*mm).build(story)
+    return buffer.getvalue()
+
+
+def rasterize(chart, dpi, path):
+    """Write a chart drawn alone on a page of its size to `path` as a PNG."""
+    buffer = io.BytesIO()
+    canv = Canvas(buffer, pagesize=(chart.width, chart.height))
+    chart.drawOn(canv, 0, 0)
+    canv.save()
+    pdf = PdfDocument.from_bytes(buffer.getvalue())
+    image = PageRenderer(pdf, round(chart.width / 72 * dpi)).render(pdf.page_refs()[0])
+    image.save(path, "PNG", optimize=True)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Vector analytics charts vs embedded PNG screenshots.")
+    parser.add_argument("--rows", type=int, default=100000, help="synthetic transactions (default: 100000)")
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 12])
+    parser.add_argument("--dpi", type=int, nargs="+", default=[150, 300])
+    parser.add_argument("--runs", type=int, default=3, help="best of this many timings (default: 3)")
+    args = parser.parse_args(argv)
+
+    request = make_request()
+    start = time.perf_counter()
+    cols = TransactionColumns.from_transactions(make_transactions(args.rows))
+    stats = column_stats(cols, request["currency"], request["rates"])
+    print(f"{args.rows} rows summarized in {time.perf_counter() - start:.2f}s\n")
+
+    def vector():
+        return list(charts.charts_from_stats(stats, request["currency"], WIDTH, HEIGHT).values())
+
+    workdir = tempfile.mkdtemp()
+    try:
+        run(args, vector, workdir)
+    finally:
+        shutil.rmtree(workdir)
+
+
+def run(args, vector, workdir):
+    rasters = {}
+    for dpi in args.dpi:
+        start = time.perf_counter()
+        pngs = [rasterize(chart, dpi, os.path.join(workdir, f"chart{i}-{dpi}.png")) for i, chart in enumerate(vector())]
+        rasters[dpi] = (pngs, time.perf_counter() - start)
+
+    print(f"{'charts':<12} {'pages':>5} {'PDF KB':>8} {'cold s':>8} {'warm s':>8} {'rasterize s':>12}")
+    for pages in args.pages:
+        def cold():
+            charts.clear_cache()
+            return build(vector, pages)
+
+        cold_s, pdf = best_of(args.runs, cold)
+        warm_s, _ = best_of(args.runs, lambda: build(vector, pages))
+        print(f"{'vector':<12} {pages:>5} {len(pdf) / 1024:>8.1f} {cold_s:>8.3f} {warm_s:>8.3f} {'-':>12}")
+        for dpi, (pngs, raster_s) in rasters.items():
+            def images():
+                return [SharedImage(png, WIDTH, HEIGHT) for png in pngs]
+
+            def cold():
+                xobjects._xobjects.clear()
+                return build(images, pages)
+
+            cold_s, pdf = best_of(args.runs, cold)
+            warm_s, _ = best_of(args.runs, lambda: build(images, pages))
+            print(f"{f'PNG {dpi} dpi':<12} {pages:>5} {len(pdf) / 1024:>8.1f} {cold_s:>8.3f} {warm_s:>8.3f} "
+                  f"{raster_s:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Guide generator cold-start benchmark.
+Times fresh interpreter launches of each generator for the paths CI hits most:
+importing the module, `--help`, and an up-to-date build that is skipped.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+
+from docgen.driver import discover_guides
+
+
+def time_command(cmd, runs):
+    """Return the median wall time in ms of `runs` fresh launches of `cmd`."""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(cmd, cwd=SCRIPTS_DIR, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cold-start time of the guide generators.")
+    parser.add_argument("--runs", type=int, default=15)
+    parser.add_argument("--skip-check", action="store_true",
+                        help="also time an up-to-date (skipped) build; needs a previous successful build")
+    args = parser.parse_args(argv)
+
+    baseline = time_command([sys.executable, "-c", "pass"], args.runs)
+    print(f"interpreter startup: {baseline:.1f} ms (median of {args.runs})")
+    print(f"{'guide':<28} {'import ms':>10} {'--help ms':>10} {'skip ms':>10}")
+    for name in discover_guides():
+        imp = time_command([sys.executable, "-c", f"import {name}"], args.runs)
+        hlp = time_command([sys.executable, f"{name}.py", "--help"], args.runs)
+        skip = time_command([sys.executable, f"{name}.py"], args.runs) if args.skip_check else float("nan")
+        print(f"{name:<28} {imp:>10.1f} {hlp:>10.1f} {skip:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Columnar transaction file benchmark.
+Size on disk, time to open and summarize, and peak RSS of an export read from
+JSON Lines (decoded into TransactionColumns) versus the memory-mapped
+columnar file of docgen.columnstore, on the synthetic transactions of
+bench_transaction_report.py.
+
+Each read runs in a fresh process so peak RSS is not shared between runs.
+"open RSS" is what opening added to the resident set, before any
+statistics; the peak includes column_stats' temporaries.
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_transaction_report import make_transactions
+from docgen.columnstore import ColumnStore, ColumnStoreWriter
+from docgen.report import JsonlTransactions
+from docgen.report_columns import TransactionColumns, column_stats
+
+RATES = {"USD": 1.08, "INR": 90.0}
+
+
+def rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+
+
+def run_child(kind, path):
+    before = rss_mb()
+    start = time.perf_counter()
+    if kind == "columns":
+        store = ColumnStore(path)
+        opened = time.perf_counter() - start
+        cols = store.columns()
+    else:
+        cols = TransactionColumns.from_transactions(tx for _, tx in JsonlTransactions(path))
+        opened = time.perf_counter() - start
+    opened_rss = rss_mb() - before
+    stats = column_stats(cols, "EUR", RATES)
+    print(json.dumps({
+        "open_s": round(opened, 4),
+        "open_rss_mb": round(opened_rss, 1),
+        "total_s": round(time.perf_counter() - start, 3),
+        "rows": stats.expense_tx_count + stats.income_tx_count + stats.transfer_count,
+        # ru_maxrss is KB on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }))
+
+
+def child(kind, path):
+    out = subprocess.run([sys.executable, __file__, "--child", kind, path],
+                         check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="JSON Lines vs memory-mapped columnar transactions.")
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--child", nargs=2, metavar=("KIND", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        run_child(*args.child)
+        return
+
+    workdir = tempfile.mkdtemp()
+    jsonl = os.path.join(workdir, "tx.jsonl")
+    columns = os.path.join(workdir, "tx.ncol")
+    try:
+        start = time.perf_counter()
+        with open(jsonl, "w") as f, ColumnStoreWriter(columns) as writer:
+            for tx in make_transactions(args.rows):
+                f.write(json.dumps(tx) + "\n")
+                writer.add(tx)
+        print(f"{args.rows} rows written in {time.perf_counter() - start:.1f}s\n")
+        print(f"{'input':<8} {'size MB':>8} {'bytes/row':>10} {'open s':>8} {'open RSS MB':>12} "
+              f"{'open+stats s':>13} {'peak RSS MB':>12}")
+        for kind, path in (("jsonl", jsonl), ("columns", columns)):
+            r = child(kind, path)
+            assert r["rows"] == args.rows, r
+            size = os.path.getsize(path)
+            print(f"{kind:<8} {size / 1024 / 1024:>8.1f} {size / args.rows:>10.0f} {r['open_s']:>8.4f} "
+                  f"{r['open_rss_mb']:>12} {r['total_s']:>13.3f} {r['peak_rss_mb']:>12}")
+    finally:
+        for path in (jsonl, columns):
+            if os.path.exists(path):
+                os.unlink(path)
+        os.rmdir(workdir)
+
+
+if __name__ == "__main__":
+    main()
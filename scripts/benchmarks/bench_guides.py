@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Guide build benchmark suite.
+Build time, peak RSS and output size of every guide generator, at its real
+size and with its story scaled up (every section after the cover repeated
+10x, 100x, ...), compared against a stored baseline.
+
+Runs offline: the screenshots and logo are replaced by deterministic
+placeholder images generated into a temporary directory before any build is
+measured, each build writes to a temporary output and uses a fresh, empty
+docgen cache, and each run is a fresh process so peak RSS is not shared
+between runs.
+
+    python benchmarks/bench_guides.py                     compare with the baseline
+    python benchmarks/bench_guides.py --save-baseline     record a new baseline
+    python benchmarks/bench_guides.py --scales 1 10 --runs 3
+
+Exits with status 1 when a metric is more than --threshold worse than the
+baseline.
+"""
+
+import argparse
+import importlib
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+
+from docgen.driver import discover_guides
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline_guides.json")
+METRICS = ("seconds", "peak_rss_mb", "size_kb")
+
+# Extra generator arguments: the manual is laid out in one pass, since the
+# section cache would reuse the fragments of repeated sections.
+GUIDE_ARGS = {"generate_user_manual": ["--no-section-cache"]}
+
+
+def make_placeholder(path, seed, size=(1170, 2532), alpha=False):
+    """Write a deterministic screenshot-like PNG of `size` to `path`."""
+    from PIL import Image, ImageDraw
+
+    rng = random.Random(seed)
+    img = Image.new("RGBA" if alpha else "RGB", size, (0, 0, 0, 0) if alpha else (15, 11, 26))
+    draw = ImageDraw.Draw(img)
+    w, h = size
+    for i in range(400):
+        x, y = rng.randrange(w), rng.randrange(h)
+        color = tuple(rng.randrange(256) for _ in range(3)) + ((255,) if alpha else ())
+        draw.rectangle([x, y, x + rng.randrange(w // 4), y + rng.randrange(h // 40 + 1)], fill=color)
+        draw.text((x, y), f"Novira placeholder {i}", fill=(255, 255, 255) + ((255,) if alpha else ()))
+    img.save(path)
+
+
+def scaled(load, scale):
+    """Wrap a section loader so every section after the cover repeats `scale` times."""
+    def wrapper(*args, **kwargs):
+        result = load(*args, **kwargs)
+        if isinstance(result, tuple):
+            cover, sections = result
+            return cover, sections * scale
+        return result[:1] + result[1:] * scale
+    return wrapper
+
+
+def use_placeholders(module, workdir):
+    """Point a guide module's images at placeholders in `workdir`, drawing missing ones."""
+    images = os.path.join(workdir, "images")
+    os.makedirs(images, exist_ok=True)
+    for key in module.SCREENSHOTS:
+        path = os.path.join(images, f"{key}.png")
+        if not os.path.exists(path):
+            make_placeholder(path, key)
+        module.SCREENSHOTS[key] = path
+    module.LOGO_PATH = os.path.join(images, "logo.png")
+    if not os.path.exists(module.LOGO_PATH):
+        make_placeholder(module.LOGO_PATH, "logo", size=(819, 819), alpha=True)
+
+
+def run_child(name, scale, workdir):
+    """Build one guide at one scale and print its metrics as JSON."""
+    module = importlib.import_module(name)
+    use_placeholders(module, workdir)
+    module.OUTPUT_PATH = os.path.join(workdir, f"{name}-x{scale}.pdf")
+    for loader in ("load_sections", "load_guide"):
+        if hasattr(module, loader):
+            setattr(module, loader, scaled(getattr(module, loader), scale))
+            break
+
+    from docgen.pdfobj import PdfDocument
+
+    start = time.perf_counter()
+    module.main(["--force", *GUIDE_ARGS.get(name, [])])
+    seconds = time.perf_counter() - start
+    result = {
+        "guide": name,
+        "scale": scale,
+        "pages": len(PdfDocument.from_file(module.OUTPUT_PATH).page_refs()),
+        "seconds": round(seconds, 2),
+        # ru_maxrss is KB on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "size_kb": round(os.path.getsize(module.OUTPUT_PATH) / 1024, 1),
+    }
+    print(json.dumps(result))
+
+
+def measure(name, scale, runs, workdir):
+    """Median metrics of `runs` cold builds, each in a fresh process and cache."""
+    samples = []
+    for _ in range(runs):
+        cache = tempfile.mkdtemp(dir=workdir)
+        env = dict(os.environ, NOVIRA_DOC_CACHE=cache)
+        out = subprocess.run([sys.executable, __file__, "--child", name, str(scale), workdir],
+                             cwd=SCRIPTS_DIR, env=env, check=True, capture_output=True, text=True).stdout
+        samples.append(json.loads(out.strip().splitlines()[-1]))
+        shutil.rmtree(cache, ignore_errors=True)
+    result = dict(samples[0])
+    for metric in METRICS:
+        result[metric] = statistics.median(s[metric] for s in samples)
+    return result
+
+
+def compare(results, baseline, threshold):
+    """Return the (key, metric, old, new) rows that regressed past `threshold`."""
+    regressions = []
+    for key, result in results.items():
+        old = baseline.get(key)
+        if old is None:
+            continue
+        for metric in METRICS:
+            if old.get(metric) and result[metric] > old[metric] * (1 + threshold):
+                regressions.append((key, metric, old[metric], result[metric]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build time, peak RSS and size of the guides versus a baseline.")
+    parser.add_argument("--guides", nargs="+", help="generator modules (default: all)")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--runs", type=int, default=1, help="builds per measurement; the median is kept")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed relative increase of any metric over the baseline")
+    parser.add_argument("--child", nargs=3, metavar=("GUIDE", "SCALE", "WORKDIR"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        run_child(args.child[0], int(args.child[1]), args.child[2])
+        return True
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+
+    workdir = tempfile.mkdtemp(prefix="novira-bench-")
+    results = {}
+    try:
+        print(f"{'guide':<28} {'scale':>5} {'pages':>6} {'seconds':>8} {'peak RSS MB':>12} {'size KB':>9}  vs baseline")
+        for name in args.guides or discover_guides():
+            # Drawn here, so no measured build pays for them in its peak RSS.
+            use_placeholders(importlib.import_module(name), workdir)
+            for scale in args.scales:
+                r = measure(name, scale, args.runs, workdir)
+                key = f"{name}@x{scale}"
+                results[key] = r
+                old = baseline.get(key)
+                delta = f"{(r['seconds'] / old['seconds'] - 1) * 100:+.0f}% time" if old and old["seconds"] else "-"
+                print(f"{name:<28} {scale:>5} {r['pages']:>6} {r['seconds']:>8} {r['peak_rss_mb']:>12} "
+                      f"{r['size_kb']:>9}  {delta}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({"machine": platform.platform(), "python": platform.python_version(),
+                       "results": results}, f, indent=2)
+            f.write("\n")
+        print(f"\n✅ Baseline saved to: {args.baseline}")
+        return True
+
+    regressions = compare(results, baseline, args.threshold)
+    for key, metric, old, new in regressions:
+        print(f"  ⚠ {key}: {metric} {old} -> {new} (more than {args.threshold:.0%} worse)")
+    if regressions:
+        sys.exit(1)
+    if baseline:
+        print(f"\n✅ No regressions beyond {args.threshold:.0%}")
+    return True
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Long table benchmark.
+Layout time and peak RSS of platypus.Table versus docgen.tables.ChunkedTable
+for a grid-styled table of N rows, with the header repeated on every page.
+
+Each (kind, rows) pair runs in a fresh process so peak RSS is not shared
+between runs. Both tables get the same precomputed column widths; Table still
+measures every row, ChunkedTable uses the fixed row height.
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reportlab.lib.colors import HexColor
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import mm
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle
+
+from docgen.tables import ChunkedTable
+
+HEADER = ["#", "Date", "Description", "Category", "Amount"]
+WIDTHS = [15*mm, 25*mm, 70*mm, 30*mm, 25*mm]
+ROW_HEIGHT = 18
+STYLE = [
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 9),
+    ('BACKGROUND', (0, 0), (-1, 0), HexColor('#8A2BE2')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), HexColor('#FFFFFF')),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [HexColor('#FFFFFF'), HexColor('#F5F5F5')]),
+    ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#DDDDDD')),
+    ('ALIGN', (4, 0), (4, -1), 'RIGHT'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+]
+KINDS = ("table", "chunked")
+
+
+def make_rows(rows):
+    return [[str(i + 1), f"2026-{i % 12 + 1:02d}-{i % 28 + 1:02d}", f"Synthetic expense number {i}",
+             ("Food", "Transport", "Bills", "Shopping")[i % 4], f"{(i * 7.31) % 500:.2f}"]
+            for i in range(rows)]
+
+
+def run_child(kind, rows):
+    data = make_rows(rows)
+    if kind == "table":
+        flowable = Table([HEADER] + data, colWidths=WIDTHS, repeatRows=1, style=TableStyle(STYLE))
+    else:
+        flowable = ChunkedTable(data, WIDTHS, ROW_HEIGHT, header=[HEADER], style=STYLE)
+    fd, out = tempfile.mkstemp(suffix=".pdf")
+    os.close(fd)
+    start = time.perf_counter()
+    doc = SimpleDocTemplate(out, pagesize=A4)
+    doc.build([flowable])
+    seconds = time.perf_counter() - start
+    result = {
+        "kind": kind,
+        "rows": rows,
+        "pages": doc.page,
+        "seconds": round(seconds, 2),
+        # ru_maxrss is KB on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+    os.unlink(out)
+    print(json.dumps(result))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Table versus ChunkedTable layout time and peak RSS.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--kinds", nargs="+", choices=KINDS, default=list(KINDS))
+    parser.add_argument("--child", nargs=2, metavar=("KIND", "ROWS"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        run_child(args.child[0], int(args.child[1]))
+        return
+
+    print(f"{'kind':>8} {'rows':>7} {'pages':>6} {'seconds':>8} {'peak RSS MB':>12}")
+    for rows in args.rows:
+        for kind in args.kinds:
+            out = subprocess.run([sys.executable, __file__, "--child", kind, str(rows)],
+                                 check=True, capture_output=True, text=True).stdout
+            r = json.loads(out.strip().splitlines()[-1])
+            print(f"{r['kind']:>8} {r['rows']:>7} {r['pages']:>6} {r['seconds']:>8} {r['peak_rss_mb']:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+NumberedCanvas memory benchmark.
+Peak RSS versus page count for the old snapshot-and-replay footer canvas and
+the form XObject NumberedCanvas (docgen.footer) used by generate_user_manual.py.
+
+Each (canvas, page count) pair runs in a fresh process so peak RSS is not
+shared between runs. Pages are drawn straight onto the canvas so the numbers
+reflect the canvas alone, not story construction.
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reportlab.lib.units import mm
+from reportlab.pdfgen import canvas
+
+import generate_user_manual as manual
+from docgen.footer import numbered_canvas
+
+LINES_PER_PAGE = 40
+
+
+class SnapshotCanvas(canvas.Canvas):
+    """The previous NumberedCanvas: keeps every page state until save()."""
+
+    def __init__(self, *args, **kwargs):
+        canvas.Canvas.__init__(self, *args, **kwargs)
+        self._saved_page_states = []
+
+    def showPage(self):
+        self._saved_page_states.append(dict(self.__dict__))
+        self._startPage()
+
+    def save(self):
+        num_pages = len(self._saved_page_states)
+        for state in self._saved_page_states:
+            self.__dict__.update(state)
+            self.draw_page_number(num_pages)
+            canvas.Canvas.showPage(self)
+        canvas.Canvas.save(self)
+
+    def draw_page_number(self, page_count):
+        page_num = self._pageNumber
+        if page_num > 1:
+            self.setFont("Helvetica", 8)
+            self.setFillColor(manual.theme.color("muted"))
+            self.drawString(manual.PAGE_W / 2 - 20, 15*mm, manual.FOOTER_TEXT.format(page=page_num, count=page_count))
+
+
+CANVASES = {"snapshot": SnapshotCanvas, "form": numbered_canvas(manual.FOOTER_TEXT, manual.theme.palette["muted"])}
+
+
+def run_child(kind, pages):
+    out = tempfile.NamedTemporaryFile(suffix=".pdf", delete=False).name
+    start = time.perf_counter()
+    c = CANVASES[kind](out, pagesize=manual.DOC_KWARGS["pagesize"])
+    for page in range(pages):
+        c.setFont("Helvetica", 10)
+        for line in range(LINES_PER_PAGE):
+            c.drawString(20*mm, manual.PAGE_H - 25*mm - line * 6*mm,
+                         f"Page {page + 1} line {line + 1}: 2026-02-14  Groceries  UPI  1,234.56 EUR")
+        c.showPage()
+    c.save()
+    result = {
+        "canvas": kind,
+        "pages": pages,
+        "seconds": round(time.perf_counter() - start, 3),
+        # ru_maxrss is KB on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "size_kb": round(os.path.getsize(out) / 1024, 1),
+    }
+    os.unlink(out)
+    print(json.dumps(result))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Peak RSS vs page count for footer canvases.")
+    parser.add_argument("--pages", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--canvas", choices=sorted(CANVASES), nargs="+", default=sorted(CANVASES))
+    parser.add_argument("--child", nargs=2, metavar=("CANVAS", "PAGES"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        run_child(args.child[0], int(args.child[1]))
+        return
+
+    print(f"{'canvas':<10} {'pages':>7} {'seconds':>9} {'peak RSS MB':>12} {'size KB':>10}")
+    for kind in args.canvas:
+        for pages in args.pages:
+            out = subprocess.run([sys.executable, __file__, "--child", kind, str(pages)],
+                                 check=True, capture_output=True, text=True).stdout
+            r = json.loads(out.strip().splitlines()[-1])
+            print(f"{r['canvas']:<10} {r['pages']:>7} {r['seconds']:>9} {r['peak_rss_mb']:>12} {r['size_kb']:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Paragraph memoization benchmark.
+How much of a guide build goes into parsing, line-breaking and drawing
+paragraphs, with the docgen.paragraphs caches enabled and disabled, on the
+guides at their real size and scaled up (see bench_guides.py).
+
+Each build runs profiled (without tracemalloc) in a fresh process with a
+fresh docgen cache; parse time is spent building the story, wrap and draw
+time inside doc.build.
+
+    python benchmarks/bench_paragraphs.py
+    python benchmarks/bench_paragraphs.py --guides generate_user_manual --scales 1 10 100
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_guides import GUIDE_ARGS, make_placeholder, scaled
+from docgen.driver import discover_guides
+
+
+def run_child(name, scale, memo, workdir):
+    """Build one guide with profiling and print the paragraph timings as JSON."""
+    from docgen import paragraphs
+
+    paragraphs.configure(enable=memo)
+    module = importlib.import_module(name)
+    images = os.path.join(workdir, "images")
+    os.makedirs(images, exist_ok=True)
+    for key in module.SCREENSHOTS:
+        path = os.path.join(images, f"{key}.png")
+        if not os.path.exists(path):
+            make_placeholder(path, key)
+        module.SCREENSHOTS[key] = path
+    module.LOGO_PATH = os.path.join(images, "logo.png")
+    if not os.path.exists(module.LOGO_PATH):
+        make_placeholder(module.LOGO_PATH, "logo", size=(819, 819), alpha=True)
+    module.OUTPUT_PATH = os.path.join(workdir, f"{name}-x{scale}.pdf")
+    for loader in ("load_sections", "load_guide"):
+        if hasattr(module, loader):
+            setattr(module, loader, scaled(getattr(module, loader), scale))
+            break
+
+    profile_path = os.path.join(workdir, f"{name}-x{scale}-{memo}.json")
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        module.main(["--force", "--profile", profile_path, "--no-allocations", *GUIDE_ARGS.get(name, [])])
+    seconds = time.perf_counter() - start
+    with open(profile_path) as f:
+        profile = json.load(f)
+    stages = profile["paragraphs"]
+    result = {
+        "guide": name, "scale": scale, "memo": memo,
+        "seconds": round(seconds, 2),
+        "doc_build": round(profile["functions"].get("doc.build", {}).get("seconds", 0.0), 3),
+        "serialize": round(profile["doc_build"]["serialize_seconds"], 3),
+        "paragraphs": stages[next(iter(stages))]["calls"] if stages else 0,
+    }
+    for stage in ("parse", "wrap", "draw"):
+        entry = stages.get(stage, {"seconds": 0.0, "calls": 0, "cache_hits": 0})
+        result[stage] = round(entry["seconds"], 3)
+        if stage != "draw":
+            result[f"{stage}_hit_rate"] = round(entry["cache_hits"] / entry["calls"], 3) if entry["calls"] else 0.0
+    print(json.dumps(result))
+
+
+def measure(name, scale, memo, workdir):
+    cache = tempfile.mkdtemp(dir=workdir)
+    env = dict(os.environ, NOVIRA_DOC_CACHE=cache)
+    out = subprocess.run([sys.executable, __file__, "--child", name, str(scale), str(int(memo)), workdir],
+                         cwd=SCRIPTS_DIR, env=env, check=True, capture_output=True, text=True).stdout
+    shutil.rmtree(cache, ignore_errors=True)
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Paragraph parse/wrap/draw time with and without memoization.")
+    parser.add_argument("--guides", nargs="+", help="generator modules (default: all)")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--child", nargs=4, metavar=("GUIDE", "SCALE", "MEMO", "WORKDIR"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        name, scale, memo, workdir = args.child
+        run_child(name, int(scale), memo == "1", workdir)
+        return True
+
+    workdir = tempfile.mkdtemp(prefix="novira-bench-")
+    try:
+        print(f"{'guide':<26} {'scale':>5} {'memo':>5} {'build s':>8} {'doc.build':>9} {'parse':>7} {'wrap':>7} "
+              f"{'draw':>7} {'para %':>7} {'hits':>6}")
+        for name in args.guides or discover_guides():
+            for scale in args.scales:
+                for memo in (False, True):
+                    r = measure(name, scale, memo, workdir)
+                    # parse runs before doc.build, wrap and draw inside it
+                    share = (r["wrap"] + r["draw"]) / r["doc_build"] * 100 if r["doc_build"] else 0.0
+                    print(f"{name:<26} {scale:>5} {'on' if memo else 'off':>5} {r['seconds']:>8} {r['doc_build']:>9} "
+                          f"{r['parse']:>7} {r['wrap']:>7} {r['draw']:>7} {share:>6.0f}% "
+                          f"{r['wrap_hit_rate'] * 100:>5.0f}%")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return True
+
+
+if __name__ == "__main__":
+    main()
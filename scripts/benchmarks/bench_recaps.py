@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Monthly recap batch benchmark.
+Recap PDFs/sec of the sharded batch job (monthly_recaps.py, docgen.batch) on
+synthetic monthly_recaps rows: a cold run, a resumed run with nothing left to
+do, and a nightly run in which a tenth of the recaps changed.
+
+--write-fixture writes the synthetic rows as a JSON Lines fixture for
+monthly_recaps.py --fixtures instead.
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import monthly_recaps
+
+CATEGORIES = ["food", "groceries", "transport", "shopping", "bills", "entertainment", "healthcare", "rent"]
+MERCHANTS = ["Lidl", "Swiggy", "Starbucks", "Uber", "Amazon", "Zara", "Shell", "Big Bazaar", "Café Nero"]
+METHODS = ["credit card", "debit card", "upi", "cash"]
+CURRENCIES = [("INR", "₹"), ("EUR", "€"), ("USD", "$"), ("GBP", "£")]
+NAMES = ["Alex Rivera", "Priya Nair", "Sam Chen", "Jürgen Weiß", "Aïcha Diallo", None]
+
+
+def make_row(rng, user_id, month, revision=0):
+    """A monthly_recaps row shaped like generateRecap's output."""
+    currency, symbol = rng.choice(CURRENCIES)
+    total = round(rng.uniform(50, 90000 if currency == "INR" else 3000), 2)
+    previous = round(total * rng.uniform(0.6, 1.4), 2)
+    change = round((total - previous) / previous * 100, 1)
+    count = rng.randrange(5, 120)
+    category, merchant, method = rng.choice(CATEGORIES), rng.choice(MERCHANTS), rng.choice(METHODS)
+    insights = [
+        {"label": "Biggest mover", "kind": "category", "subject": category,
+         "detail": f"{category.title()} jumped to **{symbol}{total * 0.3:,.2f}** across **{count // 3}** "
+                   f"transactions — **{rng.randrange(15, 45)}%** of total spend."},
+        {"label": "Top merchant", "kind": "merchant", "subject": merchant.lower(),
+         "detail": f"**{rng.randrange(2, 15)}** visits to {merchant} for **{symbol}{total * 0.1:,.2f}** total."},
+        {"label": "Payment shift", "kind": "payment", "subject": method,
+         "detail": f"{method.title()} share rose from **{rng.randrange(10, 40)}%** to **{rng.randrange(40, 80)}%**."},
+    ]
+    if rng.random() < 0.5:
+        insights.append({"label": "Frequency", "kind": "frequency", "subject": "",
+                         "detail": f"**{count}** transactions vs **{count + rng.randrange(-10, 10)}** last month, "
+                                   f"average ticket **{symbol}{total / count:,.2f}**."})
+    direction = "up" if change > 0 else "down"
+    return {
+        "user_id": user_id,
+        "month": month,
+        "recap": {
+            "headline": f"You spent {symbol}{total:,.0f} in {month}, {direction} {abs(change):.0f}% on last month.",
+            "totalSpent": total, "previousTotal": previous, "changePercent": change, "transactionCount": count,
+            "insights": insights,
+            "takeaway": f"Cap {category} at **{symbol}{total * 0.25:,.0f}** next month — that alone would save "
+                        f"~**{symbol}{total * 0.05:,.0f}**" + (" (revised)" if revision else "") + ".",
+        },
+        "analyzed": {"transactions": count, "categories": rng.randrange(3, 9), "merchants": rng.randrange(2, 10),
+                     "paymentMethods": rng.randrange(1, 4), "comparedToMonth": "previous"},
+        "currency": currency,
+        "full_name": rng.choice(NAMES),
+    }
+
+
+def write_fixture(path, users, months, seed=1, changed=0.0):
+    """Write users x months rows; `changed` of them get a revised takeaway."""
+    rng = random.Random(seed)
+    ids = [str(uuid.UUID(int=rng.getrandbits(128))) for _ in range(users)]
+    revise = random.Random(seed + 1)
+    with open(path, "w", encoding="utf-8") as f:
+        for month in months:
+            for user_id in ids:
+                row = make_row(rng, user_id, month, revision=revise.random() < changed)
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+
+def run(fixture, output, month, jobs):
+    start = time.perf_counter()
+    argv = ["--fixtures", fixture, "-o", output, "--month", month]
+    if jobs:
+        argv += ["--jobs", str(jobs)]
+    status = monthly_recaps.main(argv)
+    return time.perf_counter() - start, status
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PDFs/sec of the monthly recap batch job.")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("-j", "--jobs", type=int, default=None)
+    parser.add_argument("--write-fixture", metavar="JSONL", help="only write a fixture with --users rows")
+    parser.add_argument("--month", default="2026-04")
+    args = parser.parse_args(argv)
+
+    if args.write_fixture:
+        write_fixture(args.write_fixture, args.users, [args.month])
+        print(f"✅ {args.users} recap row(s) written to: {args.write_fixture}")
+        return
+
+    workdir = tempfile.mkdtemp()
+    try:
+        fixture = os.path.join(workdir, "recaps.jsonl")
+        output = os.path.join(workdir, "out")
+        write_fixture(fixture, args.users, [args.month])
+        results = [("cold", *run(fixture, output, args.month, args.jobs))]
+        results.append(("resume", *run(fixture, output, args.month, args.jobs)))
+        write_fixture(fixture, args.users, [args.month], changed=0.1)
+        results.append(("10% changed", *run(fixture, output, args.month, args.jobs)))
+    finally:
+        shutil.rmtree(workdir)
+
+    print(f"\n{'run':<12} {'seconds':>8} {'users/sec':>10}")
+    for name, seconds, _ in results:
+        print(f"{name:<12} {seconds:>8.2f} {args.users / seconds:>10.0f}")
+    cold = results[0][1]
+    print(f"\nProjected cold run for 50,000 users: {cold / args.users * 50000 / 60:.1f} min")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Report statistics benchmark.
+Rows/sec of computeStats' roll-ups (totals per category, payment method,
+currency, month, week, weekday and day, and split shares) computed
+row by row (docgen.report_stats.StatsBuilder) and over NumPy columns
+(docgen.report_columns), on the synthetic transactions of
+bench_transaction_report.py.
+
+Columns are encoded once (TransactionColumns.from_transactions) and then
+summarized; both steps are timed. StatsBuilder only runs up to --compare-max
+rows, where the two results are also checked against each other.
+"""
+
+import argparse
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_transaction_report import make_request, make_transactions
+from docgen.report_columns import TransactionColumns, column_stats
+from docgen.report_stats import StatsBuilder, make_converter
+
+COMPARED = ["total_expenses", "total_income", "recurring_total", "expense_tx_count", "income_tx_count",
+            "transfer_total", "category_totals", "income_category_totals", "method_totals", "currency_totals",
+            "monthly_totals", "weekly_totals", "dow_totals", "daily_totals", "split_totals"]
+
+
+def best_of(runs, fn):
+    best = math.inf
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def close(a, b):
+    """Equal up to float summation order, including dict key order."""
+    if isinstance(a, dict):
+        return list(a) == list(b) and all(close(a[k], b[k]) for k in a)
+    if isinstance(a, (list, tuple)):
+        return len(a) == len(b) and all(close(x, y) for x, y in zip(a, b))
+    if isinstance(a, float):
+        return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-6)
+    return a == b
+
+
+def compare(rows, transactions, request):
+    builder = StatsBuilder(request["currency"], make_converter(request["currency"], request["rates"]))
+    for tx in transactions:
+        builder.add(tx)
+    return builder.finish()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rows/sec of row-by-row vs columnar report statistics.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--compare-max", type=int, default=100000,
+                        help="largest row count to also run StatsBuilder on (default: 100000)")
+    parser.add_argument("--runs", type=int, default=3, help="best of this many timings (default: 3)")
+    args = parser.parse_args(argv)
+
+    request = make_request()
+    currency, rates = request["currency"], request["rates"]
+    print(f"{'rows':>8} {'encode s':>9} {'stats ms':>9} {'columnar rows/sec':>18} "
+          f"{'builder s':>10} {'builder rows/sec':>17} {'match':>6}")
+    for rows in args.rows:
+        start = time.perf_counter()
+        cols = TransactionColumns.from_transactions(make_transactions(rows))
+        encode = time.perf_counter() - start
+        seconds, stats = best_of(args.runs, lambda: column_stats(cols, currency, rates))
+        line = f"{rows:>8} {encode:>9.2f} {seconds * 1000:>9.1f} {rows / seconds:>18,.0f}"
+        if rows <= args.compare_max:
+            transactions = list(make_transactions(rows))
+            builder_seconds, expected = best_of(1, lambda: compare(rows, transactions, request))
+            match = all(close(getattr(expected, name), getattr(stats, name)) for name in COMPARED)
+            line += f" {builder_seconds:>10.2f} {rows / builder_seconds:>17,.0f} {'yes' if match else 'NO':>6}"
+        print(line, flush=True)
+
+
+if __name__ == "__main__":
+    main()
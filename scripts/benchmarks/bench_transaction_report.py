@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Transaction report throughput benchmark.
+Rows/sec and peak RSS versus row count for the streaming transaction report
+(docgen.report) on synthetic exports.
+
+Each row count runs in a fresh process so peak RSS is not shared between
+runs. The transactions are written to a JSON Lines file first and streamed
+from it, as transaction_report.py --transactions does.
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docgen.report import JsonlTransactions, TransactionReport
+
+CATEGORIES = ["food", "groceries", "transport", "fashion", "bills", "shopping", "healthcare",
+              "entertainment", "rent", "education", "others"]
+METHODS = ["Cash", "Credit Card", "Debit Card", "UPI", "Bank Transfer"]
+PLACES = ["Lidl", "Rewe", "Aldi", "DM", "Starbucks", "Shell", "Ikea", "Zara", None, None, None]
+TAGS = ["work", "trip", "family", "gift"]
+START = date(2025, 1, 1)
+
+
+def make_request():
+    """The request (currency, range, context) of a synthetic export."""
+    start = START
+    accounts = [{"id": f"acc{i}", "name": name, "type": kind, "currency": "EUR", "is_primary": i == 0}
+                for i, (name, kind) in enumerate([("Main", "checking"), ("Card", "credit_card"), ("Wallet", "cash")])]
+    buckets = [{"id": f"b{i}", "name": name, "budget": 400 * (i + 1), "currency": "EUR"}
+               for i, name in enumerate(["Holiday", "Home", "Car"])]
+    return {
+        "currency": "EUR",
+        "rates": {"USD": 1.08, "INR": 90.0},
+        "range": {"from": start.isoformat(), "to": (start + timedelta(days=364)).isoformat()},
+        "buckets": buckets,
+        "context": {
+            "email": "alex@example.com", "workspaceName": "Rivera Household", "monthlyBudget": 2500,
+            "accounts": accounts, "isGroupScope": True,
+            "goals": [{"name": "Emergency fund", "current_amount": 3200, "target_amount": 5000,
+                       "currency": "EUR", "deadline": "2026-12-31"}],
+            "recurringTemplates": [{"id": "r1", "description": "Netflix", "category": "entertainment",
+                                    "amount": 12.99, "currency": "EUR", "frequency": "monthly",
+                                    "next_occurrence": "2026-11-01", "is_active": True}],
+        },
+    }
+
+
+def make_transactions(rows, seed=1):
+    """Yield `rows` synthetic transactions in random date order."""
+    rng = random.Random(seed)
+    accounts = [a["id"] for a in make_request()["context"]["accounts"]] + [None]
+    buckets = ["b0", "b1", "b2"] + [None] * 5
+    members = [("u1", "Alex Rivera"), ("u2", "Sam Chen"), ("u3", "Priya Nair")]
+    for i in range(rows):
+        day = START + timedelta(days=rng.randrange(365))
+        income = rng.random() < 0.05
+        currency = "EUR" if rng.random() < 0.9 else rng.choice(["USD", "INR"])
+        tx = {
+            "date": day.isoformat(),
+            "description": f"{rng.choice(['Weekly', 'Quick', 'Team', 'Monthly'])} "
+                           f"{rng.choice(['groceries', 'lunch', 'taxi', 'subscription', 'dinner out'])} #{i}",
+            "category": "income" if income else rng.choice(CATEGORIES),
+            "amount": round(rng.uniform(2, 3000 if income else 180), 2),
+            "currency": currency,
+            "payment_method": rng.choice(METHODS),
+            "user_id": members[0][0],
+            "profile": {"full_name": members[0][1]},
+            "is_income": income,
+            "is_recurring": rng.random() < 0.1,
+            "account_id": rng.choice(accounts),
+            "bucket_id": rng.choice(buckets),
+            "place_name": rng.choice(PLACES),
+            "tags": rng.sample(TAGS, rng.randrange(3)),
+            "notes": "Paid back later" if rng.random() < 0.05 else None,
+            "receipt_path": f"receipts/{i}.jpg" if rng.random() < 0.2 else None,
+        }
+        if not income and rng.random() < 0.15:
+            share = round(tx["amount"] / 3, 2)
+            tx["splits"] = [{"user_id": uid, "amount": share, "is_paid": rng.random() < 0.5,
+                             "profile": {"full_name": name}} for uid, name in members[1:]]
+        yield tx
+
+
+def run_child(rows, chunk_pages):
+    workdir = tempfile.mkdtemp()
+    jsonl = os.path.join(workdir, "tx.jsonl")
+    with open(jsonl, "w") as f:
+        for tx in make_transactions(rows):
+            f.write(json.dumps(tx) + "\n")
+    out = os.path.join(workdir, "report.pdf")
+    start = time.perf_counter()
+    report = TransactionReport.from_request(make_request(), JsonlTransactions(jsonl), today=date(2025, 12, 31))
+    pages = report.render(out, chunk_pages=chunk_pages)
+    seconds = time.perf_counter() - start
+    result = {
+        "rows": rows,
+        "pages": pages,
+        "seconds": round(seconds, 2),
+        "rows_per_sec": round(rows / seconds),
+        # ru_maxrss is KB on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "size_kb": round(os.path.getsize(out) / 1024, 1),
+    }
+    os.unlink(out)
+    os.unlink(jsonl)
+    os.rmdir(workdir)
+    print(json.dumps(result))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rows/sec and peak RSS of the streaming transaction report.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--chunk-pages", type=int, default=50)
+    parser.add_argument("--child", nargs=2, metavar=("ROWS", "CHUNK_PAGES"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        run_child(int(args.child[0]), int(args.child[1]))
+        return
+
+    print(f"{'rows':>7} {'pages':>6} {'seconds':>8} {'rows/sec':>9} {'peak RSS MB':>12} {'size KB':>9}")
+    for rows in args.rows:
+        out = subprocess.run([sys.executable, __file__, "--child", str(rows), str(args.chunk_pages)],
+                             check=True, capture_output=True, text=True).stdout
+        r = json.loads(out.strip().splitlines()[-1])
+        print(f"{r['rows']:>7} {r['pages']:>6} {r['seconds']:>8} {r['rows_per_sec']:>9} "
+              f"{r['peak_rss_mb']:>12} {r['size_kb']:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Novira Guide Build Driver
+Renders every guide (scripts/generate_*.py) concurrently and reports per document.
+--watch keeps rebuilding the guides whose sources change (see docgen.watch).
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from docgen.driver import build_all, discover_guides
+
+
+def report(result):
+    """Print one BuildResult; return whether it succeeded."""
+    if result.ok and result.skipped:
+        print(f"  ⏭️  {result.name}: up to date -> {result.output_path}")
+    elif result.ok:
+        print(f"  ✅ {result.name}: {result.size / 1024:.1f} KB in {result.seconds:.2f}s -> {result.output_path}")
+    else:
+        print(f"  ❌ {result.name}: failed after {result.seconds:.2f}s")
+        if result.log:
+            print(result.log.rstrip())
+        print(result.error.rstrip())
+    return result.ok
+
+
+def watch(names, args):
+    """Build the guides in this process, then rebuild them as their sources change."""
+    from docgen.watch import watch as watch_guides
+
+    print(f"👀 Building {len(names)} guide(s), then watching for changes (Ctrl-C to stop)...")
+    try:
+        for changed, results in watch_guides(names, args):
+            if changed:
+                shown = ", ".join(os.path.relpath(p) for p in changed[:3]) + (" ..." if len(changed) > 3 else "")
+                print(f"\n🔁 Changed: {shown}")
+            for result in results:
+                report(result)
+            sys.stdout.flush()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("guides", nargs="*", help="guide modules to build (default: all)")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (default: one per guide)")
+    parser.add_argument("--force", action="store_true", help="rebuild even if no inputs changed")
+    parser.add_argument("--watch", action="store_true",
+                        help="stay running and rebuild a guide whenever its scripts, content or images change")
+    args = parser.parse_args(argv)
+
+    available = discover_guides()
+    names = args.guides or available
+    unknown = sorted(set(names) - set(available))
+    if unknown:
+        parser.error(f"unknown guide(s): {', '.join(unknown)}")
+
+    if args.watch:
+        return watch(names, ["--force"] if args.force else [])
+
+    print(f"📚 Building {len(names)} guide(s)...")
+    start = time.perf_counter()
+    failures = 0
+    for result in build_all(names, ["--force"] if args.force else [], jobs=args.jobs):
+        failures += not report(result)
+
+    print(f"\n{'✅' if not failures else '❌'} {len(names) - failures}/{len(names)} guide(s) built "
+          f"in {time.perf_counter() - start:.2f}s")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,6 @@
+"""
+Shared building blocks for the Novira PDF guide generators.
+
+The generator scripts in ``scripts/`` import from this package directly
+(``scripts/`` is on ``sys.path`` when they are run as ``python scripts/...``).
+"""
@@ -0,0 +1,150 @@
+"""
+Asset resolution and prefetch for the guide generators.
+
+Screenshot and logo paths are configured per machine (CLI flags, NOVIRA_*
+environment variables) and looked up along a search path, falling back to the
+copies in the repository. Before layout starts, prefetch() resolves every
+image a guide references, validates it and prepares its resampled rendition
+and PDF XObject concurrently in a thread pool (Pillow and zlib release the
+GIL), so missing or broken assets are reported up front instead of turning
+into blank spacers deep into a build.
+"""
+
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from .cache import REPO_ROOT
+
+# Directories searched for assets by file name, separated by os.pathsep.
+ASSET_PATH_ENV = "NOVIRA_ASSET_PATH"
+
+# Searched after the configured path itself.
+FALLBACK_DIRS = (os.path.join(REPO_ROOT, "public"),)
+
+
+class AssetError(Exception):
+    """Referenced assets are missing or unreadable; `problems` lists them."""
+
+    def __init__(self, problems):
+        super().__init__(f"{len(problems)} asset(s) missing or unreadable")
+        self.problems = problems
+
+    def report(self):
+        """Print the problems to stderr, for a generator's main() to exit on."""
+        print(f"❌ {self}:", file=sys.stderr)
+        for line in self.problems:
+            print(f"  {line}", file=sys.stderr)
+
+
+@dataclass
+class AssetReport:
+    """Outcome of a prefetch: resolved paths and what could not be used."""
+    found: dict = field(default_factory=dict)     # key -> resolved path
+    missing: dict = field(default_factory=dict)   # key -> configured path
+    invalid: dict = field(default_factory=dict)   # key -> (path, error)
+
+    @property
+    def ok(self):
+        return not self.missing and not self.invalid
+
+    def problems(self):
+        """One line per missing or unreadable asset."""
+        lines = [f"missing {key}: {path}" for key, path in sorted(self.missing.items())]
+        lines += [f"unreadable {key}: {path} ({error})" for key, (path, error) in sorted(self.invalid.items())]
+        return lines
+
+
+class AssetResolver:
+    """Find asset files by configured path, search directories and fallbacks.
+
+    A file name is looked up in each search directory first, so an explicit
+    --asset-dir overrides the configured absolute paths; then the configured
+    path itself; then the fallback directories.
+    """
+
+    def __init__(self, search_paths=(), fallbacks=FALLBACK_DIRS):
+        self.search_paths = [p for p in search_paths if p]
+        self.fallbacks = list(fallbacks)
+        self._resolved = {}
+
+    @classmethod
+    def from_env(cls, extra=()):
+        """A resolver searching `extra` directories, then $NOVIRA_ASSET_PATH."""
+        env = os.environ.get(ASSET_PATH_ENV, "")
+        return cls([*extra, *env.split(os.pathsep)])
+
+    def resolve(self, path):
+        """Return an existing file for `path`, or None."""
+        if path in self._resolved:
+            return self._resolved[path]
+        name = os.path.basename(path)
+        candidates = [os.path.join(d, name) for d in self.search_paths]
+        candidates.append(path)
+        candidates += [os.path.join(d, name) for d in self.fallbacks]
+        found = next((c for c in candidates if os.path.isfile(c)), None)
+        self._resolved[path] = found
+        return found
+
+    def _prefetch_one(self, path, bounds):
+        from PIL import Image as PILImage
+
+        from .images import shared_image
+        from .xobjects import image_xobject
+
+        resolved = self.resolve(path)
+        if resolved is None:
+            return None
+        with PILImage.open(resolved) as img:
+            img.verify()
+        # Largest use first, so the smaller ones reuse its rendition.
+        for max_width, max_height in sorted(bounds, key=lambda b: b[0] * b[1], reverse=True):
+            src, _, _ = shared_image(resolved, max_width, max_height)
+            image_xobject(src)
+        return resolved
+
+    def prefetch(self, assets, jobs=None):
+        """Resolve, validate and prepare images before layout.
+
+        `assets` maps a key to (path, [(max_width, max_height), ...]), the
+        bounds (in points) the image is drawn within. Returns an AssetReport.
+        """
+        report = AssetReport()
+        if not assets:
+            return report
+        jobs = jobs or min(len(assets), os.cpu_count() or 1) or 1
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            futures = {key: pool.submit(self._prefetch_one, path, bounds)
+                       for key, (path, bounds) in assets.items()}
+            for key, future in futures.items():
+                path = assets[key][0]
+                try:
+                    resolved = future.result()
+                except Exception as e:
+                    report.invalid[key] = (path, e)
+                    continue
+                if resolved is None:
+                    report.missing[key] = path
+                else:
+                    report.found[key] = resolved
+        return report
+
+
+def add_asset_arguments(parser):
+    """Add the asset-related CLI options shared by the generators."""
+    parser.add_argument("--asset-dir", action="append", default=[], metavar="DIR",
+                        help=f"directory searched for screenshots and the logo by file name "
+                             f"(repeatable; also ${ASSET_PATH_ENV})")
+    parser.add_argument("--strict", action="store_true",
+                        help="stop before layout if any referenced image is missing or unreadable")
+    parser.add_argument("--jobs", type=int, help="threads used to prefetch images")
+
+
+def check_assets(report, strict=False):
+    """Print the report's problems, or raise AssetError for them if `strict`."""
+    problems = report.problems()
+    if problems and strict:
+        raise AssetError(problems)
+    for line in problems:
+        print(f"  ⚠ {line}")
@@ -0,0 +1,209 @@
+"""
+Sharded, resumable batch rendering.
+
+Renders many small documents, such as one recap per user and month
+(docgen.recaps), with a pool of worker processes:
+
+- Items are split into shards by a stable hash of a shard key (the user), so
+  a run can be spread over machines (``shard=(i, n)``) and each machine's
+  share over its workers: worker j of shard i of n takes shard i + n*j of
+  n*jobs, which is a subset of shard i of n.
+- The workers are forked after the caller warmed the caches every document
+  shares (styles, fonts and their metrics, the logo), so none of them pays
+  for those again.
+- Each finished document is written atomically and appended, with its
+  content digest, to its shard's checkpoint file (JSON Lines) under
+  ``<output>/.checkpoints``. Items whose recorded digest matches and whose
+  file exists are skipped, so an interrupted run resumes where it stopped
+  and a nightly run renders only what is new or changed. At the end of a
+  run the checkpoints are compacted into one file per shard.
+
+Failed items are reported and not checkpointed, so the next run retries them.
+"""
+
+import glob
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+CHECKPOINT_DIR = ".checkpoints"
+PROGRESS_EVERY = 1000
+MAX_FAILURES_KEPT = 20
+
+
+def shard_of(key, shards):
+    """Stable shard of `key`: the first 60 bits of its MD5, modulo `shards`.
+
+    Postgres computes the same with
+    ``mod(('x' || substr(md5(key), 1, 15))::bit(60)::bigint, shards)``.
+    """
+    return int(hashlib.md5(key.encode()).hexdigest()[:15], 16) % shards
+
+
+@dataclass
+class BatchItem:
+    key: str          # unique name, e.g. "2026-04/<user id>"
+    digest: str       # changes when the document would
+    path: str         # output file
+    payload: object   # what render() takes
+
+
+@dataclass
+class ShardResult:
+    shard: int
+    rendered: int = 0
+    skipped: int = 0
+    failed: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+    failures: list = field(default_factory=list)   # (key, error) of the first MAX_FAILURES_KEPT
+
+
+@dataclass
+class BatchResult:
+    shards: list
+    seconds: float
+
+    def total(self, name):
+        return sum(getattr(s, name) for s in self.shards)
+
+    @property
+    def failures(self):
+        return [f for s in self.shards for f in s.failures]
+
+    def __str__(self):
+        rendered = self.total("rendered")
+        rate = rendered / self.seconds if self.seconds else 0
+        return (f"{rendered} rendered, {self.total('skipped')} up to date, {self.total('failed')} failed "
+                f"in {self.seconds:.1f}s ({rate:.0f}/s, {self.total('bytes') / 1024 / 1024:.1f} MB)")
+
+
+# --- Checkpoints ---
+
+def load_checkpoints(output_dir):
+    """key -> digest of every document recorded under `output_dir`."""
+    done = {}
+    for path in sorted(glob.glob(os.path.join(output_dir, CHECKPOINT_DIR, "*.jsonl"))):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # a line cut short by an interrupted run
+                done[entry["key"]] = entry["digest"]
+    return done
+
+
+def _checkpoint_path(output_dir, name):
+    return os.path.join(output_dir, CHECKPOINT_DIR, f"{name}.jsonl")
+
+
+def compact_checkpoints(output_dir, shard, shards):
+    """Merge this run's per-worker checkpoint files into one for shard `shard` of `shards`."""
+    prefix = f"shard-{shard}-of-{shards}"
+    paths = sorted(glob.glob(_checkpoint_path(output_dir, f"{prefix}.*")))
+    merged_path = _checkpoint_path(output_dir, prefix)
+    if not paths:
+        return
+    entries = {}
+    for path in [merged_path, *paths]:
+        if not os.path.exists(path):
+            continue
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                entries[entry["key"]] = line if line.endswith("\n") else line + "\n"
+    tmp = f"{merged_path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.writelines(entries.values())
+    os.replace(tmp, merged_path)
+    for path in paths:
+        os.unlink(path)
+
+
+# --- Workers ---
+
+def _write_atomic(path, data):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+    except FileNotFoundError:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, "wb") as f:
+            f.write(data)
+    os.replace(tmp, path)
+
+
+# The batch the forked workers run: set by run_batch before the pool starts.
+_batch = None
+
+
+def _run_shard(worker):
+    items, render, output_dir, done, (shard, shards), jobs, force = _batch
+    sub_shard, sub_shards = shard + shards * worker, shards * jobs
+    result = ShardResult(sub_shard)
+    start = time.perf_counter()
+    label = f"[{worker + 1}/{jobs}] " if jobs > 1 else ""
+    checkpoint = _checkpoint_path(output_dir, f"shard-{shard}-of-{shards}.{worker}")
+    os.makedirs(os.path.dirname(checkpoint), exist_ok=True)
+    with open(checkpoint, "a", encoding="utf-8") as log:
+        for item in items(sub_shard, sub_shards):
+            if not force and done.get(item.key) == item.digest and os.path.exists(item.path):
+                result.skipped += 1
+            else:
+                try:
+                    data = render(item.payload)
+                    _write_atomic(item.path, data)
+                except Exception as e:
+                    result.failed += 1
+                    if len(result.failures) < MAX_FAILURES_KEPT:
+                        result.failures.append((item.key, f"{type(e).__name__}: {e}"))
+                    continue
+                log.write(json.dumps({"key": item.key, "digest": item.digest, "size": len(data)}) + "\n")
+                log.flush()
+                result.rendered += 1
+                result.bytes += len(data)
+            processed = result.rendered + result.skipped + result.failed
+            if processed % PROGRESS_EVERY == 0:
+                elapsed = time.perf_counter() - start
+                print(f"  {label}{processed} processed ({result.rendered} rendered, {result.skipped} up to date, "
+                      f"{result.failed} failed) in {elapsed:.0f}s", flush=True)
+        os.fsync(log.fileno())
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def run_batch(items, render, output_dir, jobs=None, shard=(0, 1), force=False):
+    """Render every item of shard `shard` = (i, n) with `jobs` worker processes.
+
+    `items(sub_shard, sub_shards)` yields the BatchItems of one worker's
+    sub-shard; `render(payload)` returns a document's bytes. Warm whatever
+    `render` shares before calling this: workers are forked from the caller.
+    Returns a BatchResult.
+    """
+    global _batch
+    jobs = jobs or os.cpu_count() or 1
+    start = time.perf_counter()
+    _batch = (items, render, output_dir, {} if force else load_checkpoints(output_dir), shard, jobs, force)
+    try:
+        if jobs > 1 and "fork" in multiprocessing.get_all_start_methods():
+            with ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context("fork")) as pool:
+                results = list(pool.map(_run_shard, range(jobs)))
+        else:
+            results = [_run_shard(worker) for worker in range(jobs)]
+    except KeyboardInterrupt:
+        print("\n  ⚠ Interrupted; finished documents are checkpointed, run again to resume.", file=sys.stderr)
+        raise
+    finally:
+        _batch = None
+    compact_checkpoints(output_dir, *shard)
+    return BatchResult(results, time.perf_counter() - start)
@@ -0,0 +1,17 @@
+"""
+Location of the on-disk build cache shared by the guide generators.
+"""
+
+import os
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO_ROOT = os.path.dirname(SCRIPTS_DIR)
+
+CACHE_DIR = os.environ.get("NOVIRA_DOC_CACHE", os.path.join(REPO_ROOT, ".cache", "docgen"))
+
+
+def cache_path(*parts):
+    """Return a path inside the cache directory, creating parent folders."""
+    path = os.path.join(CACHE_DIR, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
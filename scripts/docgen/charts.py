@@ -0,0 +1,477 @@
+"""
+Vector analytics charts.
+
+ReportLab graphics versions of the analytics cards in components/analytics/:
+
+- CategoryBreakdown: category-breakdown-card (and payment-breakdown-card),
+  a donut plus the five largest entries with their share bars;
+- SpendingTrend: spending-trend-card, one smoothed line per series plus the
+  dashed prior period;
+- WeekdayBars: weekday-chart-card, with the peak day highlighted;
+- CalendarHeatmap: calendar-heatmap-card, one cell per day in week columns,
+  shaded by quartile of the days with spending.
+
+They take aggregated arrays (plain sequences or NumPy arrays), such as the
+roll-ups of docgen.report_columns.column_stats; charts_from_stats builds the
+set from a ColumnStats or ReportStats. Charts are drawn as vector paths
+with solid colors (the cards' translucent fills are blended onto the card
+background), so they stay sharp at any zoom and cost a few KB each.
+
+Charts are cached by a hash of their data, size and colors. Each Drawing is
+built once per process (an LRU) and rendered into a document once, as a form
+XObject that every later draw of the same chart references.
+"""
+
+import abc
+import hashlib
+import json
+import math
+from collections import OrderedDict
+from datetime import timedelta
+
+from reportlab.graphics import renderPDF
+from reportlab.graphics.shapes import Circle, Drawing, Line, Path, Rect, String
+from reportlab.lib.colors import HexColor, white
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.platypus.flowables import Flowable
+
+from . import fonts
+from .report_stats import MONTHS, format_currency
+
+# Bump when chart drawings change, so cached forms are not mixed across versions.
+CHART_VERSION = 1
+MAX_CACHED_DRAWINGS = 128
+
+# lib/categories.ts CATEGORY_COLORS
+CATEGORY_COLORS = {
+    "food": "#9333EA", "groceries": "#10B981", "fashion": "#F472B6", "transport": "#F87171",
+    "bills": "#06B6D4", "shopping": "#FBBF24", "healthcare": "#F97316", "entertainment": "#EC4899",
+    "rent": "#6366F1", "education": "#84CC16", "beauty": "#E879F9", "others": "#14B8A6",
+    "uncategorized": "#94A3B8",
+}
+# hooks/useAnalyticsData.ts PAYMENT_COLORS
+PAYMENT_COLORS = {
+    "cash": "#22C55E", "debit card": "#3B82F6", "credit card": "#A855F7", "upi": "#F59E0B",
+    "bank transfer": "#06B6D4", "other": "#EC4899",
+}
+WEEKDAY_LABELS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+# Labels the charts draw themselves; a chart's `gettext` translates them.
+CHART_TEXT = ["No data", "Prior period", "Peak · {day}", "Peak {amount}", "{days} days · {total}", "Less", "More"]
+# Non-ASCII characters the charts draw themselves, for font subset seeding.
+SYMBOLS = "·…"
+
+# Print stand-ins for the cards' dark-mode surfaces.
+CARD = "#F5F3FF"
+TRACK = "#E5E7EB"
+EMPTY_DAY = "#ECEAF3"
+TEXT = "#111827"
+MUTED = "#6B7280"
+PRIOR = "#9CA3AF"
+# calendar-heatmap-card INTENSITY_ALPHA / BORDER_ALPHA
+INTENSITY_ALPHA = (0.20, 0.35, 0.55, 0.85)
+BORDER_ALPHA = (0.30, 0.45, 0.65, 1.0)
+
+FONT, BOLD = fonts.font("Helvetica"), fonts.font("Helvetica-Bold")
+
+# digest -> Drawing
+_drawings = OrderedDict()
+
+
+def blend(color, alpha, background=CARD):
+    """`color` at `alpha` over `background`, as an opaque color."""
+    fg, bg = HexColor(color), HexColor(background)
+    return type(fg)(*(alpha * f + (1 - alpha) * b for f, b in zip(fg.rgb(), bg.rgb())))
+
+
+def _floats(values):
+    return [float(v) if v is not None and not (isinstance(v, float) and math.isnan(v)) else None
+            for v in (values.tolist() if hasattr(values, "tolist") else values)]
+
+
+def _text(text, x, y, size, color=MUTED, bold=False, anchor="start"):
+    font = BOLD if bold else FONT
+    return String(x, y, fonts.printable(str(text), font), fontName=font, fontSize=size,
+                  fillColor=HexColor(color), textAnchor=anchor)
+
+
+def _fit(text, size, width, bold=False):
+    """`text` cut with an ellipsis to fit `width`."""
+    font = BOLD if bold else FONT
+    text = fonts.printable(str(text), font)
+    if stringWidth(text, font, size) <= width:
+        return text
+    while text and stringWidth(text + "…", font, size) > width:
+        text = text[:-1]
+    return text + "…"
+
+
+def _arc(path, cx, cy, r, start, end, move=False):
+    """Append a circular arc (degrees, counter-clockwise if end > start) as Béziers."""
+    steps = max(1, math.ceil(abs(end - start) / 90))
+    delta = math.radians(end - start) / steps
+    k = 4 / 3 * math.tan(delta / 4)
+    a = math.radians(start)
+    x, y = cx + r * math.cos(a), cy + r * math.sin(a)
+    if move:
+        path.moveTo(x, y)
+    else:
+        path.lineTo(x, y)
+    for _ in range(steps):
+        b = a + delta
+        path.curveTo(x - k * r * math.sin(a), y + k * r * math.cos(a),
+                     cx + r * math.cos(b) + k * r * math.sin(b), cy + r * math.sin(b) - k * r * math.cos(b),
+                     cx + r * math.cos(b), cy + r * math.sin(b))
+        a, x, y = b, cx + r * math.cos(b), cy + r * math.sin(b)
+
+
+def _monotone(path, points):
+    """Append a monotone cubic through `points` (d3's curveMonotoneX, as recharts draws type="monotone")."""
+    n = len(points)
+    xs, ys = [p[0] for p in points], [p[1] for p in points]
+    path.moveTo(xs[0], ys[0])
+    if n < 3:
+        for x, y in points[1:]:
+            path.lineTo(x, y)
+        return
+    d = [(ys[i + 1] - ys[i]) / (xs[i + 1] - xs[i]) for i in range(n - 1)]
+    m = [d[0]] + [0.0 if d[i - 1] * d[i] <= 0 else (d[i - 1] + d[i]) / 2 for i in range(1, n - 1)] + [d[-1]]
+    for i in range(n - 1):
+        if d[i] == 0:
+            m[i] = m[i + 1] = 0.0
+            continue
+        a, b = m[i] / d[i], m[i + 1] / d[i]
+        s = a * a + b * b
+        if s > 9:
+            t = 3 / math.sqrt(s)
+            m[i], m[i + 1] = t * a * d[i], t * b * d[i]
+    for i in range(n - 1):
+        h = (xs[i + 1] - xs[i]) / 3
+        path.curveTo(xs[i] + h, ys[i] + m[i] * h, xs[i + 1] - h, ys[i + 1] - m[i + 1] * h, xs[i + 1], ys[i + 1])
+
+
+class Chart(Flowable, abc.ABC):
+    """Base class: a fixed-size chart drawn from a cached Drawing through a form XObject.
+
+    Subclasses keep their inputs as plain values (so section fingerprints see
+    them, see docgen.sections), return them from data() and draw them in
+    build(drawing).
+    """
+
+    def __init__(self, width, height, title="", base="#7C3AED", light="#A855F7", format_amount=None,
+                 gettext=None, hAlign="CENTER"):
+        Flowable.__init__(self)
+        self.width, self.height = width, height
+        self.title = title
+        self.base, self.light = base, light
+        self.format_amount = format_amount or (lambda amount: f"{amount:,.0f}")
+        # Translated CHART_TEXT, kept as plain values so digests and section fingerprints see it.
+        self.text = {label: gettext(label) if gettext else label for label in CHART_TEXT}
+        self.hAlign = hAlign
+
+    @abc.abstractmethod
+    def data(self):
+        """The chart's inputs as plain values."""
+
+    @abc.abstractmethod
+    def build(self, d):
+        """Add the chart's shapes and labels to Drawing `d`."""
+
+    def _amount(self, amount):
+        return self.format_amount(amount)
+
+    def _empty(self, d, x, y):
+        d.add(_text(self.text["No data"].upper(), x, y, 7, bold=True, anchor="middle"))
+
+    @property
+    def digest(self):
+        """Hash of everything the drawing depends on, formatted amounts included."""
+        payload = [CHART_VERSION, type(self).__name__, self.width, self.height, self.title, self.base, self.light,
+                   self.text, self.data(), [self._amount(v) for v in (0, 1234.5)]]
+        return hashlib.sha256(json.dumps(payload, default=str).encode()).hexdigest()
+
+    def _cached(self, digest):
+        d = _drawings.get(digest)
+        if d is None:
+            d = Drawing(self.width, self.height)
+            d.add(Rect(0, 0, self.width, self.height, rx=8, ry=8, fillColor=HexColor(CARD), strokeColor=None))
+            if self.title:
+                d.add(_text(self.title.upper(), 10, self.height - 16, 7, bold=True))
+            self.build(d)
+            _drawings[digest] = d
+            if len(_drawings) > MAX_CACHED_DRAWINGS:
+                _drawings.popitem(last=False)
+        else:
+            _drawings.move_to_end(digest)
+        return d
+
+    def drawing(self):
+        """The chart's Drawing, from the process-wide LRU when the same data was drawn before."""
+        return self._cached(self.digest)
+
+    def wrap(self, availWidth, availHeight):
+        return self.width, self.height
+
+    def draw(self):
+        canv = self.canv
+        digest = self.digest
+        name = "chart" + digest[:32]
+        if not canv.hasForm(name):
+            canv.beginForm(name, 0, 0, self.width, self.height)
+            renderPDF.draw(self._cached(digest), canv, 0, 0, showBoundary=False)
+            canv.endForm()
+        canv.doForm(name)
+
+
+class CategoryBreakdown(Chart):
+    """Donut of `amounts` by `keys`, with the top five listed beside it."""
+
+    def __init__(self, keys, amounts, width, height, colors=CATEGORY_COLORS, labels=None, **kwargs):
+        super().__init__(width, height, **kwargs)
+        rows = sorted(((str(k), a) for k, a in zip(keys, _floats(amounts)) if a and a > 0), key=lambda r: -r[1])
+        self.keys = [k for k, _ in rows]
+        self.amounts = [a for _, a in rows]
+        self.labels = [(labels or {}).get(k, k[:1].upper() + k[1:]) for k in self.keys]
+        fallback = colors.get("others", colors.get("other", "#94A3B8"))
+        self.colors = [colors.get(k.lower(), fallback) for k in self.keys]
+
+    def data(self):
+        return [self.keys, self.amounts, self.labels, self.colors]
+
+    def build(self, d):
+        top = self.height - (26 if self.title else 10)
+        outer = min(top - 10, self.width * 0.3) / 2
+        inner = outer * 46 / 68
+        cx, cy = 12 + outer, (top + 10) / 2
+        total = sum(self.amounts)
+        if not total:
+            self._empty(d, cx, cy - 3)
+            return
+        angle = 90.0
+        for amount, color in zip(self.amounts, self.colors):
+            sweep = 360 * amount / total
+            p = Path(fillColor=HexColor(color), strokeColor=white if len(self.amounts) > 1 else None,
+                     strokeWidth=1)
+            _arc(p, cx, cy, outer, angle, angle - sweep, move=True)
+            _arc(p, cx, cy, inner, angle - sweep, angle)
+            p.closePath()
+            d.add(p)
+            angle -= sweep
+
+        left = cx + outer + 18
+        width = self.width - left - 12
+        rows = list(zip(self.labels, self.amounts, self.colors))[:5]
+        step = min(26, (top - 10) / max(1, len(rows)))
+        y = cy + step * len(rows) / 2 - 9
+        for label, amount, color in rows:
+            value = self._amount(amount)
+            value_width = stringWidth(fonts.printable(value, BOLD), BOLD, 7.5)
+            d.add(Circle(left + 2, y + 2.5, 2, fillColor=HexColor(color), strokeColor=None))
+            d.add(_text(_fit(label, 7.5, width - value_width - 14), left + 8, y, 7.5, bold=True))
+            d.add(_text(value, left + width, y, 7.5, TEXT, bold=True, anchor="end"))
+            d.add(Rect(left, y - 7, width, 2.5, rx=1.25, ry=1.25, fillColor=HexColor(TRACK), strokeColor=None))
+            d.add(Rect(left, y - 7, max(2.5, width * amount / total), 2.5, rx=1.25, ry=1.25,
+                       fillColor=HexColor(color), strokeColor=None))
+            y -= step
+
+
+class SpendingTrend(Chart):
+    """Lines of `series` (name -> values per label), plus an optional dashed `prior` line."""
+
+    def __init__(self, labels, series, width, height, colors=CATEGORY_COLORS, prior=None, **kwargs):
+        super().__init__(width, height, **kwargs)
+        self.labels = [str(label) for label in labels]
+        self.series = {str(name): _floats(values) for name, values in series.items()}
+        self.prior = _floats(prior) if prior is not None else None
+        self.colors = {name: colors.get(name.lower(), self.base) for name in self.series}
+
+    def data(self):
+        return [self.labels, self.series, self.prior, self.colors]
+
+    def build(self, d):
+        n = len(self.labels)
+        legend = 14 if self.series else 0
+        bottom, top = 16 + legend, self.height - (28 if self.title else 12)
+        left, right = 14, self.width - 14
+        values = [v for vs in [*self.series.values(), self.prior or []] for v in vs if v is not None]
+        if not n or not values:
+            self._empty(d, self.width / 2, (top + bottom) / 2)
+            return
+        peak = max(max(values), 1e-9)
+
+        def x(i):
+            return left + (right - left) * (i / (n - 1) if n > 1 else 0.5)
+
+        def y(v):
+            return bottom + (top - bottom) * max(0.0, v) / peak
+
+        d.add(Line(left, bottom, right, bottom, strokeColor=HexColor(TRACK), strokeWidth=0.5))
+        d.add(_text(self._amount(peak), left, top + 4, 6, anchor="start"))
+        lines = [(self.prior, HexColor(PRIOR), 1.0, [3, 4])] if self.prior else []
+        lines += [(vs, HexColor(self.colors[name]), 1.8, None) for name, vs in self.series.items()]
+        for vs, color, width, dash in lines:
+            points = [(x(i), y(v)) for i, v in enumerate(vs[:n]) if v is not None]
+            if not points:
+                continue
+            p = Path(fillColor=None, strokeColor=color, strokeWidth=width, strokeDashArray=dash,
+                     strokeLineCap=1, strokeLineJoin=1)
+            _monotone(p, points)
+            d.add(p)
+
+        every = max(1, math.ceil(n / 7))
+        for i in range(0, n, every):
+            d.add(_text(self.labels[i], x(i), bottom - 10, 6, anchor="middle" if 0 < i < n - 1 else
+                        ("start" if i == 0 else "end")))
+        lx = left
+        for name in self.series:
+            label = name[:1].upper() + name[1:]
+            d.add(Rect(lx, 8.5, 8, 2, fillColor=HexColor(self.colors[name]), strokeColor=None))
+            d.add(_text(label, lx + 11, 7, 6.5))
+            lx += 11 + stringWidth(fonts.printable(label, FONT), FONT, 6.5) + 10
+        if self.prior:
+            d.add(Line(lx, 9.5, lx + 8, 9.5, strokeColor=HexColor(PRIOR), strokeWidth=1, strokeDashArray=[2, 2]))
+            d.add(_text(self.text["Prior period"], lx + 11, 7, 6.5))
+
+
+class WeekdayBars(Chart):
+    """Seven bars of `totals`, Monday first like the app; the peak in the light shade."""
+
+    def __init__(self, totals, width, height, labels=WEEKDAY_LABELS, **kwargs):
+        kwargs.setdefault("title", "By Weekday")
+        super().__init__(width, height, **kwargs)
+        self.totals = [t or 0.0 for t in _floats(totals)]
+        self.labels = list(labels)
+
+    def data(self):
+        return [self.totals, self.labels]
+
+    def build(self, d):
+        peak_total = max(self.totals, default=0)
+        if peak_total <= 0:
+            self._empty(d, self.width / 2, self.height / 2)
+            return
+        peak = self.totals.index(peak_total)
+        badge = self.text["Peak · {day}"].format(day=self.labels[peak])
+        d.add(_text(badge.upper(), self.width - 10, self.height - 16, 6.5, bold=True, anchor="end"))
+        top = self.height - 38
+        gap = 6
+        slot = (self.width - 20 - gap * 6) / 7
+        for i, (label, total) in enumerate(zip(self.labels, self.totals)):
+            x = 10 + i * (slot + gap)
+            is_peak = total == peak_total
+            h = max(4.0, (top - 20) * total / peak_total)
+            d.add(Rect(x, 18, slot, h, rx=3, ry=3, strokeColor=None,
+                       fillColor=HexColor(self.light) if is_peak else blend(self.base, 0.3)))
+            if total > 0:
+                d.add(_text(_fit(self._amount(round(total)), 6, slot + gap), x + slot / 2, 22 + h, 6,
+                            bold=True, anchor="middle"))
+            d.add(_text(label.upper(), x + slot / 2, 8, 6.5, TEXT if is_peak else MUTED, bold=True,
+                        anchor="middle"))
+
+
+class CalendarHeatmap(Chart):
+    """Daily `amounts` from `start` (one per day) as a week-column heatmap.
+
+    `first_day_of_week` is 1 for Monday (the app's DAY_LABELS_MON) or 0 for
+    Sunday, as in the user preferences. Rows are labelled with the initials
+    of `labels`, Monday first.
+    """
+
+    def __init__(self, start, amounts, width, height, first_day_of_week=1, labels=WEEKDAY_LABELS, **kwargs):
+        kwargs.setdefault("title", "Daily Heatmap")
+        super().__init__(width, height, **kwargs)
+        self.start = start
+        self.amounts = [a or 0.0 for a in _floats(amounts)]
+        self.first_day_of_week = first_day_of_week
+        self.labels = [label[:1] for label in labels]
+
+    def data(self):
+        return [self.start.isoformat(), self.amounts, self.first_day_of_week, self.labels]
+
+    def quantiles(self):
+        """calendar-heatmap-card's four thresholds over the days with spending."""
+        spent = sorted(a for a in self.amounts if a > 0)
+        if not spent:
+            return [0.0] * 4
+        return [spent[max(0, min(len(spent) - 1, math.floor(len(spent) * f) - 1))] for f in (0.25, 0.5, 0.75, 1)]
+
+    def build(self, d):
+        days = len(self.amounts)
+        if not days:
+            return
+        q = self.quantiles()
+        # Weekday of start within the user's week (isoweekday: Monday 1 .. Sunday 7).
+        offset = (self.start.isoweekday() - (self.first_day_of_week or 7)) % 7
+        weeks = math.ceil((offset + days) / 7)
+        gap = 2
+        left, bottom, top = 22, 24, self.height - 26
+        cell = min((self.width - left - 10 - gap * (weeks - 1)) / weeks, (top - bottom - gap * 6) / 7)
+        # Short ranges are centred rather than stretched.
+        left = max(left, (self.width - weeks * (cell + gap) + gap) / 2)
+
+        labels = self.labels if self.first_day_of_week == 1 else self.labels[-1:] + self.labels[:-1]
+        for row, label in enumerate(labels):
+            if row % 2:
+                d.add(_text(label, left - 5, top - row * (cell + gap) - cell + 1.5, 5.5, bold=True, anchor="end"))
+
+        peak = max(self.amounts)
+        # Rounded corners cost eight curves a cell; a year's small cells are drawn square.
+        radius = 2 if cell >= 8 else 0
+        for i, amount in enumerate(self.amounts):
+            column, row = divmod(offset + i, 7)
+            d.add(Rect(left + column * (cell + gap), top - row * (cell + gap) - cell, cell, cell,
+                       rx=radius, ry=radius, strokeWidth=0.5, **self._cell(amount, q)))
+        if peak > 0:
+            badge = self.text["Peak {amount}"].format(amount=self._amount(round(peak)))
+            d.add(_text(badge.upper(), self.width - 10, self.height - 16, 6.5, self.base, bold=True, anchor="end"))
+
+        d.add(Line(10, bottom - 6, self.width - 10, bottom - 6, strokeColor=HexColor(TRACK), strokeWidth=0.5))
+        footer = self.text["{days} days · {total}"].format(days=days, total=self._amount(round(sum(self.amounts))))
+        d.add(_text(footer.upper(), 10, 8, 6.5, bold=True))
+        x = self.width - 10
+        more = fonts.printable(self.text["More"].upper(), BOLD)
+        d.add(_text(more, x, 8, 6.5, bold=True, anchor="end"))
+        x -= stringWidth(more, BOLD, 6.5) + 3
+        for amount in (q[3], q[2], q[1], q[0], 0):
+            x -= 7
+            d.add(Rect(x, 7.5, 6, 6, rx=1.5, ry=1.5, strokeWidth=0.5, **self._cell(amount, q)))
+            x -= 2
+        d.add(_text(self.text["Less"].upper(), x - 1, 8, 6.5, bold=True, anchor="end"))
+
+    def _cell(self, amount, q):
+        if amount <= 0:
+            return {"fillColor": HexColor(EMPTY_DAY), "strokeColor": None}
+        index = 0 if amount <= q[0] else 1 if amount <= q[1] else 2 if amount <= q[2] else 3
+        color = self.light if index == 3 else self.base
+        return {"fillColor": blend(color, INTENSITY_ALPHA[index]), "strokeColor": blend(color, BORDER_ALPHA[index])}
+
+
+def charts_from_stats(stats, currency, width, height, first_day_of_week=1, **kwargs):
+    """The four analytics charts for a ColumnStats or ReportStats, by name.
+
+    The spending trend has one "total" line of the monthly totals; the
+    heatmap covers first to last day with spending.
+    """
+    kwargs.setdefault("format_amount", lambda amount: format_currency(amount, currency))
+    charts = {
+        "categories": CategoryBreakdown(list(stats.category_totals), list(stats.category_totals.values()),
+                                        width, height, title="Categories", **kwargs),
+        "methods": CategoryBreakdown(list(stats.method_totals), list(stats.method_totals.values()), width, height,
+                                     colors=PAYMENT_COLORS, title="Payment Methods", **kwargs),
+    }
+    months = sorted(stats.monthly_totals)
+    charts["trend"] = SpendingTrend([f"{MONTHS[m - 1][:3]} {y % 100:02d}" for y, m in months],
+                                    {"total": [stats.monthly_totals[k] for k in months]}, width, height,
+                                    colors={}, title="Spending Trend", **kwargs)
+    # dow_totals is Sunday first; the chart is Monday first.
+    charts["weekday"] = WeekdayBars(list(stats.dow_totals[1:]) + [stats.dow_totals[0]], width, height, **kwargs)
+    if stats.daily_totals:
+        first, last = min(stats.daily_totals), max(stats.daily_totals)
+        amounts = [stats.daily_totals.get(first + timedelta(days=i), 0.0) for i in range((last - first).days + 1)]
+        charts["heatmap"] = CalendarHeatmap(first, amounts, width, height, first_day_of_week, **kwargs)
+    return charts
+
+
+def clear_cache():
+    """Forget every cached chart drawing."""
+    _drawings.clear()
+
@@ -0,0 +1,352 @@
+"""
+Memory-mapped columnar transaction files.
+
+A compact on-disk form of an export's transactions and their splits, for
+report jobs over millions of rows. A dict per transaction costs hundreds of
+bytes in memory; a row here is about 100 bytes on disk plus its text (a
+split 21), and opening a file only reads its manifest.
+
+Layout:
+
+    b"NVCOLS01"             magic
+    u64 offset, u64 length  of the manifest (little-endian)
+    columns                 each on a 64-byte boundary
+    manifest                JSON: row and split counts, each column's dtype,
+                            offset and length, the vocabularies, user names
+
+The fixed-width columns are those of docgen.report_columns, plus the
+account, bucket and is_settlement the report also needs. Currency,
+category, payment method, user, account and bucket are dictionary codes
+into the manifest's vocabularies, -1 when missing. Each text field is an
+offset-indexed string heap: ``<field>.offsets`` holds n + 1 int64 byte
+offsets into ``<field>.data``, UTF-8 with no separators; empty means
+missing. Tags are joined with U+001F.
+
+ColumnStore maps the file and hands out np.frombuffer views of it, so
+nothing is copied or loaded until a column is touched. ``columns()`` gives
+the TransactionColumns that column_stats takes. A ColumnStore is also a
+transaction source for docgen.report: iterating yields (row, transaction
+dict) and get(row) rebuilds one transaction, so transaction_report.py reads
+these files as it does JSON Lines.
+"""
+
+import json
+import math
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+from array import array
+from datetime import date
+
+import numpy as np
+
+from .report_columns import ROW_COLUMNS, SPLIT_COLUMNS, VOCABULARIES, ColumnEncoder, TransactionColumns, _Vocabulary
+
+MAGIC = b"NVCOLS01"
+HEADER = struct.Struct("<8sQQ")
+ALIGN = 64
+VERSION = 1
+CHUNK_ROWS = 65536   # rows buffered before they are spilled to disk, and rebuilt per read
+TAG_SEPARATOR = "\x1f"
+
+STORE_COLUMNS = {
+    **ROW_COLUMNS,
+    "account": ("i", "i4"),
+    "bucket": ("i", "i4"),
+    "is_settlement": ("B", "?"),
+}
+STORE_VOCABULARIES = (*VOCABULARIES, "accounts", "buckets")
+TEXT_FIELDS = ("description", "notes", "place_name", "receipt_path", "tags", "transfer_pair_id")
+
+
+class ColumnStoreError(Exception):
+    pass
+
+
+def is_column_store(path):
+    """Whether `path` starts like a columnar transaction file."""
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+class StoreEncoder(ColumnEncoder):
+    """ColumnEncoder with the report's other fields: account, bucket, settlement and the texts."""
+
+    row_columns = STORE_COLUMNS
+
+    def __init__(self):
+        super().__init__()
+        self.vocabularies["accounts"] = _Vocabulary()
+        self.vocabularies["buckets"] = _Vocabulary()
+        self._text_size = dict.fromkeys(TEXT_FIELDS, 0)
+
+    def _empty(self):
+        buffers = super()._empty()
+        for name in TEXT_FIELDS:
+            buffers[f"{name}.offsets"] = array("q")   # end offset of each row
+            buffers[f"{name}.data"] = bytearray()
+        return buffers
+
+    def add(self, tx):
+        if not super().add(tx):
+            return False
+        b, v = self.buffers, self.vocabularies
+        b["account"].append(v["accounts"].code(tx.get("account_id") or None))
+        b["bucket"].append(v["buckets"].code(tx.get("bucket_id") or None))
+        b["is_settlement"].append(bool(tx.get("is_settlement")))
+        for name in TEXT_FIELDS:
+            value = tx.get(name)
+            if name == "tags":
+                value = TAG_SEPARATOR.join(t for t in value if t) if isinstance(value, list) else None
+            if value:
+                data = str(value).encode("utf-8")
+                b[f"{name}.data"] += data
+                self._text_size[name] += len(data)
+            b[f"{name}.offsets"].append(self._text_size[name])
+        return True
+
+
+class ColumnStoreWriter:
+    """Writes transactions to a columnar file with bounded memory.
+
+    Rows are encoded into buffers that are spilled, every CHUNK_ROWS rows,
+    to one scratch file per column next to the output. close() copies them
+    into the output and writes the manifest; the file appears atomically.
+    """
+
+    def __init__(self, path, chunk_rows=CHUNK_ROWS):
+        self.path = path
+        self.chunk_rows = chunk_rows
+        self.encoder = StoreEncoder()
+        self._scratch = tempfile.mkdtemp(prefix=".columns-", dir=os.path.dirname(os.path.abspath(path)))
+        self._files = {}
+        for name in TEXT_FIELDS:
+            self._file(f"{name}.offsets").write(array("q", [0]))
+
+    def _file(self, name):
+        f = self._files.get(name)
+        if f is None:
+            f = self._files[name] = open(os.path.join(self._scratch, name), "wb")
+        return f
+
+    def add(self, tx):
+        """Add one transaction; invalid ones (see report_stats.is_valid) are skipped."""
+        if self.encoder.add(tx) and self.encoder.rows % self.chunk_rows == 0:
+            self._spill()
+
+    def _spill(self):
+        for name, buffer in self.encoder.drain().items():
+            self._file(name).write(buffer)
+
+    def _dtypes(self):
+        dtypes = {name: dtype for name, (_, dtype) in {**STORE_COLUMNS, **SPLIT_COLUMNS}.items()}
+        for name in TEXT_FIELDS:
+            dtypes[f"{name}.offsets"], dtypes[f"{name}.data"] = "i8", "u1"
+        return dtypes
+
+    def close(self):
+        """Finish the file; returns its manifest."""
+        self._spill()
+        encoder = self.encoder
+        manifest = {
+            "version": VERSION,
+            "rows": encoder.rows,
+            "splits": encoder.splits,
+            "columns": {},
+            "vocabularies": {name: encoder.vocabularies[name].values for name in STORE_VOCABULARIES},
+            "user_names": encoder.user_names,
+        }
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "wb") as out:
+                out.write(HEADER.pack(MAGIC, 0, 0))
+                for name, dtype in self._dtypes().items():
+                    out.write(b"\0" * (-out.tell() % ALIGN))
+                    offset = out.tell()
+                    f = self._file(name)
+                    f.close()
+                    with open(f.name, "rb") as spill:
+                        shutil.copyfileobj(spill, out, 1 << 20)
+                    dtype = np.dtype(dtype)
+                    manifest["columns"][name] = {"dtype": dtype.str, "offset": offset,
+                                                 "length": (out.tell() - offset) // dtype.itemsize}
+                offset = out.tell()
+                data = json.dumps(manifest, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+                out.write(data)
+                out.seek(0)
+                out.write(HEADER.pack(MAGIC, offset, len(data)))
+            os.replace(tmp, self.path)
+        finally:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            self.abort()
+        return manifest
+
+    def abort(self):
+        """Drop the scratch files without writing the output."""
+        for f in self._files.values():
+            f.close()
+        shutil.rmtree(self._scratch, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def write_column_store(path, transactions):
+    """Write an iterable of transaction dicts to `path`; returns the manifest."""
+    writer = ColumnStoreWriter(path)
+    try:
+        for tx in transactions:
+            writer.add(tx)
+    except BaseException:
+        writer.abort()
+        raise
+    return writer.close()
+
+
+class ColumnStore:
+    """A memory-mapped columnar transaction file."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            try:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise ColumnStoreError(f"{path}: empty file") from None
+        if len(self._map) < HEADER.size:
+            raise ColumnStoreError(f"{path}: not a columnar transaction file")
+        magic, offset, length = HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise ColumnStoreError(f"{path}: not a columnar transaction file")
+        self.manifest = json.loads(self._map[offset:offset + length])
+        if self.manifest.get("version") != VERSION:
+            raise ColumnStoreError(f"{path}: unsupported version {self.manifest.get('version')}")
+        self.rows = self.manifest["rows"]
+        self.vocabularies = self.manifest["vocabularies"]
+        self.user_names = self.manifest["user_names"]
+        self._views = {}
+
+    def __len__(self):
+        return self.rows
+
+    def column(self, name):
+        """A read-only NumPy view of one column (no copy)."""
+        view = self._views.get(name)
+        if view is None:
+            try:
+                spec = self.manifest["columns"][name]
+            except KeyError:
+                raise ColumnStoreError(f"{self.path}: no column {name!r}") from None
+            view = self._views[name] = np.frombuffer(self._map, dtype=spec["dtype"], count=spec["length"],
+                                                     offset=spec["offset"])
+        return view
+
+    def columns(self):
+        """TransactionColumns over views of the file, for docgen.report_columns.column_stats."""
+        arrays = {name: self.column(name) for name in (*ROW_COLUMNS, *SPLIT_COLUMNS)}
+        return TransactionColumns(**arrays, **{name: self.vocabularies[name] for name in VOCABULARIES},
+                                  user_names=self.user_names)
+
+    def _values(self, name, start, stop):
+        view = self.column(name)
+        if stop - start == 1:
+            return [view.item(start)]  # much cheaper than slicing for get()
+        return view[start:stop].tolist()
+
+    def texts(self, name, start=0, stop=None):
+        """The strings of text field `name` for rows start..stop."""
+        stop = self.rows if stop is None else stop
+        offsets = self._values(f"{name}.offsets", start, stop + 1)
+        base = self.manifest["columns"][f"{name}.data"]["offset"]
+        data = self._map[base + offsets[0]:base + offsets[-1]]
+        first = offsets[0]
+        return [data[a - first:b - first].decode("utf-8") for a, b in zip(offsets, offsets[1:])]
+
+    # --- transaction source (see docgen.report) ---
+
+    def _transactions(self, start, stop):
+        """Rebuild the transaction dicts of rows start..stop."""
+        c = {name: self._values(name, start, stop) for name in STORE_COLUMNS}
+        texts = {name: self.texts(name, start, stop) for name in TEXT_FIELDS}
+        v, names = self.vocabularies, self.user_names
+        splits = {}
+        if any(c["has_splits"]):
+            split_rows = self.column("split_row")
+            lo, hi = np.searchsorted(split_rows, [start, stop]).tolist()
+            entries = zip(split_rows[lo:hi].tolist(), self.column("split_user")[lo:hi].tolist(),
+                          self.column("split_amount")[lo:hi].tolist(), self.column("split_unpaid")[lo:hi].tolist())
+        else:
+            entries = ()
+        for row, user, amount, unpaid in entries:
+            user_id = v["users"][user]
+            splits.setdefault(row, []).append({
+                "user_id": user_id, "amount": amount, "is_paid": not unpaid,
+                "profile": {"full_name": names[user_id]} if user_id in names else None,
+            })
+
+        def code(vocabulary, value):
+            return v[vocabulary][value] if value >= 0 else None
+
+        def number(value):
+            return None if math.isnan(value) else value
+
+        result = []
+        for i in range(stop - start):
+            user_id = code("users", c["user"][i])
+            tx = {
+                "date": date.fromordinal(c["day"][i]).isoformat(),
+                "amount": c["amount"][i],
+                "currency": code("currencies", c["currency"][i]),
+                "converted_amount": number(c["converted_amount"][i]),
+                "exchange_rate": number(c["exchange_rate"][i]),
+                "base_currency": code("currencies", c["base_currency"][i]),
+                "category": v["categories"][c["category"][i]],
+                "payment_method": code("methods", c["payment_method"][i]),
+                "user_id": user_id,
+                "profile": {"full_name": names[user_id]} if user_id in names else None,
+                "is_income": c["is_income"][i],
+                "is_transfer": c["is_transfer"][i],
+                "is_recurring": c["is_recurring"][i],
+                "is_settlement": c["is_settlement"][i],
+                "account_id": code("accounts", c["account"][i]),
+                "bucket_id": code("buckets", c["bucket"][i]),
+            }
+            for name in TEXT_FIELDS:
+                tx[name] = texts[name][i] or None
+            tx["tags"] = tx["tags"].split(TAG_SEPARATOR) if tx["tags"] else []
+            if c["has_splits"][i]:
+                # A list of entries without a user still counts its payer, see StatsBuilder.add.
+                tx["splits"] = splits.get(start + i) or [{}]
+            result.append(tx)
+        return result
+
+    def __iter__(self):
+        for start in range(0, self.rows, CHUNK_ROWS):
+            stop = min(start + CHUNK_ROWS, self.rows)
+            yield from enumerate(self._transactions(start, stop), start)
+
+    def get(self, key):
+        return self._transactions(key, key + 1)[0]
+
+    def close(self):
+        """Unmap the file once no views of it are left."""
+        self._views.clear()
+        try:
+            self._map.close()
+        except BufferError:
+            pass  # views are still alive; the mapping goes with the last of them
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
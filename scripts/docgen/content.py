@@ -0,0 +1,399 @@
+"""
+Declarative guide content.
+
+Guide text lives in ``scripts/content/<guide>/*.md``, one file per section, in
+a small Markdown dialect. It is parsed into a block AST and then compiled into
+ReportLab flowables by ``compile_blocks``.
+
+Syntax, one block per blank-line separated chunk:
+
+    # 1. Getting Started          heading1
+    ## 1.1  Creating an Account   heading2
+    Plain text                    paragraph in the "body" style
+    {term} Text                   paragraph in the theme's "term" style
+    - Item                        bullet ("• Item"), one per line
+    > Tip text                    tip callout
+    ![Caption](key){90x140}       image from the guide's image table, max size in mm
+    {chart key 170x60}            vector chart from the guide's chart table, size in mm
+    {space 4}                     vertical space in mm
+    {rule}                        the guide's horizontal rule
+    {pagebreak}                   page break
+    {table widths=45,100 style=grid padding=5 bg=table_bg}
+    | Header | Header |           table; a |---| row marks the header row
+    |---|---|
+    | Cell | Cell |
+
+Tables with more than LONG_TABLE_ROWS body rows are laid out as a
+``ChunkedTable`` (see docgen.tables): every row gets the height of the
+tallest one, measured once on a probe table holding the header rows (which
+keep their own heights) and that row.
+
+``**bold**`` becomes ``<b>bold</b>``; any other ReportLab paragraph markup is
+passed through. Lines ending a paragraph may be wrapped freely.
+
+An optional front matter block (``---`` / ``key: value`` lines / ``---``)
+carries section metadata such as its progress-log icon.
+
+Parsing is cached per block: each block's AST is stored under the hash of its
+source text (in memory and in ``.cache/docgen/content-ast.json``), so editing a
+file only re-parses the blocks that changed.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import re
+from dataclasses import dataclass, field
+
+from reportlab.lib.units import mm
+
+from . import fonts
+from .cache import cache_path
+
+# Bump when the AST format changes so stale cache entries are ignored.
+AST_VERSION = 1
+
+AST_CACHE_PATH = cache_path("content-ast.json")
+
+_BLOCK_SPLIT = re.compile(r"\n[ \t]*\n")
+_DIRECTIVE = re.compile(r"^\{(\w+)((?:\s+[^}]*)?)\}$")
+_STYLED = re.compile(r"^\{(\w+)\}\s+(.*)$", re.S)
+_IMAGE = re.compile(r"^!\[(.*)\]\((\w+)\)\{([\d.]+)x([\d.]+)\}$", re.S)
+_CHART = re.compile(r"^(\w+)\s+([\d.]+)x([\d.]+)$")
+_BOLD = re.compile(r"\*\*(.+?)\*\*")
+
+_ast_cache = None
+_ast_cache_dirty = False
+_file_cache = {}
+
+
+@dataclass
+class Section:
+    """One content file: its metadata and parsed blocks."""
+    name: str
+    path: str
+    meta: dict = field(default_factory=dict)
+    blocks: list = field(default_factory=list)
+
+    @property
+    def title(self):
+        for node in self.blocks:
+            if node[0] == "heading":
+                return node[2]
+        return self.meta.get("title", self.name)
+
+
+# --- Parsing ---
+
+def _join(lines):
+    return " ".join(line.strip() for line in lines if line.strip())
+
+
+def _number(text):
+    return int(text) if text.isdigit() else float(text)
+
+
+def _parse_options(text):
+    options = {}
+    for item in text.split():
+        key, _, value = item.partition("=")
+        options[key] = value
+    return options
+
+
+def _parse_row(line):
+    return [cell.strip() for cell in line.strip().strip("|").split("|")]
+
+
+def parse_block(text):
+    """Parse one block of source text into a list of AST nodes."""
+    lines = text.strip("\n").splitlines()
+    first = lines[0].strip()
+
+    if first.startswith("{table") and len(lines) > 1:
+        options = _parse_options(_DIRECTIVE.match(first).group(2))
+        rows, header = [], 0
+        for line in lines[1:]:
+            if re.match(r"^\s*\|[\s|:-]+\|\s*$", line) and "-" in line:
+                header = len(rows)
+                continue
+            rows.append(_parse_row(line))
+        options["header"] = header
+        return [["table", options, rows]]
+
+    nodes = []
+    para = []
+    style = None
+
+    def flush():
+        nonlocal para, style
+        if para:
+            nodes.append(["para", style, _join(para)])
+        para, style = [], None
+
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        stripped = line.strip()
+        m = _DIRECTIVE.match(stripped)
+        if m and m.group(1) in ("space", "rule", "pagebreak"):
+            flush()
+            if m.group(1) == "space":
+                nodes.append(["space", float(m.group(2))])
+            else:
+                nodes.append([m.group(1)])
+        elif m and m.group(1) == "chart":
+            flush()
+            chart = _CHART.match(m.group(2).strip())
+            if not chart:
+                raise ValueError(f"malformed chart: {stripped}")
+            key, w, h = chart.groups()
+            nodes.append(["chart", key, float(w), float(h)])
+        elif stripped.startswith("## "):
+            flush()
+            nodes.append(["heading", 2, stripped[3:]])
+        elif stripped.startswith("# "):
+            flush()
+            nodes.append(["heading", 1, stripped[2:]])
+        elif stripped.startswith("- "):
+            flush()
+            item = [stripped[2:]]
+            while i + 1 < len(lines) and lines[i + 1].startswith("  ") and not lines[i + 1].strip().startswith("- "):
+                i += 1
+                item.append(lines[i])
+            nodes.append(["bullet", _join(item)])
+        elif stripped.startswith("> "):
+            flush()
+            item = [stripped[2:]]
+            while i + 1 < len(lines) and lines[i + 1].strip().startswith("> "):
+                i += 1
+                item.append(lines[i].strip()[2:])
+            nodes.append(["tip", _join(item)])
+        elif stripped.startswith("!["):
+            flush()
+            m = _IMAGE.match(stripped)
+            if not m:
+                raise ValueError(f"malformed image: {stripped}")
+            caption, key, w, h = m.groups()
+            nodes.append(["image", key, float(w), float(h), caption])
+        elif not para and _STYLED.match(stripped):
+            m = _STYLED.match(stripped)
+            style = m.group(1)
+            para = [m.group(2)]
+        else:
+            para.append(line)
+        i += 1
+    flush()
+    return nodes
+
+
+def _load_ast_cache():
+    global _ast_cache
+    if _ast_cache is None:
+        try:
+            with open(AST_CACHE_PATH) as f:
+                data = json.load(f)
+            _ast_cache = data["blocks"] if data.get("version") == AST_VERSION else {}
+        except (OSError, ValueError, KeyError):
+            _ast_cache = {}
+    return _ast_cache
+
+
+def save_ast_cache():
+    """Write newly parsed blocks back to the on-disk AST cache."""
+    global _ast_cache_dirty
+    if not _ast_cache_dirty:
+        return
+    tmp = f"{AST_CACHE_PATH}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump({"version": AST_VERSION, "blocks": _ast_cache}, f)
+    os.replace(tmp, AST_CACHE_PATH)
+    _ast_cache_dirty = False
+
+
+def parse_source(text):
+    """Parse a whole content file into (meta, blocks), reusing cached blocks."""
+    global _ast_cache_dirty
+    cache = _load_ast_cache()
+    meta = {}
+    text = text.replace("\r\n", "\n")
+    if text.startswith("---\n"):
+        end = text.index("\n---", 4)
+        for line in text[4:end].splitlines():
+            key, _, value = line.partition(":")
+            meta[key.strip()] = value.strip()
+        text = text[end + 4:]
+
+    blocks = []
+    for chunk in _BLOCK_SPLIT.split(text):
+        if not chunk.strip():
+            continue
+        key = hashlib.sha1(chunk.strip().encode()).hexdigest()
+        nodes = cache.get(key)
+        if nodes is None:
+            nodes = cache[key] = parse_block(chunk)
+            _ast_cache_dirty = True
+        blocks.extend(nodes)
+    return meta, blocks
+
+
+def load_section(path):
+    """Parse one content file, memoized on its mtime and size."""
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _file_cache.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    with open(path, encoding="utf-8") as f:
+        meta, blocks = parse_source(f.read())
+    name = os.path.splitext(os.path.basename(path))[0]
+    section = Section(name, path, meta, blocks)
+    _file_cache[path] = (stamp, section)
+    return section
+
+
+def load_guide(content_dir):
+    """Parse every section file of a guide, in file name order."""
+    sections = [load_section(p) for p in sorted(glob.glob(os.path.join(content_dir, "*.md")))]
+    save_ast_cache()
+    return sections
+
+
+def headings(sections, max_level=2):
+    """Return (level, text) for every heading in the given sections."""
+    return [(node[1], node[2]) for s in sections for node in s.blocks
+            if node[0] == "heading" and node[1] <= max_level]
+
+
+def image_refs(sections):
+    """Return {image key: [(max_width, max_height) in points, ...]} for the sections."""
+    refs = {}
+    for section in sections:
+        for node in section.blocks:
+            if node[0] == "image":
+                refs.setdefault(node[1], []).append((node[2]*mm, node[3]*mm))
+    return refs
+
+
+# --- Compiling ---
+
+def inline(text):
+    """Convert the inline Markdown subset to ReportLab paragraph markup."""
+    return _BOLD.sub(r"<b>\1</b>", fonts.printable(text, fonts.font("Helvetica"), markup=True))
+
+
+def _grid_table_style(theme, options):
+    padding = _number(options.get("padding", "6"))
+    commands = [
+        ('FONTNAME', (0, 0), (-1, -1), fonts.font('Helvetica')),
+        ('FONTNAME', (0, 0), (-1, 0), fonts.font('Helvetica-Bold')),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('BACKGROUND', (0, 0), (-1, 0), theme.color("primary")),
+        ('TEXTCOLOR', (0, 0), (-1, 0), theme.color("white")),
+        ('BACKGROUND', (0, 1), (-1, -1), theme.color(options.get("bg", "table_bg"))),
+        ('GRID', (0, 0), (-1, -1), 0.5, theme.color("rule")),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), padding),
+        ('TOPPADDING', (0, 0), (-1, -1), padding),
+    ]
+    if "center" in options:
+        col = int(options["center"])
+        commands.append(('ALIGN', (col, 0), (col, -1), 'CENTER'))
+    commands.append(('VALIGN', (0, 0), (-1, -1), 'MIDDLE'))
+    return commands
+
+
+def _info_table_style(theme, options):
+    return [
+        ('FONTNAME', (0, 0), (0, -1), fonts.font('Helvetica-Bold')),
+        ('FONTNAME', (1, 0), (1, -1), fonts.font('Helvetica')),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('TEXTCOLOR', (0, 0), (0, -1), theme.color("primary")),
+        ('TEXTCOLOR', (1, 0), (1, -1), theme.color("text_secondary")),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+        ('TOPPADDING', (0, 0), (-1, -1), 4),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ]
+
+
+TABLE_STYLES = {"grid": _grid_table_style, "info": _info_table_style}
+
+# Body rows above which a table is laid out in page-sized batches.
+LONG_TABLE_ROWS = 200
+
+
+def _long_table(rows, widths, header, style):
+    """A ChunkedTable whose row height is measured on the tallest body row.
+
+    Cells are measured as Table draws them, one line per explicit line
+    break, on a probe holding the header rows and that row, so the rows are
+    as tall as they would be in a Table under LONG_TABLE_ROWS.
+    """
+    from reportlab.platypus import Table
+
+    from .tables import ChunkedTable
+
+    body = rows[header:]
+    tallest = max(body, key=lambda row: max(str(cell).count("\n") for cell in row))
+    probe = Table([*rows[:header], tallest], colWidths=widths, style=style)
+    probe.wrap(sum(widths), 0)
+    return ChunkedTable(body, widths, probe._rowHeights[header], header=rows[:header], style=style,
+                        header_heights=probe._rowHeights[:header])
+
+
+def compile_blocks(blocks, theme, image, rule, chart=None):
+    """Compile AST nodes into flowables.
+
+    `image(key, max_width, max_height)` returns a flowable for an image key,
+    or None to drop the image and its caption. `rule(story)` appends the
+    guide's horizontal rule. `chart(key, width, height)` returns a chart
+    flowable (see docgen.charts) or None; guides without one drop charts.
+    """
+    from reportlab.platypus import PageBreak, Spacer, Table, TableStyle
+
+    from .paragraphs import Paragraph
+
+    story = []
+    for node in blocks:
+        kind = node[0]
+        if kind == "heading":
+            story.append(Paragraph(inline(node[2]), theme.heading1 if node[1] == 1 else theme.heading2))
+        elif kind == "para":
+            story.append(Paragraph(inline(node[2]), theme.style(node[1] or "body")))
+        elif kind == "bullet":
+            story.append(Paragraph("• " + inline(node[1]), theme.bullet))
+        elif kind == "tip":
+            story.append(Paragraph(inline(node[1]), theme.tip))
+        elif kind == "image":
+            _, key, w, h, caption = node
+            flowable = image(key, w*mm, h*mm)
+            if flowable is not None:
+                story.append(flowable)
+                if caption:
+                    story.append(Paragraph(inline(caption), theme.caption))
+        elif kind == "chart":
+            _, key, w, h = node
+            flowable = chart(key, w*mm, h*mm) if chart is not None else None
+            if flowable is not None:
+                story.append(flowable)
+        elif kind == "space":
+            story.append(Spacer(1, node[1]*mm))
+        elif kind == "rule":
+            rule(story)
+        elif kind == "pagebreak":
+            story.append(PageBreak())
+        elif kind == "table":
+            options, rows = node[1], node[2]
+            cell_font = fonts.font('Helvetica')
+            rows = [[fonts.printable(cell, cell_font) for cell in row] for row in rows]
+            widths = [float(w)*mm for w in options["widths"].split(",")]
+            style = TableStyle(TABLE_STYLES[options.get("style", "grid")](theme, options))
+            if len(rows) - options.get("header", 0) > LONG_TABLE_ROWS:
+                story.append(_long_table(rows, widths, options.get("header", 0), style))
+                continue
+            table = Table(rows, colWidths=widths, hAlign='CENTER')
+            table.setStyle(style)
+            story.append(table)
+        else:
+            raise ValueError(f"unknown content node {kind!r}")
+    return story
@@ -0,0 +1,78 @@
+"""
+Multi-document build driver.
+
+Every ``scripts/generate_*.py`` module is a guide. Each one exposes
+``OUTPUT_PATH`` and a ``main(argv)`` that renders it (returning False when
+the build was skipped as up to date); the driver runs those ``main()``
+functions concurrently in a process pool so total wall-clock time is bounded
+by the slowest document. A guide's ``render(output, **options)`` renders it
+on demand instead (docgen.render, docgen.server).
+"""
+
+import contextlib
+import glob
+import importlib
+import io
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+
+from .cache import SCRIPTS_DIR
+from .images import forget_renditions
+
+
+@dataclass
+class BuildResult:
+    name: str
+    ok: bool
+    seconds: float
+    output_path: str = ""
+    size: int = 0
+    log: str = ""
+    error: str = ""
+    skipped: bool = False
+
+
+def discover_guides(scripts_dir=SCRIPTS_DIR):
+    """Return the module names of every guide generator, sorted."""
+    pattern = os.path.join(scripts_dir, "generate_*.py")
+    return sorted(os.path.splitext(os.path.basename(p))[0] for p in glob.glob(pattern))
+
+
+def build_guide(name, args=()):
+    """Import and render one guide. Runs inside a worker process."""
+    log = io.StringIO()
+    start = time.perf_counter()
+    output_path = ""
+    # Guides built one after another in this process must not share images.
+    forget_renditions()
+    try:
+        with contextlib.redirect_stdout(log):
+            module = importlib.import_module(name)
+            output_path = module.OUTPUT_PATH
+            built = module.main(list(args))
+            output_path = module.OUTPUT_PATH  # main() may override it (--output)
+        size = os.path.getsize(output_path) if os.path.exists(output_path) else 0
+        return BuildResult(name, True, time.perf_counter() - start, output_path, size, log.getvalue(),
+                           skipped=built is False)
+    except BaseException:
+        return BuildResult(name, False, time.perf_counter() - start, output_path, 0,
+                           log.getvalue(), traceback.format_exc())
+
+
+def build_all(names, args=(), jobs=None):
+    """Render `names` concurrently and yield a BuildResult as each one finishes."""
+    jobs = jobs or min(len(names), os.cpu_count() or 1) or 1
+    if jobs == 1:
+        for name in names:
+            yield build_guide(name, args)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(build_guide, name, tuple(args)): name for name in names}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except BaseException:
+                yield BuildResult(futures[future], False, 0.0, error=traceback.format_exc())
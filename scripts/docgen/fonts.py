@@ -0,0 +1,439 @@
+"""
+Unicode fonts for the guides and the transaction report.
+
+The base-14 fonts (Helvetica) only cover WinAnsi, so "→", "₹", "⚠" or a
+non-Latin payee name come out as garbage. When a TrueType family from
+FAMILIES is installed, every "Helvetica*" font name used by the themes, the
+content tables and the report is mapped to it by font(). ReportLab embeds
+only the glyphs a document actually uses (in subsets of up to 256 glyphs), so
+a family with thousands of glyphs adds a few kilobytes per document, not the
+whole font file.
+
+Font files are looked up by name in $NOVIRA_FONT_PATH, then the usual system
+font directories; $NOVIRA_FONT_FAMILY picks a family ("helvetica" keeps the
+base fonts). The family's files are read once per process, on first use.
+What ReportLab parses from a font file (cmap, character widths, glyph
+offsets, ascent and descent) is cached under .cache/docgen/fonts/, so a warm
+process only reads the table directory, and asking whether a symbol font
+covers a character does not parse it.
+
+Characters no font covers (colour emoji, mostly) are removed by printable(),
+or spelled out from SUBSTITUTES when the text is set in a base font.
+
+A document rendered in separately built pieces (the manual's cached section
+fragments) would embed a different subset per piece. seed() assigns a fixed
+set of characters first in every document's subsets, so the pieces embed
+identical font programs, which PdfStreamWriter then writes once.
+"""
+
+import functools
+import glob
+import hashlib
+import io
+import json
+import os
+import pickle
+import re
+import threading
+
+from .cache import cache_path
+
+FONT_PATH_ENV = "NOVIRA_FONT_PATH"
+FONT_FAMILY_ENV = "NOVIRA_FONT_FAMILY"
+
+# Searched (recursively) after $NOVIRA_FONT_PATH.
+SYSTEM_FONT_DIRS = (
+    "/usr/share/fonts", "/usr/local/share/fonts", os.path.expanduser("~/.fonts"),
+    os.path.expanduser("~/.local/share/fonts"),
+    "/Library/Fonts", "/System/Library/Fonts", os.path.expanduser("~/Library/Fonts"),
+    os.path.join(os.environ.get("WINDIR", "C:\\Windows"), "Fonts"),
+)
+
+# Candidate families, best first: (name, regular, bold, italic, bold italic).
+# A missing style falls back to the regular (or bold) face.
+FAMILIES = (
+    ("DejaVuSans", "DejaVuSans.ttf", "DejaVuSans-Bold.ttf", "DejaVuSans-Oblique.ttf", "DejaVuSans-BoldOblique.ttf"),
+    ("NotoSans", "NotoSans-Regular.ttf", "NotoSans-Bold.ttf", "NotoSans-Italic.ttf", "NotoSans-BoldItalic.ttf"),
+    ("Arial", "Arial.ttf", "Arial Bold.ttf", "Arial Italic.ttf", "Arial Bold Italic.ttf"),
+    ("Arial", "arial.ttf", "arialbd.ttf", "ariali.ttf", "arialbi.ttf"),
+)
+
+# Fonts tried, in order, for characters the family lacks (paragraphs only).
+SYMBOL_FONTS = ("NotoEmoji-Regular.ttf", "NotoSansSymbols2-Regular.ttf", "Symbola.ttf")
+
+# The base font each style of the family replaces.
+BASE_FONTS = {
+    "Helvetica": 0,
+    "Helvetica-Bold": 1,
+    "Helvetica-Oblique": 2,
+    "Helvetica-BoldOblique": 3,
+}
+
+# ASCII spellings of common symbols WinAnsi lacks, for text in a base font.
+SUBSTITUTES = {
+    "→": "->", "←": "<-", "⚠": "!", "✓": "v", "✔": "v", "✗": "x",
+    "₹": "Rs.", "₫": "VND", "₩": "KRW", "฿": "THB", "₱": "PHP",
+}
+
+# Emoji presentation selectors and joiners, which never render on their own.
+_INVISIBLE = re.compile("[\ufe0e\ufe0f\u200d]")
+_SPACES = re.compile(" {2,}")
+
+_files = None
+_found = False
+_fingerprint = None
+_metrics = {}
+_family = False
+_symbol_fonts = {}
+_coverage = {}
+_seed = ""
+
+
+def _font_files():
+    """Map every font file name on the search path to its path (first wins)."""
+    global _files
+    if _files is None:
+        _files = {}
+        dirs = [d for d in os.environ.get(FONT_PATH_ENV, "").split(os.pathsep) if d]
+        for directory in [*dirs, *SYSTEM_FONT_DIRS]:
+            if not os.path.isdir(directory):
+                continue
+            for path in sorted(glob.glob(os.path.join(directory, "**", "*.[tT][tT][fF]"), recursive=True)):
+                _files.setdefault(os.path.basename(path), path)
+    return _files
+
+
+def find_family():
+    """(name, [regular, bold, italic, bold italic paths]) of the family to use, or None.
+
+    Searching the font directories walks them recursively, so the result is
+    kept in .cache/docgen/fonts/family.json for the same $NOVIRA_FONT_FAMILY
+    and $NOVIRA_FONT_PATH, as long as its files still exist. Up-to-date
+    checks then only stat those files. Delete it to pick up a newly
+    installed family.
+    """
+    global _found
+    if _found is not False:
+        return _found
+    key = [os.environ.get(FONT_FAMILY_ENV, ""), os.environ.get(FONT_PATH_ENV, "")]
+    path = cache_path("fonts", "family.json")
+    try:
+        with open(path) as f:
+            cached = json.load(f)
+        if cached["key"] == key and all(os.path.exists(p) for p in (cached["found"] or ["", []])[1]):
+            _found = tuple(cached["found"]) if cached["found"] else None
+            return _found
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    _found = _search_family(key[0])
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump({"key": key, "found": _found}, f)
+    os.replace(tmp, path)
+    return _found
+
+
+def _search_family(wanted):
+    if wanted.lower() == "helvetica":
+        return None
+    files = _font_files()
+    for name, *styles in FAMILIES:
+        if wanted and name.lower() != wanted.lower():
+            continue
+        paths = [files.get(style) for style in styles]
+        if paths[0] is None:
+            continue
+        regular, bold, italic, bold_italic = paths
+        bold = bold or regular
+        return name, [regular, bold, italic or regular, bold_italic or bold]
+    return None
+
+
+# --- Metrics cache ---
+
+def _metrics_path(path):
+    import reportlab
+
+    st = os.stat(path)
+    key = f"{os.path.abspath(path)}\0{st.st_size}\0{st.st_mtime_ns}\0{reportlab.Version}"
+    return cache_path("fonts", f"{os.path.basename(path)}-{hashlib.sha256(key.encode()).hexdigest()[:16]}.pickle")
+
+
+def font_metrics(path):
+    """The metrics ReportLab parses from a TrueType file, parsed once and cached on disk.
+
+    A dict of the face attributes TTFontFile.extractInfo sets (name, ascent
+    and descent, charToGlyph, charWidths, glyph offsets and metrics, ...).
+    """
+    metrics = _metrics.get(path)
+    if metrics is None:
+        metrics = _face_class()(path).metrics
+    return metrics
+
+
+def _load_metrics(path):
+    cached = _metrics_path(path)
+    try:
+        with open(cached, "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+
+
+def _store_metrics(path, metrics):
+    cached = _metrics_path(path)
+    tmp = f"{cached}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(metrics, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, cached)
+
+
+@functools.cache
+def _face_class():
+    from reportlab.pdfbase.ttfonts import TTFontFace
+
+    class DocgenFace(TTFontFace):
+        """A TTFontFace that takes its metrics from the cache and whose
+        subsets leave out the 'name' table.
+
+        extractInfo() is where ReportLab parses the font's tables; on a warm
+        cache it restores what the parse produced instead, so only the table
+        directory is read. PDF readers never use the 'name' table (ISO 32000
+        lists the tables an embedded TrueType program needs), and it holds the
+        licence text and localized names: 15 KB of every DejaVu subset.
+        """
+
+        _subsetting = False
+
+        def extractInfo(self, charInfo=1):
+            path = self.filename
+            metrics = _metrics.get(path) if charInfo else None
+            if metrics is None and charInfo:
+                metrics = _load_metrics(path)
+            if metrics is None:
+                before = dict(vars(self))
+                TTFontFace.extractInfo(self, charInfo)
+                metrics = {k: v for k, v in vars(self).items()
+                           if k != "_pos" and not callable(v) and (k not in before or before[k] is not v)}
+                if charInfo:
+                    _store_metrics(path, metrics)
+            else:
+                vars(self).update(metrics)
+                scale = 1000 / self.unitsPerEm
+                self._pdfScale = (lambda x: x) if self.unitsPerEm == 1000 else (lambda x: x * scale)
+            if charInfo:
+                _metrics[path] = metrics
+            self.metrics = metrics
+
+        def makeSubset(self, subset):
+            self._subsetting = True
+            try:
+                return TTFontFace.makeSubset(self, subset)
+            finally:
+                self._subsetting = False
+
+        def get_table(self, tag):
+            if tag == "name" and self._subsetting:
+                raise KeyError(tag)
+            return TTFontFace.get_table(self, tag)
+
+    return DocgenFace
+
+
+def seed(strings):
+    """Assign the characters of `strings` first in the subsets of every later document."""
+    global _seed
+    _seed = "".join(sorted({c for text in strings for c in text if not c.isascii()}))
+
+
+def seed_key():
+    """Identifies the current seed, for caches of rendered fragments."""
+    return hashlib.sha256(_seed.encode()).hexdigest()[:16] if _seed else ""
+
+
+@functools.cache
+def _font_data(path):
+    """The bytes of a font file, read once per process."""
+    with open(path, "rb") as f:
+        return f.read()
+
+
+_face_lock = threading.Lock()
+
+
+@functools.cache
+def _font_class():
+    import weakref
+
+    from reportlab.pdfbase import ttfonts
+
+    class DocgenFont(ttfonts.TTFont):
+        """A TTFont on a DocgenFace whose subsets start with the seed() characters."""
+
+        def __init__(self, name, path):
+            data = io.BytesIO(_font_data(path))
+            data.name = path
+            # TTFont.__init__ builds its face as ttfonts.TTFontFace(filename) and
+            # offers no other way in; while the lock is held that name is the
+            # DocgenFace. tests/test_fonts.py checks it still takes effect.
+            with _face_lock:
+                plain = ttfonts.TTFontFace
+                ttfonts.TTFontFace = _face_class()
+                try:
+                    ttfonts.TTFont.__init__(self, name, data, shapable=False)
+                finally:
+                    ttfonts.TTFontFace = plain
+            self._seeded = weakref.WeakSet()
+
+        def splitString(self, text, doc, encoding="utf-8"):
+            if _seed and doc not in self._seeded:
+                self._seeded.add(doc)
+                ttfonts.TTFont.splitString(self, _seed, doc, encoding)
+            return ttfonts.TTFont.splitString(self, text, doc, encoding)
+
+    return DocgenFont
+
+
+def load_font(name, path):
+    """Register the TrueType file `path` as font `name`."""
+    from reportlab.pdfbase import pdfmetrics
+
+    try:
+        return pdfmetrics.getFont(name)
+    except KeyError:
+        pass
+    font = _font_class()(name, path)
+    pdfmetrics.registerFont(font)
+    return font
+
+
+def unicode_family():
+    """Register the TrueType family once; return its four font names, or None."""
+    global _family
+    if _family is False:
+        _family = None
+        found = find_family()
+        if found is not None:
+            from reportlab.pdfbase.pdfmetrics import registerFontFamily
+
+            family, paths = found
+            names = [f"Docgen{family}", f"Docgen{family}-Bold", f"Docgen{family}-Oblique",
+                     f"Docgen{family}-BoldOblique"]
+            try:
+                # A style without its own file (italic in DejaVu) shares the font it falls back to.
+                loaded = {}
+                for i, path in enumerate(paths):
+                    if path in loaded:
+                        names[i] = loaded[path]
+                    else:
+                        loaded[path] = names[i]
+                        load_font(names[i], path)
+            except Exception as e:
+                print(f"  ⚠ Could not load font {family}: {e}")
+            else:
+                registerFontFamily(names[0], normal=names[0], bold=names[1], italic=names[2], boldItalic=names[3])
+                _family = names
+    return _family
+
+
+def font(name):
+    """The font to use for base font `name`: the Unicode family's if available."""
+    index = BASE_FONTS.get(name)
+    if index is None:
+        return name
+    family = unicode_family()
+    return family[index] if family else name
+
+
+def fingerprint():
+    """Identifies the font files in use, for build fingerprints; computed once per process."""
+    global _fingerprint
+    if _fingerprint is None:
+        found = find_family()
+        if found is None:
+            _fingerprint = "base14"
+        else:
+            parts = []
+            for path in found[1]:
+                st = os.stat(path)
+                parts.append(f"{path}:{st.st_size}:{st.st_mtime_ns}")
+            _fingerprint = found[0] + "|" + "|".join(parts)
+    return _fingerprint
+
+
+def _symbol_font(code):
+    """Name of a registered symbol font covering `code`, or None."""
+    for file_name in SYMBOL_FONTS:
+        path = _font_files().get(file_name)
+        if path is None:
+            continue
+        try:
+            if code not in _covered(path):
+                continue
+        except Exception:
+            continue
+        name = _symbol_fonts.get(path)
+        if name is None:
+            name = _symbol_fonts[path] = "DocgenSymbols" + str(len(_symbol_fonts) + 1)
+            load_font(name, path)
+        return name
+    return None
+
+
+def _covered(path):
+    codes = _coverage.get(path)
+    if codes is None:
+        codes = _coverage[path] = frozenset(font_metrics(path)["charToGlyph"])
+    return codes
+
+
+def _coverage_test(font_name):
+    """A predicate telling whether font `font_name` has a glyph for a character."""
+    from reportlab.pdfbase import pdfmetrics
+
+    f = pdfmetrics.getFont(font_name)
+    if getattr(f, "_dynamicFont", False):
+        cmap = f.face.charToGlyph
+        return lambda char: ord(char) in cmap
+
+    def winansi(char):
+        try:
+            char.encode("cp1252")
+        except UnicodeEncodeError:
+            return False
+        return True
+    return winansi
+
+
+def covers(font_name, char):
+    """True if font `font_name` has a glyph for `char`."""
+    return _coverage_test(font_name)(char)
+
+
+def printable(text, font_name, markup=False):
+    """`text` with the characters `font_name` cannot render dealt with.
+
+    Characters an installed symbol font covers are wrapped in <font> tags
+    when `markup` (paragraph text); others are spelled out from SUBSTITUTES
+    or dropped ("💡 Tip" -> "Tip").
+    """
+    if text.isascii():
+        return text
+    covered = _coverage_test(font_name)
+    out = []
+    dropped = False
+    for char in _INVISIBLE.sub("", text):
+        if char.isascii() or covered(char):
+            out.append(char)
+            continue
+        symbols = _symbol_font(ord(char)) if markup else None
+        if symbols is not None:
+            out.append(f'<font name="{symbols}">{char}</font>')
+        elif char in SUBSTITUTES:
+            out.append(SUBSTITUTES[char])
+        else:
+            dropped = True
+    result = "".join(out)
+    if dropped:
+        result = _SPACES.sub(" ", result).strip()
+    return result
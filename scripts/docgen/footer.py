@@ -0,0 +1,128 @@
+"""
+"Page N of M" footer canvas.
+
+The page count is unknown until the last page, so every footer references a
+form XObject for the total, and the form is defined once in save(). Pages are
+written out as they finish instead of being snapshotted and replayed at the
+end, so the canvas adds no per-page memory.
+
+The table of contents lists pages that are not laid out yet the same way: a
+PageRef drawn on a NumberedCanvas references a form for its heading's page,
+defined in save() from the pages the document template recorded.
+"""
+
+from reportlab import rl_config
+from reportlab.lib.colors import HexColor
+from reportlab.lib.units import mm
+from reportlab.pdfbase.pdfmetrics import getAscent
+from reportlab.pdfgen import canvas
+from reportlab.platypus.flowables import Flowable
+
+from . import fonts
+
+
+class NumberedCanvas(canvas.Canvas):
+    """Canvas that draws `footer_text` on every page after the cover.
+
+    `footer_text` is formatted with {page} and {count}; {count} must come last.
+    Subclass (or use numbered_canvas) to set the text, color and position.
+    `footer_font` names a base font; it is drawn in the document's Unicode
+    family when one is installed (docgen.fonts.font).
+    """
+
+    footer_text = "Page {page} of {count}"
+    footer_color = "#9CA3AF"
+    footer_font = ("Helvetica", 8)
+    footer_x = None  # defaults to just left of the page centre
+    footer_y = 15*mm
+    page_count_form = "DocgenPageCount"
+
+    def __init__(self, *args, **kwargs):
+        canvas.Canvas.__init__(self, *args, **kwargs)
+        self._pages_shown = 0
+        # Heading label -> page, recorded during layout (docgen.sections.HeadingDocTemplate).
+        self.heading_pages = {}
+        self._page_refs = {}
+        name, size = self.footer_font
+        self._footer_font = (fonts.font(name), size)
+
+    def showPage(self):
+        self.draw_page_number()
+        self._pages_shown += 1
+        canvas.Canvas.showPage(self)
+
+    def save(self):
+        if len(self._code):
+            self.showPage()
+        self.beginForm(self.page_count_form)
+        self.setFont(*self._footer_font)
+        self.setFillColor(HexColor(self.footer_color))
+        self.drawString(0, 0, str(self._pages_shown))
+        self.endForm()
+        for label, (name, style) in self._page_refs.items():
+            self.beginForm(name)
+            self.setFont(style.fontName, style.fontSize)
+            self.setFillColor(style.textColor)
+            self.drawRightString(0, 0, str(self.heading_pages.get(label, "")))
+            self.endForm()
+        canvas.Canvas.save(self)
+
+    def page_ref(self, label, style):
+        """The form that save() fills with the page of heading `label`, set in `style`."""
+        if label not in self._page_refs:
+            self._page_refs[label] = (f"DocgenPageRef{len(self._page_refs)}", style)
+        return self._page_refs[label][0]
+
+    def draw_page_number(self):
+        page_num = self._pageNumber
+        if page_num > 1:  # Skip page number on cover
+            prefix = self.footer_text.split("{count}")[0].format(page=page_num)
+            prefix = fonts.printable(prefix, self._footer_font[0])
+            x = self.footer_x if self.footer_x is not None else self._pagesize[0] / 2 - 20
+            self.saveState()
+            self.setFont(*self._footer_font)
+            self.setFillColor(HexColor(self.footer_color))
+            self.drawString(x, self.footer_y, prefix)
+            self.translate(x + self.stringWidth(prefix, *self._footer_font), self.footer_y)
+            self.doForm(self.page_count_form)
+            self.restoreState()
+
+
+def numbered_canvas(footer_text, footer_color):
+    """Return a NumberedCanvas subclass with the given footer text and color."""
+    return type("NumberedCanvas", (NumberedCanvas,), {"footer_text": footer_text, "footer_color": footer_color})
+
+
+class PageRef(Flowable):
+    """The page the heading numbered `label` ("2", "2.3") lands on, right-aligned.
+
+    Drawn as a one-line Paragraph in `style` would draw it. Without `page` it
+    must be drawn on a NumberedCanvas, which fills the number in when it
+    saves, so a table of contents can precede the pages it lists in a single
+    layout pass.
+    """
+
+    def __init__(self, label, style, page=None):
+        Flowable.__init__(self)
+        self.label = label
+        self.style = style
+        self.page = page
+
+    def wrap(self, availWidth, availHeight):
+        self.width, self.height = availWidth, self.style.leading
+        return self.width, self.height
+
+    def draw(self):
+        style = self.style
+        ascent = style.fontSize if rl_config.paraFontSizeHeightOffset else getAscent(style.fontName, style.fontSize)
+        y = self.height - ascent
+        canv = self.canv
+        if self.page is not None:
+            canv.setFont(style.fontName, style.fontSize)
+            canv.setFillColor(style.textColor)
+            canv.drawRightString(self.width, y, str(self.page))
+        else:
+            canv.saveState()
+            canv.translate(self.width, y)
+            canv.doForm(canv.page_ref(self.label, style))
+            canv.restoreState()
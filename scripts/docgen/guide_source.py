@@ -0,0 +1,515 @@
+"""
+Manual sections extracted from the in-app guide.
+
+The web guide declares its sections in ``components/guide/sections-config.ts``
+(id, title, group, blurb) and writes each one as a ``<GuideSection>`` in
+``components/guide/sections/*.tsx``. This module reads both and turns every
+section into a ``docgen.content.Section`` so the manual renders the same text
+through the normal content compiler, instead of keeping a second copy.
+
+Only the JSX subset the guide uses is understood: headings, paragraphs, lists,
+``StepList``/``Step``, ``Callout``, ``FactGrid``/``FactRow`` and inline
+``strong``/``em``/``CodePill``/links. Interactive demos are left out; fact
+rows naming an analytics card (FACT_CHARTS) are followed by that card as a
+vector chart. The "What's new" page is built from its ``RELEASES`` data
+instead of its markup.
+
+Extraction results are cached per file in ``.cache/docgen/guide-extract.json``
+keyed by the file's size, mtime and digest, so repeated builds do not re-parse
+the TSX tree.
+"""
+
+import datetime
+import html
+import json
+import os
+import re
+
+from .cache import REPO_ROOT, cache_path
+from .content import Section
+from .images import file_digest
+
+# Bump when the extraction output changes so stale cache entries are ignored.
+EXTRACT_VERSION = 3
+
+GUIDE_DIR = os.path.join(REPO_ROOT, "components", "guide")
+CONFIG_PATH = os.path.join(GUIDE_DIR, "sections-config.ts")
+
+EXTRACT_CACHE_PATH = cache_path("guide-extract.json")
+
+# Labels the web Callout component puts in front of each callout type.
+CALLOUT_LABELS = {"tip": "Tip", "note": "Note", "warning": "Heads up", "pro": "Power tip"}
+
+# Intro sentences about the web guide's own interface, left out of the manual.
+WEB_ONLY_SENTENCES = ("Tap an item to jump to its detailed section.",)
+
+# FactRow labels of cards the manual draws as charts (docgen.charts), with the
+# chart key and its size in mm; the charts follow their FactGrid.
+FACT_CHARTS = {
+    "Spending trend": ("trend", 170, 62),
+    "Weekday breakdown": ("weekday", 170, 52),
+    "Category breakdown": ("categories", 170, 58),
+    "Payment method": ("methods", 170, 58),
+    "Calendar heatmap": ("heatmap", 170, 58),
+}
+
+INLINE_TAGS = {"strong": "b", "b": "b", "em": "i", "i": "i"}
+CODE_FONT = "Courier"
+
+_JS_STRING = r"'((?:[^'\\]|\\.)*)'|\"((?:[^\"\\]|\\.)*)\""
+_CONFIG_ENTRY = re.compile(r"\{\s*id:[^{}]*\}")
+_CONFIG_FIELD = re.compile(r"(\w+):\s*(?:" + _JS_STRING + r")")
+
+
+class Element:
+    """A parsed JSX element: tag name, props and children (Elements or str)."""
+
+    __slots__ = ("tag", "props", "children")
+
+    def __init__(self, tag, props=None, children=None):
+        self.tag = tag
+        self.props = props or {}
+        self.children = children or []
+
+
+class Expr(str):
+    """An attribute or child expression that is not JSX or a string literal."""
+
+
+def _unquote(match):
+    raw = match.group(1) if match.group(1) is not None else match.group(2)
+    return re.sub(r"\\(.)", r"\1", raw)
+
+
+# --- JSX parsing ---
+
+class _JsxParser:
+    def __init__(self, text, pos=0):
+        self.text = text
+        self.pos = pos
+
+    def _skip_ws(self):
+        while self.pos < len(self.text) and self.text[self.pos].isspace():
+            self.pos += 1
+
+    def _peek(self, s):
+        return self.text.startswith(s, self.pos)
+
+    def _expect(self, s):
+        if not self._peek(s):
+            raise ValueError(f"expected {s!r} at {self.text[self.pos:self.pos + 40]!r}")
+        self.pos += len(s)
+
+    def _name(self):
+        m = re.compile(r"[A-Za-z_][\w.\-]*").match(self.text, self.pos)
+        if not m:
+            return ""
+        self.pos = m.end()
+        return m.group(0)
+
+    def _js_until_brace(self):
+        """Scan a JS expression up to its closing brace, honouring strings."""
+        start, depth = self.pos, 0
+        while self.pos < len(self.text):
+            c = self.text[self.pos]
+            if c in "'\"`":
+                self.pos += 1
+                while self.text[self.pos] != c:
+                    self.pos += 2 if self.text[self.pos] == "\\" else 1
+            elif c in "{([":
+                depth += 1
+            elif c in "})]":
+                if depth == 0:
+                    return self.text[start:self.pos]
+                depth -= 1
+            self.pos += 1
+        raise ValueError("unterminated expression")
+
+    def expression(self):
+        """Parse the inside of {...}; JSX and string literals are kept, the rest is an Expr."""
+        self._skip_ws()
+        save = self.pos
+        while self._peek("("):
+            self.pos += 1
+            self._skip_ws()
+        if self._peek("<"):
+            node = self.element()
+            self._skip_ws()
+            while self._peek(")"):
+                self.pos += 1
+                self._skip_ws()
+            if self._peek("}"):
+                return node
+        self.pos = save
+        source = self._js_until_brace().strip()
+        m = re.fullmatch(_JS_STRING, source, re.S)
+        if m:
+            return _unquote(m)
+        return Expr(source)
+
+    def _props(self):
+        props = {}
+        while True:
+            self._skip_ws()
+            if self._peek("/>") or self._peek(">"):
+                return props
+            if self._peek("{"):  # {...spread}
+                self.pos += 1
+                self._js_until_brace()
+                self._expect("}")
+                continue
+            name = self._name()
+            if not name:
+                raise ValueError(f"bad attribute at {self.text[self.pos:self.pos + 40]!r}")
+            self._skip_ws()
+            if not self._peek("="):
+                props[name] = True
+                continue
+            self.pos += 1
+            self._skip_ws()
+            quote = self.text[self.pos]
+            if quote in "'\"":
+                end = self.text.index(quote, self.pos + 1)
+                props[name] = html.unescape(self.text[self.pos + 1:end])
+                self.pos = end + 1
+            else:
+                self._expect("{")
+                props[name] = self.expression()
+                self._expect("}")
+
+    def element(self):
+        self._expect("<")
+        tag = self._name()
+        props = self._props()
+        if self._peek("/>"):
+            self.pos += 2
+            return Element(tag, props)
+        self._expect(">")
+        children = []
+        while True:
+            if self._peek("</"):
+                self.pos += 2
+                self._name()
+                self._skip_ws()
+                self._expect(">")
+                return Element(tag, props, children)
+            if self._peek("<"):
+                children.append(self.element())
+            elif self._peek("{"):
+                self.pos += 1
+                self._skip_ws()
+                if self._peek("/*"):
+                    self.pos = self.text.index("*/", self.pos) + 2
+                    self._skip_ws()
+                    self._expect("}")
+                    continue
+                children.append(self.expression())
+                self._expect("}")
+            else:
+                end = len(self.text)
+                for stop in "<{":
+                    i = self.text.find(stop, self.pos)
+                    if i != -1:
+                        end = min(end, i)
+                text = _jsx_text(self.text[self.pos:end])
+                if text:
+                    children.append(text)
+                self.pos = end
+
+
+def _jsx_text(raw):
+    """Apply JSX whitespace rules: trim lines, drop blank ones, join with spaces."""
+    lines = re.split(r"\r\n|\n|\r", raw)
+    if len(lines) == 1:
+        return html.unescape(raw)
+    kept = []
+    for i, line in enumerate(lines):
+        if i > 0:
+            line = line.lstrip()
+        if i < len(lines) - 1:
+            line = line.rstrip()
+        if line:
+            kept.append(line)
+    return html.unescape(" ".join(kept))
+
+
+def parse_jsx(text, tag):
+    """Parse the first <tag ...>...</tag> element in a source file."""
+    start = re.search(r"<" + re.escape(tag) + r"\b", text)
+    if not start:
+        return None
+    return _JsxParser(text, start.start()).element()
+
+
+# --- JSX to content AST ---
+
+def _escape(text):
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def inline_markup(node):
+    """Render inline JSX (text, strong, em, CodePill, links) as paragraph markup."""
+    if isinstance(node, Expr):
+        return ""
+    if isinstance(node, str):
+        return _escape(node)
+    if isinstance(node, list):
+        return "".join(inline_markup(n) for n in node)
+    inner = "".join(inline_markup(c) for c in node.children)
+    if node.tag in INLINE_TAGS:
+        tag = INLINE_TAGS[node.tag]
+        return f"<{tag}>{inner}</{tag}>"
+    if node.tag == "CodePill" or node.tag == "code":
+        return f'<font face="{CODE_FONT}">{inner}</font>'
+    if node.tag == "br":
+        return "<br/>"
+    return inner
+
+
+def _text(node):
+    return re.sub(r"\s+", " ", inline_markup(node)).strip()
+
+
+def blocks_from_jsx(children):
+    """Convert the children of a <GuideSection> into content AST nodes."""
+    nodes = []
+    for child in children:
+        if isinstance(child, str):
+            if child.strip():
+                nodes.append(["para", None, _text(child)])
+            continue
+        if not isinstance(child, Element):
+            continue
+        tag = child.tag
+        if tag == "h3":
+            nodes.append(["heading", 3, _text(child.children)])
+        elif tag == "h4":
+            nodes.append(["para", None, f"<b>{_text(child.children)}</b>"])
+        elif tag == "p":
+            nodes.append(["para", None, _text(child.children)])
+        elif tag in ("ul", "ol"):
+            for li in child.children:
+                if isinstance(li, Element) and li.tag == "li":
+                    nodes.append(["bullet", _text(li.children)])
+        elif tag == "StepList":
+            for step in child.children:
+                if isinstance(step, Element) and step.tag == "Step":
+                    nodes.append(["para", "bullet", f"<b>{step.props.get('n', '')}.</b> {_text(step.children)}"])
+        elif tag == "FactGrid":
+            charts = []
+            for row in child.children:
+                if isinstance(row, Element) and row.tag == "FactRow":
+                    label = row.props.get("label", "")
+                    nodes.append(["bullet", f"<b>{_text(label)}:</b> {_text(row.children)}"])
+                    if label in FACT_CHARTS:
+                        charts.append(["chart", *FACT_CHARTS[label]])
+            for chart in charts:
+                nodes += [["space", 3], chart]
+        elif tag == "Callout":
+            label = CALLOUT_LABELS.get(child.props.get("type", "note"), "Note")
+            title = child.props.get("title")
+            head = f"{label}: {_text(title)}" if title else label
+            nodes.append(["tip", f"<b>{head}</b> {_text(child.children)}"])
+        elif tag.endswith("Demo"):
+            continue
+        else:
+            nodes.extend(blocks_from_jsx(child.children))
+    return nodes
+
+
+def _bracket_end(source, pos):
+    """Index just past the bracket matching the one at `pos`.
+
+    String literals and JSX fragments (``<>...</>``, whose text may hold
+    apostrophes and brackets) are skipped.
+    """
+    depth = 0
+    while pos < len(source):
+        c = source[pos]
+        if c in "'\"`":
+            pos += 1
+            while pos < len(source) and source[pos] != c:
+                pos += 2 if source[pos] == "\\" else 1
+        elif source.startswith("<>", pos):
+            end = source.find("</>", pos)
+            pos = len(source) if end < 0 else end + 2
+        elif c in "{([":
+            depth += 1
+        elif c in "})]":
+            depth -= 1
+            if depth == 0:
+                return pos + 1
+        pos += 1
+    raise ValueError("unbalanced brackets")
+
+
+def _releases(source):
+    """Extract the RELEASES log of whats-new.tsx as content AST nodes."""
+    m = re.search(r"const RELEASES[^=]*=\s*\[", source)
+    if not m:
+        return []
+    body = source[m.end():_bracket_end(source, m.end() - 1) - 1]
+    nodes = []
+    for release in re.finditer(r"version:\s*'([^']*)',\s*date:\s*'([^']*)',.*?headline:\s*'((?:[^'\\]|\\.)*)',"
+                               r"\s*items:\s*\[", body, re.S):
+        version, date, headline = release.groups()
+        items = body[release.end():_bracket_end(body, release.end() - 1) - 1]
+        released = datetime.date.fromisoformat(date)
+        nodes.append(["heading", 3, f"v{version}  •  {released:%B} {released.day}, {released.year}"])
+        nodes.append(["para", None, _escape(headline.replace("\\'", "'"))])
+        for item in re.finditer(r"title:\s*'((?:[^'\\]|\\.)*)',\s*description:\s*\(?\s*(<>.*?</>)", items, re.S):
+            title = item.group(1).replace("\\'", "'")
+            description = _JsxParser(item.group(2)).element()
+            nodes.append(["bullet", f"<b>{_escape(title)}:</b> {_text(description.children)}"])
+    return nodes
+
+
+def extract_section_file(path):
+    """Return {id, eyebrow, title, intro, blocks} for one section file, or None."""
+    with open(path, encoding="utf-8") as f:
+        source = f.read()
+    root = parse_jsx(source, "GuideSection")
+    if root is None:
+        return None
+    intro = root.props.get("intro")
+    blocks = blocks_from_jsx(root.children)
+    if os.path.basename(path) == "whats-new.tsx":
+        callouts = [b for b in blocks if b[0] == "tip"]
+        blocks = _releases(source) + callouts
+    return {
+        "id": root.props.get("id"),
+        "eyebrow": root.props.get("eyebrow") if isinstance(root.props.get("eyebrow"), str) else None,
+        "title": root.props.get("title"),
+        "intro": _text(intro) if intro else "",
+        "blocks": blocks,
+    }
+
+
+def parse_config(path=CONFIG_PATH):
+    """Return the GUIDE_SECTIONS entries of sections-config.ts, in order."""
+    with open(path, encoding="utf-8") as f:
+        source = f.read()
+    start = source.index("GUIDE_SECTIONS")
+    entries = []
+    for m in _CONFIG_ENTRY.finditer(source, start):
+        entries.append({
+            f.group(1): re.sub(r"\\(.)", r"\1", f.group(2) if f.group(2) is not None else f.group(3))
+            for f in _CONFIG_FIELD.finditer(m.group(0))
+        })
+    return entries
+
+
+# --- Cache ---
+
+def _load_cache():
+    try:
+        with open(EXTRACT_CACHE_PATH) as f:
+            data = json.load(f)
+        if data.get("version") == EXTRACT_VERSION:
+            return data["files"]
+    except (OSError, ValueError, KeyError):
+        pass
+    return {}
+
+
+def _save_cache(files):
+    tmp = f"{EXTRACT_CACHE_PATH}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump({"version": EXTRACT_VERSION, "files": files}, f)
+    os.replace(tmp, EXTRACT_CACHE_PATH)
+
+
+def _cached(files, path, extract):
+    """Return extract(path), reusing the cached result while the file is unchanged."""
+    st = os.stat(path)
+    stamp = [st.st_mtime_ns, st.st_size]
+    entry = files.get(path)
+    if entry and entry["stamp"] == stamp:
+        return entry["result"], False
+    digest = file_digest(path)
+    if entry and entry["digest"] == digest:
+        entry["stamp"] = stamp
+        return entry["result"], True
+    result = extract(path)
+    files[path] = {"stamp": stamp, "digest": digest, "result": result}
+    return result, True
+
+
+def guide_files(guide_dir=GUIDE_DIR):
+    """Return the config and section sources the manual is generated from."""
+    sections_dir = os.path.join(guide_dir, "sections")
+    return [os.path.join(guide_dir, "sections-config.ts"),
+            *sorted(os.path.join(sections_dir, n) for n in os.listdir(sections_dir) if n.endswith(".tsx"))]
+
+
+def _intro(intro, blurb):
+    """The intro without the blurb it repeats or sentences about the web guide."""
+    if blurb and intro.startswith(blurb):
+        intro = intro[len(blurb):]
+    for sentence in WEB_ONLY_SENTENCES:
+        intro = intro.replace(_escape(sentence), "")
+    return re.sub(r"\s+", " ", intro).strip()
+
+
+def load_guide_sections(guide_dir=GUIDE_DIR, images=None):
+    """Return numbered content Sections for every entry of GUIDE_SECTIONS.
+
+    Each section gets a numbered heading ("3. Adding transactions"), the
+    config's group and blurb, the <GuideSection> intro and its body, with
+    <h3> headings numbered as sub-sections ("3.1  Every field"). Entries
+    without a component are skipped with a warning and take no number.
+
+    `images` maps a section id to (key, caption, width, height, after)
+    tuples: image nodes (sizes in mm) placed at the end of the sub-section
+    whose <h3> reads `after`, or after the intro when `after` is None.
+    """
+    config_path, *paths = guide_files(guide_dir)
+    files = _load_cache()
+    dirty = False
+    config, changed = _cached(files, config_path, parse_config)
+    dirty |= changed
+    by_id = {}
+    for path in paths:
+        result, changed = _cached(files, path, extract_section_file)
+        dirty |= changed
+        if result and result["id"]:
+            by_id[result["id"]] = (path, result)
+    if dirty:
+        _save_cache(files)
+
+    sections = []
+    for entry in config:
+        if entry["id"] not in by_id:
+            print(f"  ⚠ Guide section {entry['id']!r} has no component in {os.path.relpath(guide_dir, REPO_ROOT)}/sections")
+            continue
+        path, extracted = by_id[entry["id"]]
+        number = len(sections) + 1
+        blurb = _escape(entry.get("blurb", ""))
+        blocks = [
+            ["para", "eyebrow", _escape(entry.get("group", ""))],
+            ["heading", 1, f"{number}. {_escape(entry['title'])}"],
+            ["rule"],
+            ["para", "blurb", blurb],
+        ]
+        intro = _intro(extracted["intro"], blurb)
+        if intro:
+            blocks.append(["para", None, intro])
+        placed = {}
+        for key, caption, width, height, after in (images or {}).get(entry["id"], ()):
+            placed.setdefault(after and _escape(after), []).append(["image", key, width, height, caption])
+        blocks += placed.pop(None, [])
+        sub, subsection = 0, None
+        for node in extracted["blocks"]:
+            if node[0] == "heading":
+                blocks += placed.pop(subsection, [])
+                sub, subsection = sub + 1, node[2]
+                node = ["heading", 2, f"{number}.{sub}  {node[2]}"]
+            blocks.append(node)
+        blocks += placed.pop(subsection, [])
+        for after, nodes in placed.items():
+            print(f"  ⚠ Guide section {entry['id']!r} has no sub-section {after!r}; its images go at the end")
+            blocks += nodes
+        blocks.append(["pagebreak"])
+        meta = {"group": entry.get("group", ""), "blurb": entry.get("blurb", ""), "title": entry["title"]}
+        sections.append(Section(entry["id"], path, meta, blocks))
+    return sections
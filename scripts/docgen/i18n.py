@@ -0,0 +1,145 @@
+"""
+Translated guide variants.
+
+A locale's translations are a JSON message catalog, ``<guide content
+dir>/locales/<locale>.json``, mapping English source text to its translation:
+
+    {"locale": "de",
+     "messages": {"Table of Contents": "Inhaltsverzeichnis",
+                  "Getting started": "Erste Schritte", ...}}
+
+Keys are the text of blocks as parsed by docgen.content (paragraphs, bullets,
+tips, captions, table cells) or passed to gettext() by a generator (labels,
+footers, document info). Numbered headings are looked up with and without
+their number ("3.1  Every field" or "Every field"). Anything without a
+translation stays English, so a catalog can be filled in incrementally;
+extract() lists every translatable string of a guide.
+
+translate_sections() rewrites the parsed AST of each section, reusing every
+block that does not change, so all variants share one parsed content source.
+"""
+
+import json
+import os
+import re
+from dataclasses import replace
+
+# A heading's leading number: "3. ", "3.1  ".
+_NUMBER = re.compile(r"^(\d+(?:\.\d+)*\.?\s+)(.*)$", re.S)
+
+DEFAULT_LOCALE = "en"
+
+
+class Catalog:
+    def __init__(self, locale, messages=None, path=None):
+        self.locale = locale
+        self.messages = messages or {}
+        self.path = path
+
+    def gettext(self, text):
+        """The translation of `text`, or `text` itself."""
+        translated = self.messages.get(text)
+        if translated:
+            return translated
+        match = _NUMBER.match(text)
+        if match and self.messages.get(match.group(2)):
+            return match.group(1) + self.messages[match.group(2)]
+        return text
+
+    def __bool__(self):
+        return bool(self.messages)
+
+
+def catalog_path(content_dir, locale):
+    return os.path.join(content_dir, "locales", f"{locale}.json")
+
+
+def load_catalog(content_dir, locale):
+    """Load a locale's catalog; the default locale has an empty one."""
+    path = catalog_path(content_dir, locale)
+    if locale == DEFAULT_LOCALE and not os.path.exists(path):
+        return Catalog(locale)
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return Catalog(locale, data.get("messages", {}), path)
+
+
+def available_locales(content_dir):
+    """The default locale plus every locale with a catalog, sorted."""
+    locales = {DEFAULT_LOCALE}
+    directory = os.path.join(content_dir, "locales")
+    if os.path.isdir(directory):
+        locales.update(os.path.splitext(name)[0] for name in os.listdir(directory) if name.endswith(".json"))
+    return sorted(locales)
+
+
+def variant_path(output_path, locale):
+    """Output path of a locale's variant: "Manual.pdf" -> "Manual.de.pdf"."""
+    if locale == DEFAULT_LOCALE:
+        return output_path
+    root, ext = os.path.splitext(output_path)
+    return f"{root}.{locale}{ext}"
+
+
+def _translate_node(node, _):
+    kind = node[0]
+    if kind in ("heading", "para"):
+        text = _(node[2])
+        return node if text == node[2] else [kind, node[1], text]
+    if kind in ("bullet", "tip"):
+        text = _(node[1])
+        return node if text == node[1] else [kind, text]
+    if kind == "image" and node[4]:
+        caption = _(node[4])
+        return node if caption == node[4] else [*node[:4], caption]
+    if kind == "table":
+        rows = [[_(cell) for cell in row] for row in node[2]]
+        return node if rows == node[2] else [kind, node[1], rows]
+    return node
+
+
+def translate_sections(sections, catalog):
+    """Return the sections with every translatable block run through `catalog`."""
+    if not catalog:
+        return list(sections)
+    translated = []
+    for section in sections:
+        blocks = [_translate_node(node, catalog.gettext) for node in section.blocks]
+        if any(a is not b for a, b in zip(blocks, section.blocks)):
+            section = replace(section, blocks=blocks)
+        translated.append(section)
+    return translated
+
+
+def extract(sections, extra=()):
+    """Every translatable string of the sections plus `extra`, in order."""
+    seen = {}
+    for text in extra:
+        seen.setdefault(text, None)
+    for section in sections:
+        for node in section.blocks:
+            kind = node[0]
+            if kind == "heading":
+                match = _NUMBER.match(node[2])
+                seen.setdefault(match.group(2) if match else node[2], None)
+            elif kind == "para":
+                seen.setdefault(node[2], None)
+            elif kind in ("bullet", "tip"):
+                seen.setdefault(node[1], None)
+            elif kind == "image" and node[4]:
+                seen.setdefault(node[4], None)
+            elif kind == "table":
+                for row in node[2]:
+                    for cell in row:
+                        seen.setdefault(cell, None)
+    return list(seen)
+
+
+def write_template(path, locale, strings, existing=None):
+    """Write a catalog with every string, keeping existing translations."""
+    existing = existing or {}
+    messages = {text: existing.get(text, "") for text in strings}
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"locale": locale, "messages": messages}, f, ensure_ascii=False, indent=2)
+        f.write("\n")
@@ -0,0 +1,133 @@
+"""
+Screenshot pre-processing for the guide generators.
+
+ReportLab embeds an image at its full source resolution no matter how small it
+is drawn. Here every image is resampled to the resolution it is actually drawn
+at, flattened/converted if requested, and stored in an on-disk cache keyed by
+source hash + target size, so rebuilds never re-encode an unchanged image.
+
+shared_image goes one step further for images used more than once: every use
+of a source draws the same prepared file when it is large enough, so the
+source is embedded once per PDF (see docgen.xobjects).
+"""
+
+import hashlib
+import os
+import threading
+
+from .cache import cache_path
+
+# Resolution images are resampled to, relative to their drawn size on the page.
+TARGET_DPI = int(os.environ.get("NOVIRA_IMAGE_DPI", "150"))
+
+# "auto" keeps PNG for images with transparency and uses JPEG for everything else.
+IMAGE_FORMAT = os.environ.get("NOVIRA_IMAGE_FORMAT", "auto")
+JPEG_QUALITY = int(os.environ.get("NOVIRA_JPEG_QUALITY", "82"))
+
+_digests = {}
+
+
+def file_digest(path):
+    """Return the SHA-256 of a file, memoized per (path, mtime, size)."""
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+    digest = _digests.get(key)
+    if digest is None:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        digest = _digests[key] = h.hexdigest()
+    return digest
+
+
+def fit_size(iw, ih, max_width, max_height):
+    """Return the drawn (width, height) in points for an iw x ih image."""
+    ratio = min(max_width / iw, max_height / ih)
+    return iw * ratio, ih * ratio
+
+
+def _has_alpha(img):
+    return img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+
+
+def _flatten(img):
+    """Composite an image with transparency onto a white background."""
+    from PIL import Image as PILImage
+
+    img = img.convert("RGBA")
+    background = PILImage.new("RGB", img.size, (255, 255, 255))
+    background.paste(img, mask=img.getchannel("A"))
+    return background
+
+
+def prepare_image(path, max_width, max_height, dpi=TARGET_DPI, fmt=IMAGE_FORMAT, quality=JPEG_QUALITY):
+    """Return (cached_path, draw_width, draw_height) for `path` drawn within the bounds.
+
+    The cached file is resampled to `dpi` at the drawn size (never upscaled).
+    `fmt` is "jpeg", "png" or "auto".
+    """
+    from PIL import Image as PILImage
+
+    with PILImage.open(path) as img:
+        iw, ih = img.size
+        width, height = fit_size(iw, ih, max_width, max_height)
+        tw = min(iw, max(1, round(width / 72 * dpi)))
+        th = min(ih, max(1, round(height / 72 * dpi)))
+
+        out_fmt = fmt
+        if out_fmt == "auto":
+            out_fmt = "png" if _has_alpha(img) else "jpeg"
+        ext = "jpg" if out_fmt == "jpeg" else "png"
+        key = f"{file_digest(path)[:32]}-{tw}x{th}-q{quality}"
+        target = cache_path("images", f"{key}.{ext}")
+        if os.path.exists(target):
+            return target, width, height
+
+        img.load()
+        resized = img if (tw, th) == (iw, ih) else img.resize((tw, th), PILImage.LANCZOS)
+        # Prefetch threads may prepare the same rendition at once.
+        tmp = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+        if out_fmt == "jpeg":
+            if _has_alpha(resized):
+                resized = _flatten(resized)
+            resized.convert("RGB").save(tmp, "JPEG", quality=quality, optimize=True, progressive=True)
+        else:
+            if resized.mode not in ("RGB", "RGBA", "L", "LA", "P"):
+                resized = resized.convert("RGBA")
+            resized.save(tmp, "PNG", optimize=True)
+        os.replace(tmp, target)
+    return target, width, height
+
+
+# source key -> (prepared path, pixel width, pixel height) of its largest rendition
+_renditions = {}
+
+
+def shared_image(path, max_width, max_height, dpi=TARGET_DPI, **kwargs):
+    """Like prepare_image, but reuse this process's largest rendition of `path`.
+
+    A smaller use of an image that was already prepared draws the earlier,
+    larger file, so both uses share one embedded image.
+    """
+    from PIL import Image as PILImage
+
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_mtime_ns, st.st_size, dpi, tuple(sorted(kwargs.items())))
+    with PILImage.open(path) as img:
+        iw, ih = img.size
+    width, height = fit_size(iw, ih, max_width, max_height)
+    need_w = min(iw, max(1, round(width / 72 * dpi)))
+    need_h = min(ih, max(1, round(height / 72 * dpi)))
+
+    rendition = _renditions.get(key)
+    if rendition is not None and rendition[1] >= need_w and rendition[2] >= need_h:
+        return rendition[0], width, height
+    src, width, height = prepare_image(path, max_width, max_height, dpi=dpi, **kwargs)
+    _renditions[key] = (src, need_w, need_h)
+    return src, width, height
+
+
+def forget_renditions():
+    """Start a new document: later shared_image calls do not reuse earlier renditions."""
+    _renditions.clear()
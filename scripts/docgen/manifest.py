@@ -0,0 +1,145 @@
+"""
+Build manifest for incremental guide rebuilds.
+
+A guide's fingerprint covers the source of every function and class defined in
+its module (the ``build_*`` functions and their helpers), its uppercase
+constants (``DOC_KWARGS``, ``SAMPLE_ANALYTICS``, ...), its theme's palette
+and style definitions, its content files under ``CONTENT_DIR``, the asset
+search directories and the hash of the file each image in ``SCREENSHOTS`` and
+``LOGO_PATH`` resolves to through them, and the docgen package itself. When the
+fingerprint recorded in the manifest matches and the output file is intact,
+the build is skipped.
+"""
+
+import contextlib
+import fcntl
+import glob
+import hashlib
+import inspect
+import json
+import os
+import time
+
+from .cache import cache_path
+from .images import file_digest
+
+MANIFEST_PATH = cache_path("manifest.json")
+_DOCGEN_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def guide_images(module):
+    """Return every image path a guide module references."""
+    paths = [getattr(module, "LOGO_PATH", None), *getattr(module, "SCREENSHOTS", {}).values()]
+    return [p for p in paths if p]
+
+
+def guide_fingerprint(module, inputs=(), options=()):
+    """Return a hex fingerprint of everything that affects a guide's output.
+
+    `inputs` are extra source files the build reads and `options` are strings
+    describing command-line choices that change the output.
+    """
+    from .theme import Theme
+
+    h = hashlib.sha256()
+    for option in options:
+        h.update(f"option {option}\n".encode())
+    for path in inputs:
+        h.update(f"input {path} {file_digest(path)}\n".encode())
+    for name, obj in sorted(vars(module).items()):
+        if (inspect.isfunction(obj) or inspect.isclass(obj)) and obj.__module__ == module.__name__:
+            h.update(f"def {name}\n{inspect.getsource(obj)}".encode())
+        elif isinstance(obj, Theme):
+            h.update(f"theme {name} {obj.fingerprint()}\n".encode())
+        elif name.isupper() and not inspect.ismodule(obj):
+            h.update(f"const {name}={json.dumps(obj, sort_keys=True, default=repr)}\n".encode())
+    content_dir = getattr(module, "CONTENT_DIR", None)
+    if content_dir:
+        for path in sorted(glob.glob(os.path.join(content_dir, "*.md"))):
+            h.update(f"content {os.path.basename(path)} {file_digest(path)}\n".encode())
+    for line in _asset_lines(module):
+        h.update(f"{line}\n".encode())
+    for path in sorted(glob.glob(os.path.join(_DOCGEN_DIR, "*.py"))):
+        h.update(f"docgen {os.path.basename(path)} {file_digest(path)}\n".encode())
+    return h.hexdigest()
+
+
+def _asset_lines(module):
+    """Describe the asset search path and the file each guide image resolves to.
+
+    Images are looked up the way the build will (docgen.assets), through a
+    fresh resolver so a file added to a search directory since the module's
+    resolver last looked is seen.
+    """
+    from .assets import AssetResolver
+
+    assets = getattr(module, "assets", None)
+    resolver = (AssetResolver(assets.search_paths, assets.fallbacks) if isinstance(assets, AssetResolver)
+                else AssetResolver())
+    lines = [f"search {os.path.abspath(d)}" for d in resolver.search_paths]
+    lines += [f"fallback {os.path.abspath(d)}" for d in resolver.fallbacks]
+    for path in guide_images(module):
+        resolved = resolver.resolve(path)
+        digest = file_digest(resolved) if resolved else "missing"
+        lines.append(f"image {path} -> {resolved and os.path.abspath(resolved)} {digest}")
+    return lines
+
+
+@contextlib.contextmanager
+def _locked_manifest():
+    """Yield the manifest dict under an exclusive lock; it is written back on exit."""
+    with open(MANIFEST_PATH + ".lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            with open(MANIFEST_PATH) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = {}
+        yield manifest
+        tmp = f"{MANIFEST_PATH}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp, MANIFEST_PATH)
+
+
+def is_up_to_date(name, fingerprint, output_path):
+    """Return True if `output_path` was built from `fingerprint` and is unchanged since."""
+    try:
+        with open(MANIFEST_PATH) as f:
+            entry = json.load(f).get(name)
+    except (OSError, ValueError):
+        return False
+    return (
+        entry is not None
+        and entry.get("fingerprint") == fingerprint
+        and entry.get("output") == os.path.abspath(output_path)
+        and os.path.exists(output_path)
+        and os.path.getsize(output_path) == entry.get("size")
+    )
+
+
+def record_build(name, fingerprint, output_path):
+    """Store the fingerprint a document was just built from."""
+    with _locked_manifest() as manifest:
+        manifest[name] = {
+            "fingerprint": fingerprint,
+            "output": os.path.abspath(output_path),
+            "size": os.path.getsize(output_path),
+            "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+
+
+def should_build(name, module, output_path, force=False, inputs=(), options=()):
+    """Decide whether a guide needs rebuilding and log the decision.
+
+    Returns the fingerprint to record after building, or None to skip.
+    """
+    fingerprint = guide_fingerprint(module, inputs, options)
+    if force:
+        print(f"  🔁 {name}: rebuilding (--force)")
+    elif is_up_to_date(name, fingerprint, output_path):
+        print(f"  ⏭️  {name}: inputs unchanged (fingerprint {fingerprint[:12]}), skipping build")
+        return None
+    else:
+        print(f"  🔁 {name}: inputs changed (fingerprint {fingerprint[:12]}), rebuilding")
+    return fingerprint
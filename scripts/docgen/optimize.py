@@ -0,0 +1,469 @@
+"""
+PDF post-optimizer.
+
+Rewrites a finished guide smaller, in pure Python on top of docgen.pdfobj:
+
+- streams are re-encoded as plain Flate at the highest level (ReportLab wraps
+  page content and images in ASCII85, which adds a quarter to them), and the
+  content streams of each page are joined into one;
+- resources a page's content never names (fonts, images, graphics states)
+  are dropped, along with the obsolete /ProcSet;
+- objects that serialize identically are merged, until no duplicates are
+  left, and objects nothing references any more are removed;
+- the file is written linearized ("fast web view", PDF 1.7 Annex F): the
+  first page and everything it needs come first, behind a first-page
+  cross-reference table and hint tables, so a browser can show page 1 while
+  the rest is still downloading.
+"""
+
+import hashlib
+import os
+import re
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+
+from .pdfobj import Name, PdfDocument, PdfError, Ref, Stream, _refs, filters, remap, serialize
+
+# Filters the optimizer can undo; anything else (DCTDecode, ...) is kept.
+_DECODABLE = ("ASCII85Decode", "FlateDecode")
+RESOURCE_TYPES = ("Font", "XObject", "ExtGState", "ColorSpace", "Pattern", "Shading", "Properties")
+_CONTENT_NAME = re.compile(rb"/([^\x00\t\n\x0c\r ()<>\[\]{}/%]*)")
+HEADER = b"%PDF-1.4\n%\x93\x8c\x8b\x9e\n"
+
+
+@dataclass
+class OptimizeResult:
+    path: str
+    before: int
+    after: int
+
+    @property
+    def saved(self):
+        """Fraction of the original size saved."""
+        return 1 - self.after / self.before if self.before else 0.0
+
+    def __str__(self):
+        return f"{self.before / 1024:.1f} KB -> {self.after / 1024:.1f} KB ({-self.saved:+.0%})"
+
+
+# --- Streams ---
+
+def _set_filters(d, names):
+    if not names:
+        d.pop("Filter", None)
+    else:
+        d[Name("Filter")] = Name(names[0]) if len(names) == 1 else [Name(n) for n in names]
+
+
+def _peel(stream):
+    """Undo the leading ASCII85/Flate filters; return (data, remaining filters)."""
+    names = filters(stream.dict)
+    n = 0
+    while n < len(names) and names[n] in _DECODABLE:
+        n += 1
+    data = Stream({Name("Filter"): [Name(f) for f in names[:n]]}, stream.data).decoded()
+    return data, names[n:]
+
+
+def recompress(stream, level=9):
+    """Return `stream` re-encoded as compactly as Flate allows (or unchanged)."""
+    d = stream.dict
+    if "DecodeParms" in d or d.get("Type") == "Metadata":
+        return stream
+    try:
+        data, rest = _peel(stream)
+    except (PdfError, zlib.error, ValueError):
+        return stream
+    best, best_filters = data, rest
+    flated = zlib.compress(data, level)
+    if len(flated) < len(best):
+        best, best_filters = flated, ["FlateDecode", *rest]
+    if len(best) >= len(stream.data):
+        return stream
+    new = Stream(dict(d), best)
+    _set_filters(new.dict, best_filters)
+    return new
+
+
+def _content_streams(doc, page):
+    contents = doc.resolve(page.get("Contents"))
+    if contents is None:
+        return []
+    return contents if isinstance(contents, list) else [page["Contents"]]
+
+
+def join_contents(doc, level=9):
+    """Replace the content streams of every page with one Flate stream."""
+    for ref in doc.page_refs():
+        page = doc.page(ref)
+        refs = _content_streams(doc, page)
+        if len(refs) < 2:
+            continue
+        try:
+            parts = [_peel(doc.resolve(r)) for r in refs]
+        except (PdfError, zlib.error, ValueError, AttributeError):
+            continue
+        if any(rest for _, rest in parts):
+            continue
+        joined = b"\n".join(data for data, _ in parts)
+        page[Name("Contents")] = doc.add(Stream({Name("Filter"): Name("FlateDecode")}, zlib.compress(joined, level)))
+
+
+# --- Resources ---
+
+def _names_used(data):
+    return {re.sub(rb"#([0-9A-Fa-f]{2})", lambda m: bytes([int(m.group(1), 16)]), m.group(1)).decode("latin-1")
+            for m in _CONTENT_NAME.finditer(data)}
+
+
+def _stream_names(doc, streams):
+    """The names a set of content streams use, or None if one cannot be decoded."""
+    try:
+        return _names_used(b"\n".join(_peel(doc.resolve(s))[0] for s in streams))
+    except (PdfError, zlib.error, ValueError, AttributeError):
+        return None
+
+
+def strip_resources(doc):
+    """Drop resources no content stream refers to. Return how many were dropped.
+
+    Pages and the forms they draw are scanned; a resource dictionary that is
+    also referenced from anywhere else (annotation appearances, patterns) is
+    left alone.
+    """
+    used = {}  # id(category dict) -> [dict, names used or None if unknown, ref num or None]
+    visits = Counter()  # indirect category dict -> resource dictionaries seen using it
+    visited = set()
+
+    def visit(resources, streams, seen):
+        names = _stream_names(doc, streams)
+        resources = doc.resolve(resources)
+        if not isinstance(resources, dict):
+            return
+        xobjects = doc.resolve(resources.get("XObject"))
+        if names is not None and isinstance(xobjects, dict):
+            for name in names & set(xobjects):
+                ref = xobjects[name]
+                form = doc.resolve(ref)
+                if not isinstance(form, Stream) or form.dict.get("Subtype") != "Form":
+                    continue
+                key = ref.num if isinstance(ref, Ref) else id(form)
+                if key in seen:
+                    continue
+                if "Resources" in form.dict:
+                    visit(form.dict["Resources"], [ref], seen | {key})
+                else:
+                    # A form without resources (deprecated) uses its page's.
+                    inner = _stream_names(doc, [ref])
+                    names = None if inner is None else names | inner
+        first_visit = id(resources) not in visited
+        visited.add(id(resources))
+        resources.pop("ProcSet", None)
+        for kind in RESOURCE_TYPES:
+            value = resources.get(kind)
+            category = doc.resolve(value)
+            if not isinstance(category, dict):
+                continue
+            entry = used.setdefault(id(category), [category, set(), value.num if isinstance(value, Ref) else None])
+            if isinstance(value, Ref) and first_visit:
+                visits[value.num] += 1
+            if names is None:
+                entry[1] = None
+            elif entry[1] is not None:
+                entry[1].update(names & set(category))
+
+    for ref in doc.page_refs():
+        page = doc.page(ref)
+        visit(page.get("Resources"), _content_streams(doc, page), frozenset())
+    referenced = Counter(ref.num for obj in doc.objects.values() for ref in _refs(obj))
+    dropped = 0
+    for category, names, num in used.values():
+        if names is None or (num is not None and visits[num] != referenced[num]):
+            continue
+        for key in [k for k in category if k not in names]:
+            del category[key]
+            dropped += 1
+    return dropped
+
+
+# --- Objects ---
+
+def _is_structural(obj):
+    return isinstance(obj, dict) and obj.get("Type") in ("Page", "Pages", "Catalog")
+
+
+def merge_duplicates(doc):
+    """Point every reference at one copy of identical objects. Return how many were merged."""
+    for obj in doc.objects.values():
+        if isinstance(obj, dict) and obj.get("Type") == "Font":
+            obj.pop("Name", None)  # obsolete; readers use the resource name
+    merged = 0
+    while True:
+        canonical, mapping = {}, {}
+        for num in sorted(doc.objects):
+            obj = doc.objects[num]
+            if _is_structural(obj):
+                continue
+            key = hashlib.sha1(serialize(obj)).digest()
+            if key in canonical:
+                mapping[num] = canonical[key]
+            else:
+                canonical[key] = num
+        if not mapping:
+            return merged
+        merged += len(mapping)
+        for num in mapping:
+            del doc.objects[num]
+        _renumber(doc, {num: mapping.get(num, num) for num in [*doc.objects, *mapping]})
+
+
+def _renumber(doc, mapping):
+    doc.objects = {mapping[num]: remap(obj, mapping) for num, obj in doc.objects.items() if num in mapping}
+    doc.trailer = remap(doc.trailer, mapping)
+
+
+def prune(doc):
+    """Remove objects nothing reachable from the trailer refers to."""
+    keep = doc.reachable()
+    for num in [n for n in doc.objects if n not in keep]:
+        del doc.objects[num]
+
+
+# --- Linearization ---
+
+class _BitWriter:
+    def __init__(self):
+        self.out = bytearray()
+        self._acc = 0
+        self._bits = 0
+
+    def write(self, value, bits):
+        self._acc = (self._acc << bits) | value
+        self._bits += bits
+        while self._bits >= 8:
+            self._bits -= 8
+            self.out.append((self._acc >> self._bits) & 0xFF)
+        self._acc &= (1 << self._bits) - 1
+
+    def write_all(self, values, bits):
+        """One hint table item for every page or group, padded to a byte."""
+        for value in values:
+            self.write(value, bits)
+        if self._bits:
+            self.write(0, 8 - self._bits)
+
+
+def _page_objects(doc, ref, pages):
+    """Numbers of the objects a page needs, page object first.
+
+    Links to other pages and the page tree are not followed.
+    """
+    order, seen = [], set()
+    stack = [ref]
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, Ref):
+            if obj.num in seen or obj.num not in doc.objects or (obj.num in pages and obj.num != ref.num):
+                continue
+            target = doc.objects[obj.num]
+            if isinstance(target, dict) and target.get("Type") in ("Pages", "Catalog"):
+                continue
+            seen.add(obj.num)
+            order.append(obj.num)
+            stack.append(target)
+        elif isinstance(obj, dict):
+            stack.extend(v for k, v in reversed(obj.items()) if k not in ("Parent", "P"))
+        elif isinstance(obj, list):
+            stack.extend(reversed(obj))
+        elif isinstance(obj, Stream):
+            stack.extend(reversed(obj.dict.values()))
+    return order
+
+
+def _indirect(num, obj):
+    return b"%d 0 obj\n" % num + serialize(obj) + b"\nendobj\n"
+
+
+def linearize(doc):
+    """Serialize `doc` as a linearized PDF and return the bytes."""
+    page_refs = doc.page_refs()
+    if not page_refs:
+        return doc.to_bytes()
+    pages = {ref.num for ref in page_refs}
+    catalog = doc.trailer["Root"].num
+
+    first, *closures = [_page_objects(doc, ref, pages) for ref in page_refs]
+    first_set = set(first)
+    needs = [[n for n in objects if n not in first_set] for objects in closures]
+    users = Counter(n for objects in needs for n in objects)
+    private = [[n for n in objects if users[n] == 1] for objects in needs]
+    shared = list(dict.fromkeys(n for objects in needs for n in objects if users[n] > 1))
+    placed = {catalog, *first, *shared, *(n for objects in private for n in objects)}
+    other = [n for n in sorted(doc.objects) if n not in placed]
+
+    # The first-page section (with the linearization dictionary, catalog and
+    # hint stream) takes the highest numbers, so its cross-reference table is
+    # one contiguous subsection; everything else is numbered from 1.
+    low = [n for objects in private for n in objects] + shared + other
+    mapping = {old: new for new, old in enumerate(low, 1)}
+    lin_num = len(low) + 1
+    mapping[catalog] = lin_num + 1
+    hint_num = lin_num + 2
+    for i, old in enumerate(first):
+        mapping[old] = hint_num + 1 + i
+    size = hint_num + 1 + len(first)
+    objects = {mapping[old]: remap(obj, mapping) for old, obj in doc.objects.items()}
+    trailer = remap(doc.trailer, mapping)
+
+    body = {num: _indirect(num, obj) for num, obj in objects.items()}
+    first_nums = [mapping[n] for n in first]
+    page_sections = [first_nums] + [[mapping[n] for n in objects] for objects in private]
+    shared_nums = [mapping[n] for n in shared]
+    shared_used = [[]] + [[mapping[n] for n in objects if n in first_set or users[n] > 1] for objects in closures]
+    rest_nums = [mapping[n] for n in low]  # parts 7-9 in file order
+
+    # Offsets are assigned in file order; those after the hint stream are
+    # first computed without it, which is how the hint tables record them.
+    first_trailer = {k: v for k, v in trailer.items() if k in ("Root", "Info", "ID")}
+    first_trailer[Name("Size")] = size
+
+    # The values that depend on offsets are padded to a fixed width, so the
+    # layout does not change when they are filled in.
+    trailer_width = len(serialize({**first_trailer, Name("Prev"): 10 ** 10}))
+    lin_keys = ("L", "H", "O", "E", "N", "T")
+    lin_width = len(serialize({Name("Linearized"): 1,
+                               **{Name(k): [10 ** 10] * 2 if k == "H" else 10 ** 10 for k in lin_keys}}))
+
+    def first_xref(prev, offsets):
+        entries = b"".join(b"%010d 00000 n \n" % offsets.get(num, 0) for num in range(lin_num, size))
+        return (b"xref\n%d %d\n" % (lin_num, size - lin_num) + entries + b"trailer\n"
+                + serialize({**first_trailer, Name("Prev"): prev}).ljust(trailer_width)
+                + b"\nstartxref\n0\n%%EOF\n")
+
+    def lin_dict(values):
+        d = {Name("Linearized"): 1, **{Name(k): v for k, v in values.items()}}
+        return b"%d 0 obj\n" % lin_num + serialize(d).ljust(lin_width) + b"\nendobj\n"
+
+    offsets = {}
+    pos = len(HEADER)
+    offsets[lin_num] = pos
+    pos += len(lin_dict({}))
+    xref1_offset = pos
+    pos += len(first_xref(0, {}))
+    offsets[mapping[catalog]] = pos
+    pos += len(body[mapping[catalog]])
+    hint_offset = pos
+    for num in first_nums + rest_nums:
+        offsets[num] = pos
+        pos += len(body[num])
+    first_end = offsets[rest_nums[0]] if rest_nums else pos
+
+    hint = _hint_stream(page_sections, shared_nums, shared_used, body, offsets)
+    hint_body = _indirect(hint_num, hint)
+    for num in first_nums + rest_nums:
+        offsets[num] += len(hint_body)
+    offsets[hint_num] = hint_offset
+    main_xref = pos + len(hint_body)
+    first_end += len(hint_body)
+
+    main = bytearray(b"xref\n0 %d\n0000000000 65535 f \n" % lin_num)
+    for num in range(1, lin_num):
+        main += b"%010d 00000 n \n" % offsets[num]
+    main += b"trailer\n" + serialize({Name("Size"): lin_num}) + b"\nstartxref\n%d\n%%%%EOF\n" % xref1_offset
+    total = main_xref + len(main)
+
+    lin = lin_dict({"L": total, "H": [hint_offset, len(hint_body)], "O": first_nums[0], "E": first_end,
+                    "N": len(page_refs), "T": main_xref + len(b"xref\n0 %d" % lin_num)})
+    out = bytearray(HEADER)
+    out += lin
+    out += first_xref(main_xref, offsets)
+    out += body[mapping[catalog]]
+    out += hint_body
+    for num in first_nums + rest_nums:
+        out += body[num]
+    out += main
+    if len(out) != total:
+        raise PdfError("linearized layout is inconsistent")
+    return bytes(out)
+
+
+def _hint_stream(page_sections, shared_nums, shared_used, body, offsets):
+    """The primary hint stream: page offset and shared object hint tables.
+
+    `shared_used` lists, per page, the objects it uses from the first page's
+    section or the shared section. `offsets` do not count the hint stream
+    itself, as the tables require. Content stream offsets and lengths are
+    recorded as 0 and the page length, as Acrobat writes them.
+    """
+    first_nums = page_sections[0]
+    starts = [offsets[section[0]] for section in page_sections]
+    ends = starts[1:] + [offsets[shared_nums[0]] if shared_nums else
+                         starts[-1] + sum(len(body[n]) for n in page_sections[-1])]
+    lengths = [end - start for start, end in zip(starts, ends)]
+    counts = [len(section) for section in page_sections]
+    group_ids = {num: i for i, num in enumerate(first_nums + shared_nums)}
+    shared_refs = [sorted(group_ids[n] for n in objects) for objects in shared_used]
+
+    def bits(value):
+        return value.bit_length()
+
+    w = _BitWriter()
+    min_count, min_length = min(counts), min(lengths)
+    max_refs = max(len(r) for r in shared_refs)
+    max_id = max((g for r in shared_refs for g in r), default=0)
+    for value, width in ((min_count, 32), (starts[0], 32), (bits(max(counts) - min_count), 16),
+                         (min_length, 32), (bits(max(lengths) - min_length), 16),
+                         (0, 32), (0, 16), (min_length, 32), (bits(max(lengths) - min_length), 16),
+                         (bits(max_refs), 16), (bits(max_id), 16), (0, 16), (1, 16)):
+        w.write(value, width)
+    w.write_all([c - min_count for c in counts], bits(max(counts) - min_count))
+    w.write_all([length - min_length for length in lengths], bits(max(lengths) - min_length))
+    w.write_all([len(r) for r in shared_refs], bits(max_refs))
+    w.write_all([g for r in shared_refs for g in r], bits(max_id))
+    # Numerators and content stream offsets take 0 bits.
+    w.write_all([length - min_length for length in lengths], bits(max(lengths) - min_length))
+    shared_offset = len(w.out)
+
+    groups = [len(body[n]) for n in first_nums + shared_nums]
+    min_group = min(groups)
+    for value, width in ((shared_nums[0] if shared_nums else 0, 32),
+                         (offsets[shared_nums[0]] if shared_nums else 0, 32),
+                         (len(first_nums), 32), (len(groups), 32), (0, 16),
+                         (min_group, 32), (bits(max(groups) - min_group), 16)):
+        w.write(value, width)
+    w.write_all([g - min_group for g in groups], bits(max(groups) - min_group))
+    w.write_all([0] * len(groups), 1)  # no MD5 signatures
+    data = bytes(w.out)
+    return Stream({Name("S"): shared_offset, Name("Filter"): Name("FlateDecode")}, zlib.compress(data, 9))
+
+
+# --- Entry point ---
+
+def optimize_pdf(path, output=None, linearized=True):
+    """Optimize the PDF at `path`, writing it to `output` (default: in place).
+
+    Returns an OptimizeResult with the sizes before and after.
+    """
+    output = output or path
+    with open(path, "rb") as f:
+        data = f.read()
+    doc = PdfDocument.from_bytes(data)
+    join_contents(doc)
+    strip_resources(doc)
+    prune(doc)
+    for num, obj in doc.objects.items():
+        if isinstance(obj, Stream):
+            doc.objects[num] = recompress(obj)
+    merge_duplicates(doc)
+    prune(doc)
+    if linearized:
+        result = linearize(doc)
+    else:
+        _renumber(doc, {num: i for i, num in enumerate(sorted(doc.objects), 1)})
+        result = doc.to_bytes()
+    tmp = f"{output}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(result)
+    os.replace(tmp, output)
+    return OptimizeResult(output, len(data), len(result))
@@ -0,0 +1,152 @@
+"""
+Memoized paragraphs.
+
+Guides repeat a lot of identical styled text (bullets, captions, "Tip:"
+callouts, table-of-contents lines, the same disclaimer in every locale), and
+ReportLab parses the markup of each Paragraph and breaks it into lines again
+for every instance. Paragraph here is a drop-in subclass that keeps both
+results in bounded LRU caches:
+
+- the parsed fragments, keyed by (text, style, bullet text),
+- the broken lines, keyed by (text, style, bullet text, line widths).
+
+Cached results are shared between instances. Splitting a paragraph across
+frames edits its fragments and lines in place, so a paragraph takes private
+copies before it splits; the halves (built from fragments, not text) bypass
+the caches. Styles are keyed by identity, which holds because docgen.theme
+builds each style once.
+
+When a build is being profiled (docgen.profiling), parse, wrap and draw time
+and the cache hit counts are recorded, so the share of doc.build spent on
+paragraphs shows up in the profile.
+"""
+
+import time
+from collections import OrderedDict
+from copy import deepcopy
+
+from reportlab.platypus.paragraph import Paragraph as _Paragraph
+
+from . import profiling
+
+# Entries per cache; a large guide has a few thousand distinct paragraphs.
+CACHE_SIZE = 4096
+
+
+class LRUCache:
+    """A dict bounded to `maxsize` entries, evicting the least recently used."""
+
+    def __init__(self, maxsize=CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def get(self, key):
+        value = self._data.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._data.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self._data[key] = value
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+        self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+
+# Instance attributes Paragraph.breakLines sets besides its result.
+_LINE_STATE = ("frags", "_width_max", "_splitLongWordCount", "_hyphenations")
+
+parse_cache = LRUCache()
+wrap_cache = LRUCache()
+enabled = True
+
+
+def configure(size=None, enable=None):
+    """Resize (or with `enable=False`, bypass) both caches."""
+    global enabled
+    if enable is not None:
+        enabled = enable
+    if size is not None:
+        parse_cache.maxsize = wrap_cache.maxsize = size
+    parse_cache.clear()
+    wrap_cache.clear()
+
+
+def stats():
+    """Hit/miss counts and sizes of the caches."""
+    return {name: {"hits": cache.hits, "misses": cache.misses, "entries": len(cache)}
+            for name, cache in (("parse", parse_cache), ("wrap", wrap_cache))}
+
+
+class Paragraph(_Paragraph):
+    """reportlab.platypus.Paragraph with memoized parsing and line breaking."""
+
+    _memo_key = None
+
+    def _setup(self, text, style, bulletText, frags, cleaner):
+        start = time.perf_counter()
+        cached = None
+        if (enabled and frags is None and isinstance(text, str)
+                and isinstance(bulletText, (str, type(None)))):
+            self._memo_key = key = (text, style, bulletText, self.caseSensitive)
+            cached = parse_cache.get(key)
+            if cached is None:
+                _Paragraph._setup(self, text, style, bulletText, frags, cleaner)
+                parse_cache.put(key, (self.text, self.frags, self.style, self.bulletText))
+            else:
+                self.text, self.frags, self.style, self.bulletText = cached
+                self.debug = 0
+        else:
+            _Paragraph._setup(self, text, style, bulletText, frags, cleaner)
+        if frags is None:
+            profiling.record_paragraph("parse", time.perf_counter() - start, cached is not None)
+
+    def breakLines(self, width):
+        start = time.perf_counter()
+        key = self._memo_key
+        cached = None
+        if key is not None and enabled and self.style.wordWrap != "CJK":
+            key = (key, tuple(width) if isinstance(width, (list, tuple)) else width)
+            cached = wrap_cache.get(key)
+            if cached is None:
+                blPara = _Paragraph.breakLines(self, width)
+                # breakLines also replaces the fragments by their word list and
+                # records a few measurements on the instance.
+                state = {name: self.__dict__[name] for name in _LINE_STATE if name in self.__dict__}
+                wrap_cache.put(key, (blPara, state))
+            else:
+                blPara, state = cached
+                self.__dict__.update(state)
+        else:
+            blPara = _Paragraph.breakLines(self, width)
+        profiling.record_paragraph("wrap", time.perf_counter() - start, cached is not None)
+        return blPara
+
+    def split(self, availWidth, availHeight):
+        if self._memo_key is not None:
+            if hasattr(self, "blPara"):
+                self.frags, self.blPara = deepcopy((self.frags, self.blPara))
+            else:
+                self.frags = deepcopy(self.frags)
+            self._memo_key = None
+        return _Paragraph.split(self, availWidth, availHeight)
+
+    def draw(self):
+        if profiling.active() is None:
+            return _Paragraph.draw(self)
+        start = time.perf_counter()
+        try:
+            return _Paragraph.draw(self)
+        finally:
+            profiling.record_paragraph("draw", time.perf_counter() - start)
@@ -0,0 +1,704 @@
+"""
+Minimal PDF object reader/writer.
+
+Just enough of the PDF file format to take apart the documents ReportLab writes
+(classic xref tables, no object streams), rewire their objects and write them
+back out. Used to stamp page footers and post-process finished guides without
+external tools. ``PdfStreamWriter`` concatenates cached section fragments,
+appending the pages of many documents to one file without keeping them in
+memory.
+"""
+
+import hashlib
+import os
+import re
+import zlib
+from base64 import a85decode
+from collections import namedtuple
+
+WHITESPACE = b"\x00\t\n\x0c\r "
+_REGULAR_END = re.compile(rb"[\x00\t\n\x0c\r ()<>\[\]{}/%]")
+_NUMBER = re.compile(rb"[+-]?(\d+\.?\d*|\.\d+)")
+_OBJ_HEADER = re.compile(rb"(\d+)\s+(\d+)\s+obj\b")
+_STARTXREF = re.compile(rb"startxref\s+(\d+)")
+
+Ref = namedtuple("Ref", "num gen")
+
+
+class PdfError(Exception):
+    pass
+
+
+class Name(str):
+    """A PDF name; stored without the leading slash."""
+
+    def __repr__(self):
+        return "/" + str(self)
+
+
+class PdfString(bytes):
+    """A PDF string. `is_hex` only affects how it is written back."""
+
+    is_hex = False
+
+
+class Stream:
+    """A stream object. `data` is kept exactly as stored (still encoded)."""
+
+    __slots__ = ("dict", "data")
+
+    def __init__(self, dict_, data):
+        self.dict = dict_
+        self.data = data
+
+    def decoded(self):
+        """Return the stream data with Flate/ASCII85 filters undone."""
+        data = self.data
+        for f in filters(self.dict):
+            if f == "FlateDecode":
+                data = zlib.decompress(data)
+            elif f == "ASCII85Decode":
+                data = data.strip()
+                if data.endswith(b"~>"):
+                    data = data[:-2]
+                if data.startswith(b"<~"):
+                    data = data[2:]
+                data = a85decode(data + b"~>", adobe=True) if data else b""
+            else:
+                raise PdfError(f"unsupported filter /{f}")
+        return data
+
+
+def filters(d):
+    """Return the list of filter names on a stream dictionary."""
+    f = d.get("Filter")
+    if f is None:
+        return []
+    return [str(x) for x in f] if isinstance(f, list) else [str(f)]
+
+
+def flate_stream(data, extra=None, level=9):
+    """Build a FlateDecode stream from raw bytes."""
+    d = dict(extra or {})
+    d[Name("Filter")] = Name("FlateDecode")
+    d.pop("DecodeParms", None)
+    return Stream(d, zlib.compress(data, level))
+
+
+# --- Parsing ---
+
+class _Parser:
+    def __init__(self, data):
+        self.data = data
+        self.n = len(data)
+
+    def skip_ws(self, pos):
+        data, n = self.data, self.n
+        while pos < n:
+            c = data[pos]
+            if c in WHITESPACE:
+                pos += 1
+            elif c == 0x25:  # %
+                while pos < n and data[pos] not in b"\r\n":
+                    pos += 1
+            else:
+                break
+        return pos
+
+    def token_end(self, pos):
+        m = _REGULAR_END.search(self.data, pos)
+        return m.start() if m else self.n
+
+    def parse(self, pos):
+        """Parse one object starting at `pos`; return (object, new_pos)."""
+        data = self.data
+        pos = self.skip_ws(pos)
+        if pos >= self.n:
+            raise PdfError("unexpected end of data")
+        c = data[pos:pos + 1]
+        if c == b"/":
+            end = self.token_end(pos + 1)
+            raw = data[pos + 1:end]
+            if b"#" in raw:
+                raw = re.sub(rb"#([0-9A-Fa-f]{2})", lambda m: bytes([int(m.group(1), 16)]), raw)
+            return Name(raw.decode("latin-1")), end
+        if c == b"<":
+            if data[pos + 1:pos + 2] == b"<":
+                return self.parse_dict(pos + 2)
+            end = data.index(b">", pos)
+            hexdigits = re.sub(rb"\s", b"", data[pos + 1:end])
+            if len(hexdigits) % 2:
+                hexdigits += b"0"
+            s = PdfString(bytes.fromhex(hexdigits.decode("ascii")))
+            s.is_hex = True
+            return s, end + 1
+        if c == b"[":
+            items = []
+            pos += 1
+            while True:
+                pos = self.skip_ws(pos)
+                if data[pos:pos + 1] == b"]":
+                    return items, pos + 1
+                obj, pos = self.parse(pos)
+                items.append(obj)
+        if c == b"(":
+            return self.parse_literal(pos + 1)
+        m = _NUMBER.match(data, pos)
+        if m:
+            text = m.group(0)
+            if b"." in text:
+                return float(text), m.end()
+            num = int(text)
+            # Look ahead for "gen R".
+            p2 = self.skip_ws(m.end())
+            m2 = _NUMBER.match(data, p2)
+            if m2 and b"." not in m2.group(0):
+                p3 = self.skip_ws(m2.end())
+                if data[p3:p3 + 1] == b"R" and self.token_end(p3) == p3 + 1:
+                    return Ref(num, int(m2.group(0))), p3 + 1
+            return num, m.end()
+        end = self.token_end(pos)
+        word = data[pos:end]
+        if word == b"true":
+            return True, end
+        if word == b"false":
+            return False, end
+        if word == b"null":
+            return None, end
+        raise PdfError(f"unexpected token {word[:20]!r} at offset {pos}")
+
+    def parse_dict(self, pos):
+        d = {}
+        data = self.data
+        while True:
+            pos = self.skip_ws(pos)
+            if data[pos:pos + 2] == b">>":
+                return d, pos + 2
+            key, pos = self.parse(pos)
+            if not isinstance(key, Name):
+                raise PdfError(f"dictionary key is not a name at offset {pos}")
+            value, pos = self.parse(pos)
+            d[key] = value
+
+    def parse_literal(self, pos):
+        data = self.data
+        out = bytearray()
+        depth = 1
+        while True:
+            c = data[pos]
+            if c == 0x5C:  # backslash
+                nxt = data[pos + 1]
+                pos += 2
+                if nxt in b"nrtbf":
+                    out += {0x6E: b"\n", 0x72: b"\r", 0x74: b"\t", 0x62: b"\b", 0x66: b"\f"}[nxt]
+                elif 0x30 <= nxt <= 0x37:
+                    digits = bytes([nxt])
+                    while len(digits) < 3 and 0x30 <= data[pos] <= 0x37:
+                        digits += data[pos:pos + 1]
+                        pos += 1
+                    out.append(int(digits, 8) & 0xFF)
+                elif nxt == 0x0D:
+                    if data[pos:pos + 1] == b"\n":
+                        pos += 1
+                elif nxt != 0x0A:
+                    out.append(nxt)
+                continue
+            if c == 0x28:
+                depth += 1
+            elif c == 0x29:
+                depth -= 1
+                if depth == 0:
+                    return PdfString(bytes(out)), pos + 1
+            out.append(c)
+            pos += 1
+
+    def parse_indirect(self, pos, resolve_length):
+        """Parse "N G obj ... endobj" at `pos`; return (num, object)."""
+        m = _OBJ_HEADER.match(self.data, self.skip_ws(pos))
+        if not m:
+            raise PdfError(f"no object header at offset {pos}")
+        obj, pos = self.parse(m.end())
+        pos = self.skip_ws(pos)
+        if isinstance(obj, dict) and self.data.startswith(b"stream", pos):
+            pos += 6
+            if self.data[pos:pos + 2] == b"\r\n":
+                pos += 2
+            elif self.data[pos:pos + 1] in (b"\n", b"\r"):
+                pos += 1
+            length = obj.get("Length")
+            if isinstance(length, Ref):
+                length = resolve_length(length)
+            if not isinstance(length, int) or not self.data.startswith(b"endstream", self.skip_ws(pos + length)):
+                length = self.data.index(b"endstream", pos) - pos
+                while length and self.data[pos + length - 1] in b"\r\n":
+                    length -= 1
+            obj = Stream(obj, self.data[pos:pos + length])
+        return int(m.group(1)), obj
+
+
+class PdfDocument:
+    """An in-memory PDF: numbered objects plus a trailer dictionary."""
+
+    def __init__(self, objects=None, trailer=None):
+        self.objects = objects if objects is not None else {}
+        self.trailer = trailer if trailer is not None else {}
+
+    # --- reading ---
+
+    @classmethod
+    def from_bytes(cls, data):
+        parser = _Parser(data)
+        offsets, trailer = cls._read_xref(parser)
+        if offsets is None:
+            offsets = {int(m.group(1)): m.start() for m in _OBJ_HEADER.finditer(data)}
+            tpos = data.rfind(b"trailer")
+            trailer = parser.parse(tpos + 7)[0] if tpos >= 0 else {}
+        doc = cls(trailer=trailer)
+
+        def resolve_length(ref):
+            return parser.parse_indirect(offsets[ref.num], None)[1]
+
+        for num, offset in offsets.items():
+            onum, obj = parser.parse_indirect(offset, resolve_length)
+            if onum == num:
+                doc.objects[num] = obj
+        return doc
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+    @staticmethod
+    def _read_xref(parser):
+        data = parser.data
+        m = None
+        for m in _STARTXREF.finditer(data, max(0, len(data) - 2048)):
+            pass
+        if m is None:
+            return None, None
+        offsets = {}
+        trailer = None
+        pos = int(m.group(1))
+        seen = set()
+        try:
+            while pos not in seen:
+                seen.add(pos)
+                pos = parser.skip_ws(pos)
+                if not data.startswith(b"xref", pos):
+                    return None, None
+                pos += 4
+                while True:
+                    pos = parser.skip_ws(pos)
+                    if data.startswith(b"trailer", pos):
+                        break
+                    line = re.match(rb"(\d+)\s+(\d+)", data[pos:pos + 40])
+                    start, count = int(line.group(1)), int(line.group(2))
+                    pos += line.end()
+                    for i in range(count):
+                        pos = parser.skip_ws(pos)
+                        entry = data[pos:pos + 18]
+                        offset, kind = int(entry[:10]), entry[17:18]
+                        if kind == b"n":
+                            offsets.setdefault(start + i, offset)
+                        pos += 18
+                section_trailer, _ = parser.parse(pos + 7)
+                if trailer is None:
+                    trailer = section_trailer
+                prev = section_trailer.get("Prev")
+                if prev is None:
+                    break
+                pos = prev
+        except (AttributeError, ValueError, PdfError):
+            return None, None
+        return offsets, trailer
+
+    # --- object access ---
+
+    def resolve(self, obj):
+        """Follow a Ref (possibly several) to the object it points at."""
+        while isinstance(obj, Ref):
+            obj = self.objects.get(obj.num)
+        return obj
+
+    def add(self, obj):
+        """Add a new indirect object and return its Ref."""
+        num = max(self.objects, default=0) + 1
+        self.objects[num] = obj
+        return Ref(num, 0)
+
+    @property
+    def root(self):
+        return self.resolve(self.trailer["Root"])
+
+    def page_refs(self):
+        """Return the Refs of all leaf pages in order."""
+        refs = []
+        stack = [self.root["Pages"]]
+        while stack:
+            ref = stack.pop()
+            node = self.resolve(ref)
+            if node.get("Type") == "Pages":
+                stack.extend(reversed(node.get("Kids", [])))
+            else:
+                refs.append(ref)
+        return refs
+
+    def page(self, ref):
+        """Return a page dict with inheritable attributes filled in."""
+        page = self.resolve(ref)
+        parent = page.get("Parent")
+        while parent is not None:
+            node = self.resolve(parent)
+            for key in ("Resources", "MediaBox", "CropBox", "Rotate"):
+                if key in node and key not in page:
+                    page[Name(key)] = node[key]
+            parent = node.get("Parent")
+        return page
+
+    def reachable(self):
+        """Return the set of object numbers reachable from the trailer."""
+        seen = set()
+        stack = [self.trailer]
+        while stack:
+            obj = stack.pop()
+            if isinstance(obj, Ref):
+                if obj.num in seen or obj.num not in self.objects:
+                    continue
+                seen.add(obj.num)
+                stack.append(self.objects[obj.num])
+            elif isinstance(obj, dict):
+                stack.extend(obj.values())
+            elif isinstance(obj, list):
+                stack.extend(obj)
+            elif isinstance(obj, Stream):
+                stack.extend(obj.dict.values())
+        return seen
+
+    # --- writing ---
+
+    def to_bytes(self, order=None):
+        """Serialize the document. `order` optionally fixes the object order."""
+        out = bytearray(b"%PDF-1.4\n%\x93\x8c\x8b\x9e\n")
+        offsets = {}
+        for num in order if order is not None else sorted(self.objects):
+            offsets[num] = len(out)
+            out += b"%d 0 obj\n" % num
+            out += serialize(self.objects[num])
+            out += b"\nendobj\n"
+        size = max(self.objects, default=0) + 1
+        xref = len(out)
+        out += b"xref\n0 %d\n0000000000 65535 f \n" % size
+        for num in range(1, size):
+            if num in offsets:
+                out += b"%010d 00000 n \n" % offsets[num]
+            else:
+                out += b"0000000000 65535 f \n"
+        trailer = dict(self.trailer)
+        trailer[Name("Size")] = size
+        trailer.pop("Prev", None)
+        out += b"trailer\n" + serialize(trailer) + b"\nstartxref\n%d\n%%%%EOF\n" % xref
+        return bytes(out)
+
+
+_NAME_SAFE = re.compile(rb"[^\x21-\x7e]|[#()<>\[\]{}/%]")
+
+
+def _format_number(x):
+    if isinstance(x, float):
+        if x == int(x):
+            return b"%d" % int(x)
+        return (b"%.6f" % x).rstrip(b"0").rstrip(b".")
+    return b"%d" % x
+
+
+def serialize(obj):
+    """Serialize one PDF object to bytes."""
+    if isinstance(obj, Name):
+        raw = str(obj).encode("latin-1")
+        return b"/" + _NAME_SAFE.sub(lambda m: b"#%02X" % m.group(0)[0], raw)
+    if isinstance(obj, Ref):
+        return b"%d %d R" % obj
+    if isinstance(obj, bool):
+        return b"true" if obj else b"false"
+    if isinstance(obj, (int, float)):
+        return _format_number(obj)
+    if obj is None:
+        return b"null"
+    if isinstance(obj, PdfString):
+        if obj.is_hex:
+            return b"<" + obj.hex().encode("ascii") + b">"
+        return b"(" + obj.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)").replace(b"\r", b"\\r") + b")"
+    if isinstance(obj, (bytes, str)):
+        return serialize(PdfString(obj.encode("latin-1") if isinstance(obj, str) else obj))
+    if isinstance(obj, list):
+        return b"[" + b" ".join(serialize(x) for x in obj) + b"]"
+    if isinstance(obj, dict):
+        return b"<<" + b"".join(serialize(Name(k)) + b" " + serialize(v) + b"\n" for k, v in obj.items()) + b">>"
+    if isinstance(obj, Stream):
+        d = dict(obj.dict)
+        d[Name("Length")] = len(obj.data)
+        return serialize(d) + b"\nstream\n" + obj.data + b"\nendstream"
+    raise PdfError(f"cannot serialize {type(obj).__name__}")
+
+
+def remap(obj, mapping):
+    """Return a copy of `obj` with every Ref renumbered through `mapping`."""
+    if isinstance(obj, Ref):
+        return Ref(mapping[obj.num], 0) if obj.num in mapping else None
+    if isinstance(obj, dict):
+        return {k: remap(v, mapping) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [remap(v, mapping) for v in obj]
+    if isinstance(obj, Stream):
+        return Stream(remap(obj.dict, mapping), obj.data)
+    return obj
+
+
+def append_page_content(doc, page_ref, content, fonts=None, xobjects=None):
+    """Draw extra content on top of an existing page.
+
+    `content` is a raw content stream; `fonts` and `xobjects` map resource
+    names used in it to font dictionaries and XObjects. The existing content
+    is wrapped in q/Q so its graphics state cannot leak into the overlay.
+    """
+    page = doc.page(page_ref)
+    resources = dict(doc.resolve(page.get("Resources")) or {})
+    for category, entries in (("Font", fonts), ("XObject", xobjects)):
+        if entries:
+            merged = dict(doc.resolve(resources.get(category)) or {})
+            for name, obj in entries.items():
+                merged[Name(name)] = obj
+            resources[Name(category)] = merged
+    page[Name("Resources")] = resources
+    contents = page.get("Contents")
+    if isinstance(contents, Ref) and isinstance(doc.resolve(contents), list):
+        contents = doc.resolve(contents)
+    if contents is None:
+        contents = []
+    elif not isinstance(contents, list):
+        contents = [contents]
+    push = doc.add(Stream({}, b"q\n"))
+    overlay = doc.add(flate_stream(b"Q\n" + content))
+    page[Name("Contents")] = [push, *contents, overlay]
+
+
+def import_object(doc, source, obj, mapping=None):
+    """Copy `obj` from document `source` into `doc`, with every object it references.
+
+    Returns the copy, its Refs renumbered into `doc`. Pass the same `mapping`
+    dict to several calls to copy shared objects (fonts) only once.
+    """
+    mapping = {} if mapping is None else mapping
+    copied = []
+    stack = list(_refs(obj))
+    while stack:
+        num = stack.pop().num
+        if num in mapping or num not in source.objects:
+            continue
+        mapping[num] = doc.add(None).num
+        copied.append(num)
+        stack.extend(_refs(source.objects[num]))
+    for num in copied:
+        doc.objects[mapping[num]] = remap(source.objects[num], mapping)
+    return remap(obj, mapping)
+
+
+def page_form(doc, ref):
+    """A form XObject drawing page `ref` of `doc`, for stamping it onto another page."""
+    page = doc.page(ref)
+    contents = doc.resolve(page.get("Contents"))
+    if contents is None:
+        contents = []
+    elif not isinstance(contents, list):
+        contents = [contents]
+    data = b"\n".join(doc.resolve(c).decoded() for c in contents)
+    return flate_stream(data, {
+        Name("Type"): Name("XObject"), Name("Subtype"): Name("Form"),
+        Name("BBox"): doc.resolve(page.get("MediaBox")),
+        Name("Resources"): page.get("Resources") or {},
+    })
+
+
+HELVETICA = {
+    Name("Type"): Name("Font"), Name("Subtype"): Name("Type1"),
+    Name("BaseFont"): Name("Helvetica"), Name("Encoding"): Name("WinAnsiEncoding"),
+}
+
+
+def text_stream(text, x, y, font_size, color, font="FDocgenFooter"):
+    """A content stream drawing one line of WinAnsi text in an RGB color."""
+    encoded = text.encode("cp1252", "replace")
+    r, g, b = color.red, color.green, color.blue
+    return (b"BT /%s %g Tf %.4f %.4f %.4f rg %.2f %.2f Td " % (font.encode(), font_size, r, g, b, x, y)
+            + serialize(PdfString(encoded)) + b" Tj ET\n")
+
+
+def _refs(obj):
+    """Yield the Refs directly inside an object (not through other Refs)."""
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, Ref):
+            yield obj
+        elif isinstance(obj, dict):
+            stack.extend(obj.values())
+        elif isinstance(obj, list):
+            stack.extend(obj)
+        elif isinstance(obj, Stream):
+            stack.extend(obj.dict.values())
+
+
+class PdfStreamWriter:
+    """Append the pages of many documents to one PDF file as they arrive.
+
+    Objects are written out as soon as a document is added; only their file
+    offsets are kept. Fonts, resource dictionaries and other small objects that
+    serialize identically are written once and shared, as are streams (matched
+    by digest), so a report rendered in chunks does not repeat its fonts per
+    chunk. Object 1 is reserved for the page tree.
+
+    Use as a context manager or call close(); the file is written to a
+    temporary path and moved into place on close. `path` can also be a binary
+    file object, which the PDF is written into as it goes (and left open).
+    """
+
+    SHARED_MAX_BYTES = 1024
+
+    def __init__(self, path):
+        self.path = path
+        if hasattr(path, "write"):
+            self._tmp = None
+            self._file = path
+        else:
+            self._tmp = f"{path}.{os.getpid()}.tmp"
+            self._file = open(self._tmp, "wb")
+        self._closed = False
+        # Offsets are counted from where the PDF starts, not taken from tell(),
+        # so any writable stream will do.
+        self._pos = 0
+        self._offsets = {}
+        self._next = 2
+        self._kids = []
+        self._shared = {}
+        self._write_raw(b"%PDF-1.4\n%\x93\x8c\x8b\x9e\n")
+
+    @property
+    def pages(self):
+        return len(self._kids)
+
+    def _write_raw(self, data):
+        self._file.write(data)
+        self._pos += len(data)
+
+    def _allocate(self):
+        num = self._next
+        self._next += 1
+        return num
+
+    def _write_object(self, num, data):
+        self._offsets[num] = self._pos
+        self._write_raw(b"%d 0 obj\n" % num + data + b"\nendobj\n")
+
+    @staticmethod
+    def _share_key(obj, data):
+        if isinstance(obj, Stream):
+            return hashlib.sha1(data).digest()
+        if isinstance(obj, dict):
+            if obj.get("Type") == "Page":
+                return None
+            if obj.get("Type") == "Font":
+                # The same font subset under another resource name (/Name is
+                # obsolete and ignored by readers).
+                return hashlib.sha1(serialize({k: v for k, v in obj.items() if k != "Name"})).digest()
+        return data if len(data) <= PdfStreamWriter.SHARED_MAX_BYTES else None
+
+    def _copy(self, doc, num, mapping, pending):
+        if num in mapping:
+            return
+        if num in pending:
+            # A reference cycle: give the object its number now; it is
+            # written (unshared) when its own visit finishes.
+            mapping[num] = self._allocate()
+            return
+        obj = doc.objects.get(num)
+        if obj is None:
+            return
+        pending.add(num)
+        for ref in _refs(obj):
+            self._copy(doc, ref.num, mapping, pending)
+        pending.discard(num)
+        copy = remap(obj, mapping)
+        if isinstance(copy, dict) and copy.get("Type") == "Page":
+            copy[Name("Parent")] = Ref(1, 0)
+        data = serialize(copy)
+        if num in mapping:
+            self._write_object(mapping[num], data)
+            return
+        key = self._share_key(copy, data)
+        if key is not None and key in self._shared:
+            mapping[num] = self._shared[key]
+            return
+        mapping[num] = self._allocate()
+        self._write_object(mapping[num], data)
+        if key is not None:
+            self._shared[key] = mapping[num]
+
+    def add_document(self, doc):
+        """Write every page of `doc` (and what it references) to the file."""
+        mapping = {}
+        page_refs = doc.page_refs()
+        for ref in page_refs:
+            # Drop the old page tree; _copy points the pages at object 1.
+            doc.page(ref).pop("Parent", None)
+        for ref in page_refs:
+            self._copy(doc, ref.num, mapping, set())
+            self._kids.append(Ref(mapping[ref.num], 0))
+        return len(page_refs)
+
+    def close(self, info=None):
+        """Write the page tree, catalog and xref, and move the file into place."""
+        self._offsets[1] = self._pos
+        pages = {Name("Type"): Name("Pages"), Name("Count"): len(self._kids), Name("Kids"): self._kids}
+        self._write_raw(b"1 0 obj\n" + serialize(pages) + b"\nendobj\n")
+        catalog = self._allocate()
+        self._write_object(catalog, serialize({Name("Type"): Name("Catalog"), Name("Pages"): Ref(1, 0)}))
+        trailer = {Name("Root"): Ref(catalog, 0)}
+        if info:
+            info_num = self._allocate()
+            self._write_object(info_num, serialize(
+                {Name(k): PdfString(v.encode("latin-1", "replace")) for k, v in info.items()}))
+            trailer[Name("Info")] = Ref(info_num, 0)
+        size = self._next
+        xref = self._pos
+        out = bytearray(b"xref\n0 %d\n0000000000 65535 f \n" % size)
+        for num in range(1, size):
+            if num in self._offsets:
+                out += b"%010d 00000 n \n" % self._offsets[num]
+            else:
+                out += b"0000000000 65535 f \n"
+        trailer[Name("Size")] = size
+        out += b"trailer\n" + serialize(trailer) + b"\nstartxref\n%d\n%%%%EOF\n" % xref
+        self._write_raw(bytes(out))
+        self._closed = True
+        if self._tmp is not None:
+            self._file.close()
+            os.replace(self._tmp, self.path)
+        return len(self._kids)
+
+    def abort(self):
+        """Discard the partial file."""
+        self._closed = True
+        if self._tmp is not None:
+            self._file.close()
+            if os.path.exists(self._tmp):
+                os.unlink(self._tmp)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.abort()
+        elif not self._closed:
+            self.close()
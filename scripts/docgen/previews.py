@@ -0,0 +1,746 @@
+"""
+Page previews.
+
+PNG previews of every page of a guide plus a cover thumbnail, for the website
+and the in-app help, written next to the PDF:
+
+    Novira_User_Manual.previews/page-001.png ... cover.png
+
+Pages are drawn with Pillow by playing back the drawing operators the layout
+pass wrote into each page's content stream, so no rasterizer (Ghostscript,
+poppler, MuPDF) is needed. The renderer covers what the guides draw: filled
+and stroked paths (lines, rectangles, curves) in gray, RGB or CMYK with
+alpha, with dash patterns and clipping paths; text in the embedded TrueType
+subsets or in the base fonts (drawn and advanced with docgen.fonts' family, as
+a viewer substitutes its own Helvetica); images and forms. Shadings and
+even-odd fills are not drawn exactly, so fine detail can differ from a PDF
+viewer.
+
+Each preview is cached under ``.cache/docgen/previews`` by a hash of its
+page's content and resources, so only changed pages are rendered again, and
+the pages that do need rendering are drawn in parallel worker processes.
+"""
+
+import contextlib
+import hashlib
+import io
+import math
+import multiprocessing
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+from .cache import cache_path
+from .pdfobj import Name, PdfDocument, PdfError, PdfString, Ref, Stream, _Parser, serialize
+
+# Bump when the renderer's output changes.
+RENDERER_VERSION = 2
+
+PREVIEW_WIDTH = 800
+THUMBNAIL_WIDTH = 240
+# Pages are drawn this many times larger and scaled down, for antialiasing.
+SUPERSAMPLE = 2
+_CURVE_STEPS = 8
+
+# Stand-ins for the base Courier fonts, by file name.
+MONO_FONTS = ("DejaVuSansMono.ttf", "NotoSansMono-Regular.ttf", "Menlo.ttc", "Courier New.ttf")
+
+IDENTITY = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+
+@dataclass
+class PreviewResult:
+    directory: str
+    pages: list = field(default_factory=list)
+    thumbnail: str = ""
+    rendered: int = 0
+    cached: int = 0
+
+    def __str__(self):
+        return f"{len(self.pages)} page(s) ({self.rendered} rendered, {self.cached} cached) -> {self.directory}"
+
+
+def multiply(m, n):
+    """The matrix m × n (apply m, then n), PDF-style [a b c d e f]."""
+    a, b, c, d, e, f = m
+    a2, b2, c2, d2, e2, f2 = n
+    return (a * a2 + b * c2, a * b2 + b * d2,
+            c * a2 + d * c2, c * b2 + d * d2,
+            e * a2 + f * c2 + e2, e * b2 + f * d2 + f2)
+
+
+def apply(m, x, y):
+    return m[0] * x + m[2] * y + m[4], m[1] * x + m[3] * y + m[5]
+
+
+def _scale(m):
+    return math.sqrt(abs(m[0] * m[3] - m[1] * m[2]))
+
+
+# --- Content stream tokens ---
+
+def operations(data):
+    """Yield (operator, operands) for every operator of a content stream."""
+    parser = _Parser(data)
+    pos, n = 0, len(data)
+    operands = []
+    while True:
+        pos = parser.skip_ws(pos)
+        if pos >= n:
+            return
+        c = data[pos:pos + 1]
+        if c in b"/<([+-.0123456789":
+            value, pos = parser.parse(pos)
+            operands.append(value)
+            continue
+        end = parser.token_end(pos)
+        if end == pos:  # a stray delimiter: ")", ">", "]", "}"
+            pos += 1
+            continue
+        op = data[pos:end].decode("latin-1")
+        pos = end
+        if op == "BI":
+            # Inline images are not drawn; skip to the end of their data.
+            end = data.find(b"EI", data.find(b"ID", pos))
+            pos = n if end < 0 else end + 2
+            operands = []
+            continue
+        yield op, operands
+        operands = []
+
+
+# --- Fonts ---
+
+class _Font:
+    """Glyph advances and the Pillow font for one PDF font resource."""
+
+    def __init__(self, font_file, widths, first_char, default_width, encoding, advances=None):
+        self.font_file = font_file  # path or bytes
+        self.widths = widths
+        self.first_char = first_char
+        self.default_width = default_width
+        self.encoding = encoding  # None: draw codes as they are (embedded subsets)
+        # Widths (1/1000 em) by Unicode character of the font substituted for
+        # a base font; the text is advanced by them rather than the PDF's widths.
+        self.advances = advances
+        self._sized = {}
+
+    def width(self, code):
+        if self.advances is not None:
+            return self.advances.get(ord(self.char(code)), self.default_width * 1000) / 1000
+        i = code - self.first_char
+        return self.widths[i] / 1000 if 0 <= i < len(self.widths) else self.default_width
+
+    def char(self, code):
+        if self.encoding is None:
+            return chr(code)
+        if code == 0o177:  # WinAnsiEncoding's second bullet, which ReportLab writes
+            return "\u2022"
+        return bytes([code]).decode(self.encoding, "replace")
+
+    def sized(self, pixels):
+        from PIL import ImageFont
+
+        pixels = max(1, round(pixels * 2) / 2)
+        font = self._sized.get(pixels)
+        if font is None and self.font_file is not None:
+            # Embedded subsets map their codes in a Macintosh (1, 0) cmap.
+            for encoding in ("unic", "armn") if isinstance(self.font_file, bytes) else ("unic",):
+                source = io.BytesIO(self.font_file) if isinstance(self.font_file, bytes) else self.font_file
+                try:
+                    font = self._sized[pixels] = ImageFont.truetype(source, pixels, encoding=encoding)
+                    break
+                except OSError:
+                    pass
+            else:
+                self.font_file = None
+        return font
+
+
+def _base_font_file(base_font):
+    from . import fonts
+
+    if "Courier" in str(base_font):
+        files = fonts._font_files()
+        mono = next((files[name] for name in MONO_FONTS if name in files), None)
+        if mono:
+            return mono
+    family = fonts.find_family()
+    if family is None:
+        return None
+    regular, bold, italic, bold_italic = family[1]
+    name = str(base_font)
+    is_bold = "Bold" in name
+    is_italic = "Oblique" in name or "Italic" in name
+    return (bold_italic if is_bold and is_italic else bold if is_bold else italic if is_italic else regular)
+
+
+def _substitute_font(base_font):
+    """(font file, {character: width}, default width) standing in for a base font."""
+    from . import fonts
+
+    path = _base_font_file(base_font)
+    if path is None:
+        return None, None, 0.5
+    try:
+        metrics = fonts.font_metrics(path)
+    except Exception:
+        return path, None, 0.5
+    return path, metrics["charWidths"], metrics["defaultWidth"] / 1000
+
+
+def load_font(doc, font):
+    """A _Font for a font dictionary (simple fonts only)."""
+    from reportlab.pdfbase import pdfmetrics
+
+    font = doc.resolve(font)
+    base = str(font.get("BaseFont", "Helvetica"))
+    descriptor = doc.resolve(font.get("FontDescriptor")) or {}
+    embedded = doc.resolve(descriptor.get("FontFile2"))
+    widths = doc.resolve(font.get("Widths"))
+    if isinstance(embedded, Stream) and font.get("Subtype") == "TrueType":
+        try:
+            data = embedded.decoded()
+        except (PdfError, ValueError):
+            data = None
+        return _Font(data, [doc.resolve(w) for w in widths or []], font.get("FirstChar", 0),
+                     descriptor.get("MissingWidth", 0) / 1000, None)
+    path, advances, default_width = _substitute_font(base)
+    if widths:
+        return _Font(path, [doc.resolve(w) for w in widths], font.get("FirstChar", 0), default_width, "cp1252",
+                     advances)
+    try:
+        base_widths = list(pdfmetrics.getFont(base.split("+")[-1]).widths)
+    except (KeyError, AttributeError):
+        base_widths = []
+    return _Font(path, base_widths, 0, default_width, "cp1252", advances)
+
+
+# --- Rendering ---
+
+def _dashes(points, pattern, phase):
+    """Split a polyline into the dashes of a dash pattern (device units)."""
+    pattern = [max(v, 0.0) for v in pattern]
+    if len(pattern) % 2:
+        pattern = pattern * 2
+    period = sum(pattern)
+    i, left = 0, pattern[0]
+    phase %= period
+    while phase > 0:  # skip into the pattern by the phase
+        step = min(phase, left)
+        phase -= step
+        left -= step
+        if left <= 0:
+            i = (i + 1) % len(pattern)
+            left = pattern[i]
+    dashes, current = [], [points[0]] if i % 2 == 0 else None
+    for (x0, y0), (x1, y1) in zip(points, points[1:]):
+        length = math.hypot(x1 - x0, y1 - y0)
+        done = 0.0
+        while length - done > 1e-9:
+            step = min(left, length - done)
+            done += step
+            left -= step
+            t = done / length
+            point = (x0 + (x1 - x0) * t, y0 + (y1 - y0) * t)
+            if current is not None:
+                current.append(point)
+            if left <= 1e-9:
+                if current is not None:
+                    if len(current) >= 2:
+                        dashes.append(current)
+                    current = None
+                else:
+                    current = [point]
+                i = (i + 1) % len(pattern)
+                left = pattern[i]
+    if current is not None and len(current) >= 2:
+        dashes.append(current)
+    return dashes
+
+
+class _GraphicsState:
+    __slots__ = ("ctm", "fill", "stroke", "line_width", "fill_alpha", "stroke_alpha",
+                 "char_spacing", "word_spacing", "scale", "leading", "rise", "font", "size", "mode",
+                 "dash", "clip")
+
+    def __init__(self, ctm):
+        self.ctm = ctm
+        self.fill = self.stroke = (0, 0, 0)
+        self.line_width = 1.0
+        self.fill_alpha = self.stroke_alpha = 1.0
+        self.char_spacing = self.word_spacing = 0.0
+        self.scale = 1.0
+        self.leading = self.rise = 0.0
+        self.font = None
+        self.size = 0.0
+        self.mode = 0
+        self.dash = ([], 0.0)
+        self.clip = None  # an "L" mask of the page image, None for no clipping
+
+    def copy(self):
+        new = _GraphicsState.__new__(_GraphicsState)
+        for name in self.__slots__:
+            setattr(new, name, getattr(self, name))
+        return new
+
+
+def _color(operands):
+    values = [float(v) for v in operands if isinstance(v, (int, float))]
+    if len(values) == 1:
+        g = round(values[0] * 255)
+        return g, g, g
+    if len(values) == 3:
+        return tuple(round(v * 255) for v in values)
+    if len(values) == 4:
+        c, m, y, k = values
+        return tuple(round(255 * (1 - min(1, v + k))) for v in (c, m, y))
+    return None
+
+
+class PageRenderer:
+    """Draws one page of a PdfDocument into a Pillow image."""
+
+    def __init__(self, doc, width):
+        self.doc = doc
+        self.width = width
+        self._fonts = {}
+        self._images = {}
+
+    def render(self, page_ref):
+        from PIL import Image, ImageDraw
+
+        page = self.doc.page(page_ref)
+        x0, y0, x1, y1 = (float(v) for v in self.doc.resolve(page.get("MediaBox", [0, 0, 612, 792])))
+        scale = self.width * SUPERSAMPLE / (x1 - x0)
+        size = (round((x1 - x0) * scale), round((y1 - y0) * scale))
+        self.image = Image.new("RGB", size, "white")
+        self.draw = ImageDraw.Draw(self.image, "RGBA")
+        contents = self.doc.resolve(page.get("Contents"))
+        streams = contents if isinstance(contents, list) else [page.get("Contents")]
+        data = b"\n".join(self._decoded(s) for s in streams if s is not None)
+        self.run(data, self.doc.resolve(page.get("Resources")) or {}, (scale, 0.0, 0.0, -scale, -x0 * scale, y1 * scale))
+        return self.image.reduce(SUPERSAMPLE) if SUPERSAMPLE > 1 else self.image
+
+    def _decoded(self, ref):
+        stream = self.doc.resolve(ref)
+        try:
+            return stream.decoded() if isinstance(stream, Stream) else b""
+        except (PdfError, ValueError):
+            return b""
+
+    def run(self, data, resources, ctm, depth=0):
+        state = _GraphicsState(ctm)
+        stack = []
+        path, subpath = [], None
+        clip_next = False
+        tm = tlm = IDENTITY
+        for op, args in operations(data):
+            if op == "q":
+                stack.append(state.copy())
+            elif op == "Q":
+                if stack:
+                    state = stack.pop()
+            elif op == "cm" and len(args) == 6:
+                state.ctm = multiply(tuple(float(v) for v in args), state.ctm)
+            elif op in ("rg", "g", "k", "sc", "scn"):
+                state.fill = _color(args) or state.fill
+            elif op in ("RG", "G", "K", "SC", "SCN"):
+                state.stroke = _color(args) or state.stroke
+            elif op == "w" and args:
+                state.line_width = float(args[0])
+            elif op == "d" and len(args) == 2 and isinstance(args[0], list):
+                state.dash = ([float(v) for v in args[0]], float(args[1]))
+            elif op == "gs" and args:
+                gs = self.doc.resolve(self.doc.resolve(resources.get("ExtGState", {})).get(args[0])) or {}
+                state.fill_alpha = float(gs.get("ca", state.fill_alpha))
+                state.stroke_alpha = float(gs.get("CA", state.stroke_alpha))
+                state.line_width = float(gs.get("LW", state.line_width))
+            # Paths
+            elif op == "m" and len(args) == 2:
+                subpath = [apply(state.ctm, *args)]
+                path.append(subpath)
+            elif op == "l" and len(args) == 2 and subpath is not None:
+                subpath.append(apply(state.ctm, *args))
+            elif op in ("c", "v", "y") and subpath is not None:
+                self._curve(op, args, state.ctm, subpath)
+            elif op == "re" and len(args) == 4:
+                x, y, w, h = args
+                path.append([apply(state.ctm, x, y), apply(state.ctm, x + w, y),
+                             apply(state.ctm, x + w, y + h), apply(state.ctm, x, y + h), None])
+                subpath = None
+            elif op == "h" and subpath is not None:
+                subpath.append(None)  # closed
+            elif op in ("W", "W*"):
+                clip_next = True
+            elif op in ("f", "F", "f*", "S", "s", "B", "B*", "b", "b*", "n"):
+                if op in ("s", "b", "b*"):
+                    for sp in path:
+                        if sp and sp[-1] is not None:
+                            sp.append(None)
+                if op in ("f", "F", "f*", "B", "B*", "b", "b*"):
+                    self._fill(path, state)
+                if op in ("S", "s", "B", "B*", "b", "b*"):
+                    self._stroke(path, state)
+                if clip_next:
+                    state.clip = self._clip(path, state.clip)
+                    clip_next = False
+                path, subpath = [], None
+            # Text
+            elif op == "BT":
+                tm = tlm = IDENTITY
+            elif op == "Tf" and len(args) == 2:
+                fonts = self.doc.resolve(resources.get("Font", {})) or {}
+                state.font = self._font(fonts.get(args[0]))
+                state.size = float(args[1])
+            elif op == "Tc" and args:
+                state.char_spacing = float(args[0])
+            elif op == "Tw" and args:
+                state.word_spacing = float(args[0])
+            elif op == "Tz" and args:
+                state.scale = float(args[0]) / 100
+            elif op == "TL" and args:
+                state.leading = float(args[0])
+            elif op == "Ts" and args:
+                state.rise = float(args[0])
+            elif op == "Tr" and args:
+                state.mode = int(args[0])
+            elif op in ("Td", "TD") and len(args) == 2:
+                if op == "TD":
+                    state.leading = -float(args[1])
+                tm = tlm = multiply((1, 0, 0, 1, float(args[0]), float(args[1])), tlm)
+            elif op == "Tm" and len(args) == 6:
+                tm = tlm = tuple(float(v) for v in args)
+            elif op == "T*":
+                tm = tlm = multiply((1, 0, 0, 1, 0, -state.leading), tlm)
+            elif op in ("Tj", "'", '"', "TJ") and args:
+                if op in ("'", '"'):
+                    if op == '"' and len(args) == 3:
+                        state.word_spacing, state.char_spacing = float(args[0]), float(args[1])
+                    tm = tlm = multiply((1, 0, 0, 1, 0, -state.leading), tlm)
+                items = args[-1] if op == "TJ" else [args[-1]]
+                for item in items if isinstance(items, list) else [items]:
+                    if isinstance(item, bytes):
+                        tm = self._show(item, state, tm)
+                    elif isinstance(item, (int, float)):
+                        tm = multiply((1, 0, 0, 1, -item / 1000 * state.size * state.scale, 0), tm)
+            # XObjects
+            elif op == "Do" and args and depth < 8:
+                xobjects = self.doc.resolve(resources.get("XObject", {})) or {}
+                self._xobject(xobjects.get(args[0]), state, resources, depth)
+
+    def _curve(self, op, args, ctm, subpath):
+        if len(args) not in (4, 6) or subpath[-1] is None:
+            return
+        x0, y0 = subpath[-1]
+        points = [apply(ctm, args[i], args[i + 1]) for i in range(0, len(args), 2)]
+        if op == "c":
+            p1, p2, p3 = points
+        elif op == "v":
+            p1, (p2, p3) = (x0, y0), points
+        else:
+            (p1, p3), p2 = points, points[1]
+        for i in range(1, _CURVE_STEPS + 1):
+            t = i / _CURVE_STEPS
+            u = 1 - t
+            subpath.append((u ** 3 * x0 + 3 * u * u * t * p1[0] + 3 * u * t * t * p2[0] + t ** 3 * p3[0],
+                            u ** 3 * y0 + 3 * u * u * t * p1[1] + 3 * u * t * t * p2[1] + t ** 3 * p3[1]))
+
+    @contextlib.contextmanager
+    def _target(self, state):
+        """An ImageDraw to paint with; under a clipping path it draws on a
+        layer that is composited through the clip mask."""
+        from PIL import Image, ImageChops, ImageDraw
+
+        if state.clip is None:
+            yield self.draw
+            return
+        layer = Image.new("RGBA", self.image.size, (0, 0, 0, 0))
+        yield ImageDraw.Draw(layer)
+        alpha = ImageChops.multiply(layer.getchannel("A"), state.clip)
+        self.image.paste(layer.convert("RGB"), (0, 0), alpha)
+
+    def _clip(self, path, clip):
+        """The clip mask `clip` intersected with the area of `path`."""
+        from PIL import Image, ImageChops, ImageDraw
+
+        mask = Image.new("L", self.image.size, 0)
+        draw = ImageDraw.Draw(mask)
+        for sp in path:
+            points = [p for p in sp if p is not None]
+            if len(points) >= 3:
+                draw.polygon(points, fill=255)
+        return mask if clip is None else ImageChops.multiply(mask, clip)
+
+    def _fill(self, path, state):
+        color = (*state.fill, round(255 * state.fill_alpha))
+        with self._target(state) as draw:
+            for sp in path:
+                points = [p for p in sp if p is not None]
+                if len(points) >= 3:
+                    draw.polygon(points, fill=color)
+
+    def _stroke(self, path, state):
+        color = (*state.stroke, round(255 * state.stroke_alpha))
+        scale = _scale(state.ctm)
+        width = max(1, round(state.line_width * scale))
+        pattern, phase = state.dash
+        with self._target(state) as draw:
+            for sp in path:
+                points = [p for p in sp if p is not None]
+                if sp and sp[-1] is None and points:
+                    points.append(points[0])
+                if len(points) < 2:
+                    continue
+                if any(pattern):
+                    for dash in _dashes(points, [v * scale for v in pattern], phase * scale):
+                        draw.line(dash, fill=color, width=width)
+                else:
+                    draw.line(points, fill=color, width=width)
+
+    def _font(self, ref):
+        if ref is None:
+            return None
+        key = ref.num if isinstance(ref, Ref) else id(ref)
+        font = self._fonts.get(key)
+        if font is None:
+            font = self._fonts[key] = load_font(self.doc, ref)
+        return font
+
+    def _show(self, data, state, tm):
+        font = state.font
+        if font is None:
+            return tm
+        h = state.scale
+        pil_font = font.sized(state.size * _scale(multiply(tm, state.ctm))) if state.mode != 3 else None
+        color = (*state.fill, round(255 * state.fill_alpha))
+        # Glyphs are placed by the PDF's widths; without character spacing a
+        # word is drawn in one go.
+        run, run_tm = "", tm
+        for code in data:
+            if pil_font is not None:
+                if code == 32 or state.char_spacing:
+                    if run:
+                        self._text(run, run_tm, state, pil_font, color)
+                    run, run_tm = "", tm
+                if code != 32:
+                    if not run:
+                        run_tm = tm
+                    run += font.char(code)
+            advance = (font.width(code) * state.size + state.char_spacing
+                       + (state.word_spacing if code == 32 else 0)) * h
+            tm = multiply((1, 0, 0, 1, advance, 0), tm)
+        if run:
+            self._text(run, run_tm, state, pil_font, color)
+        return tm
+
+    def _text(self, text, tm, state, pil_font, color):
+        trm = multiply(multiply((state.size * state.scale, 0, 0, state.size, 0, state.rise), tm), state.ctm)
+        with self._target(state) as draw:
+            draw.text(apply(trm, 0, 0), text, font=pil_font, fill=color, anchor="ls")
+
+    def _xobject(self, ref, state, resources, depth):
+        xobject = self.doc.resolve(ref)
+        if not isinstance(xobject, Stream):
+            return
+        subtype = xobject.dict.get("Subtype")
+        if subtype == "Form":
+            matrix = tuple(float(v) for v in xobject.dict.get("Matrix", IDENTITY))
+            inner = self.doc.resolve(xobject.dict.get("Resources")) or resources
+            try:
+                data = xobject.decoded()
+            except (PdfError, ValueError):
+                return
+            self.run(data, inner, multiply(matrix, state.ctm), depth + 1)
+        elif subtype == "Image":
+            self._image(ref, xobject, state)
+
+    def _decode_image(self, xobject):
+        from PIL import Image
+
+        d = xobject.dict
+        names = [str(f) for f in (d.get("Filter") if isinstance(d.get("Filter"), list) else
+                                  [d["Filter"]] if d.get("Filter") else [])]
+        if names and names[-1] == "DCTDecode":
+            data = Stream({Name("Filter"): [Name(f) for f in names[:-1]]}, xobject.data).decoded()
+            return Image.open(io.BytesIO(data)).convert("RGB")
+        data = xobject.decoded()
+        width, height = int(d["Width"]), int(d["Height"])
+        if d.get("ImageMask") or d.get("BitsPerComponent") == 1:
+            return Image.frombytes("1", (width, height), data).convert("L")
+        space = self.doc.resolve(d.get("ColorSpace"))
+        if isinstance(space, list) and space and space[0] == "Indexed":
+            base, palette = self.doc.resolve(space[1]), self.doc.resolve(space[3])
+            palette = palette.decoded() if isinstance(palette, Stream) else bytes(palette)
+            image = Image.frombytes("P", (width, height), data)
+            if self.doc.resolve(base) == "DeviceGray":
+                palette = bytes(v for g in palette for v in (g, g, g))
+            image.putpalette(palette)
+            return image.convert("RGB")
+        if isinstance(space, list) and space and space[0] == "ICCBased":
+            components = self.doc.resolve(space[1]).dict.get("N", 3)
+            space = {1: "DeviceGray", 4: "DeviceCMYK"}.get(components, "DeviceRGB")
+        mode = {"DeviceGray": "L", "DeviceCMYK": "CMYK"}.get(str(space), "RGB")
+        return Image.frombytes(mode, (width, height), data).convert("L" if mode == "L" else "RGB")
+
+    def _image(self, ref, xobject, state):
+        from PIL import Image, ImageChops
+
+        key = ref.num if isinstance(ref, Ref) else id(xobject)
+        if key not in self._images:
+            try:
+                image = self._decode_image(xobject)
+                smask = self.doc.resolve(xobject.dict.get("SMask"))
+                mask = self._decode_image(smask).convert("L") if isinstance(smask, Stream) else None
+            except (PdfError, ValueError, KeyError, OSError):
+                image = mask = None
+            self._images[key] = (image, mask)
+        image, mask = self._images[key]
+        if image is None:
+            return
+        a, b, c, d, e, f = state.ctm
+        corners = [apply(state.ctm, x, y) for x, y in ((0, 0), (1, 0), (0, 1), (1, 1))]
+        left, top = min(x for x, _ in corners), min(y for _, y in corners)
+        width = round(max(x for x, _ in corners) - left)
+        height = round(max(y for _, y in corners) - top)
+        if width < 1 or height < 1:
+            return
+        image = image.resize((width, height), Image.BILINEAR)
+        mask = mask.resize((width, height), Image.BILINEAR) if mask is not None else None
+        if a < 0:
+            image = image.transpose(Image.FLIP_LEFT_RIGHT)
+            mask = mask.transpose(Image.FLIP_LEFT_RIGHT) if mask is not None else None
+        if d > 0:
+            image = image.transpose(Image.FLIP_TOP_BOTTOM)
+            mask = mask.transpose(Image.FLIP_TOP_BOTTOM) if mask is not None else None
+        if state.fill_alpha < 1:
+            alpha = Image.new("L", image.size, round(255 * state.fill_alpha))
+            mask = alpha if mask is None else Image.composite(mask, Image.new("L", image.size, 0), alpha)
+        if state.clip is not None:
+            clip = state.clip.crop((round(left), round(top), round(left) + width, round(top) + height))
+            mask = clip if mask is None else ImageChops.multiply(mask, clip)
+        self.image.paste(image.convert("RGB"), (round(left), round(top)), mask)
+
+
+# --- Page hashes ---
+
+class _Hasher:
+    """Digests of objects with every reference followed, memoized per object."""
+
+    def __init__(self, doc):
+        self.doc = doc
+        self._digests = {}
+
+    def digest(self, obj):
+        h = hashlib.sha256()
+        self._feed(h, obj, set())
+        return h.digest()
+
+    def _feed(self, h, obj, pending):
+        if isinstance(obj, Ref):
+            digest = self._digests.get(obj.num)
+            if digest is None:
+                if obj.num in pending:
+                    h.update(b"<cycle>")
+                    return
+                sub = hashlib.sha256()
+                self._feed(sub, self.doc.objects.get(obj.num), pending | {obj.num})
+                digest = self._digests[obj.num] = sub.digest()
+            h.update(b"R" + digest)
+        elif isinstance(obj, dict):
+            h.update(b"<<")
+            for key in sorted(obj):
+                if key in ("Parent", "P"):
+                    continue
+                h.update(serialize(Name(key)))
+                self._feed(h, obj[key], pending)
+            h.update(b">>")
+        elif isinstance(obj, list):
+            h.update(b"[")
+            for item in obj:
+                self._feed(h, item, pending)
+            h.update(b"]")
+        elif isinstance(obj, Stream):
+            self._feed(h, {k: v for k, v in obj.dict.items() if k != "Length"}, pending)
+            h.update(hashlib.sha256(obj.data).digest())
+        elif isinstance(obj, PdfString):
+            h.update(b"(" + hashlib.sha256(obj).digest())
+        else:
+            h.update(serialize(obj) if obj is not None else b"null")
+
+
+def page_key(hasher, page_ref, width):
+    """Cache key of a page's preview at `width` pixels."""
+    page = hasher.doc.page(page_ref)
+    h = hashlib.sha256(f"preview {RENDERER_VERSION} {width} {SUPERSAMPLE}\n".encode())
+    for key in ("MediaBox", "Contents", "Resources"):
+        hasher._feed(h, page.get(key), set())
+    return h.hexdigest()
+
+
+# --- Entry point ---
+
+_doc = None  # the document workers render from (inherited on fork)
+
+
+def _render_page(index, width, target):
+    page_ref = _doc.page_refs()[index]
+    image = PageRenderer(_doc, width).render(page_ref)
+    tmp = f"{target}.{os.getpid()}.tmp"
+    image.save(tmp, "PNG", compress_level=6)
+    os.replace(tmp, target)
+    return target
+
+
+def preview_dir(pdf_path):
+    """Where the previews of a PDF go: "Manual.pdf" -> "Manual.previews"."""
+    return os.path.splitext(pdf_path)[0] + ".previews"
+
+
+def render_previews(pdf_path, directory=None, width=PREVIEW_WIDTH, thumbnail_width=THUMBNAIL_WIDTH, jobs=None):
+    """Write page-NNN.png for every page and cover.png for the first one.
+
+    Returns a PreviewResult; only pages missing from the cache are rendered.
+    """
+    global _doc
+    directory = directory or preview_dir(pdf_path)
+    doc = PdfDocument.from_file(pdf_path)
+    page_refs = doc.page_refs()
+    hasher = _Hasher(doc)
+    wanted = [(i, width, f"page-{i + 1:03d}.png") for i in range(len(page_refs))]
+    if page_refs:
+        wanted.append((0, thumbnail_width, "cover.png"))
+    todo, sources = [], []
+    for index, size, name in wanted:
+        source = cache_path("previews", page_key(hasher, page_refs[index], size)[:32] + ".png")
+        sources.append((source, name))
+        if not os.path.exists(source) and (index, size, source) not in todo:
+            todo.append((index, size, source))
+
+    _doc = doc
+    try:
+        jobs = jobs or min(len(todo), os.cpu_count() or 1)
+        if jobs > 1 and "fork" in multiprocessing.get_all_start_methods():
+            with ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context("fork")) as pool:
+                list(pool.map(_render_page, *zip(*todo)))
+        else:
+            for job in todo:
+                _render_page(*job)
+    finally:
+        _doc = None
+
+    os.makedirs(directory, exist_ok=True)
+    result = PreviewResult(directory, rendered=len(todo), cached=len(wanted) - len(todo))
+    for source, name in sources:
+        target = os.path.join(directory, name)
+        shutil.copyfile(source, target)
+        if name == "cover.png":
+            result.thumbnail = target
+        else:
+            result.pages.append(target)
+    # Pages a longer earlier build left behind.
+    for name in os.listdir(directory):
+        if name.startswith("page-") and name.endswith(".png") and os.path.join(directory, name) not in result.pages:
+            os.unlink(os.path.join(directory, name))
+    return result
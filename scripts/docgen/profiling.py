@@ -0,0 +1,279 @@
+"""
+Build instrumentation.
+
+A BuildProfile collects, for one guide build:
+
+- wall time and allocations (tracemalloc) per @profiled function,
+- doc.build time split into layout and canvas serialization (canvas.save),
+- prepare/decode time per image key,
+- Paragraph parse, line-break and draw time with their cache hits
+  (docgen.paragraphs),
+- the final byte size of each section, measured on the output PDF,
+
+and writes them as JSON, optionally with a cProfile dump for pstats. Nothing
+is recorded unless a profile was started, so the hooks are free otherwise.
+tracemalloc slows allocation-heavy code (image encoding most of all) by an
+order of magnitude, so compare timings only between runs of the same mode.
+"""
+
+import cProfile
+import functools
+import json
+import os
+import platform
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# The profile of the build running in this process, if any.
+_active = None
+
+
+def active():
+    return _active
+
+
+def start(name, allocations=True, cprofile=False):
+    """Start profiling a build and return its BuildProfile."""
+    global _active
+    _active = BuildProfile(name, allocations, cprofile)
+    return _active
+
+
+def profiled(func):
+    """Record the wall time and allocations of `func` in the active profile."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if _active is None:
+            return func(*args, **kwargs)
+        with _active.phase(func.__name__):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+@contextmanager
+def image_timer(key, path=None):
+    """Time preparing an image for `key`; yields a dict to set "path" in."""
+    if _active is None:
+        yield {}
+        return
+    info = {"path": path}
+    start = time.perf_counter()
+    try:
+        yield info
+    finally:
+        _active.image(key, info["path"], time.perf_counter() - start)
+
+
+def record_decode(path, seconds):
+    """Called when an image file is decoded into a PDF XObject."""
+    if _active is not None:
+        path = os.path.abspath(path)
+        _active.decodes[path] = _active.decodes.get(path, 0.0) + seconds
+
+
+def record_paragraph(stage, seconds, hit=False):
+    """Called by docgen.paragraphs for each parse, line break and draw."""
+    if _active is not None:
+        entry = _active.paragraphs.setdefault(stage, {"calls": 0, "cache_hits": 0, "seconds": 0.0})
+        entry["calls"] += 1
+        entry["cache_hits"] += hit
+        entry["seconds"] += seconds
+
+
+def build(doc, story, canvasmaker=None):
+    """doc.build, timed as layout plus canvas serialization when profiling."""
+    if _active is None:
+        return doc.build(story, canvasmaker=canvasmaker) if canvasmaker else doc.build(story)
+    with _active.phase("doc.build"):
+        return doc.build(story, canvasmaker=_active.canvasmaker(canvasmaker))
+
+
+class _Frame:
+    __slots__ = ("start", "peak")
+
+    def __init__(self, start):
+        self.start = start
+        self.peak = start
+
+
+class BuildProfile:
+    def __init__(self, name, allocations=True, cprofile=False):
+        self.name = name
+        self.allocations = allocations
+        self.functions = {}
+        self.images = {}
+        self.decodes = {}
+        self.paragraphs = {}
+        self.serialize_seconds = 0.0
+        self.sections = []
+        self._marks = []
+        self._stack = []
+        self._started = time.perf_counter()
+        self.seconds = None
+        self._tracing = allocations and not tracemalloc.is_tracing()
+        if self._tracing:
+            tracemalloc.start()
+        self._cprofile = cProfile.Profile() if cprofile else None
+        if self._cprofile is not None:
+            self._cprofile.enable()
+
+    @contextmanager
+    def phase(self, name):
+        """Time a block and record it under `name` (calls accumulate)."""
+        if self.allocations:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                self._stack[-1].peak = max(self._stack[-1].peak, peak)
+            tracemalloc.reset_peak()
+            frame = _Frame(current)
+            self._stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry = self.functions.setdefault(name, {"calls": 0, "seconds": 0.0})
+            entry["calls"] += 1
+            entry["seconds"] += time.perf_counter() - start
+            if self.allocations:
+                current, peak = tracemalloc.get_traced_memory()
+                self._stack.pop()
+                frame.peak = max(frame.peak, peak)
+                entry["allocated_bytes"] = entry.get("allocated_bytes", 0) + current - frame.start
+                entry["peak_bytes"] = max(entry.get("peak_bytes", 0), frame.peak - frame.start)
+                if self._stack:
+                    self._stack[-1].peak = max(self._stack[-1].peak, frame.peak)
+                tracemalloc.reset_peak()
+
+    def image(self, key, path, seconds):
+        entry = self.images.setdefault(key, {"path": path, "prepare_seconds": 0.0})
+        entry["path"] = path or entry["path"]
+        entry["prepare_seconds"] += seconds
+
+    def canvasmaker(self, base=None):
+        """A canvas class whose save() time is recorded as serialization."""
+        from reportlab.pdfgen.canvas import Canvas
+
+        profile = self
+
+        class TimedCanvas(base or Canvas):
+            def save(self):
+                start = time.perf_counter()
+                try:
+                    return super().save()
+                finally:
+                    profile.serialize_seconds += time.perf_counter() - start
+
+        return TimedCanvas
+
+    def mark(self, name):
+        """A zero-size flowable recording the page section `name` starts on."""
+        from reportlab.platypus.flowables import Flowable
+
+        marks = self._marks
+
+        class SectionMark(Flowable):
+            def wrap(self, availWidth, availHeight):
+                return 0, 0
+
+            def draw(self):
+                marks.append((name, self.canv.getPageNumber()))
+
+        return SectionMark()
+
+    def section(self, name, pages):
+        """Record the next section of the output and its page count."""
+        self.sections.append({"name": name, "pages": pages})
+
+    def _section_sizes(self, output_path):
+        """Attribute the output's bytes to sections by the pages they span.
+
+        Each object counts towards the first page that references it, so
+        shared fonts and images land in the section that first uses them.
+        """
+        from .pdfobj import PdfDocument, Stream, _refs, serialize
+
+        doc = PdfDocument.from_file(output_path)
+        page_refs = doc.page_refs()
+        sections = self.sections
+        if not sections and self._marks:
+            starts = [(page, name) for name, page in self._marks]
+            ends = [page for page, _ in starts[1:]] + [len(page_refs) + 1]
+            sections = [{"name": name, "pages": end - page} for (page, name), end in zip(starts, ends)]
+            if starts[0][0] > 1:
+                sections.insert(0, {"name": "(front)", "pages": starts[0][0] - 1})
+
+        seen = set()
+
+        def size(ref):
+            total = 0
+            stack = [ref]
+            while stack:
+                ref = stack.pop()
+                if ref.num in seen or ref.num not in doc.objects:
+                    continue
+                seen.add(ref.num)
+                obj = doc.objects[ref.num]
+                if isinstance(obj, dict) and obj.get("Type") == "Pages":
+                    continue
+                total += len(obj.data) + len(serialize(obj.dict)) if isinstance(obj, Stream) else len(serialize(obj))
+                stack.extend(_refs(obj))
+            return total
+
+        page_sizes = [size(ref) for ref in page_refs]
+        first = 0
+        for entry in sections:
+            entry["first_page"] = first + 1
+            entry["bytes"] = sum(page_sizes[first:first + entry["pages"]])
+            first += entry["pages"]
+        return sections
+
+    def finish(self, output_path=None):
+        """Stop recording; measure the output's section sizes if it exists."""
+        global _active
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        self.seconds = time.perf_counter() - self._started
+        if self._tracing:
+            tracemalloc.stop()
+        if _active is self:
+            _active = None
+        self.output_path = output_path
+        if output_path and os.path.exists(output_path):
+            self.sections = self._section_sizes(output_path)
+
+    def to_dict(self):
+        build = self.functions.get("doc.build", {}).get("seconds", 0.0)
+        images = {}
+        for key, entry in self.images.items():
+            path = entry["path"]
+            decode = self.decodes.get(os.path.abspath(path), 0.0) if path else 0.0
+            images[key] = {"path": path, "prepare_seconds": round(entry["prepare_seconds"], 6),
+                           "decode_seconds": round(decode, 6)}
+        output = getattr(self, "output_path", None)
+        return {
+            "guide": self.name,
+            "python": platform.python_version(),
+            "allocations": self.allocations,
+            "seconds": round(self.seconds or 0.0, 6),
+            "functions": {name: {k: round(v, 6) if isinstance(v, float) else v for k, v in entry.items()}
+                          for name, entry in self.functions.items()},
+            "doc_build": {
+                "layout_seconds": round(max(build - self.serialize_seconds, 0.0), 6),
+                "serialize_seconds": round(self.serialize_seconds, 6),
+            },
+            "paragraphs": {stage: {k: round(v, 6) if isinstance(v, float) else v for k, v in entry.items()}
+                           for stage, entry in self.paragraphs.items()},
+            "images": images,
+            "sections": self.sections,
+            "output_bytes": os.path.getsize(output) if output and os.path.exists(output) else None,
+        }
+
+    def write(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def dump_stats(self, path):
+        """Write the cProfile data, readable with pstats.Stats(path)."""
+        if self._cprofile is not None:
+            self._cprofile.dump_stats(path)
@@ -0,0 +1,323 @@
+"""
+Monthly recap documents.
+
+A one-page PDF of a stored recap (``public.monthly_recaps``, written by
+``generateRecap`` in ``lib/recap-generator.ts``), laid out like RecapBody in
+``components/recap/recap-card.tsx``: headline, spent / change / transaction
+figures, the insights, the takeaway and what was analyzed, in the user
+manual's styles with the Novira logo. Figures the model wrapped in
+``**double asterisks**`` are set in bold, as in the app.
+
+A recap row is a dict with the table's ``user_id``, ``month`` ("2026-04", or
+"2026-FY" for a yearly recap), ``recap`` and ``analyzed`` plus the profile's
+``currency`` and, optionally, ``full_name``. Rows come from a JSON Lines
+fixture (JsonlRecaps) or from Postgres (PostgresRecaps, which needs psycopg),
+each restricted to a shard of the users (docgen.batch).
+"""
+
+import hashlib
+import json
+import os
+import re
+from datetime import date
+from xml.sax.saxutils import escape
+
+from reportlab.lib.colors import HexColor
+from reportlab.lib.enums import TA_LEFT
+from reportlab.lib.units import mm
+
+from . import fonts
+from .batch import shard_of
+from .images import file_digest
+from .report_stats import MONTHS, format_currency, format_for_pdf
+from .theme import get_theme
+
+# Bump when the recap layout changes, so every recap is rendered again.
+RECAP_VERSION = 1
+
+VALID_PERIOD = re.compile(r"^\d{4}(-\d{2}|-FY)$")
+_BOLD = re.compile(r"\*\*([^*]+)\*\*")
+
+# Tailwind rose-600 / emerald-600: spending up is bad news, down is good.
+UP_COLOR = HexColor("#E11D48")
+DOWN_COLOR = HexColor("#059669")
+
+theme = get_theme("manual")
+
+
+class RecapError(Exception):
+    pass
+
+
+def previous_month(today=None):
+    """The "YYYY-MM" key of the month before `today`'s, the one a nightly run renders."""
+    today = today or date.today()
+    year, month = (today.year, today.month - 1) if today.month > 1 else (today.year - 1, 12)
+    return f"{year}-{month:02d}"
+
+
+def period_label(period):
+    """ "2026-04" -> "April 2026", "2026-FY" -> "2026 in review"."""
+    year, _, month = period.partition("-")
+    return f"{year} in review" if month == "FY" else f"{MONTHS[int(month) - 1]} {year}"
+
+
+# --- Sources ---
+
+def _row(user_id, month, recap, analyzed, currency, full_name):
+    if isinstance(recap, str):
+        recap = json.loads(recap)
+    if isinstance(analyzed, str):
+        analyzed = json.loads(analyzed)
+    return {"user_id": str(user_id), "month": month, "recap": recap, "analyzed": analyzed or {},
+            "currency": (currency or "USD").upper(), "full_name": full_name}
+
+
+class JsonlRecaps:
+    """Recap rows from a JSON Lines file, one row per line.
+
+    Every worker reads the whole file and keeps its shard's rows.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def rows(self, months=None, shard=0, shards=1):
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                if months and row["month"] not in months:
+                    continue
+                if shards > 1 and shard_of(str(row["user_id"]), shards) != shard:
+                    continue
+                yield _row(row["user_id"], row["month"], row["recap"], row.get("analyzed"),
+                           row.get("currency"), row.get("full_name"))
+
+
+class PostgresRecaps:
+    """Recap rows from public.monthly_recaps joined with profiles.
+
+    Each worker opens its own connection and streams its shard through a
+    server-side cursor; the shard is selected in SQL with the same hash as
+    docgen.batch.shard_of.
+    """
+
+    QUERY = """
+        select r.user_id::text, r.month, r.recap, r.analyzed, p.currency, p.full_name
+        from public.monthly_recaps r
+        left join public.profiles p on p.id = r.user_id
+        where (%(months)s::text[] is null or r.month = any(%(months)s))
+          and mod(('x' || substr(md5(r.user_id::text), 1, 15))::bit(60)::bigint, %(shards)s) = %(shard)s
+        order by r.month, r.user_id
+    """
+    FETCH_SIZE = 2000
+
+    def __init__(self, dsn):
+        self.dsn = dsn
+
+    def rows(self, months=None, shard=0, shards=1):
+        try:
+            import psycopg
+        except ImportError:
+            raise RecapError("reading recaps from Postgres needs psycopg (pip install psycopg)") from None
+        with psycopg.connect(self.dsn) as conn, conn.cursor(name=f"recaps_{shard}") as cur:
+            cur.itersize = self.FETCH_SIZE
+            cur.execute(self.QUERY, {"months": list(months) if months else None, "shards": shards, "shard": shard})
+            for values in cur:
+                yield _row(*values)
+
+
+# --- The document ---
+
+class RecapRenderer:
+    """Renders recap rows with the user manual's layout, styles and logo.
+
+    `doc_kwargs` are the manual's SimpleDocTemplate arguments (page size and
+    margins). Styles, fonts and the prepared logo are process-wide caches, so
+    a renderer warmed before the batch workers fork serves them all.
+    """
+
+    def __init__(self, doc_kwargs, logo_path=None):
+        self.doc_kwargs = doc_kwargs
+        self.logo_path = logo_path if logo_path and os.path.exists(logo_path) else None
+        self.width = doc_kwargs["pagesize"][0] - doc_kwargs["leftMargin"] - doc_kwargs["rightMargin"]
+        self._fingerprint = None
+
+    # --- styles ---
+
+    def styles(self):
+        return {
+            "eyebrow": theme.eyebrow,
+            "title": theme.derive("RecapTitle", "heading1", fontSize=26, leading=30, spaceBefore=1*mm,
+                                  spaceAfter=1*mm),
+            "name": theme.derive("RecapName", "blurb", alignment=TA_LEFT, spaceAfter=6*mm),
+            "headline": theme.derive("RecapHeadline", "body", fontSize=15, leading=20, fontName="Helvetica-Bold",
+                                     alignment=TA_LEFT, spaceAfter=6*mm),
+            "stat_label": theme.derive("RecapStatLabel", "eyebrow", fontSize=7, textColor="@muted"),
+            "stat_value": theme.derive("RecapStatValue", "body", fontSize=15, leading=19,
+                                       fontName="Helvetica-Bold", spaceAfter=0, alignment=TA_LEFT),
+            "heading": theme.heading2,
+            "insight_label": theme.derive("RecapInsightLabel", "eyebrow", textColor="@primary"),
+            "detail": theme.derive("RecapDetail", "body", fontSize=10.5, leading=14.5, spaceAfter=0,
+                                   alignment=TA_LEFT),
+            "takeaway_label": theme.derive("RecapTakeawayLabel", "eyebrow", textColor="@tip"),
+            "analyzed": theme.derive("RecapAnalyzed", "caption", alignment=TA_LEFT, fontName="Helvetica",
+                                     spaceBefore=4*mm, spaceAfter=0),
+        }
+
+    def money(self, amount, currency):
+        if fonts.font("Helvetica") == "Helvetica":
+            return format_for_pdf(amount, currency)
+        return format_currency(amount, currency)
+
+    @staticmethod
+    def rich(text, style):
+        """Recap text as paragraph markup: escaped, **figures** in bold, printable."""
+        markup = _BOLD.sub(r"<b>\1</b>", escape(str(text or "")))
+        return fonts.printable(markup, style.fontName, markup=True)
+
+    # --- identity ---
+
+    def fingerprint(self):
+        """Hash of everything besides the row that shapes a recap PDF."""
+        if self._fingerprint is None:
+            h = hashlib.sha256(f"recap {RECAP_VERSION}\n{theme.fingerprint()}\n".encode())
+            h.update(f"{sorted((k, repr(v)) for k, v in self.doc_kwargs.items())}\n".encode())
+            h.update(f"logo {file_digest(self.logo_path) if self.logo_path else None}\n".encode())
+            h.update(f"module {file_digest(os.path.abspath(__file__))}\n".encode())
+            self._fingerprint = h.hexdigest()
+        return self._fingerprint
+
+    def digest(self, row):
+        """Content digest of a row's PDF: changes when the recap or the layout does."""
+        payload = json.dumps([row["recap"], row["analyzed"], row["currency"], row["full_name"]],
+                             sort_keys=True, default=str)
+        return hashlib.sha256(f"{self.fingerprint()}\n{payload}".encode()).hexdigest()[:32]
+
+    # --- story ---
+
+    def _stats(self, row, styles):
+        from reportlab.platypus import Table, TableStyle
+        from docgen.paragraphs import Paragraph
+
+        recap, currency = row["recap"], row["currency"]
+        yearly = row["month"].endswith("-FY")
+        change = float(recap.get("changePercent") or 0)
+        if change == 0:
+            change_text, color = "No change", None
+        else:
+            change_text, color = f"{'+' if change > 0 else ''}{change:.1f}%", UP_COLOR if change > 0 else DOWN_COLOR
+        cells = [
+            ("Spent", self.money(float(recap.get("totalSpent") or 0), currency), None),
+            ("vs last year" if yearly else "vs last month", change_text, color),
+            ("Last year" if yearly else "Last month", self.money(float(recap.get("previousTotal") or 0), currency),
+             None),
+        ]
+        if isinstance(recap.get("transactionCount"), (int, float)):
+            cells.append(("Transactions", f"{int(recap['transactionCount'])}", None))
+        value_style = styles["stat_value"]
+        row_cells = []
+        for label, value, color in cells:
+            style = value_style if color is None else theme.derive(
+                f"RecapStat{'Up' if color is UP_COLOR else 'Down'}", "body", fontSize=15, leading=19,
+                fontName="Helvetica-Bold", spaceAfter=0, alignment=TA_LEFT, textColor=color)
+            row_cells.append([Paragraph(label.upper(), styles["stat_label"]),
+                              Paragraph(self.rich(value, style), style)])
+        table = Table([row_cells], colWidths=[self.width / len(cells)] * len(cells), hAlign="LEFT")
+        table.setStyle(TableStyle([
+            ("VALIGN", (0, 0), (-1, -1), "TOP"),
+            ("LEFTPADDING", (0, 0), (-1, -1), 0),
+            ("LINEBEFORE", (1, 0), (-1, -1), 0.5, theme.color("rule")),
+            ("LEFTPADDING", (1, 0), (-1, -1), 4*mm),
+        ]))
+        return table
+
+    def _card(self, label, label_style, text, background, bar=None):
+        from reportlab.platypus import Table, TableStyle
+        from docgen.paragraphs import Paragraph
+
+        styles = self.styles()
+        card = Table([[Paragraph(escape(label.upper()), label_style)],
+                      [Paragraph(self.rich(text, styles["detail"]), styles["detail"])]],
+                     colWidths=[self.width], hAlign="LEFT", cornerRadii=[2*mm] * 4)
+        commands = [
+            ("BACKGROUND", (0, 0), (-1, -1), background),
+            ("LEFTPADDING", (0, 0), (-1, -1), 4*mm),
+            ("RIGHTPADDING", (0, 0), (-1, -1), 4*mm),
+            ("TOPPADDING", (0, 0), (-1, 0), 3*mm),
+            ("BOTTOMPADDING", (0, -1), (-1, -1), 3*mm),
+        ]
+        if bar is not None:
+            commands.append(("LINEBEFORE", (0, 0), (0, -1), 2, bar))
+        card.setStyle(TableStyle(commands))
+        return card
+
+    def story(self, row):
+        """The flowables of one recap PDF."""
+        from reportlab.platypus import Spacer
+        from docgen.images import shared_image
+        from docgen.paragraphs import Paragraph
+        from docgen.xobjects import SharedImage
+
+        styles = self.styles()
+        recap, analyzed = row["recap"], row["analyzed"]
+        yearly = row["month"].endswith("-FY")
+        story = []
+        if self.logo_path:
+            src, width, height = shared_image(self.logo_path, 16*mm, 16*mm)
+            story += [SharedImage(src, width, height, hAlign="LEFT"), Spacer(1, 4*mm)]
+        story.append(Paragraph("NOVIRA YEARLY RECAP" if yearly else "NOVIRA MONTHLY RECAP", styles["eyebrow"]))
+        story.append(Paragraph(escape(period_label(row["month"])), styles["title"]))
+        if row.get("full_name"):
+            name = fonts.printable(escape(row["full_name"]), styles["name"].fontName, markup=True)
+            story.append(Paragraph(f"Prepared for {name}", styles["name"]))
+        else:
+            story.append(Spacer(1, 5*mm))
+        story.append(Paragraph(self.rich(recap.get("headline"), styles["headline"]), styles["headline"]))
+        story.append(self._stats(row, styles))
+
+        insights = [i for i in recap.get("insights") or [] if isinstance(i, dict)]
+        if insights:
+            story.append(Paragraph("Insights", styles["heading"]))
+            for insight in insights:
+                story.append(self._card(insight.get("label") or "", styles["insight_label"], insight.get("detail"),
+                                        theme.color("table_bg")))
+                story.append(Spacer(1, 3*mm))
+        story.append(Spacer(1, 3*mm))
+        story.append(self._card("Takeaway", styles["takeaway_label"], recap.get("takeaway"),
+                                theme.color("table_bg_alt"), bar=theme.color("tip")))
+        if analyzed:
+            story.append(Paragraph(
+                f"Analyzed {analyzed.get('transactions', 0)} txns · {analyzed.get('categories', 0)} categories · "
+                f"{analyzed.get('merchants', 0)} merchants · {analyzed.get('paymentMethods', 0)} payment methods",
+                styles["analyzed"]))
+        return story
+
+    def render(self, row, output=None):
+        """Render one row into `output` (a path or binary file object), or return the bytes."""
+        from .render import render_document
+
+        return render_document(lambda: self.story(row), output, title=f"Novira Recap · {period_label(row['month'])}",
+                               author="Novira", **self.doc_kwargs)
+
+    def warm(self):
+        """Build the styles, load the fonts and prepare the logo by rendering a sample recap."""
+        return self.render(SAMPLE_ROW)
+
+
+SAMPLE_ROW = _row("00000000-0000-0000-0000-000000000000", "2026-04", {
+    "headline": "You spent **€1,284.50** in April, down **12%** on March.",
+    "totalSpent": 1284.5, "previousTotal": 1459.7, "changePercent": -12.0, "transactionCount": 42,
+    "insights": [
+        {"label": "Food cooled off", "kind": "category", "subject": "food",
+         "detail": "Food fell to **€312.40** across **18** transactions — **24%** of total spend."},
+        {"label": "Card habit", "kind": "payment", "subject": "credit card",
+         "detail": "Credit card share rose from **41%** to **58%** of spend."},
+        {"label": "Frequent stops", "kind": "merchant", "subject": "lidl",
+         "detail": "**9** visits to Lidl for **€201.15** total."},
+    ],
+    "takeaway": "Keep food under **€300** next month — that alone would save ~**€40**.",
+}, {"transactions": 42, "categories": 7, "merchants": 10, "paymentMethods": 3, "comparedToMonth": "2026-03"},
+    "EUR", "Alex Rivera")
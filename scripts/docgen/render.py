@@ -0,0 +1,75 @@
+"""
+Render-to-bytes API.
+
+Guides normally render from their ``main()`` straight to ``OUTPUT_PATH``.
+This module renders on demand instead, into a binary file object or into
+bytes:
+
+- ``render_document(build_story, output, **doc_kwargs)`` lays out the
+  flowables a story builder returns;
+- ``render_guide(name, output, **options)`` renders a guide through the
+  ``render(output, **options)`` function every ``generate_*.py`` module
+  exposes next to ``main()``.
+
+Without an ``output`` both return the PDF as bytes. A guide's string-valued
+keyword options (``locale``, ``source``) are the ones a caller such as the
+render service (docgen.server) may set; see ``render_options``.
+"""
+
+import importlib
+import inspect
+import io
+
+from . import profiling
+from .images import forget_renditions
+
+
+class RenderError(Exception):
+    """A render request a guide cannot satisfy, such as an unknown locale."""
+
+
+def _write(render, output):
+    if output is not None:
+        render(output)
+        return None
+    buffer = io.BytesIO()
+    render(buffer)
+    return buffer.getvalue()
+
+
+def render_document(build_story, output=None, canvasmaker=None, **doc_kwargs):
+    """Lay out the flowables `build_story()` returns as a SimpleDocTemplate.
+
+    `output` is a path or a binary file object; without one the PDF is
+    returned as bytes. `doc_kwargs` go to SimpleDocTemplate (pagesize,
+    margins, title...).
+    """
+    from reportlab.platypus import SimpleDocTemplate
+
+    def render(target):
+        doc = SimpleDocTemplate(target, **doc_kwargs)
+        profiling.build(doc, build_story(), canvasmaker)
+
+    return _write(render, output)
+
+
+def render_options(module):
+    """The options of a guide's render() callers may set, with their defaults."""
+    params = list(inspect.signature(module.render).parameters.values())[1:]
+    return {p.name: p.default for p in params if isinstance(p.default, str)}
+
+
+def render_guide(name, output=None, **options):
+    """Render the guide module `name` into `output`, or return its bytes.
+
+    Raises RenderError for options the guide does not take.
+    """
+    module = importlib.import_module(name)
+    if not hasattr(module, "render"):
+        raise RenderError(f"{name} cannot render on demand")
+    unknown = sorted(set(options) - set(render_options(module)))
+    if unknown:
+        raise RenderError(f"{name} has no option(s) {', '.join(unknown)}")
+    # As in docgen.driver: a render must not draw another document's images.
+    forget_renditions()
+    return _write(lambda target: module.render(target, **options), output)
@@ -0,0 +1,998 @@
+"""
+Streaming transaction report.
+
+A Python port of ``generatePDF`` in ``utils/export-utils.ts`` that can handle
+tens of thousands of transactions with bounded memory. The report takes the
+same inputs as ``generatePDF`` (transactions with their splits, buckets and the
+``ExportContext``: accounts, goals, recurring templates, ...) and draws the
+same pages with jsPDF's coordinates (mm, y measured from the top).
+
+Transactions are read twice instead of being held in memory:
+
+1. in input order, to compute the statistics (see docgen.report_stats), a
+   date-sorted index of the rows and the width of every table column; the
+   totals of a columnar source (docgen.columnstore) come from
+   docgen.report_columns instead;
+2. in date order, to draw the Transaction Details table.
+
+Detail rows have a fixed height, so the page count is known before the table
+is drawn and every footer can be written straight away. Pages are drawn onto
+a fresh canvas every ``CHUNK_PAGES`` pages and each finished chunk is appended
+to the output file by ``PdfStreamWriter``, so neither the canvas nor the
+output grows in memory with the row count.
+
+Text is set in the Unicode family of docgen.fonts when one is installed, so
+currency symbols and non-Latin names print as they are; with the base fonts,
+formatForPDF's spelled-out symbols are used as in the app.
+"""
+
+import io
+import json
+import math
+import os
+from array import array
+from datetime import date
+
+from reportlab.lib.colors import Color
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import mm
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+
+from . import fonts
+from .pdfobj import HELVETICA, PdfDocument, PdfStreamWriter, append_page_content, text_stream
+from .report_stats import (
+    StatsBuilder, capitalize, format_currency, format_for_pdf, is_valid, long_date, make_converter,
+    month_label, ordinal_date, parse_date, resolve_amount, short_date,
+)
+from .theme import get_theme
+
+theme = get_theme("report")
+
+PAGE_W, PAGE_H = 210, 297  # mm, like jsPDF's default A4 page
+FONT, BOLD = fonts.font("Helvetica"), fonts.font("Helvetica-Bold")
+CHUNK_PAGES = 50
+
+# jspdf-autotable defaults
+LINE_HEIGHT = 1.15
+TABLE_MARGIN = 40 / mm     # 40 user units -> mm
+CELL_PADDING = 5 / mm
+
+FOOTER_TEXT = "Page {page} of {count}  ·  Novira Financial Audit"
+
+DOC_INFO = {
+    "Title": "Expense Audit Report",
+    "Author": "Novira",
+    "Subject": "Novira Financial Audit",
+}
+
+CATEGORY_COLORS = {
+    "food": (138, 43, 226),
+    "groceries": (16, 185, 129),
+    "transport": (255, 107, 107),
+    "fashion": (244, 114, 182),
+    "bills": (78, 205, 196),
+    "shopping": (249, 199, 79),
+    "healthcare": (255, 159, 28),
+    "entertainment": (255, 20, 147),
+    "rent": (99, 102, 241),
+    "education": (132, 204, 22),
+    "income": (16, 185, 129),
+    "others": (45, 212, 191),
+    "uncategorized": (99, 102, 241),
+}
+
+METHOD_COLORS = {
+    "cash": (74, 222, 128),
+    "card": (96, 165, 250),
+    "online": (248, 113, 113),
+    "other": (156, 163, 175),
+    "credit card": (96, 165, 250),
+    "debit card": (129, 140, 248),
+    "bank transfer": (6, 182, 212),
+    "upi": (138, 43, 226),
+}
+
+ACCOUNT_TYPE_LABELS = {
+    "cash": "Cash",
+    "checking": "Checking",
+    "savings": "Savings",
+    "credit_card": "Credit card",
+    "digital_wallet": "Digital wallet",
+    "other": "Other",
+}
+
+DETAIL_COLUMNS = ["Date", "Description", "Category", "Bucket", "Account", "Payment", "Amount", "Tags", "Notes"]
+DETAIL_FONT_SIZE = 7.5
+DETAIL_PADDING = 2
+
+
+def _truncate(text, limit, keep):
+    return text[:keep] + ".." if len(text) > limit else text
+
+
+def _text(text):
+    """User text with the characters FONT cannot render replaced or dropped."""
+    return text if text.isascii() else fonts.printable(text, FONT)
+
+
+def _fit(text, width, font, size):
+    """Shorten `text` with ".." until it fits `width` points."""
+    if stringWidth(text, font, size) <= width:
+        return text
+    while text and stringWidth(text + "..", font, size) > width:
+        text = text[:-1]
+    return text + ".."
+
+
+# --- Input ---
+
+class JsonlTransactions:
+    """Transactions from a JSON Lines file.
+
+    Iterating yields (key, transaction) in file order; get(key) re-reads one
+    transaction by its byte offset, so nothing is kept between the passes.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def __iter__(self):
+        with open(self.path, "rb") as f:
+            offset = 0
+            for line in f:
+                if line.strip():
+                    yield offset, json.loads(line)
+                offset += len(line)
+
+    def get(self, key):
+        if self._file is None:
+            self._file = open(self.path, "rb")
+        self._file.seek(key)
+        return json.loads(self._file.readline())
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class ListTransactions:
+    """Transactions already in memory (e.g. inline in the request JSON)."""
+
+    def __init__(self, transactions):
+        self.transactions = transactions
+
+    def __iter__(self):
+        return enumerate(self.transactions)
+
+    def get(self, key):
+        return self.transactions[key]
+
+    def close(self):
+        pass
+
+
+# --- Drawing ---
+
+class Pen:
+    """jsPDF-style drawing on a ReportLab canvas: mm units, y from the top."""
+
+    def __init__(self, canv):
+        self.canvas = canv
+        self._colors = {}
+
+    def color(self, value):
+        color = self._colors.get(value)
+        if color is None:
+            if isinstance(value, str):
+                color = theme.color(value)
+            else:
+                r, g, b = (value,) * 3 if isinstance(value, int) else value
+                color = Color(r / 255, g / 255, b / 255)
+            self._colors[value] = color
+        return color
+
+    def text(self, text, x, y, size, color, bold=False, align="left"):
+        text = _text(text)
+        c = self.canvas
+        c.setFont(BOLD if bold else FONT, size)
+        c.setFillColor(self.color(color))
+        if align == "right":
+            c.drawRightString(x * mm, (PAGE_H - y) * mm, text)
+        elif align == "center":
+            c.drawCentredString(x * mm, (PAGE_H - y) * mm, text)
+        else:
+            c.drawString(x * mm, (PAGE_H - y) * mm, text)
+
+    def text_run(self, items, y, size, color, bold=False):
+        """Several strings on one baseline as a single text object.
+
+        `items` are (text, x, align) with align "left" or "right"; much cheaper
+        than one text() call per string when drawing table rows.
+        """
+        font = BOLD if bold else FONT
+        t = self.canvas.beginText()
+        t.setFont(font, size)
+        t.setFillColor(self.color(color))
+        baseline = (PAGE_H - y) * mm
+        for text, x, align in items:
+            text = _text(text)
+            x *= mm
+            if align == "right":
+                x -= stringWidth(text, font, size)
+            t.setTextOrigin(x, baseline)
+            t.textOut(text)
+        self.canvas.drawText(t)
+
+    def rect(self, x, y, w, h, fill=None, stroke=None, line_width=0.2, alpha=None):
+        c = self.canvas
+        if fill is not None:
+            c.setFillColor(self.color(fill))
+            if alpha is not None:
+                c.setFillAlpha(alpha)
+        if stroke is not None:
+            c.setStrokeColor(self.color(stroke))
+            c.setLineWidth(line_width * mm)
+        c.rect(x * mm, (PAGE_H - y - h) * mm, w * mm, h * mm,
+               stroke=stroke is not None, fill=fill is not None)
+        if alpha is not None:
+            c.setFillAlpha(1)
+
+    def line(self, x1, y1, x2, y2, color, line_width=0.2):
+        c = self.canvas
+        c.setStrokeColor(self.color(color))
+        c.setLineWidth(line_width * mm)
+        c.line(x1 * mm, (PAGE_H - y1) * mm, x2 * mm, (PAGE_H - y2) * mm)
+
+    def wedge(self, x, y, radius, start, sweep, color):
+        """A pie slice; angles in radians, clockwise from 3 o'clock as on the page."""
+        c = self.canvas
+        c.setFillColor(self.color(color))
+        c.wedge((x - radius) * mm, (PAGE_H - y - radius) * mm, (x + radius) * mm, (PAGE_H - y + radius) * mm,
+                -math.degrees(start + sweep), math.degrees(sweep), stroke=0, fill=1)
+
+    def image(self, path, x, y, w, h):
+        self.canvas.drawImage(path, x * mm, (PAGE_H - y - h) * mm, w * mm, h * mm)
+
+    def new_page(self):
+        self.canvas.showPage()
+
+
+def draw_pie_chart(pen, data, x, y, radius):
+    """drawPieChart: slices plus a legend of the first six labels."""
+    total = sum(value for _, value, _ in data)
+    if total <= 0:
+        pen.text("No data", x, y, 8, 150, align="center")
+        return
+    start = 0.0
+    for _, value, color in data:
+        if value <= 0:
+            continue
+        sweep = value / total * 2 * math.pi
+        pen.wedge(x, y, radius, start, sweep, color)
+        start += sweep
+    legend_y = y - radius
+    for i, (label, value, color) in enumerate([d for d in data if d[1] > 0][:6]):
+        pen.rect(x + radius + 5, legend_y + i * 6, 3, 3, fill=color)
+        label = label[:10] + ".." if len(label) > 12 else label
+        pen.text(f"{label} ({value / total * 100:.0f}%)", x + radius + 10, legend_y + i * 6 + 2.5, 7, 50)
+
+
+def draw_bar_chart(pen, data, x, y, width, height, color):
+    """drawBarChart: evenly spaced bars over a baseline with centred labels."""
+    if not data:
+        return
+    max_value = max([value for _, value in data] + [1])
+    bar_width = min(width / len(data) * 0.7, 15)
+    spacing = (width - bar_width * len(data)) / (len(data) - 1) if len(data) > 1 else 0
+    start_x = x + (width - (bar_width * len(data) + spacing * (len(data) - 1))) / 2
+    pen.line(x, y + height, x + width, y + height, 200)
+    for i, (label, value) in enumerate(data):
+        bar_height = value / max_value * height
+        bar_x = start_x + i * (bar_width + spacing)
+        if bar_height > 0:
+            pen.rect(bar_x, y + height - bar_height, bar_width, bar_height, fill=color)
+        pen.text(label, bar_x + bar_width / 2, y + height + 5, 6, 100, align="center")
+
+
+def draw_progress_bar(pen, percent, x, y, width, height, color):
+    pen.rect(x, y, width, height, fill=240)
+    pen.rect(x, y, min(width, percent / 100 * width), height, fill=color)
+
+
+def draw_insight_box(pen, x, y, w, h, label, value, color):
+    pen.rect(x, y, w, h, fill=color, alpha=0.08)
+    pen.rect(x, y, w, h, stroke=color, line_width=0.4)
+    pen.text(label.upper(), x + 3, y + 5, 6.5, 100)
+    pen.text(value, x + 3, y + 11, 9, color, bold=True)
+
+
+def _column_widths(wanted, width):
+    """Fit natural column widths to `width` the way autoTable does.
+
+    Narrow columns keep their natural width and the widest ones are capped at
+    a common width when the table is too wide; spare room is shared out in
+    proportion to the natural widths.
+    """
+    total = sum(wanted)
+    if total <= width:
+        return [w * width / total for w in wanted] if total else wanted
+    cap, remaining = width / len(wanted), width
+    for i, w in enumerate(sorted(wanted)):
+        cap = remaining / (len(wanted) - i)
+        if w > cap:
+            break
+        remaining -= w
+    return [min(w, cap) for w in wanted]
+
+
+class TableLayout:
+    """A "striped" autoTable with single-line rows of a fixed height.
+
+    Column widths come from the widest text of each column (`natural`, in
+    points, without padding) scaled to fill `width` mm. Text that does not
+    fit its column is shortened with "..".
+    """
+
+    def __init__(self, head, natural, width, head_color, font_size=8, padding=CELL_PADDING, right_align=()):
+        self.head = head
+        self.head_color = head_color
+        self.font_size = font_size
+        self.padding = padding
+        self.right_align = set(right_align)
+        self.row_height = font_size * LINE_HEIGHT / mm + 2 * padding
+        wanted = [n / mm + 2 * padding for n in natural]
+        self.widths = _column_widths(wanted, width)
+        self.clipped = [w < n - 1e-6 for w, n in zip(self.widths, wanted)]
+
+    @classmethod
+    def measure(cls, head, rows, font_size=8):
+        """Natural column widths (points) of a head row and body rows."""
+        natural = [stringWidth(h, BOLD, font_size) for h in head]
+        for row in rows:
+            for i, cell in enumerate(row):
+                natural[i] = max(natural[i], stringWidth(cell, FONT, font_size))
+        return natural
+
+    def _row(self, pen, x, y, cells, color, bold):
+        font = BOLD if bold else FONT
+        items = []
+        for i, (cell, width) in enumerate(zip(cells, self.widths)):
+            if cell:
+                if self.clipped[i]:
+                    cell = _fit(cell, (width - 2 * self.padding) * mm, font, self.font_size)
+                if i in self.right_align:
+                    items.append((cell, x + width - self.padding, "right"))
+                else:
+                    items.append((cell, x + self.padding, "left"))
+            x += width
+        pen.text_run(items, y + self.row_height / 2 + self.font_size / mm * 0.35, self.font_size, color, bold)
+
+    def draw_head(self, pen, x, y):
+        pen.rect(x, y, sum(self.widths), self.row_height, fill=self.head_color)
+        self._row(pen, x, y, self.head, "white", True)
+        return y + self.row_height
+
+    def draw_row(self, pen, x, y, cells, index):
+        if index % 2 == 0:
+            pen.rect(x, y, sum(self.widths), self.row_height, fill="stripe")
+        self._row(pen, x, y, cells, "table_text", False)
+        return y + self.row_height
+
+
+def draw_table(pen, y, head, rows, head_color="primary", font_size=8, padding=CELL_PADDING,
+               right_align=(), left=14, right=14, width=None, top=TABLE_MARGIN):
+    """autoTable(doc, {theme: 'striped', ...}); returns the table's final y.
+
+    The head row is repeated on every page the table continues on.
+    """
+    layout = TableLayout(head, TableLayout.measure(head, rows, font_size),
+                         width or PAGE_W - left - right, head_color, font_size, padding, right_align)
+    bottom = PAGE_H - TABLE_MARGIN
+    y = layout.draw_head(pen, left, y)
+    for i, row in enumerate(rows):
+        if y + layout.row_height > bottom:
+            pen.new_page()
+            y = layout.draw_head(pen, left, top)
+        y = layout.draw_row(pen, left, y, row, i)
+    return y
+
+
+class _ChunkedPages:
+    """Pages drawn onto a new canvas every `chunk_pages` pages and streamed to a writer."""
+
+    def __init__(self, writer, chunk_pages, first_page, page_count):
+        self.writer = writer
+        self.chunk_pages = chunk_pages
+        self.page = first_page
+        self.page_count = page_count
+        self._start_chunk()
+
+    def _start_chunk(self):
+        self._buffer = io.BytesIO()
+        self.pen = Pen(canvas.Canvas(self._buffer, pagesize=A4, pageCompression=1))
+        self._pages = 0
+
+    def end_page(self):
+        self.pen.text(FOOTER_TEXT.format(page=self.page, count=self.page_count),
+                      PAGE_W / 2, PAGE_H - 6, 7.5, "footer", align="center")
+        self.pen.new_page()
+        self.page += 1
+        self._pages += 1
+        if self._pages >= self.chunk_pages:
+            self.flush()
+
+    def flush(self):
+        if self._pages:
+            self.pen.canvas.save()
+            self.writer.add_document(PdfDocument.from_bytes(self._buffer.getvalue()))
+            self._start_chunk()
+
+
+# --- The report ---
+
+class TransactionReport:
+    """generatePDF for one request: transactions plus their context."""
+
+    def __init__(self, source, currency, rates=None, buckets=(), groups=(), report_range=None,
+                 context=None, today=None):
+        context = context or {}
+        self.source = source
+        self.currency = currency
+        self.rates = rates or {}
+        self.convert = make_converter(currency, self.rates)
+        self.buckets = list(buckets)
+        self.bucket_map = {b["id"]: b for b in self.buckets}
+        self.groups = list(groups)
+        self.report_range = report_range
+        self.today = today or date.today()
+        self.email = context.get("email")
+        self.avatar = context.get("avatarUrl")
+        self.workspace_name = context.get("workspaceName")
+        self.monthly_budget = context.get("monthlyBudget")
+        self.accounts = context.get("accounts") or []
+        self.account_map = {a["id"]: a for a in self.accounts}
+        self.goals = context.get("goals") or []
+        self.templates = context.get("recurringTemplates") or []
+        self.is_group_scope = bool(context.get("isGroupScope"))
+        self.stats = None
+        self.rows = 0
+
+    @classmethod
+    def from_request(cls, request, source=None, today=None):
+        """Build a report from the JSON request format (see transaction_report.py)."""
+        rng = request.get("range") or {}
+        report_range = None
+        if rng.get("from"):
+            report_range = (parse_date(rng["from"]), parse_date(rng["to"]) if rng.get("to") else None)
+        if source is None:
+            source = ListTransactions(request.get("transactions") or [])
+        return cls(source, request.get("currency", "USD"), request.get("rates"), request.get("buckets") or [],
+                   request.get("groups") or [], report_range, request.get("context") or {}, today)
+
+    def fmt(self, amount, currency=None):
+        if FONT == "Helvetica":
+            return format_for_pdf(amount, currency or self.currency)
+        return format_currency(amount, currency or self.currency)
+
+    # --- pass 1 ---
+
+    def _detail_cells(self, tx, raw_amount):
+        """Every Transaction Details cell of a row, optional columns included."""
+        category = tx.get("category") or ""
+        is_income = tx.get("is_income") is True or raw_amount < 0 or category == "income"
+        amount = self.fmt(abs(raw_amount))
+        markers = []
+        if tx.get("is_settlement"):
+            markers.append("[S]")
+        elif tx.get("is_transfer"):
+            markers.append("[T]")
+        elif tx.get("is_recurring"):
+            markers.append("[R]")
+        if tx.get("receipt_path"):
+            markers.append("[*]")
+        prefix = " ".join(markers) + " " if markers else ""
+        bucket = self.bucket_map.get(tx.get("bucket_id")) if tx.get("bucket_id") else None
+        account = self.account_map.get(tx.get("account_id")) if tx.get("account_id") else None
+        tags = tx.get("tags")
+        tags = ", ".join(tags) if isinstance(tags, list) and tags else ""
+        notes = tx.get("notes") or ""
+        return [
+            short_date(parse_date(tx["date"])),
+            prefix + _truncate(tx.get("description") or "", 22, 20),
+            "Settlement" if tx.get("is_settlement") else "Transfer" if tx.get("is_transfer") else capitalize(category),
+            (bucket or {}).get("name") or "-",
+            (account or {}).get("name") or "-",
+            tx.get("payment_method") or "-",
+            "+" + amount if is_income else amount,
+            _truncate(tags, 18, 16),
+            _truncate(notes, 20, 18),
+        ]
+
+    def scan(self):
+        """Pass 1: statistics, the date-sorted row index and column widths."""
+        rollups = None
+        if hasattr(self.source, "columns"):
+            # A columnar source (docgen.columnstore) has its totals summed over its columns.
+            from .report_columns import column_stats
+
+            rollups = column_stats(self.source.columns(), self.currency, self.rates)
+        builder = StatsBuilder(self.currency, self.convert, self.buckets, self.report_range,
+                               self.monthly_budget, self.today, rollups)
+        order = array("q")
+        widths = [stringWidth(h, BOLD, DETAIL_FONT_SIZE) for h in DETAIL_COLUMNS]
+        measured = [set() for _ in DETAIL_COLUMNS]  # strings already measured, per column
+        characters = set()  # non-ASCII characters of the details, see render()
+        flags = dict(notes=False, tags=False, accounts=False, receipts=False, multi_currency=False)
+        for key, tx in self.source:
+            if not is_valid(tx):
+                continue
+            raw = resolve_amount(tx, self.currency, self.convert)
+            builder.add(tx, raw)
+            # Stable sort by day: the ordinal above the row's key.
+            order.append(parse_date(tx["date"]).toordinal() << 40 | key)
+            for i, cell in enumerate(self._detail_cells(tx, raw)):
+                seen = measured[i]
+                if cell not in seen:
+                    if len(seen) < 4096:
+                        seen.add(cell)
+                    widths[i] = max(widths[i], stringWidth(cell, FONT, DETAIL_FONT_SIZE))
+                    if not cell.isascii():
+                        characters.update(cell)
+            flags["notes"] |= bool(tx.get("notes"))
+            flags["tags"] |= isinstance(tx.get("tags"), list) and bool(tx["tags"])
+            flags["accounts"] |= bool(tx.get("account_id"))
+            flags["receipts"] |= bool(tx.get("receipt_path"))
+            flags["multi_currency"] |= bool(tx.get("currency")) and tx["currency"] != self.currency
+        self.stats = builder.finish()
+        self.rows = len(order)
+        self.order = array("q", sorted(order))
+        del order
+        self.flags = flags
+        self.detail_widths = widths
+        self.characters = characters
+
+    # --- summary pages ---
+
+    def _page_overview(self, pen):
+        s = self.stats
+        pen.rect(0, 0, PAGE_W, 44, fill="primary")
+        pen.text("Expense Audit Report", 14, 18, 22, "white", bold=True)
+        if self.workspace_name:
+            pen.text(self.workspace_name, 14, 26, 10, "header_text", bold=True)
+        pen.text(f"Generated: {ordinal_date(self.today)}", 14, 33, 8, "header_muted")
+        rng = self.report_range
+        if rng and rng[0]:
+            text = (f"Period: {long_date(rng[0])} – {long_date(rng[1])}" if rng[1]
+                    else f"From: {long_date(rng[0])}")
+            pen.text(text, 14, 39, 8, "header_text")
+        pen.text(f"All amounts in {self.currency}", PAGE_W - 14, 33, 7.5, "header_muted", align="right")
+        if self.avatar and os.path.exists(self.avatar):
+            try:
+                pen.image(self.avatar, PAGE_W - 28, 8, 14, 14)
+            except Exception as e:
+                print(f"  ⚠ Could not load avatar {self.avatar}: {e}")
+        if self.email:
+            pen.text(self.email, PAGE_W - 14, 39, 8, "header_muted", align="right")
+
+        pen.text("Financial Overview", 14, 55, 11, "heading", bold=True)
+
+        def box(x, label, value, color):
+            pen.rect(x, 59, 56, 22, stroke=230)
+            pen.text(label, x + 3, 66, 7, 120)
+            pen.text(value, x + 3, 76, 11, color, bold=True)
+
+        box(14, "TOTAL SPENT", self.fmt(s.total_expenses), "primary")
+        box(73, "TOTAL INCOME", self.fmt(s.total_income), "success")
+        box(132, "NET CASH FLOW", self.fmt(s.net_cash_flow), "success" if s.net_cash_flow >= 0 else "danger")
+
+        def small_box(x, label, value):
+            pen.rect(x, 84, 56, 18, stroke=240)
+            pen.text(label, x + 3, 90, 7, 130)
+            pen.text(value, x + 3, 98, 10, 80, bold=True)
+
+        small_box(14, "TRANSACTIONS", f"{s.expense_tx_count} expenses")
+        small_box(73, "AVG PER TRANSACTION", self.fmt(s.avg_per_tx))
+        small_box(132, "AVG DAILY SPEND", self.fmt(s.avg_per_day))
+
+        pen.text("Category Breakdown", 14, 116, 10, "heading", bold=True)
+        pen.text("Payment Methods", 110, 116, 10, "heading", bold=True)
+        pie = sorted(((capitalize(k), v, CATEGORY_COLORS.get(k.lower(), (150, 150, 150)))
+                      for k, v in s.category_totals.items()), key=lambda d: -d[1])
+        draw_pie_chart(pen, pie, 35, 140, 20)
+        methods = sorted(((capitalize(k), v, METHOD_COLORS.get((k or "Other").lower(), METHOD_COLORS["other"]))
+                          for k, v in s.method_totals.items()), key=lambda d: -d[1])
+        draw_pie_chart(pen, methods, 130, 140, 20)
+
+        pen.text("Spending Trend (Last 7 Days)", 14, 176, 10, "heading", bold=True)
+        pen.text("Top 5 Expenses", 110, 176, 10, "heading", bold=True)
+        end = (rng[1] if rng and rng[1] else self.today).toordinal()
+        days = [date.fromordinal(end - i) for i in range(6, -1, -1)]
+        draw_bar_chart(pen, [(d.strftime("%a")[0], s.daily_totals.get(d, 0)) for d in days],
+                       14, 182, 85, 38, "primary")
+        for i, (amount, tx) in enumerate(s.top_expenses):
+            y = 184 + i * 9
+            desc = tx.get("description") or ""
+            desc = f"{desc} (R)" if tx.get("is_recurring") else desc
+            pen.text(_truncate(desc, 26, 24), 110, y, 8, 80)
+            pen.text(self.fmt(amount), PAGE_W - 14, y, 8, "primary", align="right")
+            pen.line(110, y + 2, PAGE_W - 14, y + 2, 245)
+
+        locations = s.top_merchants_by_visits[:5]
+        if locations:
+            pen.text("Top Locations", 14, 232, 10, "heading", bold=True)
+            for i, (name, count, total) in enumerate(locations):
+                y = 239 + i * 8
+                pen.text(_truncate(name, 28, 26), 14, y, 8, 80)
+                avg = total / count if count else 0
+                pen.text(f"{count}x · avg {self.fmt(avg)}/visit", 120, y, 8, 100)
+                pen.text(self.fmt(total), PAGE_W - 14, y, 8, "primary", align="right")
+                pen.line(14, y + 2, PAGE_W - 14, y + 2, 245)
+
+    def _page_insights(self, pen):
+        s = self.stats
+        pen.text("Spending Insights", 14, 18, 13, "heading", bold=True)
+        w, h, gap = 42, 16, 3
+        top = s.top_category
+        draw_insight_box(pen, 14, 22, w, h, "Top Category",
+                         f"{capitalize(top[0])} ({top[1] / s.total_expenses * 100:.0f}%)" if top else "N/A", "primary")
+        busiest = s.busiest_day
+        draw_insight_box(pen, 14 + w + gap, 22, w, h, "Busiest Day",
+                         f"{busiest[0].isoformat()} — {self.fmt(busiest[1])}" if busiest else "N/A", "danger")
+        draw_insight_box(pen, 14 + (w + gap) * 2, 22, w, h, "Recurring Spend",
+                         f"{s.recurring_pct:.0f}% of total", "teal")
+        draw_insight_box(pen, 14 + (w + gap) * 3, 22, w, h,
+                         "Savings Rate" if s.savings_rate is not None else "Period Covered",
+                         f"{s.savings_rate:.1f}%" if s.savings_rate is not None else f"{s.days_covered} days",
+                         "success")
+
+        pen.text("Spending by Day of Week", 14, 50, 10, "heading", bold=True)
+        labels = ["Sun", "Mon", "Tue", "Wed", "Thu", "Fri", "Sat"]
+        draw_bar_chart(pen, list(zip(labels, s.dow_totals)), 14, 56, 85, 30, "primary")
+
+        pen.text("Bucket Performance", 110, 50, 13, "heading", bold=True)
+        y = 57
+        if not s.bucket_totals:
+            pen.text("No buckets in this report.", 110, y, 9, 150)
+        for data in s.bucket_totals.values():
+            if y > 88:
+                break
+            has_budget = data["budget"] > 0
+            pct = data["spent"] / data["budget"] * 100 if has_budget else 0
+            pen.text(_truncate(data["name"], 20, 18), 110, y, 9, "heading", bold=True)
+            if has_budget:
+                pen.text(f"{pct:.1f}% used", PAGE_W - 14, y, 7, 130, align="right")
+            pen.text(f"Spent: {self.fmt(data['spent'])}", 110, y + 5, 7.5, 80)
+            if has_budget:
+                pen.text(f"Budget: {self.fmt(data['budget'])}", PAGE_W - 14, y + 5, 7.5, 120, align="right")
+            color = 200 if not has_budget else "danger" if pct > 100 else "good"
+            draw_progress_bar(pen, pct if has_budget else 100, 110, y + 7, PAGE_W - 124, 3, color)
+            if has_budget and pct > 100:
+                pen.text(f"Over budget by {self.fmt(data['spent'] - data['budget'])}", 110, y + 14, 6.5, "danger")
+            y += 20 if has_budget and pct > 100 else 15
+
+        table_y = 100
+        rows = [[capitalize(cat), self.fmt(amount),
+                 f"{amount / s.total_expenses * 100:.1f}%" if s.total_expenses > 0 else "0.0%"]
+                for cat, amount in sorted(s.category_totals.items(), key=lambda kv: -kv[1])]
+        if rows:
+            pen.text("Category Breakdown", 14, table_y, 10, "heading", bold=True)
+            table_y = draw_table(pen, table_y + 4, ["Category", "Amount", "% of Total"], rows,
+                                 right_align=(1, 2), right=PAGE_W / 2 + 5) + 10
+        if len(s.monthly_totals) > 1:
+            pen.text("Monthly Recap", 14, table_y, 13, "heading", bold=True)
+            rows = [[month_label(*month), self.fmt(amount)] for month, amount in sorted(s.monthly_totals.items())]
+            draw_table(pen, table_y + 4, ["Month", "Total Spent"], rows, width=80)
+
+    def _page_distribution(self, pen):
+        s = self.stats
+        y = 18
+        pen.text("Spending Distribution & Highlights", 14, y, 13, "heading", bold=True)
+        y += 6
+        if s.expense_tx_count > 0:
+            w, h, gap = 42, 16, 3
+            d = s.distribution
+            draw_insight_box(pen, 14, y, w, h, "Smallest", self.fmt(d["min"]), "teal")
+            draw_insight_box(pen, 14 + (w + gap), y, w, h, "Median", self.fmt(d["median"]), "primary")
+            draw_insight_box(pen, 14 + (w + gap) * 2, y, w, h, "75th %ile", self.fmt(d["p75"]), "orange")
+            draw_insight_box(pen, 14 + (w + gap) * 3, y, w, h, "Largest", self.fmt(d["max"]), "danger")
+            y += h + 4
+            draw_insight_box(pen, 14, y, w, h, "Spend Streak", f"{s.longest_spend_streak}d", "success")
+            draw_insight_box(pen, 14 + (w + gap), y, w, h, "No-Spend Streak", f"{s.longest_no_spend_streak}d", "indigo")
+            day = s.biggest_single_day
+            label = f"{day[0].strftime('%b')} {day[0].day} {self.fmt(day[1])}" if day else "—"
+            draw_insight_box(pen, 14 + (w + gap) * 2, y, w, h, "Biggest Day", label, "pink")
+            draw_insight_box(pen, 14 + (w + gap) * 3, y, w, h, "Avg Tx/Day", f"{s.avg_tx_per_day:.2f}", "teal")
+            y += h + 8
+            pen.text(f"Receipts attached: {s.receipted_count} of {s.expense_tx_count} expenses "
+                     f"({s.receipt_coverage_pct:.0f}%)", 14, y, 8, 80)
+            y += 6
+
+        if s.forecast:
+            f = s.forecast
+            pen.text("Period-End Forecast", 14, y, 11, "heading", bold=True)
+            y += 5
+            pen.text(f"Projected total: {self.fmt(f['projected'])} (extrapolated from current daily run-rate)",
+                     14, y, 8, 80)
+            y += 4
+            if f["vs_budget"]:
+                delta = f["vs_budget"]["delta_pct"]
+                over = delta > 0
+                pen.text(f"Budget {self.fmt(f['vs_budget']['budget'])} · projected {'+' if delta >= 0 else ''}"
+                         f"{delta:.1f}% {'over' if over else 'under'}", 14, y, 8, "danger" if over else "success")
+            y += 8
+
+        if len(s.currency_totals) > 1:
+            pen.text("Currency Mix", 14, y, 11, "heading", bold=True)
+            rows = [[code, str(count), f"{native:.2f} {code}", self.fmt(converted)]
+                    for code, (count, native, converted)
+                    in sorted(s.currency_totals.items(), key=lambda kv: -kv[1][2])]
+            y = draw_table(pen, y + 4, ["Currency", "Tx", "Native Total", f"Converted ({self.currency})"], rows,
+                           right_align=(1, 2, 3), right=PAGE_W / 2 + 5) + 8
+
+        if s.income_category_totals:
+            pen.text("Income by Category", 14, y, 11, "heading", bold=True)
+            rows = [[capitalize(cat), self.fmt(amount),
+                     f"{amount / s.total_income * 100:.1f}%" if s.total_income > 0 else "0.0%"]
+                    for cat, amount in sorted(s.income_category_totals.items(), key=lambda kv: -kv[1])]
+            y = draw_table(pen, y + 4, ["Category", "Amount", "% of Income"], rows, head_color="success",
+                           right_align=(1, 2), right=PAGE_W / 2 + 5) + 8
+
+        if s.tag_totals:
+            if y > PAGE_H - 40:
+                pen.new_page()
+                y = 18
+            pen.text("Top Tags", 14, y, 11, "heading", bold=True)
+            rows = [[tag, str(count), self.fmt(total),
+                     f"{total / s.total_expenses * 100:.1f}%" if s.total_expenses > 0 else "0.0%"]
+                    for tag, (count, total) in sorted(s.tag_totals.items(), key=lambda kv: -kv[1][1])[:12]]
+            draw_table(pen, y + 4, ["Tag", "Tx", "Total", "%"], rows, right_align=(1, 2, 3), width=100)
+
+    def _page_accounts(self, pen, show_accounts, show_transfers, show_goals, show_splits):
+        s = self.stats
+        y = 18
+
+        def ensure_room(needed):
+            nonlocal y
+            if y + needed > PAGE_H - 14:
+                pen.new_page()
+                y = 18
+
+        if show_accounts:
+            ensure_room(20)
+            pen.text("Account Breakdown", 14, y, 13, "heading", bold=True)
+            totals = s.account_totals
+            ordered = sorted((a for a in self.accounts if a["id"] in totals),
+                             key=lambda a: -(totals[a["id"]]["income"] - totals[a["id"]]["spent"]))
+            rows = []
+            for a in ordered:
+                t = totals[a["id"]]
+                rows.append([a["name"] + (" *" if a.get("is_primary") else ""),
+                             ACCOUNT_TYPE_LABELS.get(a.get("type"), a.get("type") or ""), a.get("currency") or "",
+                             self.fmt(t["spent"]), self.fmt(t["income"]), self.fmt(t["income"] - t["spent"]),
+                             str(t["tx_count"])])
+            u = s.unassigned
+            if u["tx_count"] > 0:
+                rows.append(["(Unassigned)", "", "", self.fmt(u["spent"]), self.fmt(u["income"]),
+                             self.fmt(u["income"] - u["spent"]), str(u["tx_count"])])
+            y = draw_table(pen, y + 4, ["Account", "Type", "Currency", "Spent", "Income", "Net", "Tx"], rows,
+                           padding=2, right_align=(3, 4, 5, 6)) + 4
+            pen.text("* = primary account", 14, y, 6.5, 150)
+            y += 8
+
+        if show_transfers:
+            ensure_room(20)
+            pen.text("Transfers", 14, y, 13, "heading", bold=True)
+            by_pair, lonely = {}, []
+            for tx in s.transfers:
+                if tx.get("transfer_pair_id"):
+                    by_pair.setdefault(tx["transfer_pair_id"], []).append(tx)
+                else:
+                    lonely.append(tx)
+
+            def account_name(tx):
+                return (self.account_map.get(tx["account_id"]) or {}).get("name") or "?" if tx.get("account_id") else "?"
+
+            def amount(tx):
+                return self.fmt(abs(resolve_amount(tx, self.currency, self.convert)))
+
+            def row(tx, to):
+                return [short_date(parse_date(tx["date"])), _truncate(tx.get("description") or "", 22, 20),
+                        account_name(tx), to, amount(tx)]
+
+            rows = []
+            for legs in sorted(by_pair.values(), key=lambda legs: parse_date(legs[0]["date"])):
+                if len(legs) == 2:
+                    rows.append(row(legs[0], account_name(legs[1])))
+                else:
+                    rows.extend(row(tx, "(paired)") for tx in legs)
+            rows.extend(row(tx, "") for tx in lonely)
+            y = draw_table(pen, y + 4, ["Date", "Description", "From", "To", "Amount"], rows,
+                           head_color="indigo", padding=2, right_align=(4,)) + 8
+
+        if show_goals:
+            ensure_room(20 + min(len(self.goals), 6) * 12)
+            pen.text("Savings Goals", 14, y, 13, "heading", bold=True)
+            y += 6
+
+            def progress(g):
+                return g["current_amount"] / g["target_amount"] if g.get("target_amount", 0) > 0 else 0
+
+            for g in sorted(self.goals, key=lambda g: -progress(g)):
+                ensure_room(16)
+                pct = min(100, progress(g) * 100)
+                pen.text(_truncate(g["name"], 32, 30), 14, y, 9, "heading", bold=True)
+                pen.text(f"{pct:.0f}%", PAGE_W - 14, y, 7, 130, align="right")
+                pen.text(f"{self.fmt(g['current_amount'], g.get('currency'))} of "
+                         f"{self.fmt(g['target_amount'], g.get('currency'))}", 14, y + 5, 7.5, 80)
+                if g.get("deadline"):
+                    due = parse_date(g["deadline"])
+                    days_left = (due - self.today).days
+                    tag = f"overdue · {abs(days_left)}d ago" if days_left < 0 else f"{days_left}d left"
+                    pen.text(f"Due {long_date(due)} · {tag}", PAGE_W - 14, y + 5, 7.5, 120, align="right")
+                draw_progress_bar(pen, pct, 14, y + 7, PAGE_W - 28, 3, "success" if pct >= 100 else "primary")
+                y += 14
+            y += 4
+
+        if show_splits:
+            ensure_room(30)
+            pen.text("Splits & Settlements", 14, y, 13, "heading", bold=True)
+            rows = [[m["name"], self.fmt(m["paid_for"]), self.fmt(m["owed"]), self.fmt(m["owes"]),
+                     self.fmt(m["outstanding_owed"]), self.fmt(m["outstanding_owes"]), self.fmt(m["owed"] - m["owes"])]
+                    for m in sorted(s.split_totals.values(), key=lambda m: -m["paid_for"])]
+            y = draw_table(pen, y + 4, ["Member", "Paid", "Owed To Them", "They Owe", "Outstanding Owed",
+                                        "Outstanding Owes", "Net"], rows,
+                           head_color="pink", font_size=7.5, padding=2, right_align=(1, 2, 3, 4, 5, 6)) + 4
+            pen.text("Paid = sum of bills this member fronted · Owed To Them = others' shares · "
+                     "They Owe = their shares of others' bills · Outstanding = unsettled portion", 14, y, 6.5, 150)
+
+    def _page_templates(self, pen):
+        pen.text("Recurring Templates", 14, 18, 13, "heading", bold=True)
+        rows = []
+        for t in sorted(self.templates, key=lambda t: t["next_occurrence"]):
+            meta = t.get("metadata") or {}
+            trial = meta["trial_ends_at"][:10] if isinstance(meta.get("trial_ends_at"), str) else ""
+            pause = meta["pause_until"][:10] if isinstance(meta.get("pause_until"), str) else ""
+            flag = f"Trial → {trial}" if trial else f"Paused → {pause}" if pause else ""
+            rows.append([_truncate(t["description"], 24, 22), capitalize(t["category"]),
+                         "Income" if t.get("is_income") else "Expense", capitalize(t["frequency"]),
+                         t["next_occurrence"], self.fmt(float(t["amount"]), t.get("currency")),
+                         "Active" if t.get("is_active") else "Paused", flag])
+        draw_table(pen, 24, ["Description", "Category", "Type", "Frequency", "Next Due", "Amount", "Status", "Notes"],
+                   rows, padding=2, right_align=(5,), top=20)
+
+    def render_summary(self):
+        """Draw every page before Transaction Details; return the PDF bytes."""
+        s = self.stats
+        buffer = io.BytesIO()
+        pen = Pen(canvas.Canvas(buffer, pagesize=A4, pageCompression=1))
+        self._page_overview(pen)
+        pen.new_page()
+        self._page_insights(pen)
+
+        if (s.expense_tx_count > 0 or s.tag_totals or len(s.currency_totals) > 1
+                or s.income_category_totals or s.forecast is not None):
+            pen.new_page()
+            self._page_distribution(pen)
+
+        show_accounts = bool(self.accounts) and (bool(s.account_totals) or s.unassigned["tx_count"] > 0)
+        show_transfers = bool(s.transfers)
+        show_goals = bool(self.goals)
+        show_splits = self.is_group_scope and bool(s.split_totals)
+        if show_accounts or show_transfers or show_goals or show_splits:
+            pen.new_page()
+            self._page_accounts(pen, show_accounts, show_transfers, show_goals, show_splits)
+
+        if self.templates:
+            pen.new_page()
+            self._page_templates(pen)
+        pen.canvas.save()
+        return buffer.getvalue()
+
+    # --- Transaction Details ---
+
+    def detail_layout(self):
+        """Return (column indices, TableLayout) for the Transaction Details table."""
+        columns = [0, 1, 2, 3]
+        if self.accounts and self.flags["accounts"]:
+            columns.append(4)
+        columns += [5, 6]
+        if self.flags["tags"]:
+            columns.append(7)
+        if self.flags["notes"]:
+            columns.append(8)
+        layout = TableLayout([DETAIL_COLUMNS[i] for i in columns], [self.detail_widths[i] for i in columns],
+                             PAGE_W - 28, "primary", DETAIL_FONT_SIZE, DETAIL_PADDING,
+                             right_align=(columns.index(6),))
+        return columns, layout
+
+    def footnotes(self):
+        legend = ["[R] = Recurring", "[S] = Settlement"]
+        if self.stats.transfer_count:
+            legend.append("[T] = Transfer")
+        if self.flags["receipts"]:
+            legend.append("[*] = Receipt attached")
+        notes = [" · ".join(legend), "Income rows are shown with a + prefix"]
+        if self.flags["multi_currency"]:
+            notes.append(f"Amounts converted to {self.currency} using rates at time of import")
+        return notes
+
+    def detail_pages(self, layout):
+        """Pages the details table and its footnotes take; rows are fixed height."""
+        bottom = PAGE_H - TABLE_MARGIN
+        first = int((bottom - 24 - layout.row_height) // layout.row_height)
+        per_page = int((bottom - 20 - layout.row_height) // layout.row_height)
+        pages, rows = 1, max(0, self.rows - first)
+        last_rows = min(self.rows, first)
+        if rows:
+            pages += math.ceil(rows / per_page)
+            last_rows = rows - (pages - 2) * per_page
+        top = 24 if pages == 1 else 20
+        final_y = top + layout.row_height * (last_rows + 1)
+        overflow = final_y + 5 + 5 * (len(self.footnotes()) - 1) > PAGE_H - 10
+        return first, per_page, pages + overflow
+
+    def render_details(self, out):
+        columns, layout = self.detail_layout()
+        first, per_page, _ = self.detail_pages(layout)
+        pen = out.pen
+        pen.text("Transaction Details", 14, 18, 13, "heading", bold=True)
+        y = layout.draw_head(pen, 14, 24)
+        room = first
+        for i, packed in enumerate(self.order):
+            if room == 0:
+                out.end_page()
+                pen = out.pen
+                y = layout.draw_head(pen, 14, 20)
+                room = per_page
+            tx = self.source.get(packed & 0xFFFFFFFFFF)
+            cells = self._detail_cells(tx, resolve_amount(tx, self.currency, self.convert))
+            y = layout.draw_row(pen, 14, y, [cells[c] for c in columns], i)
+            room -= 1
+
+        notes = self.footnotes()
+        y += 5
+        if y + 5 * (len(notes) - 1) > PAGE_H - 10:
+            out.end_page()
+            pen = out.pen
+            y = 20
+        for i, note in enumerate(notes):
+            pen.text(note, 14, y + i * 5, 7, 150)
+        out.end_page()
+
+    def render(self, output_path, chunk_pages=CHUNK_PAGES):
+        """Write the report to `output_path`; return its page count."""
+        if self.stats is None:
+            self.scan()
+        # Every chunk embeds the same font subsets, which the writer shares.
+        fonts.seed([*self.characters, *self.footnotes()])
+        try:
+            return self._render(output_path, chunk_pages)
+        finally:
+            fonts.seed(())
+
+    def _render(self, output_path, chunk_pages):
+        summary = PdfDocument.from_bytes(self.render_summary())
+        summary_refs = summary.page_refs()
+        _, layout = self.detail_layout()
+        page_count = len(summary_refs) + self.detail_pages(layout)[2]
+
+        font = summary.add(dict(HELVETICA))
+        footer_color = theme.color("footer")
+        for page_num, ref in enumerate(summary_refs, start=1):
+            text = FOOTER_TEXT.format(page=page_num, count=page_count)
+            x = PAGE_W / 2 * mm - stringWidth(text, "Helvetica", 7.5) / 2
+            append_page_content(summary, ref, text_stream(text, x, 6 * mm, 7.5, footer_color),
+                                fonts={"FDocgenFooter": font})
+
+        with PdfStreamWriter(output_path) as writer:
+            writer.add_document(summary)
+            del summary
+            out = _ChunkedPages(writer, chunk_pages, len(summary_refs) + 1, page_count)
+            self.render_details(out)
+            out.flush()
+            pages = writer.close(DOC_INFO)
+        self.source.close()
+        return pages
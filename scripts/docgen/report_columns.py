@@ -0,0 +1,398 @@
+"""
+Columnar transaction statistics.
+
+The roll-ups of ``computeStats`` (see docgen.report_stats) over transactions
+held as NumPy columns instead of dicts, for summarizing year-long,
+multi-group exports in milliseconds: totals per category, payment method,
+source currency, month, week, weekday and day, and each member's share of
+split expenses.
+
+Text columns (currency, category, payment method, user) are dictionary
+encoded: an integer code per row indexing a vocabulary list, with -1 for a
+missing value. Vocabularies are in order of first appearance, so the dicts
+built from them come out in the same key order as ``StatsBuilder``'s. Group-by
+is ``np.bincount`` over the codes, and over day ordinals offset by the first
+day; key order comes from each group's first row (``np.minimum.at``), so
+nothing is sorted per row. Splits are a second, flat set of columns with the
+row index of their transaction.
+
+Only ``ColumnEncoder`` (behind ``TransactionColumns.from_transactions``)
+touches the rows one by one;
+``resolve_amounts`` and ``column_stats`` are vectorized throughout.
+"""
+
+import math
+from array import array
+from dataclasses import dataclass, field
+from datetime import date
+
+import numpy as np
+
+from .report_stats import is_valid, parse_date, unwrap_profile
+
+UNIX_EPOCH = date(1970, 1, 1).toordinal()
+
+
+class _Vocabulary:
+    """Dictionary encoding of one text column: code per distinct value, first seen first."""
+
+    def __init__(self, values=()):
+        self.values = list(values)
+        self.codes = {value: code for code, value in enumerate(self.values)}
+
+    def code(self, value):
+        if value is None:
+            return -1
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+def _number(value):
+    return float(value) if value is not None else math.nan
+
+
+# name -> (array typecode, NumPy dtype) of the columns ColumnEncoder fills.
+ROW_COLUMNS = {
+    "amount": ("d", "f8"),
+    "converted_amount": ("d", "f8"),
+    "exchange_rate": ("d", "f8"),
+    "currency": ("h", "i2"),
+    "base_currency": ("h", "i2"),
+    "category": ("i", "i4"),
+    "payment_method": ("i", "i4"),
+    "day": ("i", "i4"),
+    "user": ("i", "i4"),
+    "is_income": ("B", "?"),
+    "is_transfer": ("B", "?"),
+    "is_recurring": ("B", "?"),
+    "has_splits": ("B", "?"),
+}
+SPLIT_COLUMNS = {
+    "split_row": ("q", "i8"),
+    "split_user": ("i", "i4"),
+    "split_amount": ("d", "f8"),
+    "split_unpaid": ("B", "?"),
+}
+VOCABULARIES = ("currencies", "categories", "methods", "users")
+
+
+@dataclass
+class TransactionColumns:
+    """Transactions as parallel NumPy arrays, one element per (valid) row."""
+
+    amount: np.ndarray             # float64, as stored
+    converted_amount: np.ndarray   # float64, NaN when missing
+    exchange_rate: np.ndarray      # float64, NaN when missing
+    currency: np.ndarray           # int16 code into currencies, -1 = report currency
+    base_currency: np.ndarray      # int16 code into currencies, -1 = none
+    category: np.ndarray           # int32 code into categories ("" when missing)
+    payment_method: np.ndarray     # int32 code into methods, -1 = "Other"
+    day: np.ndarray                # int32 proleptic Gregorian ordinal
+    user: np.ndarray               # int32 code into users (the payer), -1 = none
+    is_income: np.ndarray          # bool, the is_income flag itself
+    is_transfer: np.ndarray        # bool
+    is_recurring: np.ndarray       # bool
+    has_splits: np.ndarray         # bool, a non-empty splits list
+    split_row: np.ndarray          # int64 row of each split
+    split_user: np.ndarray         # int32 code into users
+    split_amount: np.ndarray       # float64, the share as stored
+    split_unpaid: np.ndarray       # bool, is_paid is false
+    currencies: list               # upper-cased codes
+    categories: list
+    methods: list
+    users: list                    # user ids
+    user_names: dict = field(default_factory=dict)   # user id -> full name
+
+    def __len__(self):
+        return len(self.amount)
+
+    @classmethod
+    def from_transactions(cls, transactions):
+        """Encode an iterable of transaction dicts; invalid rows are skipped."""
+        encoder = ColumnEncoder()
+        for tx in transactions:
+            encoder.add(tx)
+        return encoder.columns()
+
+
+class ColumnEncoder:
+    """Appends transactions to typed column buffers (``array.array``).
+
+    ``columns()`` wraps the buffers as TransactionColumns without copying;
+    ``drain()`` hands them over and starts empty ones, for writers that spill
+    large inputs to disk in chunks (see docgen.columnstore).
+    """
+
+    row_columns = ROW_COLUMNS
+    split_columns = SPLIT_COLUMNS
+
+    def __init__(self):
+        self.vocabularies = {name: _Vocabulary() for name in VOCABULARIES}
+        self.user_names = {}
+        self.rows = 0
+        self.splits = 0
+        self.buffers = self._empty()
+
+    def _empty(self):
+        return {name: array(typecode) for name, (typecode, _) in {**self.row_columns, **self.split_columns}.items()}
+
+    def drain(self):
+        buffers, self.buffers = self.buffers, self._empty()
+        return buffers
+
+    def _name(self, user_id, profile):
+        name = (unwrap_profile(profile) or {}).get("full_name")
+        if name and user_id not in self.user_names:
+            self.user_names[user_id] = name
+
+    def add(self, tx):
+        """Encode one transaction; returns False (and adds nothing) if it is invalid."""
+        if not is_valid(tx):
+            return False
+        b, v = self.buffers, self.vocabularies
+        b["amount"].append(float(tx["amount"]))
+        b["converted_amount"].append(_number(tx.get("converted_amount")))
+        b["exchange_rate"].append(_number(tx.get("exchange_rate")))
+        b["currency"].append(v["currencies"].code(tx["currency"].upper() if tx.get("currency") else None))
+        b["base_currency"].append(
+            v["currencies"].code(tx["base_currency"].upper() if tx.get("base_currency") else None))
+        b["category"].append(v["categories"].code(tx.get("category") or ""))
+        b["payment_method"].append(v["methods"].code(tx.get("payment_method") or None))
+        b["day"].append(parse_date(tx["date"]).toordinal())
+        user_id = tx.get("user_id")
+        b["user"].append(v["users"].code(user_id or None))
+        if user_id:
+            self._name(user_id, tx.get("profile"))
+        b["is_income"].append(tx.get("is_income") is True)
+        b["is_transfer"].append(bool(tx.get("is_transfer")))
+        b["is_recurring"].append(bool(tx.get("is_recurring")))
+        splits = tx.get("splits")
+        has_splits = isinstance(splits, list) and bool(splits)
+        b["has_splits"].append(has_splits)
+        if has_splits:
+            for split in splits:
+                if not split or not split.get("user_id"):
+                    continue
+                b["split_row"].append(self.rows)
+                b["split_user"].append(v["users"].code(split["user_id"]))
+                b["split_amount"].append(float(split.get("amount") or 0))
+                b["split_unpaid"].append(split.get("is_paid") is False)
+                self._name(split["user_id"], split.get("profile"))
+                self.splits += 1
+        self.rows += 1
+        return True
+
+    def columns(self):
+        """TransactionColumns over everything added since the last drain().
+
+        The arrays share the buffers, so add nothing more while they are in use.
+        """
+        dtypes = {**ROW_COLUMNS, **SPLIT_COLUMNS}
+        arrays = {name: np.frombuffer(self.buffers[name], dtype=dtypes[name][1]) for name in dtypes}
+        return TransactionColumns(**arrays, **{name: v.values for name, v in self.vocabularies.items()},
+                                  user_names=self.user_names)
+
+
+# --- Amounts ---
+
+def conversion_divisors(currencies, currency, rates):
+    """Per currency code, what make_converter's convert() divides by (1 = unconverted)."""
+    target = currency.upper()
+    divisors = np.ones(len(currencies) + 1)  # the last slot is code -1
+    if rates:
+        for code, name in enumerate(currencies):
+            if name != target:
+                divisors[code] = rates.get(name) or 1
+    return divisors
+
+
+def resolve_amounts(cols, currency, rates):
+    """resolve_amount for every row: amounts in the report currency (signed)."""
+    divisors = conversion_divisors(cols.currencies, currency, rates)
+    target = cols.currencies.index(currency.upper()) if currency.upper() in cols.currencies else -2
+    same = (cols.currency == target) | (cols.currency == -1)
+    base = cols.base_currency
+    has_base = base != -1
+    base_is_target = base == target
+    converted = cols.converted_amount
+    use_converted = ~same & base_is_target & ~np.isnan(converted) & (converted != 0)
+    rate = cols.exchange_rate
+    use_rate = ~same & ~use_converted & has_base & ~np.isnan(rate) & (rate != 0)
+
+    # Fall-through: convert(amount, tx currency).
+    result = cols.amount / divisors[cols.currency]
+    in_base = cols.amount * np.where(use_rate, rate, 0)
+    result = np.where(use_rate, np.where(base_is_target, in_base, in_base / divisors[base]), result)
+    result = np.where(use_converted, converted, result)
+    return np.where(same, cols.amount, result)
+
+
+# --- Statistics ---
+
+@dataclass
+class ColumnStats:
+    """The ReportStats roll-ups column_stats computes, same keys and order."""
+    total_expenses: float = 0.0
+    total_income: float = 0.0
+    recurring_total: float = 0.0
+    expense_tx_count: int = 0
+    income_tx_count: int = 0
+    transfer_total: float = 0.0
+    transfer_count: int = 0
+    category_totals: dict = field(default_factory=dict)
+    income_category_totals: dict = field(default_factory=dict)
+    method_totals: dict = field(default_factory=dict)
+    currency_totals: dict = field(default_factory=dict)  # code -> [count, native, converted]
+    monthly_totals: dict = field(default_factory=dict)   # (year, month) -> total
+    weekly_totals: list = field(default_factory=list)    # [(week start, total)]
+    dow_totals: list = field(default_factory=lambda: [0.0] * 7)  # Sunday first
+    daily_totals: dict = field(default_factory=dict)     # date -> total
+    split_totals: dict = field(default_factory=dict)
+    personal_share: float = None   # see column_stats
+
+
+def _first_seen(codes, size):
+    """The distinct codes (0 <= code < size) of `codes`, in order of first appearance."""
+    first = np.full(size, len(codes))
+    np.minimum.at(first, codes, np.arange(len(codes)))
+    present = np.flatnonzero(first < len(codes))
+    return present[np.argsort(first[present], kind="stable")]
+
+
+def _totals(codes, weights, labels, size):
+    sums = np.bincount(codes, weights=weights, minlength=size)
+    return {labels[c]: float(sums[c]) for c in _first_seen(codes, size)}
+
+
+def column_stats(cols, currency, rates=None, user_id=None):
+    """computeStats' roll-ups over TransactionColumns.
+
+    `rates` is the make_converter rate table. With `user_id`, personal_share
+    is that user's own part of the expenses: what they paid alone, plus what
+    they paid for a split expense less the other members' shares, plus their
+    shares of expenses others paid for.
+    """
+    s = ColumnStats()
+    if not len(cols):
+        return s
+    raw = resolve_amounts(cols, currency, rates)
+    amount = np.abs(raw)
+    category_income = np.zeros(len(cols.categories) + 1, dtype=bool)
+    if "income" in cols.categories:
+        category_income[cols.categories.index("income")] = True
+    transfer = cols.is_transfer
+    is_income = (cols.is_income | (raw < 0) | category_income[cols.category]) & ~transfer
+    expense = ~transfer & ~is_income
+
+    s.transfer_count = int(transfer.sum())
+    s.transfer_total = float(amount[transfer].sum())
+
+    # Currency split, before conversion; rows without one are in the report currency.
+    counted = ~transfer
+    report_code = len(cols.currencies)
+    labels = [*cols.currencies, currency.upper()]
+    codes = np.where(cols.currency == -1, report_code, cols.currency)[counted]
+    if currency.upper() in cols.currencies:
+        codes[codes == report_code] = cols.currencies.index(currency.upper())
+    size = len(labels)
+    counts = np.bincount(codes, minlength=size)
+    native = np.bincount(codes, weights=np.abs(cols.amount[counted]), minlength=size)
+    converted = np.bincount(codes, weights=amount[counted], minlength=size)
+    s.currency_totals = {labels[c]: [int(counts[c]), float(native[c]), float(converted[c])]
+                         for c in _first_seen(codes, size)}
+
+    s.income_tx_count = int(is_income.sum())
+    s.total_income = float(amount[is_income].sum())
+    s.income_category_totals = _totals(cols.category[is_income], amount[is_income],
+                                       cols.categories, len(cols.categories))
+
+    spent = amount[expense]
+    s.expense_tx_count = int(expense.sum())
+    s.total_expenses = float(spent.sum())
+    s.recurring_total = float(amount[expense & cols.is_recurring].sum())
+    s.category_totals = _totals(cols.category[expense], spent, cols.categories, len(cols.categories))
+    other = len(cols.methods)
+    methods = cols.payment_method[expense]
+    s.method_totals = _totals(np.where(methods == -1, other, methods), spent, [*cols.methods, "Other"], other + 1)
+
+    days = cols.day[expense]
+    if len(days):
+        first_day = int(days.min())
+        offsets = days - first_day
+        span = int(offsets.max()) + 1
+        per_day = np.bincount(offsets, weights=spent, minlength=span)
+        present = np.flatnonzero(np.bincount(offsets, minlength=span))
+        ordinals = present + first_day
+        s.daily_totals = {date.fromordinal(first_day + int(i)): float(per_day[i])
+                          for i in _first_seen(offsets, span)}
+        totals = per_day[present]
+        # Ordinal 1 is a Monday, so ordinal % 7 counts from Sunday.
+        s.dow_totals = [float(t) for t in np.bincount(ordinals % 7, weights=totals, minlength=7)]
+        weeks = ordinals - (ordinals + 6) % 7
+        week_index = (weeks - weeks[0]) // 7
+        week_totals = np.bincount(week_index, weights=totals)
+        s.weekly_totals = [(date.fromordinal(int(weeks[0]) + 7 * int(w)), float(week_totals[w]))
+                           for w in np.flatnonzero(np.bincount(week_index))]
+        months = (ordinals - UNIX_EPOCH).astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+        month_of_day = np.zeros(span, dtype=np.int64)
+        month_of_day[present] = months - months[0]
+        month_totals = np.bincount(months - months[0], weights=totals)
+        s.monthly_totals = {(1970 + (int(months[0]) + int(m)) // 12, (int(months[0]) + int(m)) % 12 + 1):
+                            float(month_totals[m])
+                            for m in _first_seen(month_of_day[offsets], len(month_totals))}
+
+    _split_totals(s, cols, currency, rates, amount, expense, user_id)
+    return s
+
+
+def _split_totals(s, cols, currency, rates, amount, expense, user_id):
+    users = len(cols.users)
+    paying = expense & cols.has_splits & (cols.user != -1)
+    rows = cols.split_row
+    keep = paying[rows]
+    rows, members, shares = rows[keep], cols.split_user[keep], np.abs(cols.split_amount[keep])
+    unpaid = cols.split_unpaid[keep]
+
+    # convert_share in StatsBuilder.add: report-currency rows as stored, others
+    # pro rata to the resolved amount, or converted when that is zero.
+    divisors = conversion_divisors(cols.currencies, currency, rates)
+    target = cols.currencies.index(currency.upper()) if currency.upper() in cols.currencies else -2
+    tx_currency = cols.currency[rows]
+    native = np.abs(cols.amount[rows])
+    resolved = amount[rows]
+    pro_rata = (resolved > 0) & (native > 0)
+    shares = np.where((tx_currency == target) | (tx_currency == -1), shares,
+                      np.where(pro_rata, shares / np.where(pro_rata, native, 1) * resolved,
+                               shares / divisors[tx_currency]))
+
+    payers = cols.user[rows]
+    other = members != payers
+    paid_for = np.bincount(cols.user[paying], weights=amount[paying], minlength=users)
+    owes = np.bincount(members[other], weights=shares[other], minlength=users)
+    owed = np.bincount(payers[other], weights=shares[other], minlength=users)
+    open_ = other & unpaid
+    outstanding_owes = np.bincount(members[open_], weights=shares[open_], minlength=users)
+    outstanding_owed = np.bincount(payers[open_], weights=shares[open_], minlength=users)
+
+    # Entries appear as StatsBuilder creates them: payer first, then each member, row by row.
+    events = np.concatenate([np.flatnonzero(paying) * 2, rows[other] * 2 + 1])
+    involved = np.concatenate([cols.user[paying], members[other]])
+    order = np.argsort(events, kind="stable")
+    for code in _first_seen(involved[order], users):
+        uid = cols.users[code]
+        s.split_totals[uid] = {
+            "name": cols.user_names.get(uid, "Unknown"),
+            "paid_for": float(paid_for[code]), "owes": float(owes[code]), "owed": float(owed[code]),
+            "outstanding_owes": float(outstanding_owes[code]), "outstanding_owed": float(outstanding_owed[code]),
+        }
+
+    if user_id is not None:
+        if user_id not in cols.users:
+            s.personal_share = 0.0
+            return
+        code = cols.users.index(user_id)
+        own = expense & (cols.user == code)
+        s.personal_share = float(amount[own].sum() - owed[code] + owes[code])
@@ -0,0 +1,492 @@
+"""
+Transaction report statistics.
+
+A port of ``computeStats`` / ``resolveAmount`` and the currency formatting used
+by ``generatePDF`` in ``utils/export-utils.ts``. Transactions are fed one at a
+time to ``StatsBuilder.add`` so a report can be computed in a single streaming
+pass; only per-day/per-category roll-ups and the expense amounts (for the
+distribution quantiles) are kept in memory. docgen.report_columns computes
+the same roll-ups over NumPy columns, for summaries of many rows at once; a
+StatsBuilder given those (``rollups``) only keeps what they do not cover.
+"""
+
+import heapq
+import math
+from array import array
+from dataclasses import dataclass, field
+from datetime import date
+
+CURRENCY_SYMBOLS = {
+    "USD": "$", "EUR": "€", "INR": "₹", "GBP": "£", "CHF": "Fr", "SGD": "S$", "VND": "₫",
+    "TWD": "NT$", "JPY": "¥", "KRW": "₩", "HKD": "HK$", "MYR": "RM",
+    "PHP": "₱", "THB": "฿", "CAD": "C$", "AUD": "A$", "MXN": "Mex$", "BRL": "R$", "IDR": "Rp", "AED": "AED",
+    "CNY": "CN¥", "RUB": "₽", "ZAR": "R", "TRY": "₺", "NZD": "NZ$", "SEK": "kr",
+}
+
+# (group separator, decimal separator) of the Intl locale formatCurrency uses
+# for each currency; anything not listed formats like en-US.
+NUMBER_FORMATS = {
+    "CHF": ("’", "."),
+    "VND": (".", ","),
+    "BRL": (".", ","),
+    "IDR": (".", ","),
+    "TRY": (".", ","),
+    "RUB": (" ", ","),
+    "ZAR": (" ", ","),
+    "SEK": (" ", ","),
+}
+
+ZERO_DECIMAL_CURRENCIES = {"VND", "IDR", "JPY", "KRW", "INR", "TWD", "THB", "PHP"}
+
+# formatForPDF: symbols the standard PDF fonts cannot draw, in replacement order.
+PDF_SYMBOL_REPLACEMENTS = [
+    ("₹", "Rs. "), ("₫", " VND "), ("₩", " KRW "),
+    ("¥", " JPY "), ("฿", " THB "), ("₱", " PHP "),
+    ("NT$", " TWD "), ("S$", " SGD "), ("HK$", " HKD "),
+    ("Mex$", " MXN "), ("C$", " CAD "), ("A$", " AUD "),
+    ("RM", " MYR "), ("R$", " BRL "), ("Rp", " IDR "),
+]
+
+MONTHS = ["January", "February", "March", "April", "May", "June",
+          "July", "August", "September", "October", "November", "December"]
+
+
+# --- Formatting ---
+
+def _group(digits, sep, indian):
+    if not indian or len(digits) <= 3:
+        return f"{int(digits):,}".replace(",", sep)
+    head, tail = digits[:-3], digits[-3:]
+    pairs = []
+    while head:
+        pairs.insert(0, head[-2:])
+        head = head[:-2]
+    return sep.join([*pairs, tail])
+
+
+def format_currency(amount, currency):
+    """formatCurrency from the preferences provider: "-€1,234.56"."""
+    group, decimal = NUMBER_FORMATS.get(currency, (",", "."))
+    places = 0 if currency in ZERO_DECIMAL_CURRENCIES else 2
+    text = f"{abs(amount):.{places}f}"
+    whole, _, frac = text.partition(".")
+    number = _group(whole, group, currency == "INR") + (decimal + frac if frac else "")
+    return f"{'-' if amount < 0 else ''}{CURRENCY_SYMBOLS.get(currency, '$')}{number}"
+
+
+def format_for_pdf(amount, currency):
+    """formatForPDF: formatCurrency with symbols spelled out for the base fonts."""
+    text = format_currency(amount, currency)
+    for symbol, replacement in PDF_SYMBOL_REPLACEMENTS:
+        text = text.replace(symbol, replacement, 1)
+    return text
+
+
+def parse_date(text):
+    """The yyyy-MM-dd day of an ISO date or timestamp string."""
+    return date.fromisoformat(text[:10])
+
+
+def short_date(d):
+    """date-fns 'MMM d, yy'."""
+    return f"{MONTHS[d.month - 1][:3]} {d.day}, {d.year % 100:02d}"
+
+
+def long_date(d):
+    """date-fns 'MMM d, yyyy'."""
+    return f"{MONTHS[d.month - 1][:3]} {d.day}, {d.year}"
+
+
+def month_label(year, month):
+    """date-fns 'MMM yyyy'."""
+    return f"{MONTHS[month - 1][:3]} {year}"
+
+
+def ordinal_date(d):
+    """date-fns 'PPP': "October 17th, 2026"."""
+    suffix = "th" if 11 <= d.day % 100 <= 13 else {1: "st", 2: "nd", 3: "rd"}.get(d.day % 10, "th")
+    return f"{MONTHS[d.month - 1]} {d.day}{suffix}, {d.year}"
+
+
+def capitalize(text):
+    return text[:1].upper() + text[1:]
+
+
+# --- Amounts ---
+
+def make_converter(currency, rates):
+    """convertAmount from the preferences provider for a fixed rate table.
+
+    `rates` maps currency codes to units per report-currency unit; with no
+    rates, amounts are returned unconverted.
+    """
+    target = currency.upper()
+
+    def convert(amount, from_currency):
+        if not from_currency:
+            return amount
+        source = from_currency.upper()
+        if source == target or not rates:
+            return amount
+        return amount / (rates.get(source) or 1)
+
+    return convert
+
+
+def resolve_amount(tx, currency, convert):
+    """A transaction's amount in the report currency (see resolveAmount)."""
+    tx_curr = (tx.get("currency") or currency).upper()
+    display_curr = currency.upper()
+    if tx_curr == display_curr:
+        return float(tx["amount"])
+    base = tx.get("base_currency")
+    if tx.get("converted_amount") and base and base.upper() == display_curr:
+        return float(tx["converted_amount"])
+    if tx.get("exchange_rate") and base:
+        in_base = float(tx["amount"]) * tx["exchange_rate"]
+        if base.upper() == display_curr:
+            return in_base
+        return convert(in_base, base.upper())
+    return convert(float(tx["amount"]), tx_curr)
+
+
+def is_valid(tx):
+    """generatePDF drops rows that would produce NaN in the report."""
+    if not tx.get("date") or tx.get("amount") is None:
+        return False
+    try:
+        return not math.isnan(float(tx["amount"]))
+    except (TypeError, ValueError):
+        return False
+
+
+def unwrap_profile(profile):
+    if not profile:
+        return None
+    return (profile[0] if profile else None) if isinstance(profile, list) else profile
+
+
+def _quantile(values, p):
+    if not values:
+        return 0
+    return values[max(0, min(len(values) - 1, math.floor(len(values) * p)))]
+
+
+# --- Statistics ---
+
+# The ReportStats fields docgen.report_columns.ColumnStats also computes.
+ROLLUPS = ("total_expenses", "total_income", "recurring_total", "income_tx_count", "transfer_total",
+           "category_totals", "income_category_totals", "method_totals", "currency_totals", "monthly_totals",
+           "weekly_totals", "dow_totals", "daily_totals", "split_totals")
+
+
+@dataclass
+class ReportStats:
+    total_expenses: float = 0.0
+    total_income: float = 0.0
+    recurring_total: float = 0.0
+    expense_tx_count: int = 0
+    income_tx_count: int = 0
+    days_covered: int = 1
+    avg_per_tx: float = 0.0
+    avg_per_day: float = 0.0
+    avg_tx_per_day: float = 0.0
+    savings_rate: float = None
+    recurring_pct: float = 0.0
+    net_cash_flow: float = 0.0
+    category_totals: dict = field(default_factory=dict)
+    income_category_totals: dict = field(default_factory=dict)
+    method_totals: dict = field(default_factory=dict)
+    monthly_totals: dict = field(default_factory=dict)   # (year, month) -> total
+    weekly_totals: list = field(default_factory=list)    # [(week start, total)]
+    dow_totals: list = field(default_factory=lambda: [0.0] * 7)  # Sunday first
+    daily_totals: dict = field(default_factory=dict)     # date -> total
+    location_totals: dict = field(default_factory=dict)  # name -> [count, total]
+    bucket_totals: dict = field(default_factory=dict)    # id -> {name, spent, budget}
+    tag_totals: dict = field(default_factory=dict)       # tag -> [count, total]
+    currency_totals: dict = field(default_factory=dict)  # code -> [count, native, converted]
+    distribution: dict = field(default_factory=dict)
+    biggest_single_day: tuple = None
+    biggest_single_tx: dict = None
+    longest_spend_streak: int = 0
+    longest_no_spend_streak: int = 0
+    first_tx_date: date = None
+    last_tx_date: date = None
+    forecast: dict = None
+    top_merchants_by_visits: list = field(default_factory=list)
+    top_category: tuple = None
+    busiest_day: tuple = None
+    account_totals: dict = field(default_factory=dict)   # id -> {spent, income, tx_count}
+    transfer_total: float = 0.0
+    transfers: list = field(default_factory=list)
+    split_totals: dict = field(default_factory=dict)
+    receipted_count: int = 0
+    receipt_coverage_pct: float = 0.0
+    # generatePDF extras that need a pass over every transaction
+    top_expenses: list = field(default_factory=list)     # [(converted, tx)]
+    unassigned: dict = field(default_factory=lambda: {"spent": 0.0, "income": 0.0, "tx_count": 0})
+
+    @property
+    def transfer_count(self):
+        return len(self.transfers)
+
+
+class StatsBuilder:
+    """Accumulates ReportStats one transaction at a time.
+
+    `rollups`, the ColumnStats of the same transactions, supplies the ROLLUPS
+    fields: add() then skips summing them row by row.
+    """
+
+    def __init__(self, currency, convert, buckets=(), report_range=None, monthly_budget=None, today=None,
+                 rollups=None):
+        self.currency = currency
+        self.convert = convert
+        self.bucket_map = {b["id"]: b for b in buckets}
+        self.report_range = report_range
+        self.monthly_budget = monthly_budget
+        self.today = today or date.today()
+        self.rollups = rollups
+        self.stats = ReportStats()
+        self.expense_amounts = array("d")
+        self._week_totals = {}
+        self._top = []  # min-heap of (converted, -index, tx)
+        self._index = 0
+        self._biggest = 0.0
+
+    def _split(self, user_id, name):
+        entry = self.stats.split_totals.get(user_id)
+        if entry is None:
+            entry = self.stats.split_totals[user_id] = {
+                "name": name, "paid_for": 0.0, "owes": 0.0, "owed": 0.0,
+                "outstanding_owes": 0.0, "outstanding_owed": 0.0,
+            }
+        elif name and entry["name"] == "Unknown":
+            entry["name"] = name
+        return entry
+
+    def _account(self, account_id):
+        totals = self.stats.account_totals
+        if account_id not in totals:
+            totals[account_id] = {"spent": 0.0, "income": 0.0, "tx_count": 0}
+        return totals[account_id]
+
+    def add(self, tx, raw_amount=None):
+        """Add one (valid) transaction. `raw_amount` skips re-resolving it."""
+        s = self.stats
+        currency = self.currency
+        if raw_amount is None:
+            raw_amount = resolve_amount(tx, currency, self.convert)
+        category = tx.get("category") or ""
+        is_income = tx.get("is_income") is True or raw_amount < 0 or category == "income"
+        amount = abs(raw_amount)
+        self._index += 1
+
+        # topExpenses in generatePDF: positive, non-income-category rows, first wins on ties.
+        if raw_amount > 0 and category != "income":
+            item = (raw_amount, -self._index, tx)
+            if len(self._top) < 5:
+                heapq.heappush(self._top, item)
+            elif item > self._top[0]:
+                heapq.heapreplace(self._top, item)
+
+        if not tx.get("account_id") and not tx.get("is_transfer"):
+            u = s.unassigned
+            if tx.get("is_income") is True or category == "income":
+                u["income"] += amount
+            else:
+                u["spent"] += amount
+            u["tx_count"] += 1
+
+        summing = self.rollups is None
+        if tx.get("is_transfer"):
+            if summing:
+                s.transfer_total += amount
+            s.transfers.append(tx)
+            if tx.get("account_id"):
+                self._account(tx["account_id"])["tx_count"] += 1
+            return
+
+        if summing:
+            src_curr = (tx.get("currency") or currency).upper()
+            entry = s.currency_totals.get(src_curr)
+            if entry is None:
+                entry = s.currency_totals[src_curr] = [0, 0.0, 0.0]
+            entry[0] += 1
+            entry[1] += abs(float(tx["amount"]))
+            entry[2] += amount
+
+        if tx.get("account_id"):
+            acct = self._account(tx["account_id"])
+            acct["tx_count"] += 1
+            acct["income" if is_income else "spent"] += amount
+
+        if not is_income and tx.get("receipt_path"):
+            s.receipted_count += 1
+
+        if is_income:
+            if summing:
+                s.total_income += amount
+                s.income_tx_count += 1
+                s.income_category_totals[category] = s.income_category_totals.get(category, 0.0) + amount
+            return
+
+        self.expense_amounts.append(amount)
+        if amount > self._biggest:
+            self._biggest = amount
+            s.biggest_single_tx = tx
+        if summing:
+            self._add_expense_rollups(tx, category, amount)
+
+        place = tx.get("place_name")
+        if place:
+            loc = s.location_totals.setdefault(place, [0, 0.0])
+            loc[0] += 1
+            loc[1] += amount
+
+        tags = tx.get("tags")
+        if isinstance(tags, list):
+            for tag in tags:
+                if tag:
+                    t = s.tag_totals.setdefault(tag, [0, 0.0])
+                    t[0] += 1
+                    t[1] += amount
+
+        bucket_id = tx.get("bucket_id")
+        bucket = self.bucket_map.get(bucket_id) if bucket_id else None
+        if bucket:
+            if bucket_id not in s.bucket_totals:
+                s.bucket_totals[bucket_id] = {"name": bucket["name"], "spent": 0.0, "budget": self._bucket_budget(bucket)}
+            s.bucket_totals[bucket_id]["spent"] += amount
+
+    def _add_expense_rollups(self, tx, category, amount):
+        s = self.stats
+        currency = self.currency
+        s.total_expenses += amount
+        if tx.get("is_recurring"):
+            s.recurring_total += amount
+
+        splits = tx.get("splits")
+        if isinstance(splits, list) and splits and tx.get("user_id"):
+            tx_curr = (tx.get("currency") or currency).upper()
+            native = abs(float(tx["amount"])) or 0.0
+
+            def convert_share(raw):
+                share = abs(raw)
+                if tx_curr == currency.upper():
+                    return share
+                if amount > 0 and native > 0:
+                    return share / native * amount
+                return self.convert(share, tx_curr)
+
+            payer = self._split(tx["user_id"], (unwrap_profile(tx.get("profile")) or {}).get("full_name") or "Unknown")
+            payer["paid_for"] += amount
+            for split in splits:
+                if not split or not split.get("user_id"):
+                    continue
+                share = convert_share(float(split.get("amount") or 0))
+                if split["user_id"] != tx["user_id"]:
+                    member = self._split(split["user_id"],
+                                         (unwrap_profile(split.get("profile")) or {}).get("full_name") or "Unknown")
+                    member["owes"] += share
+                    payer["owed"] += share
+                    if split.get("is_paid") is False:
+                        member["outstanding_owes"] += share
+                        payer["outstanding_owed"] += share
+
+        s.category_totals[category] = s.category_totals.get(category, 0.0) + amount
+        method = tx.get("payment_method") or "Other"
+        s.method_totals[method] = s.method_totals.get(method, 0.0) + amount
+        day = parse_date(tx["date"])
+        month = (day.year, day.month)
+        s.monthly_totals[month] = s.monthly_totals.get(month, 0.0) + amount
+        week = day.toordinal() - day.weekday()  # Monday-anchored
+        self._week_totals[week] = self._week_totals.get(week, 0.0) + amount
+        s.dow_totals[(day.weekday() + 1) % 7] += amount
+        s.daily_totals[day] = s.daily_totals.get(day, 0.0) + amount
+
+    def _bucket_budget(self, bucket):
+        bucket_curr = (bucket.get("currency") or self.currency).upper()
+        budget = self.convert(float(bucket.get("budget") or 0), bucket_curr)
+        rng = self.report_range
+        if bucket.get("start_date") and bucket.get("end_date") and rng and rng[0] and rng[1]:
+            b_start, b_end = parse_date(bucket["start_date"]), parse_date(bucket["end_date"])
+            overlap_start, overlap_end = max(b_start, rng[0]), min(b_end, rng[1])
+            if overlap_end > overlap_start:
+                bucket_days = max(1, (b_end - b_start).days + 1)
+                overlap_days = max(1, (overlap_end - overlap_start).days + 1)
+                budget *= overlap_days / bucket_days
+        return budget
+
+    def finish(self):
+        """Derive averages, distribution, streaks and rankings; return ReportStats."""
+        s = self.stats
+        if self.rollups is not None:
+            for name in ROLLUPS:
+                setattr(s, name, getattr(self.rollups, name))
+        else:
+            s.weekly_totals = [(date.fromordinal(w), t) for w, t in sorted(self._week_totals.items())]
+        amounts = self.expense_amounts
+        count = s.expense_tx_count = len(amounts)
+        days = sorted(s.daily_totals)
+        s.first_tx_date = days[0] if days else None
+        s.last_tx_date = days[-1] if days else None
+        rng = self.report_range
+        if rng and rng[0] and rng[1]:
+            s.days_covered = max(1, (rng[1] - rng[0]).days + 1)
+        elif days:
+            s.days_covered = max(1, (days[-1] - days[0]).days + 1)
+        s.avg_per_tx = s.total_expenses / count if count else 0.0
+        s.avg_per_day = s.total_expenses / s.days_covered
+        s.avg_tx_per_day = count / s.days_covered
+        if s.total_income > 0:
+            s.savings_rate = (s.total_income - s.total_expenses) / s.total_income * 100
+        s.recurring_pct = s.recurring_total / s.total_expenses * 100 if s.total_expenses > 0 else 0.0
+        s.net_cash_flow = s.total_income - s.total_expenses
+
+        ordered = sorted(amounts)
+        mean = s.total_expenses / count if count else 0.0
+        variance = sum((a - mean) ** 2 for a in amounts) / (count - 1) if count > 1 else 0.0
+        s.distribution = {
+            "min": ordered[0] if ordered else 0, "p25": _quantile(ordered, 0.25),
+            "median": _quantile(ordered, 0.5), "p75": _quantile(ordered, 0.75),
+            "max": ordered[-1] if ordered else 0, "stddev": math.sqrt(variance),
+        }
+        del ordered
+
+        if days:
+            spend = dry = 0
+            for ordinal in range(days[0].toordinal(), days[-1].toordinal() + 1):
+                if s.daily_totals.get(date.fromordinal(ordinal), 0) > 0:
+                    spend, dry = spend + 1, 0
+                    s.longest_spend_streak = max(s.longest_spend_streak, spend)
+                else:
+                    spend, dry = 0, dry + 1
+                    s.longest_no_spend_streak = max(s.longest_no_spend_streak, dry)
+
+        if s.daily_totals:
+            # Stable sort on insertion order, like Object.entries(...).sort().
+            s.busiest_day = max(s.daily_totals.items(), key=lambda kv: kv[1])
+            s.biggest_single_day = s.busiest_day
+
+        today = self.today
+        if rng and rng[0] and rng[1] and rng[0] <= today <= rng[1] and count:
+            elapsed = max(1, (today - rng[0]).days + 1)
+            range_days = max(elapsed, (rng[1] - rng[0]).days + 1)
+            projected = s.total_expenses / elapsed * range_days
+            budget = self.monthly_budget
+            s.forecast = {
+                "projected": projected,
+                "vs_budget": {"budget": budget, "delta_pct": (projected - budget) / budget * 100}
+                if budget and budget > 0 else None,
+            }
+
+        s.top_merchants_by_visits = [
+            (name, c, t) for name, (c, t) in sorted(s.location_totals.items(), key=lambda kv: -kv[1][0])[:10]
+        ]
+        if s.category_totals:
+            s.top_category = max(s.category_totals.items(), key=lambda kv: kv[1])
+        s.receipt_coverage_pct = s.receipted_count / count * 100 if count else 0.0
+        s.top_expenses = [(amount, tx) for amount, _, tx in sorted(self._top, reverse=True)]
+        return s
+
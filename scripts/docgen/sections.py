@@ -0,0 +1,221 @@
+"""
+Section-level render cache.
+
+Each section of a guide is laid out on its own into a PDF fragment stored under
+``.cache/docgen/sections``, keyed by a hash of the section's flowables. The
+final document is assembled by concatenating the fragments, so only sections
+whose content changed are laid out again. Page numbers are global and depend
+on every other section, so they are applied in a second pass: the table of
+contents is rendered last with real page numbers and the footers are stamped
+onto the concatenated pages.
+"""
+
+import hashlib
+import io
+import json
+import os
+import re
+from dataclasses import dataclass, field
+
+from reportlab import Version as REPORTLAB_VERSION
+from reportlab.lib.colors import Color
+from reportlab.lib.styles import PropertySet
+from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate
+
+from . import fonts, profiling
+from .cache import cache_path
+from .pdfobj import PdfDocument, PdfStreamWriter, append_page_content, import_object, page_form
+from .render import RenderError
+
+# Bump when the fragment layout or metadata format changes.
+FRAGMENT_VERSION = 1
+
+HEADING_STYLES = ("H1", "H2")
+
+# Layouts settle_toc tries before giving up on page numbers that keep moving.
+TOC_PASSES = 5
+
+_ADDRESS = re.compile(r" at 0x[0-9a-fA-F]+")
+_SKIP_ATTRS = {"canv", "_img", "_frame", "_doc", "blPara", "_cache"}
+
+
+def signature(obj, _seen=None):
+    """Return a JSON-able, address-free description of a flowable tree."""
+    if obj is None or isinstance(obj, (bool, int, float, str)):
+        return obj
+    if isinstance(obj, bytes):
+        return hashlib.sha256(obj).hexdigest()
+    if isinstance(obj, Color):
+        return repr(obj)
+    _seen = _seen or set()
+    if id(obj) in _seen:
+        return "<cycle>"
+    _seen = _seen | {id(obj)}
+    if isinstance(obj, (list, tuple)):
+        return [signature(x, _seen) for x in obj]
+    if isinstance(obj, dict):
+        return [[str(k), signature(v, _seen)] for k, v in sorted(obj.items(), key=lambda kv: str(kv[0]))]
+    if isinstance(obj, PropertySet):
+        return ["style", obj.name, signature({k: v for k, v in vars(obj).items()}, _seen)]
+    if isinstance(obj, Paragraph):
+        return ["Paragraph", obj.text, obj.bulletText, signature(obj.style, _seen)]
+    if callable(obj) and not hasattr(obj, "__dict__"):
+        return type(obj).__name__
+    if hasattr(obj, "__dict__"):
+        attrs = {k: v for k, v in vars(obj).items() if k not in _SKIP_ATTRS and not callable(v)}
+        return [type(obj).__name__, signature(attrs, _seen)]
+    return _ADDRESS.sub("", repr(obj))
+
+
+def story_fingerprint(story, *extra):
+    """Return a hex digest of a list of flowables plus any extra context."""
+    payload = json.dumps([FRAGMENT_VERSION, REPORTLAB_VERSION, [signature(f) for f in story], extra],
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+@dataclass
+class Fragment:
+    name: str
+    key: str
+    path: str
+    pages: int
+    headings: list = field(default_factory=list)  # [(text, page within fragment)]
+    cached: bool = False
+
+
+class HeadingDocTemplate(SimpleDocTemplate):
+    """Records the page each heading lands on while laying out.
+
+    After a build it has a Fragment's `headings` and `pages`, so it can be
+    passed to page_numbers(). On a NumberedCanvas (docgen.footer) the pages
+    also go to the canvas as they are found.
+    """
+
+    def __init__(self, *args, **kwargs):
+        SimpleDocTemplate.__init__(self, *args, **kwargs)
+        self.headings = []
+
+    @property
+    def pages(self):
+        return self.page
+
+    def afterFlowable(self, flowable):
+        if isinstance(flowable, Paragraph) and flowable.style.name in HEADING_STYLES:
+            text = flowable.getPlainText()
+            self.headings.append((text, self.page))
+            # A NumberedCanvas fills the table of contents in from these (docgen.footer.PageRef).
+            pages = getattr(self.canv, "heading_pages", None)
+            if pages is not None:
+                pages.setdefault(heading_label(text), self.page)
+
+
+@profiling.profiled
+def render_fragment(name, story, doc_kwargs):
+    """Lay out one section into a cached PDF fragment and return its Fragment."""
+    key = story_fingerprint(story, [*sorted((k, repr(v)) for k, v in doc_kwargs.items()), fonts.seed_key()])
+    path = cache_path("sections", f"{key}.pdf")
+    meta_path = path[:-4] + ".json"
+    if os.path.exists(path) and os.path.exists(meta_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+        return Fragment(name, key, path, meta["pages"], [tuple(h) for h in meta["headings"]], cached=True)
+
+    while story and isinstance(story[-1], PageBreak):
+        story = story[:-1]
+    tmp = f"{path}.{os.getpid()}.tmp"
+    doc = HeadingDocTemplate(tmp, **doc_kwargs)
+    profiling.build(doc, list(story))
+    os.replace(tmp, path)
+    with open(meta_path, "w") as f:
+        json.dump({"pages": doc.page, "headings": doc.headings}, f)
+    return Fragment(name, key, path, doc.page, doc.headings)
+
+
+def heading_label(text):
+    """A heading's leading number without its trailing dot: "2.3" for "2.3 Quick gestures"."""
+    return text.split()[0].rstrip(".") if text.split() else text
+
+
+def page_numbers(fragments, first_page=1):
+    """Map every heading's leading number ("2", "2.3", ...) to its global page.
+
+    `first_page` is the page the first fragment starts on.
+    """
+    numbers = {}
+    for fragment in fragments:
+        for text, page in fragment.headings:
+            numbers.setdefault(heading_label(text), first_page + page - 1)
+        first_page += fragment.pages
+    return numbers
+
+
+def settle_toc(layout, pages):
+    """Lay out a table of contents until the page numbers it shows are right.
+
+    `layout(pages)` lays out the document with a TOC showing `pages` (see
+    page_numbers) and returns the pages its headings actually land on. The
+    TOC's length moves the headings after it, so this repeats until the two
+    agree, at most TOC_PASSES times. Returns the settled pages.
+    """
+    for _ in range(TOC_PASSES):
+        found = layout(pages)
+        if found == pages:
+            return pages
+        pages = found
+    raise RenderError(f"table of contents page numbers did not settle in {TOC_PASSES} passes")
+
+
+def _footer_sheet(footer, page_count, pagesize):
+    """Draw every page's footer on a page of its own, in the document font.
+
+    The text goes through ReportLab like the full build's NumberedCanvas
+    footers (docgen.footer), so both builds set it in the same embedded font.
+    Returns the sheet as a PdfDocument.
+    """
+    from reportlab.pdfgen.canvas import Canvas
+
+    buffer = io.BytesIO()
+    font_name = fonts.font("Helvetica")
+    canv = Canvas(buffer, pagesize=pagesize, initialFontName=font_name)
+    for page_num in range(1, page_count + 1):
+        spec = footer(page_num, page_count)
+        if spec is not None:
+            text, x, y, font_size, color = spec
+            canv.setFont(font_name, font_size)
+            canv.setFillColor(color)
+            canv.drawString(x, y, fonts.printable(text, font_name))
+        canv.showPage()
+    canv.save()
+    return PdfDocument.from_bytes(buffer.getvalue())
+
+
+@profiling.profiled
+def assemble(fragments, output_path, info, footer=None):
+    """Concatenate fragments into `output_path`, stamping footers if given.
+
+    `footer` is a callable (page_num, page_count) -> (text, x, y, font_size,
+    color) or None for pages without a footer; the text is set in the
+    document's font (docgen.fonts.font). Fonts and images that several
+    fragments embed are written once. Returns the page count.
+    """
+    page_count = sum(f.pages for f in fragments)
+    sheet = sheet_refs = None
+    page_num = 0
+    with PdfStreamWriter(output_path) as writer:
+        for fragment in fragments:
+            doc = PdfDocument.from_file(fragment.path)
+            mapping = {}
+            for ref in doc.page_refs():
+                page_num += 1
+                if footer is None:
+                    continue
+                if sheet is None:
+                    box = doc.resolve(doc.page(ref)["MediaBox"])
+                    sheet = _footer_sheet(footer, page_count, (box[2] - box[0], box[3] - box[1]))
+                    sheet_refs = sheet.page_refs()
+                if footer(page_num, page_count) is not None:
+                    form = doc.add(import_object(doc, sheet, page_form(sheet, sheet_refs[page_num - 1]), mapping))
+                    append_page_content(doc, ref, b"/FDocgenFooter Do\n", xobjects={"FDocgenFooter": form})
+            writer.add_document(doc)
+        return writer.close(info)
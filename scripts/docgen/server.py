@@ -0,0 +1,218 @@
+"""
+Local render service.
+
+An HTTP front end to docgen.render, for the website's dev server and other
+local tools that want a guide rendered on demand:
+
+    GET /guides                          -> JSON: each guide's options and defaults
+    GET /guides/<guide>.pdf?locale=de    -> the PDF, rendered now
+    GET /health                          -> JSON: workers, pending renders, counters
+
+Renders run in a pool of worker processes forked after the service warmed
+up by rendering every guide once, so each worker starts with the modules
+imported, the styles built, fonts registered with their metrics loaded,
+images decoded and prepared, the paragraph caches filled and the section
+fragments on disk; a request only pays for what changed since.
+
+Concurrent requests for the same guide and options share one render
+(single flight). At most ``max_pending`` distinct renders are queued or
+running at once; beyond that a request is answered 503 with Retry-After
+right away instead of queueing behind the pool. Responses carry an ETag of
+the PDF, so clients revalidating with If-None-Match get a 304.
+"""
+
+import contextlib
+import hashlib
+import importlib
+import io
+import json
+import multiprocessing
+import os
+import re
+import threading
+import time
+import traceback
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from .render import RenderError, render_guide, render_options
+
+# Distinct renders allowed per worker (queued or running) before requests
+# are turned away.
+QUEUE_DEPTH = 4
+RENDER_TIMEOUT = 120
+RETRY_AFTER = 1
+
+_GUIDE_URL = re.compile(r"/guides/([A-Za-z0-9_.-]+)\.pdf")
+
+
+class Busy(Exception):
+    """Too many renders are pending; try again later."""
+
+
+class UnknownGuide(KeyError):
+    pass
+
+
+@dataclass
+class Rendition:
+    data: bytes
+    seconds: float
+    shared: bool = False
+
+
+def _render(guide, options):
+    """Render in a worker process; the guide's progress output is dropped."""
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        data = render_guide(guide, **options)
+    return data, time.perf_counter() - start
+
+
+def _ping():
+    return os.getpid()
+
+
+class RenderService:
+    """A pool of warm render workers with single-flight and a bounded queue."""
+
+    def __init__(self, guides, jobs=None, max_pending=None):
+        self.guides = {name: render_options(importlib.import_module(name)) for name in guides}
+        self.jobs = jobs or os.cpu_count() or 1
+        self.max_pending = max_pending or self.jobs * QUEUE_DEPTH
+        self.counters = Counter()
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._pool = None
+
+    def warm(self):
+        """Render every guide once in this process; yield (guide, seconds)."""
+        for guide in self.guides:
+            yield guide, _render(guide, {})[1]
+
+    def _start_pool(self):
+        context = multiprocessing.get_context("fork") if "fork" in multiprocessing.get_all_start_methods() else None
+        pool = ProcessPoolExecutor(max_workers=self.jobs, mp_context=context)
+        # Fork every worker now, from the warm process, rather than on the
+        # first requests.
+        for future in [pool.submit(_ping) for _ in range(self.jobs)]:
+            future.result()
+        return pool
+
+    def start(self):
+        self._pool = self._start_pool()
+        return self
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def submit(self, guide, options):
+        """The future rendering `guide` with `options`, and whether it was shared."""
+        if guide not in self.guides:
+            raise UnknownGuide(guide)
+        unknown = sorted(set(options) - set(self.guides[guide]))
+        if unknown:
+            raise RenderError(f"{guide} has no option(s) {', '.join(unknown)}")
+        key = (guide, tuple(sorted(options.items())))
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.counters["shared"] += 1
+                return future, True
+            if len(self._inflight) >= self.max_pending:
+                self.counters["rejected"] += 1
+                raise Busy(f"{len(self._inflight)} render(s) pending")
+            try:
+                future = self._pool.submit(_render, guide, options)
+            except BrokenProcessPool:
+                # A worker died; the pool cannot be used any more.
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = self._start_pool()
+                future = self._pool.submit(_render, guide, options)
+            self._inflight[key] = future
+        future.add_done_callback(lambda f: self._finished(key, f))
+        return future, False
+
+    def _finished(self, key, future):
+        with self._lock:
+            self._inflight.pop(key, None)
+            self.counters["failed" if future.cancelled() or future.exception() else "rendered"] += 1
+
+    def render(self, guide, options, timeout=RENDER_TIMEOUT):
+        """Render (or join the render in flight of) `guide`; returns a Rendition."""
+        future, shared = self.submit(guide, options)
+        data, seconds = future.result(timeout)
+        return Rendition(data, seconds, shared)
+
+    def status(self):
+        with self._lock:
+            return {"workers": self.jobs, "pending": len(self._inflight), "max_pending": self.max_pending,
+                    **{k: self.counters[k] for k in ("rendered", "shared", "rejected", "failed")}}
+
+
+class RenderHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    service = None
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == "/health":
+            return self._json(200, self.service.status())
+        if url.path.rstrip("/") == "/guides":
+            return self._json(200, {name: {"url": f"/guides/{name}.pdf", "options": options}
+                                    for name, options in self.service.guides.items()})
+        match = _GUIDE_URL.fullmatch(url.path)
+        if match is None:
+            return self._json(404, {"error": "not found"})
+        try:
+            rendition = self.service.render(match[1], dict(parse_qsl(url.query)))
+        except UnknownGuide:
+            return self._json(404, {"error": f"unknown guide {match[1]}"})
+        except RenderError as e:
+            return self._json(400, {"error": str(e)})
+        except Busy as e:
+            return self._json(503, {"error": str(e)}, {"Retry-After": str(RETRY_AFTER)})
+        except FutureTimeout:
+            return self._json(504, {"error": f"render took longer than {RENDER_TIMEOUT}s"})
+        except Exception as e:
+            traceback.print_exc()
+            return self._json(500, {"error": f"{type(e).__name__}: {e}"})
+
+        etag = f'"{hashlib.sha256(rendition.data).hexdigest()[:32]}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache",
+                   "X-Render-Seconds": f"{rendition.seconds:.3f}",
+                   "X-Render-Shared": "1" if rendition.shared else "0"}
+        if self.headers.get("If-None-Match") == etag:
+            return self._send(304, b"", None, headers)
+        self._send(200, rendition.data, "application/pdf", headers)
+
+    def _json(self, status, body, headers=None):
+        self._send(status, json.dumps(body, indent=2).encode() + b"\n", "application/json", headers or {})
+
+    def _send(self, status, body, content_type, headers):
+        self.send_response(status)
+        if content_type:
+            self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        print(f"  {self.address_string()} {format % args}", flush=True)
+
+
+def make_server(service, host="127.0.0.1", port=8765):
+    """A ThreadingHTTPServer answering with `service` (call serve_forever())."""
+    handler = type("Handler", (RenderHandler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
@@ -0,0 +1,157 @@
+"""
+Long tables.
+
+platypus.Table creates a style object for every cell and measures every row
+before the first page is laid out, and each split copies the remaining rows,
+so tables with thousands of rows are slow and hold the whole grid in memory.
+
+ChunkedTable takes precomputed column widths and one fixed row height, so the
+number of rows that fit on a page is simple arithmetic. Each page is drawn as
+a small Table holding the repeated header rows plus that page's batch, which
+keeps TableStyle commands working: row indexes in the style are relative to a
+batch, with the header rows first.
+"""
+
+from collections import deque
+from itertools import islice
+
+from reportlab import rl_config
+from reportlab.platypus import Table, TableStyle
+from reportlab.platypus.flowables import Flowable
+
+
+class _Buffer:
+    """An iterator's rows, read ahead on demand and dropped once drawn.
+
+    Rows are addressed by their index in the whole iterator; `base` is the
+    index of the first row still held.
+    """
+
+    def __init__(self, iterator):
+        self.iterator = iterator
+        self.rows = deque()
+        self.base = 0
+
+    def fill(self, end):
+        """Read rows up to index `end`; return how far the iterator reaches."""
+        missing = end - self.base - len(self.rows)
+        if missing > 0:
+            self.rows.extend(islice(self.iterator, missing))
+        return self.base + len(self.rows)
+
+    def get(self, start, end):
+        self.fill(end)
+        return list(islice(self.rows, start - self.base, end - self.base))
+
+    def release(self, end):
+        """Drop the rows before index `end`."""
+        while self.base < end and self.rows:
+            self.rows.popleft()
+            self.base += 1
+
+
+class _Rows:
+    """The rows not laid out yet: a view of a sequence or a buffered iterator.
+
+    Views never modify what they look at, so a split the frame discards
+    loses no rows. Sequences are never copied, so a ChunkedTable over a list
+    can be laid out again (multiBuild); an iterator's rows are dropped from
+    its buffer once the batch holding them is drawn.
+    """
+
+    def __init__(self, rows, start=0):
+        self.start = start
+        if isinstance(rows, _Buffer) or (hasattr(rows, "__len__") and hasattr(rows, "__getitem__")):
+            self.rows = rows
+        else:
+            self.rows = _Buffer(iter(rows))
+        self.buffered = isinstance(self.rows, _Buffer)
+
+    def available(self, limit):
+        """How many rows are left, counting at most `limit`."""
+        if not self.buffered:
+            return max(min(limit, len(self.rows) - self.start), 0)
+        return max(min(limit, self.rows.fill(self.start + limit) - self.start), 0)
+
+    def head(self, n):
+        if not self.buffered:
+            return list(self.rows[self.start:self.start + n])
+        return self.rows.get(self.start, self.start + n)
+
+    def rest(self, n):
+        """The rows after the first `n`."""
+        return _Rows(self.rows, self.start + n)
+
+    def release(self, n):
+        """The first `n` rows were drawn: an iterator's buffer may drop them."""
+        if self.buffered:
+            self.rows.release(self.start + n)
+
+
+class _Batch(Table):
+    """One page of a ChunkedTable; calls `drawn()` after drawing."""
+
+    def __init__(self, *args, drawn, **kwargs):
+        Table.__init__(self, *args, **kwargs)
+        self._drawn = drawn
+
+    def draw(self):
+        Table.draw(self)
+        self._drawn()
+
+
+class ChunkedTable(Flowable):
+    """A table of fixed-height rows, laid out one page-sized batch at a time.
+
+    `rows` is a sequence or any iterable of row lists; `header` rows are
+    repeated at the top of every page, `header_heights` tall (default:
+    `row_height` each). Cells are drawn as by Table, but are
+    never measured: content taller than `row_height` overflows its row.
+    """
+
+    def __init__(self, rows, col_widths, row_height, header=(), style=None, hAlign="CENTER",
+                 header_heights=None):
+        Flowable.__init__(self)
+        self.rows = rows if isinstance(rows, _Rows) else _Rows(rows)
+        self.col_widths = list(col_widths)
+        self.row_height = row_height
+        self.header = [list(row) for row in header]
+        self.header_heights = list(header_heights or [row_height] * len(self.header))
+        if style is not None and not isinstance(style, TableStyle):
+            style = TableStyle(style)
+        self.style = style
+        self.hAlign = hAlign
+        self.width = sum(self.col_widths)
+        self.height = 0
+
+    def _capacity(self, availHeight):
+        """Body rows that fit in `availHeight` under the header."""
+        space = availHeight - sum(self.header_heights) + rl_config._FUZZ
+        return max(int(space // self.row_height), 0)
+
+    def _batch(self, n):
+        rows = self.header + self.rows.head(n)
+        heights = self.header_heights + [self.row_height] * n
+        return _Batch(rows, colWidths=self.col_widths, rowHeights=heights, style=self.style,
+                      hAlign=self.hAlign, drawn=lambda: self.rows.release(n))
+
+    def wrap(self, availWidth, availHeight):
+        # Counting one row past the page makes the frame ask for a split.
+        rows = self.rows.available(self._capacity(availHeight) + 1)
+        self.height = sum(self.header_heights) + rows * self.row_height
+        return self.width, self.height
+
+    def split(self, availWidth, availHeight):
+        fits = self._capacity(availHeight)
+        if fits < 1:
+            return []
+        rows = self.rows.available(fits)
+        batch = self._batch(rows)
+        rest = ChunkedTable(self.rows.rest(rows), self.col_widths, self.row_height,
+                            self.header, self.style, self.hAlign, self.header_heights)
+        return [batch, rest]
+
+    def draw(self):
+        table = self._batch(round((self.height - sum(self.header_heights)) / self.row_height))
+        table.wrap(self.width, self.height)
+        table.drawOn(self.canv, 0, 0)
@@ -0,0 +1,274 @@
+"""
+Shared styles and palettes for the guide generators.
+
+Styles are declared here as plain data. ReportLab's ``ParagraphStyle`` and
+color objects are only created the first time a style is used, then cached on
+the theme, so importing a generator (or skipping an up-to-date build) never
+pays for ``getSampleStyleSheet()`` or the ReportLab import.
+
+Each document picks a palette: the violet "manual" palette, the purple
+"advanced" palette or the "report" palette of the transaction report. A
+style's color values refer to palette keys as ``"@primary"``.
+"""
+
+import hashlib
+import json
+
+from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY, TA_RIGHT
+from reportlab.lib.units import mm
+
+from . import fonts
+
+PALETTES = {
+    "manual": {
+        "primary": "#7C3AED",   # Violet/purple
+        "accent": "#A855F7",
+        "dark_bg": "#0F0B1A",
+        "secondary": "#1E1B2E",
+        "text_white": "#F8F8FF",
+        "muted": "#9CA3AF",
+        "text": "#000000",
+        "text_secondary": "#4B5563",
+        "tip": "#059669",
+        "caption": "#9CA3AF",
+        "rule": "#D1D5DB",
+        "table_bg": "#F3F4F6",
+        "table_bg_alt": "#F9FAFB",
+        "white": "#FFFFFF",
+    },
+    "advanced": {
+        "primary": "#A855F7",   # Purple
+        "accent": "#7C3AED",    # Violet
+        "dark_bg": "#0F0B1A",
+        "muted": "#6B7280",
+        "text": "#000000",
+        "success": "#10B981",
+        "warning": "#F59E0B",
+        "danger": "#EF4444",
+        "caption": "#808080",
+        "rule": "#808080",
+        "white": "#FFFFFF",
+    },
+    # generatePDF in utils/export-utils.ts
+    "report": {
+        "primary": "#8A2BE2",   # (138, 43, 226)
+        "header_text": "#DCC8FF",
+        "header_muted": "#C8B9F0",
+        "success": "#10B981",
+        "danger": "#FF6B6B",
+        "teal": "#4ECDC4",
+        "indigo": "#6366F1",
+        "pink": "#FF1493",
+        "orange": "#FF9F1C",
+        "good": "#4ADE80",
+        "heading": "#323232",
+        "text": "#505050",
+        "muted": "#969696",
+        "footer": "#B4B4B4",
+        "rule": "#F5F5F5",
+        "stripe": "#F5F5F5",
+        "table_text": "#141414",
+        "white": "#FFFFFF",
+    },
+}
+
+# key -> (ReportLab style name, parent, properties). A parent is either another
+# key in the same table or a style from getSampleStyleSheet().
+BASE_STYLES = {
+    "title": ("Title", "Title", dict(
+        fontSize=28, textColor="@primary", spaceAfter=8*mm,
+        fontName="Helvetica-Bold", alignment=TA_CENTER,
+    )),
+    "heading1": ("H1", "Heading1", dict(
+        fontSize=20, textColor="@primary", spaceBefore=8*mm,
+        spaceAfter=4*mm, fontName="Helvetica-Bold",
+    )),
+    "heading2": ("H2", "Heading2", dict(
+        fontSize=15, textColor="@accent", spaceBefore=6*mm,
+        spaceAfter=3*mm, fontName="Helvetica-Bold",
+    )),
+    "body": ("Body", "Normal", dict(
+        fontSize=11, textColor="@text", spaceAfter=3*mm,
+        fontName="Helvetica", leading=16, alignment=TA_JUSTIFY,
+    )),
+    "bullet": ("Bullet", "body", dict(
+        fontSize=11, leftIndent=15, spaceAfter=2*mm,
+        bulletIndent=5, fontName="Helvetica",
+    )),
+    "caption": ("Caption", "Normal", dict(
+        fontSize=9, textColor="@caption", alignment=TA_CENTER,
+        spaceAfter=6*mm, fontName="Helvetica-Oblique",
+    )),
+}
+
+# Per-document additions and overrides on top of BASE_STYLES.
+DOCUMENT_STYLES = {
+    "manual": {
+        "title": ("ManualTitle", "Title", dict(
+            fontSize=32, textColor="@primary", spaceAfter=6*mm,
+            fontName="Helvetica-Bold", alignment=TA_CENTER,
+        )),
+        "subtitle": ("ManualSubtitle", "Normal", dict(
+            fontSize=14, textColor="@muted", spaceAfter=12*mm,
+            fontName="Helvetica", alignment=TA_CENTER,
+        )),
+        "heading1": ("H1", "Heading1", dict(
+            fontSize=22, textColor="@primary", spaceBefore=8*mm,
+            spaceAfter=4*mm, fontName="Helvetica-Bold",
+            borderPadding=(0, 0, 2, 0),
+        )),
+        "heading2": ("H2", "Heading2", dict(
+            fontSize=16, textColor="@accent", spaceBefore=6*mm,
+            spaceAfter=3*mm, fontName="Helvetica-Bold",
+        )),
+        "tip": ("Tip", "body", dict(
+            fontSize=10, textColor="@tip",
+            leftIndent=10, fontName="Helvetica-Oblique",
+            spaceBefore=2*mm, spaceAfter=4*mm,
+        )),
+        "toc": ("TOC", "Normal", dict(
+            fontSize=13, textColor="@text", spaceAfter=3*mm,
+            fontName="Helvetica", leftIndent=10,
+        )),
+        "toc_sub": ("TOCSub", "toc", dict(
+            fontSize=11, leftIndent=30, textColor="@text_secondary",
+        )),
+        "toc_page": ("TOCPage", "toc", dict(
+            leftIndent=0, alignment=TA_RIGHT,
+        )),
+        "footer": ("Footer", "Normal", dict(
+            fontSize=8, textColor="@muted", alignment=TA_CENTER,
+        )),
+        "tagline": ("Tag", "subtitle", dict(
+            fontSize=20, textColor="@accent",
+        )),
+        "closing_title": ("Final", "heading1", dict(
+            alignment=TA_CENTER, fontSize=20,
+        )),
+        "closing_body": ("FinalBody", "body", dict(
+            alignment=TA_CENTER,
+        )),
+        "closing_note": ("Love", "caption", dict(
+            fontSize=10,
+        )),
+        "eyebrow": ("Eyebrow", "body", dict(
+            fontSize=9, textColor="@accent", fontName="Helvetica-Bold",
+            spaceAfter=0, leading=12,
+        )),
+        "blurb": ("Blurb", "body", dict(
+            textColor="@text_secondary", fontName="Helvetica-Oblique",
+        )),
+    },
+    "advanced": {
+        "title": ("AdvancedTitle", "Title", dict(
+            fontSize=28, textColor="@primary", spaceAfter=8*mm,
+            fontName="Helvetica-Bold", alignment=TA_CENTER,
+        )),
+        "question": ("Question", "body", dict(
+            fontSize=12, textColor="@accent", fontName="Helvetica-Bold",
+            spaceBefore=4*mm, spaceAfter=2*mm,
+        )),
+        "answer": ("Answer", "body", dict(
+            leftIndent=10, borderPadding=5,
+        )),
+        "tip_box": ("TipBox", "body", dict(
+            fontSize=10, textColor="@success",
+            leftIndent=15, fontName="Helvetica-Oblique",
+            spaceBefore=3*mm, spaceAfter=3*mm,
+        )),
+        "subtitle": ("Sub", "title", dict(
+            fontSize=22, textColor="@accent",
+        )),
+        "tagline": ("T", "Normal", dict(
+            alignment=TA_CENTER, textColor="@muted",
+        )),
+        "warning": ("W", "body", dict(
+            textColor="@danger", fontName="Helvetica-Bold",
+        )),
+        "term": ("Term", "body", dict(
+            leftIndent=20,
+        )),
+        "closing": ("End", "body", dict(
+            alignment=TA_CENTER, textColor="@muted",
+        )),
+    },
+}
+
+_sample_styles = None
+_themes = {}
+
+
+def _sample_stylesheet():
+    global _sample_styles
+    if _sample_styles is None:
+        from reportlab.lib.styles import getSampleStyleSheet
+        _sample_styles = getSampleStyleSheet()
+    return _sample_styles
+
+
+class Theme:
+    """A palette plus its style table; styles and colors are built on first use."""
+
+    def __init__(self, name, palette, styles):
+        self.name = name
+        self.palette = palette
+        self.specs = styles
+        self._colors = {}
+        self._styles = {}
+
+    def color(self, key):
+        """Return the ReportLab color for a palette key."""
+        color = self._colors.get(key)
+        if color is None:
+            from reportlab.lib.colors import HexColor
+            color = self._colors[key] = HexColor(self.palette[key])
+        return color
+
+    def _resolve(self, props):
+        return {
+            k: self.color(v[1:]) if isinstance(v, str) and v.startswith("@") else v
+            for k, v in props.items()
+        }
+
+    def _parent(self, parent):
+        if parent in self.specs:
+            return self.style(parent)
+        return _sample_stylesheet()[parent]
+
+    def style(self, key):
+        """Return the ParagraphStyle for a key in the style table."""
+        style = self._styles.get(key)
+        if style is None:
+            from reportlab.lib.styles import ParagraphStyle
+            name, parent, props = self.specs[key]
+            style = self._styles[key] = ParagraphStyle(name, parent=self._parent(parent), **self._resolve(props))
+            style.fontName = fonts.font(style.fontName)
+        return style
+
+    def derive(self, name, parent, **props):
+        """Return a one-off variant of a style, cached by its definition."""
+        cache_key = (name, parent, tuple(sorted((k, repr(v)) for k, v in props.items())))
+        style = self._styles.get(cache_key)
+        if style is None:
+            from reportlab.lib.styles import ParagraphStyle
+            style = self._styles[cache_key] = ParagraphStyle(name, parent=self._parent(parent), **self._resolve(props))
+            style.fontName = fonts.font(style.fontName)
+        return style
+
+    def __getattr__(self, key):
+        if key.startswith("_") or key not in self.__dict__.get("specs", {}):
+            raise AttributeError(key)
+        return self.style(key)
+
+    def fingerprint(self):
+        """Hash of the palette, style definitions and fonts, without building anything."""
+        payload = json.dumps([self.name, self.palette, self.specs, fonts.fingerprint()], sort_keys=True, default=repr)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def get_theme(name):
+    """Return the shared Theme for a document palette ("manual", "advanced" or "report")."""
+    theme = _themes.get(name)
+    if theme is None:
+        theme = _themes[name] = Theme(name, PALETTES[name], {**BASE_STYLES, **DOCUMENT_STYLES.get(name, {})})
+    return theme
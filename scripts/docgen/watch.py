@@ -0,0 +1,248 @@
+"""
+Watch mode: rebuild guides as their sources change.
+
+The guides are built once and then rebuilt in the same process whenever a
+file they depend on changes, so imported modules, the parsed content and
+paragraph caches, registered fonts and prepared images stay warm:
+
+- ``generate_<guide>.py``: the module is reloaded and that guide rebuilt;
+- files under a guide's ``CONTENT_DIR`` (sections, locale catalogs), the
+  files its optional ``source_paths()`` lists, and images with the name of
+  one in its ``SCREENSHOTS`` / ``LOGO_PATH`` (in their directories or the
+  asset search path): that guide is rebuilt;
+- docgen itself: the watcher restarts, since its classes are shared by
+  every loaded guide.
+
+A guide built from cached sections (docgen.sections) re-renders only the
+sections that changed. Changes are collected until none arrive for
+``DEBOUNCE`` seconds, so an editor's save (or a batch of screenshots) causes
+one rebuild. Files are watched with inotify on Linux and by polling their
+modification times elsewhere.
+"""
+
+import ctypes
+import ctypes.util
+import importlib
+import os
+import select
+import struct
+import sys
+import time
+import traceback
+
+from .cache import SCRIPTS_DIR
+from .driver import BuildResult, build_guide
+from .manifest import guide_images
+
+DEBOUNCE = 0.15
+POLL_INTERVAL = 0.3
+DOCGEN_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Editor swap and backup files, temporary outputs.
+_IGNORED_SUFFIXES = ("~", ".swp", ".swx", ".tmp", ".pyc")
+
+# inotify(7)
+IN_ATTRIB = 0x004
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_DELETE = 0x200
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE | IN_ATTRIB
+_EVENT = struct.Struct("iIII")
+
+
+def _ignored(path):
+    name = os.path.basename(path)
+    return not name or name.startswith(".") or name.endswith(_IGNORED_SUFFIXES)
+
+
+class InotifyWatcher:
+    """Report files created, written, moved or deleted in a set of directories."""
+
+    def __init__(self, directories):
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs = {}
+        self.update(directories)
+
+    def update(self, directories):
+        """Also watch `directories` (already watched ones are kept)."""
+        watched = set(self._dirs.values())
+        for directory in directories:
+            if directory in watched or not os.path.isdir(directory):
+                continue
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+            if wd >= 0:
+                self._dirs[wd] = directory
+
+    def read(self, timeout):
+        """Changed paths seen within `timeout` seconds (None: wait for one)."""
+        if not select.select([self._fd], [], [], timeout)[0]:
+            return set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        paths = set()
+        pos = 0
+        while pos < len(data):
+            wd, _, _, length = _EVENT.unpack_from(data, pos)
+            pos += _EVENT.size
+            name = data[pos:pos + length].rstrip(b"\0")
+            pos += length
+            if wd in self._dirs and name:
+                paths.add(os.path.join(self._dirs[wd], os.fsdecode(name)))
+        return paths
+
+    def close(self):
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    """The same interface, comparing modification times every POLL_INTERVAL."""
+
+    def __init__(self, directories):
+        self._dirs = set()
+        self._snapshot = {}
+        self.update(directories)
+
+    def update(self, directories):
+        self._dirs.update(d for d in directories if os.path.isdir(d))
+        self._snapshot = self._scan()
+
+    def _scan(self):
+        files = {}
+        for directory in self._dirs:
+            try:
+                entries = os.scandir(directory)
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    try:
+                        if entry.is_file():
+                            st = entry.stat()
+                            files[entry.path] = (st.st_mtime_ns, st.st_size)
+                    except OSError:
+                        pass
+        return files
+
+    def read(self, timeout):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            current = self._scan()
+            changed = {p for p in current.keys() | self._snapshot.keys() if current.get(p) != self._snapshot.get(p)}
+            self._snapshot = current
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            time.sleep(POLL_INTERVAL if deadline is None else min(POLL_INTERVAL, max(0, deadline - time.monotonic())))
+
+    def close(self):
+        pass
+
+
+def open_watcher(directories):
+    """An InotifyWatcher where inotify is available, else a PollingWatcher."""
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(directories)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(directories)
+
+
+def batches(watcher, debounce=DEBOUNCE):
+    """Yield sets of changed paths, each once no change arrived for `debounce` s."""
+    while True:
+        paths = watcher.read(None)
+        while True:
+            more = watcher.read(debounce)
+            if not more:
+                break
+            paths |= more
+        paths = {p for p in paths if not _ignored(p)}
+        if paths:
+            yield paths
+
+
+# --- What a guide depends on ---
+
+def _source_paths(module):
+    hook = getattr(module, "source_paths", None)
+    return [os.path.abspath(p) for p in hook()] if hook else []
+
+
+def _image_dirs(module):
+    assets = getattr(module, "assets", None)
+    search = [*assets.search_paths, *assets.fallbacks] if assets else []
+    return [*(os.path.dirname(os.path.abspath(p)) for p in guide_images(module)), *search]
+
+
+def watched_directories(modules):
+    """Every directory a change in which can affect one of the guide modules."""
+    directories = {SCRIPTS_DIR, DOCGEN_DIR}
+    for module in modules.values():
+        content_dir = getattr(module, "CONTENT_DIR", None)
+        if content_dir and os.path.isdir(content_dir):
+            directories.update(root for root, _, _ in os.walk(content_dir))
+        directories.update(os.path.dirname(p) for p in _source_paths(module))
+        directories.update(os.path.abspath(d) for d in _image_dirs(module))
+    return sorted(directories)
+
+
+def affected_guides(path, modules):
+    """Names of the guides a change to `path` affects."""
+    path = os.path.abspath(path)
+    name = os.path.basename(path)
+    affected = set()
+    for guide, module in modules.items():
+        content_dir = getattr(module, "CONTENT_DIR", None)
+        if (path == os.path.abspath(module.__file__)
+                or (content_dir and path.startswith(os.path.abspath(content_dir) + os.sep))
+                or path in _source_paths(module)
+                or name in {os.path.basename(p) for p in guide_images(module)}):
+            affected.add(guide)
+    return affected
+
+
+def _restart():
+    print("🔄 docgen changed, restarting...", flush=True)
+    os.execv(sys.executable, [sys.executable, *sys.argv])
+
+
+def watch(names, args=(), debounce=DEBOUNCE):
+    """Build `names`, then rebuild them as their sources change, forever.
+
+    Yields (changed paths, [BuildResult, ...]) for the initial build (with no
+    changed paths) and for every rebuild.
+    """
+    modules = {name: importlib.import_module(name) for name in names}
+    yield [], [build_guide(name, args) for name in names]
+    watcher = open_watcher(watched_directories(modules))
+    try:
+        for paths in batches(watcher, debounce):
+            if any(os.path.dirname(os.path.abspath(p)) == DOCGEN_DIR and p.endswith(".py") for p in paths):
+                _restart()
+            affected = {}
+            for path in sorted(paths):
+                for guide in affected_guides(path, modules):
+                    affected.setdefault(guide, []).append(path)
+            if not affected:
+                continue
+            results = []
+            for guide in [name for name in names if name in affected]:
+                if os.path.abspath(modules[guide].__file__) in affected[guide]:
+                    try:
+                        modules[guide] = importlib.reload(modules[guide])
+                    except Exception:
+                        results.append(BuildResult(guide, False, 0.0, error=traceback.format_exc()))
+                        continue
+                results.append(build_guide(guide, [*args, "--force"]))
+            watcher.update(watched_directories(modules))
+            yield sorted({p for changed in affected.values() for p in changed}), results
+    finally:
+        watcher.close()
@@ -0,0 +1,109 @@
+"""
+Shared image XObjects.
+
+canvas.drawImage decodes and compresses an image file again for every
+document (and every cached section fragment) it appears in. Here each image
+file is loaded into a PDF image XObject once per process and copied into
+each canvas that draws it, where it is registered once under a name derived
+from the file's digest and referenced by every later draw.
+"""
+
+import copy
+import os
+import time
+
+from reportlab import Version as REPORTLAB_VERSION
+from reportlab.pdfbase.pdfdoc import PDFDocument, PDFImageXObject, PDFObjectReference
+from reportlab.platypus.flowables import Flowable
+
+from . import profiling
+from .images import file_digest
+
+# (path, mtime, size) -> loaded PDFImageXObject, shared by every canvas.
+_xobjects = {}
+
+
+def image_xobject(path):
+    """Return the process-wide loaded XObject for an image file."""
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+    xobject = _xobjects.get(key)
+    if xobject is None:
+        name = "docgen" + file_digest(path)[:32]
+        start = time.perf_counter()
+        xobject = _xobjects[key] = PDFImageXObject(name, path, mask="auto")
+        profiling.record_decode(path, time.perf_counter() - start)
+    return xobject
+
+
+def _document(canv):
+    """The PDFDocument a canvas writes to.
+
+    The one piece of canvas internals this module relies on: Canvas has no
+    public accessor for its document, which it has kept in `_doc` since
+    ReportLab 1.x. Checked here so a ReportLab that changes it fails loudly
+    instead of writing a broken PDF (tests/test_xobjects.py runs it against
+    the installed version).
+    """
+    doc = getattr(canv, "_doc", None)
+    if not isinstance(doc, PDFDocument):
+        raise RuntimeError(f"ReportLab {REPORTLAB_VERSION}: the canvas has no PDFDocument in _doc; "
+                           f"docgen.xobjects needs updating")
+    return doc
+
+
+def _register(doc, xobject):
+    """Add a copy of a loaded image XObject (and its soft mask) to `doc` as form `xobject.name`.
+
+    As canvas.drawImage does, the soft mask PDFImageXObject split off while
+    loading (its `_smask`) becomes an object of its own that the image refers to.
+    """
+    image = copy.copy(xobject)
+    smask = getattr(xobject, "_smask", None)
+    if smask is not None:
+        del image._smask
+        mask_name = doc.getXObjectName(smask.name)
+        if doc.hasForm(smask.name):
+            image.smask = PDFObjectReference(mask_name)
+        else:
+            image.smask = doc.Reference(copy.copy(smask), mask_name)
+    doc.addForm(image.name, image)
+
+
+def draw_image(canv, path, x, y, width, height):
+    """Draw an image file, embedding it at most once in the canvas's document.
+
+    Like canvas.drawImage, but the XObject comes from image_xobject() instead
+    of being decoded again; it is drawn as a named form through the public
+    canvas.doForm.
+    """
+    xobject = image_xobject(path)
+    doc = _document(canv)
+    if not doc.hasForm(xobject.name):
+        _register(doc, xobject)
+    canv.saveState()
+    canv.translate(x, y)
+    canv.scale(width, height)
+    canv.doForm(xobject.name)
+    canv.restoreState()
+
+
+class SharedImage(Flowable):
+    """An image flowable drawn through draw_image.
+
+    Takes the same drawn size as platypus.Image; the file is not opened until
+    the image is drawn.
+    """
+
+    def __init__(self, filename, width, height, hAlign="CENTER"):
+        Flowable.__init__(self)
+        self.filename = filename
+        self.drawWidth = width
+        self.drawHeight = height
+        self.hAlign = hAlign
+
+    def wrap(self, availWidth, availHeight):
+        return self.drawWidth, self.drawHeight
+
+    def draw(self):
+        draw_image(self.canv, self.filename, 0, 0, self.drawWidth, self.drawHeight)
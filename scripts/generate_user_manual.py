@@ -2,25 +2,58 @@
 """
 Novira User Manual PDF Generator
 Generates a comprehensive, professional user manual PDF.
+The sections are generated from the in-app guide in components/guide (see
+docgen.guide_source); --source content uses content/user_manual/*.md instead.
+
+Paths default to the values below and can be set with NOVIRA_ARTIFACT_DIR,
+NOVIRA_LOGO_PATH and NOVIRA_USER_MANUAL_PDF, or --logo / --output. Images are
+looked up along --asset-dir / $NOVIRA_ASSET_PATH first (see docgen.assets).
+
+--locale de (repeatable, or "all") builds translated variants from the
+catalogs in content/user_manual/locales (see docgen.i18n) next to the output,
+e.g. Novira_User_Manual.de.pdf. The content is parsed and the images are
+prepared once; the variants are then rendered in parallel worker processes
+that inherit those caches.
+
+--optimize rewrites each finished PDF smaller and linearized for fast first
+page display on the website (see docgen.optimize), and reports the sizes
+before and after.
+
+The analytics section's charts (FACT_CHARTS in the guide, {chart ...} in the
+content files) are drawn as vector graphics from the aggregated
+SAMPLE_ANALYTICS arrays (see docgen.charts) instead of a screenshot.
+
+--previews also writes PNG previews of every page and a cover thumbnail next
+to each PDF (see docgen.previews).
 """
 
+import argparse
+import contextlib
+import io
+import multiprocessing
 import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import mm, inch
-from reportlab.lib.colors import HexColor, white, black
-from reportlab.platypus import (
-    SimpleDocTemplate, Paragraph, Spacer, Image, PageBreak,
-    Table, TableStyle, KeepTogether
-)
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
-from reportlab.pdfgen import canvas
-from PIL import Image as PILImage
+from reportlab.lib.units import mm
+
+from docgen import profiling
+from docgen.assets import AssetError, AssetResolver, add_asset_arguments, check_assets
+from docgen.content import compile_blocks, headings, image_refs, load_guide
+from docgen.i18n import (DEFAULT_LOCALE, Catalog, available_locales, catalog_path, extract, load_catalog,
+                         translate_sections, variant_path, write_template)
+from docgen.images import shared_image
+from docgen.manifest import record_build, should_build
+from docgen.render import RenderError, render_document
+from docgen.theme import get_theme
 
 # --- Configuration ---
-ARTIFACT_DIR = "/Users/ragav/.gemini/antigravity/brain/fdec7365-ccb0-4be8-8994-da201a34d932"
-LOGO_PATH = "/Users/ragav/Projects/novira/public/Novira.png"
-OUTPUT_PATH = "/Users/ragav/Projects/novira/Novira_User_Manual.pdf"
+ARTIFACT_DIR = os.environ.get("NOVIRA_ARTIFACT_DIR",
+                              "/Users/ragav/.gemini/antigravity/brain/fdec7365-ccb0-4be8-8994-da201a34d932")
+LOGO_PATH = os.environ.get("NOVIRA_LOGO_PATH", "/Users/ragav/Projects/novira/public/Novira.png")
+OUTPUT_PATH = os.environ.get("NOVIRA_USER_MANUAL_PDF", "/Users/ragav/Projects/novira/Novira_User_Manual.pdf")
+GUIDE_NAME = os.path.splitext(os.path.basename(__file__))[0]
+CONTENT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "content", "user_manual")
 
 # Screenshots
 SCREENSHOTS = {
@@ -39,96 +72,97 @@ SCREENSHOTS = {
     "settings_bottom": os.path.join(ARTIFACT_DIR, "settings_page_bottom_1771569775440.png"),
 }
 
-# Colors
-PRIMARY = HexColor("#7C3AED")  # Violet/purple
-DARK_BG = HexColor("#0F0B1A")
-SECONDARY = HexColor("#1E1B2E")
-TEXT_WHITE = HexColor("#F8F8FF")
-TEXT_MUTED = HexColor("#9CA3AF")
-ACCENT = HexColor("#A855F7")
-
-PAGE_W, PAGE_H = A4
-
-# --- Styles ---
-styles = getSampleStyleSheet()
-
-title_style = ParagraphStyle(
-    'ManualTitle', parent=styles['Title'],
-    fontSize=32, textColor=PRIMARY, spaceAfter=6*mm,
-    fontName='Helvetica-Bold', alignment=TA_CENTER
-)
+# Where the screenshots go in the sections extracted from the in-app guide
+# (--source guide): section id -> (key, caption, width, height in mm, the
+# sub-section they close, or None for right after the intro).
+GUIDE_SCREENSHOTS = {
+    "getting-started": [("signin", "Sign In Screen", 90, 140, "Create an account")],
+    "dashboard": [("dashboard", "Dashboard – Home Screen", 100, 140, None)],
+    "adding-transactions": [("add_expense", "Add Expense Form", 90, 135, "The fast path")],
+    "splits": [("settlements", "Settlements Tab", 130, 90, "Settling up")],
+    "buckets": [("personal_buckets", "Personal Buckets Tab", 130, 90, "Create a bucket")],
+    "search": [("search", "Search Page", 130, 90, None),
+               ("search_filters", "Filter & Sort Panel", 130, 100, "Filter panel")],
+    "groups": [("groups", "Groups Tab", 130, 100, "Create a group"),
+               ("friends", "Friends Tab", 130, 90, "Adding people")],
+    "data": [("import", "Import Transactions Page", 130, 90, "Import a bank statement")],
+    "settings": [("settings_top", "Settings – Profile & Data Management", 130, 100, "Profile"),
+                 ("settings_bottom", "Settings – Preferences & Security", 130, 100, "Below the panels")],
+}
 
-subtitle_style = ParagraphStyle(
-    'ManualSubtitle', parent=styles['Normal'],
-    fontSize=14, textColor=TEXT_MUTED, spaceAfter=12*mm,
-    fontName='Helvetica', alignment=TA_CENTER
-)
+# Pre-aggregated sample data behind the analytics charts ({chart key WxH} in
+# the content files), in the shapes the app's analytics hooks produce.
+SAMPLE_ANALYTICS = {
+    "trend_labels": ["Feb 1", "Feb 3", "Feb 5", "Feb 7", "Feb 9", "Feb 11", "Feb 13",
+                     "Feb 15", "Feb 17", "Feb 19", "Feb 21", "Feb 23", "Feb 25", "Feb 27"],
+    "trend": {
+        "food": [420, 380, 510, 460, 620, 540, 480, 450, 590, 610, 530, 700, 640, 580],
+        "transport": [180, 220, 160, 240, 200, 260, 190, 210, 250, 230, 270, 220, 240, 300],
+        "shopping": [0, 650, 120, 90, 0, 880, 300, 150, 0, 420, 960, 200, 80, 350],
+    },
+    "trend_prior": [700, 950, 720, 800, 680, 1300, 900, 820, 760, 1100, 1250, 980, 900, 1000],
+    "categories": {"food": 7480, "rent": 6500, "transport": 3170, "shopping": 4200, "bills": 2350,
+                   "entertainment": 1280, "healthcare": 640},
+    "methods": {"UPI": 11840, "Credit Card": 7260, "Cash": 3110, "Debit Card": 2190, "Bank Transfer": 1280},
+    "weekday": [2150, 1880, 2440, 2010, 3120, 4380, 3270],
+    "heatmap_start": "2026-02-01",
+    "heatmap": [0, 420, 180, 0, 650, 310, 1200, 90, 0, 260, 540, 0, 880, 1420, 150, 0, 330, 610, 240, 0,
+                960, 470, 0, 210, 380, 720, 0, 1580],
+}
+CHART_TITLES = ["Spending Trend", "Categories", "Payment Methods", "By Weekday", "Daily Heatmap"]
 
-heading1_style = ParagraphStyle(
-    'H1', parent=styles['Heading1'],
-    fontSize=22, textColor=PRIMARY, spaceBefore=8*mm,
-    spaceAfter=4*mm, fontName='Helvetica-Bold',
-    borderPadding=(0, 0, 2, 0),
-)
+theme = get_theme("manual")
+assets = AssetResolver.from_env()
+catalog = Catalog(DEFAULT_LOCALE)
 
-heading2_style = ParagraphStyle(
-    'H2', parent=styles['Heading2'],
-    fontSize=16, textColor=ACCENT, spaceBefore=6*mm,
-    spaceAfter=3*mm, fontName='Helvetica-Bold',
-)
 
-body_style = ParagraphStyle(
-    'Body', parent=styles['Normal'],
-    fontSize=11, textColor=black, spaceAfter=3*mm,
-    fontName='Helvetica', leading=16, alignment=TA_JUSTIFY,
-)
+def tr(text):
+    """Translate a generator string into the locale being built."""
+    return catalog.gettext(text)
 
-bullet_style = ParagraphStyle(
-    'Bullet', parent=body_style,
-    fontSize=11, leftIndent=15, spaceAfter=2*mm,
-    bulletIndent=5, fontName='Helvetica',
-)
 
-tip_style = ParagraphStyle(
-    'Tip', parent=body_style,
-    fontSize=10, textColor=HexColor("#059669"),
-    leftIndent=10, fontName='Helvetica-Oblique',
-    spaceBefore=2*mm, spaceAfter=4*mm,
-)
+PAGE_W, PAGE_H = A4
 
-caption_style = ParagraphStyle(
-    'Caption', parent=styles['Normal'],
-    fontSize=9, textColor=TEXT_MUTED, alignment=TA_CENTER,
-    spaceAfter=6*mm, fontName='Helvetica-Oblique',
-)
 
-toc_style = ParagraphStyle(
-    'TOC', parent=styles['Normal'],
-    fontSize=13, textColor=black, spaceAfter=3*mm,
-    fontName='Helvetica', leftIndent=10,
-)
+def load_reportlab():
+    """Import the ReportLab layer on first use.
 
-toc_sub_style = ParagraphStyle(
-    'TOCSub', parent=toc_style,
-    fontSize=11, leftIndent=30, textColor=HexColor("#4B5563"),
+    Importing this module, --help and up-to-date checks never pay for it.
+    """
+    global Paragraph, Spacer, SharedImage, PageBreak, Table, TableStyle, PageRef
+    from reportlab.platypus import (
+        Spacer, PageBreak,
+        Table, TableStyle,
+    )
+    from docgen.footer import PageRef
+    from docgen.paragraphs import Paragraph
+    from docgen.xobjects import SharedImage
+
+
+# Page layout shared by the full build and the cached section fragments
+DOC_KWARGS = dict(
+    pagesize=A4,
+    leftMargin=20*mm,
+    rightMargin=20*mm,
+    topMargin=18*mm,
+    bottomMargin=22*mm,
 )
 
-footer_style = ParagraphStyle(
-    'Footer', parent=styles['Normal'],
-    fontSize=8, textColor=TEXT_MUTED, alignment=TA_CENTER,
-)
+FOOTER_TEXT = "Novira User Manual  •  Page {page} of {count}"
 
 
 def get_scaled_image(path, max_width=140*mm, max_height=180*mm):
-    """Return an Image platypus object scaled to fit within bounds."""
+    """Return an image flowable scaled to fit within bounds, or None if it cannot be loaded.
+
+    The embedded file is resampled to the drawn size and shared by every use
+    of the same image (see docgen.images and docgen.xobjects).
+    """
     try:
-        pil_img = PILImage.open(path)
-        iw, ih = pil_img.size
-        ratio = min(max_width / iw, max_height / ih)
-        return Image(path, width=iw * ratio, height=ih * ratio, hAlign='CENTER')
+        src, width, height = shared_image(path, max_width, max_height)
+        return SharedImage(src, width, height, hAlign='CENTER')
     except Exception as e:
         print(f"  ⚠ Could not load {path}: {e}")
-        return Spacer(1, 10*mm)
+        return None
 
 
 def add_horizontal_rule(story):
@@ -137,801 +171,430 @@ def add_horizontal_rule(story):
     rule_data = [['', '']]
     rule_table = Table(rule_data, colWidths=[PAGE_W - 50*mm])
     rule_table.setStyle(TableStyle([
-        ('LINEABOVE', (0, 0), (-1, 0), 0.5, HexColor("#D1D5DB")),
+        ('LINEABOVE', (0, 0), (-1, 0), 0.5, theme.color("rule")),
     ]))
     story.append(rule_table)
     story.append(Spacer(1, 3*mm))
 
 
-def build_cover_page(story):
-    """Build the cover page with logo and title."""
-    story.append(Spacer(1, 45*mm))
-
-    # Logo
-    if os.path.exists(LOGO_PATH):
-        logo = get_scaled_image(LOGO_PATH, max_width=50*mm, max_height=50*mm)
-        story.append(logo)
-    story.append(Spacer(1, 8*mm))
-
-    # Title
-    story.append(Paragraph("NOVIRA", title_style))
-    story.append(Spacer(1, 3*mm))
-
-    # Tagline
-    story.append(Paragraph("User Manual", ParagraphStyle(
-        'Tag', parent=subtitle_style, fontSize=20, textColor=ACCENT
-    )))
-    story.append(Spacer(1, 8*mm))
-
-    story.append(Paragraph(
-        "Your complete guide to tracking expenses,<br/>splitting bills, and managing your finances.",
-        subtitle_style
-    ))
-
-    story.append(Spacer(1, 30*mm))
-
-    # Version & Date
-    info_data = [
-        ['Version', '1.0'],
-        ['Date', 'February 2026'],
-        ['Website', 'novira-one.vercel.app'],
-    ]
-    info_table = Table(info_data, colWidths=[35*mm, 60*mm], hAlign='CENTER')
-    info_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('TEXTCOLOR', (0, 0), (0, -1), PRIMARY),
-        ('TEXTCOLOR', (1, 0), (1, -1), HexColor("#4B5563")),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+def toc_entry(text, style, label, page=None):
+    """A TOC line with the page of heading `label` right-aligned (see PageRef)."""
+    entry = Table(
+        [[Paragraph(text, style), PageRef(label, theme.toc_page, page)]],
+        colWidths=[PAGE_W - 55*mm, 15*mm],
+    )
+    entry.setStyle(TableStyle([
+        ('LEFTPADDING', (0, 0), (-1, -1), 0),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 0),
+        ('TOPPADDING', (0, 0), (-1, -1), 0),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), style.spaceAfter),
     ]))
-    story.append(info_table)
-
-    story.append(PageBreak())
+    return entry
 
 
-def build_toc(story):
-    """Build Table of Contents."""
-    story.append(Paragraph("Table of Contents", heading1_style))
-    story.append(Spacer(1, 4*mm))
-
-    toc_items = [
-        ("1.", "Getting Started", [
-            "1.1  Creating an Account",
-            "1.2  Signing In",
-            "1.3  Navigation Overview",
-        ]),
-        ("2.", "Dashboard", [
-            "2.1  Spending Overview",
-            "2.2  Budget Tracker",
-            "2.3  Debt Summary",
-            "2.4  Recent Transactions",
-            "2.5  Transaction Management",
-        ]),
-        ("3.", "Adding Expenses", [
-            "3.1  Basic Fields",
-            "3.2  Category Selection",
-            "3.3  Payment Methods",
-            "3.4  Currency Conversion",
-            "3.5  Personal Buckets",
-            "3.6  Splitting Expenses",
-            "3.7  Recurring Expenses",
-        ]),
-        ("4.", "Analytics", [
-            "4.1  Spending Trend",
-            "4.2  Category Breakdown",
-            "4.3  Payment Method Breakdown",
-        ]),
-        ("5.", "Groups & Friends", [
-            "5.1  Creating Groups",
-            "5.2  Adding Friends",
-            "5.3  Personal Buckets",
-            "5.4  Settlements",
-        ]),
-        ("6.", "Search & Filter", [
-            "6.1  Keyword Search",
-            "6.2  Advanced Filters",
-        ]),
-        ("7.", "Import Bank Statements", [
-            "7.1  Supported Formats",
-            "7.2  Import Process",
-        ]),
-        ("8.", "Settings & Preferences", [
-            "8.1  Profile Management",
-            "8.2  Data Management",
-            "8.3  Preferences",
-            "8.4  Security & Privacy",
-        ]),
-        ("9.", "Offline Capabilities & Sync", [
-            "9.1  Offline Mode",
-            "9.2  Automatic Synchronization",
-            "9.3  Pending Review",
-        ]),
-    ]
-
-    for num, title, subs in toc_items:
-        story.append(Paragraph(f"<b>{num}</b>  {title}", toc_style))
-        for sub in subs:
-            story.append(Paragraph(sub, toc_sub_style))
-    
-    story.append(PageBreak())
-
+@profiling.profiled
+def build_toc(story, sections, pages=None):
+    """Build Table of Contents from the section headings.
 
-def build_getting_started(story):
-    """Section 1: Getting Started."""
-    story.append(Paragraph("1. Getting Started", heading1_style))
-    add_horizontal_rule(story)
-    
-    story.append(Paragraph(
-        "Novira is a modern personal finance management application designed to help you "
-        "track your expenses, split bills with friends, and gain insights into your spending "
-        "habits. It works seamlessly on both mobile and desktop browsers.",
-        body_style
-    ))
-
-    # --- 1.1 Creating an Account ---
-    story.append(Paragraph("1.1  Creating an Account", heading2_style))
-    story.append(Paragraph(
-        "To start using Novira, you need to create an account. You have two options:",
-        body_style
-    ))
-    story.append(Paragraph("• <b>Email & Password:</b> Enter your email address and create a secure password. "
-        "Passwords must meet security requirements (minimum length, uppercase, lowercase, numbers, and special characters).",
-        bullet_style))
-    story.append(Paragraph("• <b>Google Sign-In:</b> Click \"Continue with Google\" to sign up instantly using your Google account.",
-        bullet_style))
-    story.append(Paragraph("💡 Tip: You can link both methods later from Settings for added security.", tip_style))
-
-    # --- 1.2 Signing In ---
-    story.append(Paragraph("1.2  Signing In", heading2_style))
-    story.append(Paragraph(
-        "Visit the Novira website and enter your credentials to sign in. You can also use "
-        "Google OAuth for a one-click login experience.",
-        body_style
-    ))
-
-    if os.path.exists(SCREENSHOTS["signin"]):
-        story.append(get_scaled_image(SCREENSHOTS["signin"], max_width=90*mm, max_height=140*mm))
-        story.append(Paragraph("Sign In Screen", caption_style))
-
-    # --- 1.3 Navigation ---
-    story.append(Paragraph("1.3  Navigation Overview", heading2_style))
-    story.append(Paragraph(
-        "Novira features an intuitive bottom navigation bar with quick access to all sections of the app:",
-        body_style
-    ))
-
-    nav_data = [
-        ['Icon', 'Section', 'Description'],
-        ['🏠', 'Home', 'Your Dashboard – spending overview and transactions'],
-        ['+', 'Add', 'Add a new expense or transaction'],
-        ['📊', 'Analytics', 'Charts and insights into your spending'],
-        ['👥', 'Groups', 'Manage groups, friends, buckets & settlements'],
-        ['🔍', 'Search', 'Search and filter through all transactions'],
-        ['⚙️', 'Settings', 'Profile, exports, preferences & security'],
-    ]
-    nav_table = Table(nav_data, colWidths=[15*mm, 25*mm, 105*mm], hAlign='CENTER')
-    nav_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('BACKGROUND', (0, 0), (-1, 0), PRIMARY),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('BACKGROUND', (0, 1), (-1, -1), HexColor("#F3F4F6")),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor("#D1D5DB")),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ('TOPPADDING', (0, 0), (-1, -1), 6),
-        ('ALIGN', (0, 0), (0, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-    ]))
-    story.append(nav_table)
+    `pages` maps section numbers ("2", "2.3") to page numbers; entries missing
+    from it are listed unnumbered. Without `pages` the numbers are filled in
+    as the document is saved, which takes a NumberedCanvas (docgen.footer).
+    """
+    story.append(Paragraph(tr("Table of Contents"), theme.heading1))
     story.append(Spacer(1, 4*mm))
-    
-    story.append(PageBreak())
 
-
-def build_dashboard_section(story):
-    """Section 2: Dashboard."""
-    story.append(Paragraph("2. Dashboard", heading1_style))
-    add_horizontal_rule(story)
-
-    story.append(Paragraph(
-        "The Dashboard is your home screen – the first thing you see after logging in. "
-        "It provides a comprehensive overview of your financial status at a glance.",
-        body_style
-    ))
-
-    if os.path.exists(SCREENSHOTS["dashboard"]):
-        story.append(get_scaled_image(SCREENSHOTS["dashboard"], max_width=100*mm, max_height=140*mm))
-        story.append(Paragraph("Dashboard – Home Screen", caption_style))
-
-    # 2.1
-    story.append(Paragraph("2.1  Spending Overview", heading2_style))
-    story.append(Paragraph(
-        "The prominent spending card shows your <b>Personal Share Spent</b> for the current month. "
-        "This reflects only your share of expenses, excluding amounts owed by others in split transactions.",
-        body_style
-    ))
-
-    # 2.2
-    story.append(Paragraph("2.2  Budget Tracker", heading2_style))
-    story.append(Paragraph(
-        "Below the spending amount, you'll see your monthly budget with a progress bar:",
-        body_style
-    ))
-    story.append(Paragraph("• <b>Budget:</b> Your total monthly budget (configurable in Settings).", bullet_style))
-    story.append(Paragraph("• <b>Remaining:</b> How much of your budget is left.", bullet_style))
-    story.append(Paragraph("• <b>Progress Bar:</b> Visual indicator of budget usage percentage.", bullet_style))
-    story.append(Paragraph("• <b>Day of Month:</b> Shows the current day for context.", bullet_style))
-    story.append(Paragraph("💡 Tip: Enable Budget Alerts in Settings to receive notifications when approaching your limit.", tip_style))
-
-    # 2.3
-    story.append(Paragraph("2.3  Debt Summary", heading2_style))
-    story.append(Paragraph(
-        "Two cards at the bottom show your debt status:",
-        body_style
-    ))
-    story.append(Paragraph("• <b>You Are Owed:</b> Total amount friends owe you from split expenses.", bullet_style))
-    story.append(Paragraph("• <b>You Owe:</b> Total amount you owe to others.", bullet_style))
-
-    # 2.4
-    story.append(Paragraph("2.4  Recent Transactions", heading2_style))
-    story.append(Paragraph(
-        "Scroll down to see your recent transactions listed chronologically. Each transaction "
-        "shows the description, amount, category icon, and date. Transactions from group splits "
-        "will also show the group name.",
-        body_style
-    ))
-
-    # 2.5
-    story.append(Paragraph("2.5  Transaction Management", heading2_style))
-    story.append(Paragraph("You can manage each transaction by tapping on it:", body_style))
-    story.append(Paragraph("• <b>Edit:</b> Modify the description, amount, or category of a transaction.", bullet_style))
-    story.append(Paragraph("• <b>Delete:</b> Remove a transaction permanently (with confirmation).", bullet_style))
-    story.append(Paragraph("• <b>Audit Log:</b> View the history of changes made to any transaction.", bullet_style))
+    for level, heading in headings(sections):
+        num, _, title = heading.partition(" ")
+        label = num.rstrip(".")
+        if level == 1:
+            text, style = f"<b>{num}</b>  {title}", theme.toc
+        elif label.count(".") == 1:
+            text, style = heading, theme.toc_sub
+        else:
+            continue
+        if pages is None:
+            story.append(toc_entry(text, style, label))
+        elif label in pages:
+            story.append(toc_entry(text, style, label, pages[label]))
+        else:
+            story.append(Paragraph(text, style))
 
     story.append(PageBreak())
 
 
-def build_add_expense_section(story):
-    """Section 3: Adding Expenses."""
-    story.append(Paragraph("3. Adding Expenses", heading1_style))
-    add_horizontal_rule(story)
-
-    story.append(Paragraph(
-        "The Add Expense screen is where you record new transactions. It provides a rich, "
-        "intuitive form with all the options you need.",
-        body_style
-    ))
-
-    if os.path.exists(SCREENSHOTS["add_expense"]):
-        story.append(get_scaled_image(SCREENSHOTS["add_expense"], max_width=90*mm, max_height=135*mm))
-        story.append(Paragraph("Add Expense Form", caption_style))
-
-    # 3.1
-    story.append(Paragraph("3.1  Basic Fields", heading2_style))
-    story.append(Paragraph("• <b>Amount (required):</b> Enter the expense amount. The large input field makes it easy to type quickly.", bullet_style))
-    story.append(Paragraph("• <b>Description (required):</b> A short description of the expense (e.g., \"Lunch at café\").", bullet_style))
-    story.append(Paragraph("• <b>Date (required):</b> Defaults to today. Tap to choose any date and time using the calendar picker.", bullet_style))
-    story.append(Paragraph("• <b>Notes (optional):</b> Add any additional notes or details about the expense.", bullet_style))
-
-    # 3.2
-    story.append(Paragraph("3.2  Category Selection", heading2_style))
-    story.append(Paragraph("Choose from the following expense categories:", body_style))
-
-    cat_data = [
-        ['Category', 'Examples'],
-        ['🍽️ Food & Dining', 'Restaurants, groceries, coffee shops'],
-        ['🚗 Transportation', 'Fuel, public transport, parking, ride-sharing'],
-        ['⚡ Bills & Utilities', 'Electricity, water, internet, phone bills'],
-        ['🛍️ Shopping', 'Clothing, electronics, online purchases'],
-        ['💊 Healthcare', 'Medicine, doctor visits, pharmacy'],
-        ['🎬 Entertainment', 'Movies, concerts, subscriptions, games'],
-        ['📦 Others', 'Any expense that does not fit above'],
-        ['❓ Uncategorized', 'Unclassified expenses'],
-    ]
-    cat_table = Table(cat_data, colWidths=[45*mm, 100*mm], hAlign='CENTER')
-    cat_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('BACKGROUND', (0, 0), (-1, 0), PRIMARY),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('BACKGROUND', (0, 1), (-1, -1), HexColor("#F9FAFB")),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor("#D1D5DB")),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
-        ('TOPPADDING', (0, 0), (-1, -1), 5),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-    ]))
-    story.append(cat_table)
-    story.append(Spacer(1, 4*mm))
-
-    # 3.3
-    story.append(Paragraph("3.3  Payment Methods", heading2_style))
-    story.append(Paragraph("Select how you paid for the expense:", body_style))
-    story.append(Paragraph("• <b>Cash</b> – Physical cash payment", bullet_style))
-    story.append(Paragraph("• <b>UPI</b> – Unified Payments Interface (Google Pay, PhonePe, etc.)", bullet_style))
-    story.append(Paragraph("• <b>Debit Card</b> – Direct bank card payment", bullet_style))
-    story.append(Paragraph("• <b>Credit Card</b> – Credit card payment", bullet_style))
-
-    # 3.4
-    story.append(Paragraph("3.4  Currency Conversion", heading2_style))
-    story.append(Paragraph(
-        "Novira supports multiple currencies: <b>USD ($)</b>, <b>EUR (€)</b>, and <b>INR (₹)</b>. "
-        "If you enter an expense in a different currency than your base currency, Novira will "
-        "automatically fetch the exchange rate for accurate conversion.",
-        body_style
-    ))
-    story.append(Paragraph("💡 Tip: Perfect for tracking expenses during international travel!", tip_style))
+def screenshot(key, max_width, max_height):
+    """Image hook for the content compiler; missing screenshots are left out."""
+    path = assets.resolve(image_path(key))
+    if path is None:
+        return None
+    with profiling.image_timer(key) as timing:
+        image = get_scaled_image(path, max_width=max_width, max_height=max_height)
+        timing["path"] = getattr(image, "filename", None)
+    return image
 
-    story.append(PageBreak())
 
-    # 3.5
-    story.append(Paragraph("3.5  Personal Buckets", heading2_style))
-    story.append(Paragraph(
-        "If you have created Personal Buckets (see Section 5.3), you can assign any expense "
-        "to a specific bucket. Buckets are private organizers that help you track spending "
-        "for specific goals or categories (e.g., \"Europe Trip\", \"Home Renovation\").",
-        body_style
-    ))
-
-    # 3.6
-    story.append(Paragraph("3.6  Splitting Expenses", heading2_style))
-    story.append(Paragraph(
-        "Toggle the <b>\"Split this expense\"</b> switch to divide the cost with others:",
-        body_style
-    ))
-    story.append(Paragraph("• <b>Split with a Group:</b> Select any of your groups and the expense will be split among all members.", bullet_style))
-    story.append(Paragraph("• <b>Split with Friends:</b> Select individual friends to split with.", bullet_style))
-    story.append(Paragraph("• <b>Even Split:</b> Divides the total equally among all parties (including you).", bullet_style))
-    story.append(Paragraph("• <b>Custom Amounts:</b> Manually enter how much each person owes.", bullet_style))
-    story.append(Paragraph(
-        "A live summary shows \"Others owe\" and \"Your share\" as you configure the split.",
-        body_style
-    ))
-
-    # 3.7
-    story.append(Paragraph("3.7  Recurring Expenses", heading2_style))
-    story.append(Paragraph(
-        "Toggle the <b>\"Recurring Expense\"</b> switch to automatically repeat this expense. "
-        "Choose from four frequency options:",
-        body_style
-    ))
-    story.append(Paragraph("• <b>Daily</b> – Repeats every day", bullet_style))
-    story.append(Paragraph("• <b>Weekly</b> – Repeats every week", bullet_style))
-    story.append(Paragraph("• <b>Monthly</b> – Repeats every month (most common for bills)", bullet_style))
-    story.append(Paragraph("• <b>Yearly</b> – Repeats once a year", bullet_style))
-    story.append(Paragraph(
-        "The next scheduled date is shown below the frequency selector. "
-        "Recurring templates can be managed from Settings.",
-        body_style
-    ))
+def image_path(key):
+    """The configured path of an image key (the key itself if unknown)."""
+    return LOGO_PATH if key == "logo" else SCREENSHOTS.get(key, key)
 
-    story.append(PageBreak())
 
+def analytics_chart(key, width, height):
+    """Chart hook for the content compiler, drawn from SAMPLE_ANALYTICS."""
+    from datetime import date
 
-def build_analytics_section(story):
-    """Section 4: Analytics."""
-    story.append(Paragraph("4. Analytics", heading1_style))
-    add_horizontal_rule(story)
-
-    story.append(Paragraph(
-        "The Analytics section provides rich visual insights into your spending patterns "
-        "using interactive charts and graphs.",
-        body_style
-    ))
-
-    if os.path.exists(SCREENSHOTS["analytics"]):
-        story.append(get_scaled_image(SCREENSHOTS["analytics"], max_width=130*mm, max_height=100*mm))
-        story.append(Paragraph("Analytics View", caption_style))
-
-    # 4.1
-    story.append(Paragraph("4.1  Spending Trend", heading2_style))
-    story.append(Paragraph(
-        "A glowing line chart shows your daily spending over the selected time period. "
-        "You can choose between <b>This Week</b>, <b>This Month</b>, or a <b>Custom date range</b> "
-        "to analyze different periods.",
-        body_style
-    ))
-
-    # 4.2
-    story.append(Paragraph("4.2  Category Breakdown", heading2_style))
-    story.append(Paragraph(
-        "An interactive pie chart shows how your spending is distributed across categories. "
-        "Each slice is color-coded and labeled with the category name and percentage. "
-        "Tap any slice to see the exact amount spent.",
-        body_style
-    ))
-
-    # 4.3
-    story.append(Paragraph("4.3  Payment Method Breakdown", heading2_style))
-    story.append(Paragraph(
-        "A second pie chart breaks down your spending by payment method (Cash, UPI, Card, etc.). "
-        "This helps you understand your payment preferences and spending channels.",
-        body_style
-    ))
-    story.append(Paragraph("💡 Tip: Use the date range filter to compare spending across different periods.", tip_style))
+    from docgen import charts
 
-    story.append(PageBreak())
+    data = SAMPLE_ANALYTICS
+    options = dict(base=theme.palette["primary"], light=theme.palette["accent"], gettext=tr)
+    weekdays = [tr(label) for label in charts.WEEKDAY_LABELS]
+    if key == "trend":
+        return charts.SpendingTrend(data["trend_labels"], data["trend"], width, height, prior=data["trend_prior"],
+                                    title=tr("Spending Trend"), **options)
+    if key in ("categories", "methods"):
+        totals = data[key]
+        return charts.CategoryBreakdown(list(totals), list(totals.values()), width, height,
+                                        colors=charts.PAYMENT_COLORS if key == "methods" else charts.CATEGORY_COLORS,
+                                        title=tr("Payment Methods" if key == "methods" else "Categories"), **options)
+    if key == "weekday":
+        return charts.WeekdayBars(data["weekday"], width, height, labels=weekdays, title=tr("By Weekday"), **options)
+    if key == "heatmap":
+        return charts.CalendarHeatmap(date.fromisoformat(data["heatmap_start"]), data["heatmap"], width, height,
+                                      labels=weekdays, title=tr("Daily Heatmap"), **options)
+    print(f"  ⚠ Unknown chart {key!r}")
+    return None
 
 
-def build_groups_section(story):
-    """Section 5: Groups & Friends."""
-    story.append(Paragraph("5. Groups & Friends", heading1_style))
-    add_horizontal_rule(story)
-
-    story.append(Paragraph(
-        "The Groups section is the social hub of Novira. It contains four tabs: "
-        "<b>Groups</b>, <b>Personal Buckets</b>, <b>Friends</b>, and <b>Settlements</b>.",
-        body_style
-    ))
-
-    # 5.1
-    story.append(Paragraph("5.1  Creating Groups", heading2_style))
-
-    if os.path.exists(SCREENSHOTS["groups"]):
-        story.append(get_scaled_image(SCREENSHOTS["groups"], max_width=130*mm, max_height=100*mm))
-        story.append(Paragraph("Groups Tab", caption_style))
-
-    story.append(Paragraph(
-        "Groups let you track shared expenses with roommates, travel buddies, or project teams.",
-        body_style
-    ))
-    story.append(Paragraph("How to create a group:", body_style))
-    story.append(Paragraph("1. Navigate to the <b>Groups</b> tab.", bullet_style))
-    story.append(Paragraph("2. Tap the <b>+ Create Group</b> button.", bullet_style))
-    story.append(Paragraph("3. Enter a group name and add members from your friends list.", bullet_style))
-    story.append(Paragraph("4. Start adding shared expenses!", bullet_style))
-    story.append(Paragraph(
-        "The Groups tab also shows a summary of how much <b>You Are Owed</b> and how much <b>You Owe</b> "
-        "across all groups.",
-        body_style
-    ))
-
-    # 5.2
-    story.append(Paragraph("5.2  Adding Friends", heading2_style))
-    
-    if os.path.exists(SCREENSHOTS["friends"]):
-        story.append(get_scaled_image(SCREENSHOTS["friends"], max_width=130*mm, max_height=90*mm))
-        story.append(Paragraph("Friends Tab", caption_style))
-
-    story.append(Paragraph(
-        "To split expenses, you first need to connect with other Novira users:",
-        body_style
-    ))
-    story.append(Paragraph("• <b>Add by Email:</b> Enter your friend's email address to send a friend request.", bullet_style))
-    story.append(Paragraph("• <b>QR Code:</b> Share your unique Novira QR code or scan a friend's QR code for instant connection.", bullet_style))
-    story.append(Paragraph(
-        "Friend requests appear in real-time. Once accepted, you can immediately start "
-        "splitting expenses together.",
-        body_style
-    ))
+def chart_strings():
+    """Every translatable string analytics_chart draws."""
+    from docgen.charts import CHART_TEXT, WEEKDAY_LABELS
+    return [*CHART_TITLES, *WEEKDAY_LABELS, *CHART_TEXT]
 
-    story.append(PageBreak())
 
-    # 5.3
-    story.append(Paragraph("5.3  Personal Buckets", heading2_style))
-
-    if os.path.exists(SCREENSHOTS["personal_buckets"]):
-        story.append(get_scaled_image(SCREENSHOTS["personal_buckets"], max_width=130*mm, max_height=90*mm))
-        story.append(Paragraph("Personal Buckets Tab", caption_style))
-
-    story.append(Paragraph(
-        "Personal Buckets are private spending organizers visible only to you. "
-        "Use them to track spending for specific goals or events:",
-        body_style
-    ))
-    story.append(Paragraph("• Create buckets like \"Vacation Fund\", \"Groceries\", or \"Wedding\".", bullet_style))
-    story.append(Paragraph("• Assign a custom icon to each bucket for easy identification.", bullet_style))
-    story.append(Paragraph("• Assign expenses to buckets when adding them.", bullet_style))
-    story.append(Paragraph("• Archive buckets when done – archived buckets appear separately at the bottom.", bullet_style))
-    story.append(Paragraph("• View total spending per bucket in the Analytics section.", bullet_style))
-
-    # 5.4
-    story.append(Paragraph("5.4  Settlements", heading2_style))
-
-    if os.path.exists(SCREENSHOTS["settlements"]):
-        story.append(get_scaled_image(SCREENSHOTS["settlements"], max_width=130*mm, max_height=90*mm))
-        story.append(Paragraph("Settlements Tab", caption_style))
-
-    story.append(Paragraph(
-        "The Settlements tab shows all pending payments between you and your friends/group members. "
-        "When someone marks a split as paid, it updates in real-time for both parties.",
-        body_style
-    ))
-    story.append(Paragraph("💡 Tip: Keep track of debts easily – Novira calculates net balances automatically.", tip_style))
+def prefetch_images(sections, strict=False, jobs=None):
+    """Resolve and prepare every image the sections use, before layout."""
+    refs = image_refs(sections)
+    print(f"  🖼️  Prefetching {len(refs)} image(s)...")
+    report = assets.prefetch({key: (image_path(key), bounds) for key, bounds in refs.items()}, jobs=jobs)
+    check_assets(report, strict)
+    return report
 
-    story.append(PageBreak())
 
+@profiling.profiled
+def build_section(story, section):
+    """Append a content section's flowables to the story."""
+    story.extend(compile_blocks(section.blocks, theme, screenshot, add_horizontal_rule, analytics_chart))
 
-def build_search_section(story):
-    """Section 6: Search & Filter."""
-    story.append(Paragraph("6. Search & Filter", heading1_style))
-    add_horizontal_rule(story)
-
-    story.append(Paragraph(
-        "The Search section lets you find any transaction quickly using keywords, filters, and sorting options.",
-        body_style
-    ))
-
-    if os.path.exists(SCREENSHOTS["search"]):
-        story.append(get_scaled_image(SCREENSHOTS["search"], max_width=130*mm, max_height=90*mm))
-        story.append(Paragraph("Search Page", caption_style))
-
-    # 6.1
-    story.append(Paragraph("6.1  Keyword Search", heading2_style))
-    story.append(Paragraph(
-        "Type any keyword in the search bar to instantly find transactions matching the description. "
-        "Search is case-insensitive and updates results as you type.",
-        body_style
-    ))
-
-    # 6.2
-    story.append(Paragraph("6.2  Advanced Filters", heading2_style))
-
-    if os.path.exists(SCREENSHOTS["search_filters"]):
-        story.append(get_scaled_image(SCREENSHOTS["search_filters"], max_width=130*mm, max_height=100*mm))
-        story.append(Paragraph("Filter & Sort Panel", caption_style))
-
-    story.append(Paragraph("Tap the filter icon to open the advanced Filter & Sort panel:", body_style))
-    story.append(Paragraph("• <b>Sort By:</b> Newest First, Oldest First, Highest Amount, Lowest Amount.", bullet_style))
-    story.append(Paragraph("• <b>Price Range:</b> Use the slider to set minimum and maximum amounts.", bullet_style))
-    story.append(Paragraph("• <b>Date Range:</b> Pick a specific start and end date.", bullet_style))
-    story.append(Paragraph("• <b>Categories:</b> Toggle categories on/off to show only relevant expenses.", bullet_style))
-    story.append(Paragraph("• <b>Payment Methods:</b> Filter by Cash, UPI, Debit Card, or Credit Card.", bullet_style))
-    story.append(Paragraph(
-        "The number of matching transactions is shown at the bottom. "
-        "Use the <b>Reset All</b> button to clear all filters at once.",
-        body_style
-    ))
 
-    story.append(PageBreak())
+# --- Footer callback ---
+def footer(page_num, page_count):
+    """Footer for the assembled section build; matches the full build's NumberedCanvas."""
+    if page_num > 1:
+        return tr(FOOTER_TEXT).format(page=page_num, count=page_count), PAGE_W / 2 - 20, 15*mm, 8, theme.color("muted")
+    return None
 
 
-def build_import_section(story):
-    """Section 7: Import Bank Statements."""
-    story.append(Paragraph("7. Import Bank Statements", heading1_style))
-    add_horizontal_rule(story)
-
-    story.append(Paragraph(
-        "Novira allows you to import transactions directly from your bank statements, "
-        "saving you the effort of manual entry.",
-        body_style
-    ))
-
-    if os.path.exists(SCREENSHOTS["import"]):
-        story.append(get_scaled_image(SCREENSHOTS["import"], max_width=130*mm, max_height=90*mm))
-        story.append(Paragraph("Import Transactions Page", caption_style))
-
-    # 7.1
-    story.append(Paragraph("7.1  Supported Formats", heading2_style))
-    story.append(Paragraph("Novira supports the following file formats:", body_style))
-    story.append(Paragraph("• <b>CSV</b> (Comma-Separated Values)", bullet_style))
-    story.append(Paragraph("• <b>Excel</b> (.xlsx) files", bullet_style))
-    story.append(Paragraph(
-        "The import system has built-in support for <b>HDFC Bank</b> and <b>SBI</b> statement formats, "
-        "and can also work with generic bank statements.",
-        body_style
-    ))
-
-    # 7.2
-    story.append(Paragraph("7.2  Import Process", heading2_style))
-    story.append(Paragraph("The import follows a simple 3-step wizard:", body_style))
-    story.append(Paragraph("<b>Step 1 – Upload:</b> Drag and drop your file or click \"Select File\" to browse.", bullet_style))
-    story.append(Paragraph("<b>Step 2 – Map Columns:</b> Match the columns in your file to Novira's fields "
-        "(Date, Description, Amount, Category). Novira intelligently pre-maps common column names.", bullet_style))
-    story.append(Paragraph("<b>Step 3 – Review:</b> Preview the parsed transactions, make corrections if needed, "
-        "and confirm the import.", bullet_style))
-    story.append(Paragraph("💡 Tip: The system auto-categorizes transactions based on common keywords in the description.", tip_style))
+def progress(section):
+    """Progress line for a content section, e.g. "🚀 Building Getting Started..."."""
+    title = section.meta.get("title") or section.title.partition(" ")[2] or section.title
+    return f"{section.meta.get('icon', '📄')} Building {title}..."
 
-    story.append(PageBreak())
 
+DOC_INFO = {
+    "Title": "Novira User Manual",
+    "Author": "Novira",
+    "Subject": "Complete guide to the Novira expense tracking application",
+}
 
-def build_settings_section(story):
-    """Section 8: Settings & Preferences."""
-    story.append(Paragraph("8. Settings & Preferences", heading1_style))
-    add_horizontal_rule(story)
-
-    story.append(Paragraph(
-        "The Settings page lets you customize your experience, manage your data, and control "
-        "your account security.",
-        body_style
-    ))
-
-    if os.path.exists(SCREENSHOTS["settings_top"]):
-        story.append(get_scaled_image(SCREENSHOTS["settings_top"], max_width=130*mm, max_height=100*mm))
-        story.append(Paragraph("Settings – Profile & Data Management", caption_style))
-
-    # 8.1
-    story.append(Paragraph("8.1  Profile Management", heading2_style))
-    story.append(Paragraph("• <b>Avatar:</b> Tap your profile picture to upload a custom avatar image.", bullet_style))
-    story.append(Paragraph("• <b>Full Name:</b> Update your display name.", bullet_style))
-    story.append(Paragraph("• <b>Monthly Budget:</b> Set your monthly spending budget. This value is used in the Dashboard budget tracker.", bullet_style))
-    story.append(Paragraph("Click <b>Save Changes</b> to apply your profile updates.", body_style))
-
-    # 8.2
-    story.append(Paragraph("8.2  Data Management", heading2_style))
-    story.append(Paragraph("• <b>Import Bank Statement:</b> Opens the Import page (see Section 7) to upload bank statements.", bullet_style))
-    story.append(Paragraph("• <b>Export CSV:</b> Download all your transactions as a CSV spreadsheet. "
-        "You can select a custom date range and filter by bucket.", bullet_style))
-    story.append(Paragraph("• <b>Export PDF:</b> Download a professionally formatted PDF report of your transactions. "
-        "Includes transaction type (personal/recurring) for easy reference.", bullet_style))
-
-    # Recurring Expenses
-    story.append(Paragraph("8.2.1  Recurring Expenses", heading2_style))
-    story.append(Paragraph(
-        "View and manage all your active recurring expense templates. Each template shows the "
-        "description, amount, frequency, start date, and next scheduled date. "
-        "You can delete any recurring template to stop future automatic entries.",
-        body_style
-    ))
 
-    story.append(PageBreak())
+def source_paths():
+    """Files the default (--source guide) sections are generated from; watched by docgen.watch."""
+    from docgen.guide_source import guide_files
+    return guide_files()
 
-    # 8.3
-    story.append(Paragraph("8.3  Preferences", heading2_style))
-
-    if os.path.exists(SCREENSHOTS["settings_bottom"]):
-        story.append(get_scaled_image(SCREENSHOTS["settings_bottom"], max_width=130*mm, max_height=100*mm))
-        story.append(Paragraph("Settings – Preferences & Security", caption_style))
-
-    story.append(Paragraph("• <b>Currency:</b> Choose between <b>USD ($)</b>, <b>EUR (€)</b>, or <b>INR (₹)</b> "
-        "as your default base currency.", bullet_style))
-    story.append(Paragraph("• <b>Budget Alerts:</b> Toggle on/off. When enabled, you'll receive alerts when "
-        "your spending approaches your monthly budget limit.", bullet_style))
-
-    # 8.4
-    story.append(Paragraph("8.4  Security & Privacy", heading2_style))
-    story.append(Paragraph("• <b>Account Email:</b> View your registered email and account linking status (Google/Email).", bullet_style))
-    story.append(Paragraph("• <b>Change Password:</b> Update your login password with a new secure password.", bullet_style))
-    story.append(Paragraph("• <b>Log Out:</b> Sign out of your account on this device.", bullet_style))
-    story.append(Paragraph("• <b>Delete Account:</b> Permanently delete your account and all associated data. "
-        "This action requires email OTP verification for security.", bullet_style))
-
-    story.append(Spacer(1, 10*mm))
-    add_horizontal_rule(story)
-    story.append(Spacer(1, 10*mm))
-
-    # Final note
-    story.append(Paragraph("Thank You for Using Novira!", ParagraphStyle(
-        'Final', parent=heading1_style, alignment=TA_CENTER, fontSize=20
-    )))
-    story.append(Spacer(1, 4*mm))
-    story.append(Paragraph(
-        "We hope this manual helps you make the most of Novira. For questions, feedback, "
-        "or feature requests, visit us at <b>novira-one.vercel.app</b>.",
-        ParagraphStyle('FinalBody', parent=body_style, alignment=TA_CENTER)
-    ))
-    story.append(Spacer(1, 6*mm))
-    story.append(Paragraph(
-        "Built with ❤️ in Dortmund, Germany",
-        ParagraphStyle('Love', parent=caption_style, fontSize=10)
-    ))
-
-
-def build_offline_section(story):
-    """Section 9: Offline Capabilities & Sync."""
-    story.append(Paragraph("9. Offline Capabilities & Sync", heading1_style))
-    add_horizontal_rule(story)
-
-    story.append(Paragraph(
-        "Novira is built as a Resilient Progressive Web App (PWA), meaning it continues to function "
-        "even when you lose internet connection. You can seamlessly add expenses offline.",
-        body_style
-    ))
-
-    # 9.1
-    story.append(Paragraph("9.1  Offline Mode", heading2_style))
-    story.append(Paragraph(
-        "When offline, the app displays a custom offline screen if you try to navigate to a new page. "
-        "However, you can still use the <b>Add Expense</b> feature. When you save an expense offline, "
-        "you will see a subtle blue notification: \"Saved — will sync when online\". "
-        "Your transaction is securely stored in your device's local database.",
-        body_style
-    ))
-
-    # 9.2
-    story.append(Paragraph("9.2  Automatic Synchronization", heading2_style))
-    story.append(Paragraph(
-        "Once your internet connection is restored, Novira automatically detects it and "
-        "silently syncs your queued transactions to the cloud. You will see a small "
-        "<b>Syncing...</b> indicator appear at the top of your screen during this process.",
-        body_style
-    ))
-
-    # 9.3
-    story.append(Paragraph("9.3  Pending Review", heading2_style))
-    story.append(Paragraph(
-        "In the rare event that a transaction fails to sync permanently (e.g., due to a server error), "
-        "it will appear in the <b>Settings</b> page under an <b>Offline Sync Failures</b> section. "
-        "From there, you can view the failed items and choose to <b>Retry Sync</b> or <b>Discard</b> them.",
-        body_style
-    ))
 
-    story.append(PageBreak())
+def load_sections(source):
+    """Return (cover, sections) for the given content source."""
+    cover, *sections = load_guide(CONTENT_DIR)
+    if source == "guide":
+        from docgen.guide_source import load_guide_sections
+        sections = load_guide_sections(images=GUIDE_SCREENSHOTS)
+    return cover, sections
 
 
-# --- Footer callback ---
-class NumberedCanvas(canvas.Canvas):
-    def __init__(self, *args, **kwargs):
-        canvas.Canvas.__init__(self, *args, **kwargs)
-        self._saved_page_states = []
-
-    def showPage(self):
-        self._saved_page_states.append(dict(self.__dict__))
-        self._startPage()
-
-    def save(self):
-        num_pages = len(self._saved_page_states)
-        for state in self._saved_page_states:
-            self.__dict__.update(state)
-            self.draw_page_number(num_pages)
-            canvas.Canvas.showPage(self)
-        canvas.Canvas.save(self)
-
-    def draw_page_number(self, page_count):
-        page_num = self._pageNumber
-        if page_num > 1:  # Skip page number on cover
-            self.setFont("Helvetica", 8)
-            self.setFillColor(HexColor("#9CA3AF"))
-            self.drawString(PAGE_W / 2 - 20, 15*mm, f"Novira User Manual  •  Page {page_num} of {page_count}")
-
-
-def main():
-    print("📄 Generating Novira User Manual PDF...")
+@profiling.profiled
+def build_full(output_path, cover, sections):
+    """Lay out the whole story in one pass (no section cache).
 
-    doc = SimpleDocTemplate(
-        OUTPUT_PATH,
-        pagesize=A4,
-        leftMargin=20*mm,
-        rightMargin=20*mm,
-        topMargin=18*mm,
-        bottomMargin=22*mm,
-        title="Novira User Manual",
-        author="Novira",
-        subject="Complete guide to the Novira expense tracking application",
-    )
+    The TOC's page numbers are filled in when the canvas saves, once the
+    headings have been laid out (docgen.footer.PageRef).
+    """
+    load_reportlab()
+    from docgen.footer import numbered_canvas
+    from docgen.sections import HeadingDocTemplate
 
+    profile = profiling.active()
     story = []
 
     print("  📕 Building cover page...")
-    build_cover_page(story)
+    if profile:
+        story.append(profile.mark(cover.name))
+    build_section(story, cover)
 
     print("  📑 Building table of contents...")
-    build_toc(story)
-
-    print("  🚀 Building Getting Started...")
-    build_getting_started(story)
+    if profile:
+        story.append(profile.mark("toc"))
+    build_toc(story, sections)
 
-    print("  🏠 Building Dashboard section...")
-    build_dashboard_section(story)
+    for section in sections:
+        print(f"  {progress(section)}")
+        if profile:
+            story.append(profile.mark(section.name))
+        build_section(story, section)
 
-    print("  ➕ Building Add Expense section...")
-    build_add_expense_section(story)
-
-    print("  📊 Building Analytics section...")
-    build_analytics_section(story)
+    print("  🔧 Assembling PDF...")
+    doc = HeadingDocTemplate(output_path,
+                             title=tr(DOC_INFO["Title"]),
+                             author=tr(DOC_INFO["Author"]),
+                             subject=tr(DOC_INFO["Subject"]),
+                             **DOC_KWARGS)
+    profiling.build(doc, story, numbered_canvas(tr(FOOTER_TEXT), theme.palette["muted"]))
 
-    print("  👥 Building Groups & Friends section...")
-    build_groups_section(story)
 
-    print("  🔍 Building Search section...")
-    build_search_section(story)
+def render_story(name, story):
+    """Render a story into a cached fragment and report whether it was reused."""
+    from docgen.sections import render_fragment
 
-    print("  📥 Building Import section...")
-    build_import_section(story)
+    fragment = render_fragment(name, story, DOC_KWARGS)
+    print(f"     {'♻️  cached' if fragment.cached else '🖨️  rendered'}: {fragment.pages} page(s)")
+    return fragment
 
-    print("  ⚙️  Building Settings section...")
-    build_settings_section(story)
 
-    print("  📶  Building Offline section...")
-    build_offline_section(story)
+@profiling.profiled
+def build_sectioned(output_path, cover_section, sections):
+    """Render each section into its own cached fragment and concatenate them."""
+    load_reportlab()
+    from docgen import fonts
+    from docgen.charts import SYMBOLS
+    from docgen.sections import assemble, page_numbers, settle_toc
 
-    print("  🔧 Assembling PDF...")
-    doc.build(story, canvasmaker=NumberedCanvas)
+    # Embed the same font subsets in every fragment, so they are written once.
+    fonts.seed(extract([cover_section, *sections], [tr("Table of Contents"), *map(tr, chart_strings()), SYMBOLS]))
+    try:
+        print("  📕 Building cover page...")
+        story = []
+        build_section(story, cover_section)
+        cover = render_story("cover", story)
+
+        # A fragment always starts on a new page, so a section that does not end
+        # with a page break shares its fragment with the sections that follow it.
+        body = []
+        story, names = [], []
+        for i, section in enumerate(sections):
+            print(f"  {progress(section)}")
+            build_section(story, section)
+            names.append(section.name)
+            if i == len(sections) - 1 or (story and isinstance(story[-1], PageBreak)):
+                body.append(render_story("+".join(names), story))
+                story, names = [], []
+
+        # The TOC shows global page numbers, which depend on its own length.
+        print("  📑 Building table of contents...")
+        toc = None
+
+        def layout_toc(pages):
+            nonlocal toc
+            story = []
+            build_toc(story, sections, pages)
+            toc = render_story("toc", story)
+            return page_numbers(body, first_page=cover.pages + toc.pages + 1)
+
+        settle_toc(layout_toc, page_numbers(body, first_page=cover.pages + 2))
+
+        print("  🔧 Assembling PDF...")
+        profile = profiling.active()
+        if profile:
+            for fragment in (cover, toc, *body):
+                profile.section(fragment.name, fragment.pages)
+        assemble([cover, toc, *body], output_path, {k: tr(v) for k, v in DOC_INFO.items()}, footer=footer)
+    finally:
+        fonts.seed(())
+
+
+def variant_name(locale):
+    """Manifest name of a locale's variant."""
+    return GUIDE_NAME if locale == DEFAULT_LOCALE else f"{GUIDE_NAME}.{locale}"
+
+
+def build_variant(locale, cover, sections, no_section_cache=False, output_path=None):
+    """Translate the parsed sections into `locale` and build that variant.
+
+    It is written to `output_path` (a path or a binary file object), by
+    default the locale's variant of OUTPUT_PATH.
+    """
+    global catalog
+    catalog = load_catalog(CONTENT_DIR, locale)
+    cover, *sections = translate_sections([cover, *sections], catalog)
+    output_path = output_path or variant_path(OUTPUT_PATH, locale)
+    if no_section_cache:
+        build_full(output_path, cover, sections)
+    else:
+        build_sectioned(output_path, cover, sections)
+    return output_path
+
+
+def render(output, locale=DEFAULT_LOCALE, source="guide", section_cache=True):
+    """Render one locale's manual into `output`, a path or a binary file object.
+
+    The on-demand counterpart of main() (see docgen.render): no manifest
+    check, and the images are prefetched without --strict.
+    """
+    if source not in ("guide", "content"):
+        raise RenderError(f"unknown source {source!r}")
+    if locale not in available_locales(CONTENT_DIR):
+        raise RenderError(f"no catalog for locale {locale!r}")
+    cover, sections = load_sections(source)
+    prefetch_images([cover, *sections])
+    build_variant(locale, cover, sections, not section_cache, output)
+
+
+def _build_variant_quietly(locale, cover, sections, no_section_cache):
+    """build_variant in a worker process, returning its output instead of printing it."""
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log):
+        output_path = build_variant(locale, cover, sections, no_section_cache)
+    return output_path, log.getvalue()
+
+
+def build_variants(locales, cover, sections, no_section_cache=False, jobs=None):
+    """Build several locales at once; yield (locale, output path) as each finishes.
+
+    Workers are forked after the content was parsed and the images prepared,
+    so every variant starts with those caches (and the theme's styles and
+    font metrics) already warm. While a build profile is active they are
+    built one after another in this process, where the profiler records them.
+    """
+    if (len(locales) == 1 or profiling.active() is not None
+            or "fork" not in multiprocessing.get_all_start_methods()):
+        for locale in locales:
+            print(f"  🌐 Building {locale}...")
+            yield locale, build_variant(locale, cover, sections, no_section_cache)
+        return
+    jobs = jobs or min(len(locales), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context("fork")) as pool:
+        futures = [(locale, pool.submit(_build_variant_quietly, locale, cover, sections, no_section_cache))
+                   for locale in locales]
+        for locale, future in futures:
+            output_path, log = future.result()
+            print(f"  🌐 {locale}:")
+            print(log, end="")
+            yield locale, output_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the Novira User Manual PDF.")
+    parser.add_argument("--force", action="store_true", help="rebuild even if no inputs changed")
+    parser.add_argument("--no-section-cache", action="store_true",
+                        help="lay out the whole manual in one pass instead of assembling cached sections")
+    parser.add_argument("--source", choices=("guide", "content"), default="guide",
+                        help="take the sections from the in-app guide (default) or from content/user_manual")
+    parser.add_argument("-o", "--output", help="output PDF path (default: $NOVIRA_USER_MANUAL_PDF)")
+    parser.add_argument("--logo", help="logo image (default: $NOVIRA_LOGO_PATH)")
+    parser.add_argument("--locale", action="append", metavar="LOCALE",
+                        help="build this translation (repeatable; \"all\" for every catalog); default: en")
+    parser.add_argument("--extract-messages", metavar="LOCALE",
+                        help="write LOCALE's catalog with every translatable string and exit")
+    parser.add_argument("--optimize", action="store_true",
+                        help="compress, deduplicate and linearize the finished PDFs")
+    parser.add_argument("--previews", action="store_true",
+                        help="write PNG page previews and a cover thumbnail next to each PDF")
+    add_asset_arguments(parser)
+    parser.add_argument("--profile", metavar="JSON",
+                        help="write build timings, allocations and section sizes to this file")
+    parser.add_argument("--pstats", metavar="FILE", help="also write a cProfile dump for pstats")
+    parser.add_argument("--no-allocations", action="store_true",
+                        help="profile without tracemalloc, whose overhead inflates the timings")
+    args = parser.parse_args(argv)
+
+    global OUTPUT_PATH, LOGO_PATH, assets
+    OUTPUT_PATH = args.output or OUTPUT_PATH
+    LOGO_PATH = args.logo or LOGO_PATH
+    assets = AssetResolver.from_env(args.asset_dir)
+
+    if args.extract_messages:
+        cover, sections = load_sections(args.source)
+        path = catalog_path(CONTENT_DIR, args.extract_messages)
+        existing = load_catalog(CONTENT_DIR, args.extract_messages).messages if os.path.exists(path) else {}
+        strings = extract([cover, *sections], ["Table of Contents", FOOTER_TEXT, *DOC_INFO.values(), *chart_strings()])
+        write_template(path, args.extract_messages, strings, existing)
+        print(f"✅ {len(strings)} message(s) written to: {path}")
+        return True
+
+    locales = args.locale or [DEFAULT_LOCALE]
+    if "all" in locales:
+        locales = available_locales(CONTENT_DIR)
 
-    print(f"\n✅ User Manual saved to: {OUTPUT_PATH}")
-    print(f"   File size: {os.path.getsize(OUTPUT_PATH) / 1024:.1f} KB")
+    print("📄 Generating Novira User Manual PDF...")
+    inputs = []
+    if args.source == "guide":
+        from docgen.guide_source import guide_files
+        inputs = guide_files()
+    fingerprints = {}
+    for locale in locales:
+        if locale == DEFAULT_LOCALE:
+            variant_inputs, options = inputs, [f"source={args.source}"]
+        else:
+            variant_inputs, options = [*inputs, catalog_path(CONTENT_DIR, locale)], [f"source={args.source}",
+                                                                                        f"locale={locale}"]
+        if args.optimize:
+            options = [*options, "optimize"]
+        if args.previews:
+            options = [*options, "previews"]
+        fingerprint = should_build(variant_name(locale), sys.modules[__name__], variant_path(OUTPUT_PATH, locale),
+                                   force=args.force, inputs=variant_inputs, options=options)
+        if fingerprint is not None:
+            fingerprints[locale] = fingerprint
+    if not fingerprints:
+        return False
+
+    profile = None
+    if args.profile or args.pstats:
+        profile = profiling.start(GUIDE_NAME, allocations=not args.no_allocations,
+                                  cprofile=bool(args.pstats))
+    cover, sections = load_sections(args.source)
+    try:
+        prefetch_images([cover, *sections], args.strict, args.jobs)
+    except AssetError as e:
+        e.report()
+        sys.exit(1)
+    outputs, optimized, previews = [], {}, {}
+    for locale, output_path in build_variants(list(fingerprints), cover, sections, args.no_section_cache,
+                                              args.jobs):
+        if args.optimize:
+            from docgen.optimize import optimize_pdf
+            optimized[output_path] = optimize_pdf(output_path)
+        if args.previews:
+            from docgen.previews import render_previews
+            previews[output_path] = render_previews(output_path, jobs=args.jobs)
+        record_build(variant_name(locale), fingerprints[locale], output_path)
+        outputs.append(output_path)
+
+    if profile:
+        profile.finish(outputs[0])
+        if args.profile:
+            profile.write(args.profile)
+            print(f"   ⏱  Profile written to: {args.profile}")
+        if args.pstats:
+            profile.dump_stats(args.pstats)
+
+    for output_path in outputs:
+        print(f"\n✅ User Manual saved to: {output_path}")
+        if output_path in optimized:
+            print(f"   File size: {optimized[output_path]}")
+        else:
+            print(f"   File size: {os.path.getsize(output_path) / 1024:.1f} KB")
+        if output_path in previews:
+            print(f"   🖼  Previews: {previews[output_path]}")
+    return True
 
 
 if __name__ == "__main__":
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Novira Monthly Recap PDF Batch
+Renders one PDF per user and period from the stored recaps
+(public.monthly_recaps, written by lib/recap-generator.ts), with the user
+manual's page layout, styles and logo. See docgen.recaps and docgen.batch.
+
+Recaps are read from a JSON Lines fixture (--fixtures: one monthly_recaps
+row per line with the profile's "currency" and "full_name" added) or from
+Postgres (--database, needs psycopg). By default the previous calendar month
+is rendered, as a nightly job after the month ends would. PDFs are written to
+<output>/<month>/<user_id>.pdf.
+
+Users are sharded over the worker processes (--jobs) and, with --shard I/N,
+over machines. Every finished PDF is checkpointed with a digest of its
+content, so an interrupted run resumes where it stopped and a repeated run
+only renders recaps that are new or changed since.
+"""
+
+import argparse
+import os
+import sys
+
+from docgen.assets import AssetResolver
+from docgen.batch import BatchItem, run_batch
+from docgen.recaps import VALID_PERIOD, JsonlRecaps, PostgresRecaps, RecapError, RecapRenderer, previous_month
+from generate_user_manual import DOC_KWARGS, LOGO_PATH
+
+DATABASE_ENV = "NOVIRA_DATABASE_URL"
+
+
+def parse_shard(text):
+    try:
+        index, count = (int(part) for part in text.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected I/N, got {text!r}") from None
+    if not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"shard index must be in 0..{count - 1}")
+    return index, count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render Novira monthly recap PDFs for every user.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--fixtures", metavar="JSONL", help="read recap rows from this JSON Lines file")
+    source.add_argument("--database", metavar="DSN",
+                        help=f"read recaps from this Postgres database (default: ${DATABASE_ENV})")
+    parser.add_argument("-o", "--output", default="recaps", help="output directory (default: recaps)")
+    parser.add_argument("--month", action="append", metavar="PERIOD",
+                        help='period to render, e.g. 2026-04 or 2026-FY (repeatable, or "all"; '
+                             "default: the previous month)")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--shard", type=parse_shard, default=(0, 1), metavar="I/N",
+                        help="render only shard I of N of the users, to split a run over machines")
+    parser.add_argument("--logo", help="logo image (default: $NOVIRA_LOGO_PATH)")
+    parser.add_argument("--force", action="store_true", help="render every recap, ignoring the checkpoints")
+    args = parser.parse_args(argv)
+
+    months = args.month or [previous_month()]
+    if "all" in months:
+        months = None
+    elif not all(VALID_PERIOD.match(m) for m in months):
+        parser.error("periods look like 2026-04 or 2026-FY")
+    if args.fixtures:
+        recaps = JsonlRecaps(args.fixtures)
+    elif args.database or os.environ.get(DATABASE_ENV):
+        recaps = PostgresRecaps(args.database or os.environ[DATABASE_ENV])
+    else:
+        parser.error(f"give --fixtures or --database (or set ${DATABASE_ENV})")
+
+    renderer = RecapRenderer(DOC_KWARGS, AssetResolver.from_env().resolve(args.logo or LOGO_PATH))
+    output = os.path.abspath(args.output)
+
+    def items(shard, shards):
+        for row in recaps.rows(months, shard, shards):
+            yield BatchItem(f"{row['month']}/{row['user_id']}", renderer.digest(row),
+                            os.path.join(output, row["month"], f"{row['user_id']}.pdf"), row)
+
+    print(f"📄 Rendering monthly recaps ({'all periods' if months is None else ', '.join(months)})...")
+    print("  🔥 Warming styles, fonts and logo...")
+    renderer.warm()
+    try:
+        result = run_batch(items, renderer.render, output, jobs=args.jobs, shard=args.shard, force=args.force)
+    except RecapError as e:
+        print(f"❌ {e}")
+        return 1
+    except KeyboardInterrupt:
+        return 130
+
+    for key, error in result.failures:
+        print(f"  ❌ {key}: {error}")
+    print(f"\n{'✅' if not result.total('failed') else '❌'} Recaps: {result} -> {output}")
+    return 1 if result.total("failed") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Novira Guide Render Service
+Serves every guide (scripts/generate_*.py) as a PDF rendered on demand over HTTP (see docgen.server).
+"""
+
+import argparse
+import sys
+
+from docgen.driver import discover_guides
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("guides", nargs="*", help="guide modules to serve (default: all)")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="port to listen on (default: 8765)")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="render worker processes (default: one per CPU)")
+    parser.add_argument("--max-pending", type=int, default=None,
+                        help="distinct renders queued or running before requests get 503 (default: 4 per worker)")
+    parser.add_argument("--no-warm", action="store_true", help="start the workers without rendering each guide first")
+    args = parser.parse_args(argv)
+
+    from docgen.server import RenderService, make_server
+
+    available = discover_guides()
+    names = args.guides or available
+    unknown = sorted(set(names) - set(available))
+    if unknown:
+        parser.error(f"unknown guide(s): {', '.join(unknown)}")
+
+    service = RenderService(names, jobs=args.jobs, max_pending=args.max_pending)
+    if not args.no_warm:
+        print(f"🔥 Warming up {len(names)} guide(s)...")
+        for name, seconds in service.warm():
+            print(f"  ✅ {name}: {seconds:.2f}s")
+    service.start()
+    server = make_server(service, args.host, args.port)
+    print(f"🌐 Serving on http://{args.host}:{server.server_port}/guides with {service.jobs} worker(s) "
+          f"(Ctrl-C to stop)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""
+Shared setup for the docgen tests.
+
+Makes the scripts and benchmarks directories importable (the benchmarks'
+synthetic exports double as test data) and points the build cache at a
+throwaway directory, so tests neither read nor pollute .cache/docgen.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, os.path.join(SCRIPTS_DIR, "benchmarks"))
+
+CACHE_DIR = tempfile.mkdtemp(prefix="docgen-tests-")
+os.environ["NOVIRA_DOC_CACHE"] = CACHE_DIR
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(CACHE_DIR, ignore_errors=True)
+
+
+def _footer(page_num, page_count):
+    from reportlab.lib.colors import Color
+
+    if page_num > 1:
+        return f"Page {page_num} of {page_count}", 280, 40, 8, Color(0.6, 0.6, 0.6)
+    return None
+
+
+@pytest.fixture(scope="session")
+def fragments():
+    """Three two-page section fragments, as the manual's sectioned build renders them."""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+    from reportlab.platypus import PageBreak, Paragraph
+
+    from docgen.sections import render_fragment
+
+    styles = getSampleStyleSheet()
+    h1 = ParagraphStyle("H1", parent=styles["Heading1"])  # docgen.sections.HEADING_STYLES
+    h2 = ParagraphStyle("H2", parent=styles["Heading2"])
+    result = []
+    for number in range(1, 4):
+        story = [
+            Paragraph(f"{number}. Section {number}", h1),
+            Paragraph(f"Body text of section {number}. " * 40, styles["Normal"]),
+            PageBreak(),
+            Paragraph(f"{number}.1 Details", h2),
+            Paragraph("More text.", styles["Normal"]),
+        ]
+        result.append(render_fragment(f"section{number}", story, {"pagesize": A4}))
+    return result
+
+
+@pytest.fixture(scope="session")
+def assembled(fragments, tmp_path_factory):
+    """Path of the fragments assembled into one PDF with footers."""
+    from docgen.sections import assemble
+
+    path = str(tmp_path_factory.mktemp("assembled") / "manual.pdf")
+    assemble(fragments, path, {"Title": "Test Manual"}, footer=_footer)
+    return path
@@ -0,0 +1,40 @@
+import { Bell, Hand } from 'lucide-react';
+import { GuideSection } from '../guide-section';
+import { Callout } from '../callout';
+
+// Reformatted with two-space indentation and a trailing comma layout the
+// manual's extractor must not depend on.
+const RELEASES: Release[] = [
+  {
+  version: '2.61',
+  date: '2026-05-13',
+  headline: 'Install anywhere, gesture-first.',
+  items: [
+  {
+  icon: Hand,
+  title: 'Swipe-to-edit',
+  description: (
+  <>Swipe left to reveal <strong>Edit</strong> [and Delete]; it's quick.</>
+  ),
+  href: '#gestures',
+  },
+  ],
+  },
+  { version: '2.60', date: '2026-04-02', headline: 'Reminders that don\'t nag.', items: [
+    { icon: Bell, title: 'Bill reminders', description: <>Pick <em>1 day</em> or <em>3 days</em>.</> },
+    { icon: Bell, title: 'Quiet hours', description: <>Nothing between 22:00 and 07:00.</> },
+  ] },
+];
+
+export function WhatsNewSection() {
+  return (
+    <GuideSection id="whats-new" eyebrow="Updates" title="What's new" intro="Recent releases.">
+      <ul>
+        {RELEASES.map((release) => (
+          <li key={release.version}>{release.headline}</li>
+        ))}
+      </ul>
+      <Callout type="tip" title="Stay current">Updates install themselves.</Callout>
+    </GuideSection>
+  );
+}
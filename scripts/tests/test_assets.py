@@ -0,0 +1,34 @@
+"""
+Missing assets in the guide generators (docgen.assets).
+"""
+
+import os
+
+import pytest
+
+import generate_advanced_guide as guide
+
+
+@pytest.fixture
+def missing_screenshots(monkeypatch, tmp_path):
+    monkeypatch.setattr(guide, "SCREENSHOTS", {key: str(tmp_path / os.path.basename(path))
+                                               for key, path in guide.SCREENSHOTS.items()})
+    monkeypatch.setattr(guide, "assets", guide.assets)
+    monkeypatch.setattr(guide, "OUTPUT_PATH", guide.OUTPUT_PATH)
+    monkeypatch.setattr(guide, "LOGO_PATH", guide.LOGO_PATH)
+    return tmp_path / "guide.pdf"
+
+
+def test_missing_images_are_left_out(missing_screenshots):
+    assert guide.main(["--force", "-o", str(missing_screenshots)])
+    assert missing_screenshots.exists()
+    assert guide.screenshot("audit_log", 100, 100) is None
+
+
+def test_strict_exits_listing_missing_images(missing_screenshots, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        guide.main(["--force", "--strict", "-o", str(missing_screenshots)])
+    assert exit_info.value.code == 1
+    err = capsys.readouterr().err
+    assert all(f"missing {key}:" in err for key in guide.SCREENSHOTS)
+    assert not missing_screenshots.exists()
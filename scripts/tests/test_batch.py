@@ -0,0 +1,114 @@
+"""
+Sharded, resumable batch rendering (docgen.batch).
+"""
+
+import hashlib
+import os
+
+import pytest
+
+from docgen.batch import BatchItem, load_checkpoints, run_batch, shard_of
+
+KEYS = [f"2026-04/user{i}" for i in range(40)]
+
+
+class Batch:
+    """BatchItems for KEYS under `output`, with a digest per key; records what it renders."""
+
+    def __init__(self, output):
+        self.output = output
+        self.digests = {key: "v1" for key in KEYS}
+        self.rendered = []
+        self.fail_after = None
+
+    def items(self, shard, shards):
+        for key in KEYS:
+            if shard_of(key, shards) == shard:
+                yield BatchItem(key, self.digests[key], os.path.join(self.output, f"{key}.pdf"), key)
+
+    def render(self, key):
+        if self.fail_after is not None and len(self.rendered) == self.fail_after:
+            raise KeyboardInterrupt
+        self.rendered.append(key)
+        return f"%PDF {key} {self.digests[key]}".encode()
+
+    def run(self, jobs=1, shard=(0, 1)):
+        return run_batch(self.items, self.render, self.output, jobs=jobs, shard=shard)
+
+
+@pytest.fixture
+def batch(tmp_path):
+    return Batch(str(tmp_path))
+
+
+def test_shard_matches_the_postgres_expression():
+    key = "2026-04/user0"
+    bits = int(hashlib.md5(key.encode()).hexdigest()[:15], 16)  # ('x' || substr(md5(key), 1, 15))::bit(60)
+    assert shard_of(key, 7) == bits % 7
+
+
+def test_worker_sub_shards_stay_inside_their_shard():
+    shards, jobs = 3, 4
+    for key in KEYS:
+        shard = shard_of(key, shards)
+        workers = [j for j in range(jobs) if shard_of(key, shards * jobs) == shard + shards * j]
+        assert len(workers) == 1
+
+
+def test_shards_render_every_item_once(batch):
+    # Two forked workers per shard: count what they wrote, not batch.rendered.
+    results = [batch.run(shard=(i, 3), jobs=2) for i in range(3)]
+    assert [r.total("rendered") for r in results] == [sum(shard_of(k, 3) == i for k in KEYS) for i in range(3)]
+    assert [[s.shard for s in r.shards] for r in results] == [[0, 3], [1, 4], [2, 5]]
+    assert set(load_checkpoints(batch.output)) == set(KEYS)
+    assert all(os.path.exists(os.path.join(batch.output, f"{key}.pdf")) for key in KEYS)
+    checkpoints = sorted(os.listdir(os.path.join(batch.output, ".checkpoints")))
+    assert checkpoints == [f"shard-{i}-of-3.jsonl" for i in range(3)]
+
+
+def test_interrupted_run_resumes(batch):
+    batch.fail_after = 5
+    with pytest.raises(KeyboardInterrupt):
+        batch.run()
+    assert len(load_checkpoints(batch.output)) == 5
+
+    batch.fail_after = None
+    result = batch.run()
+    assert (result.total("skipped"), result.total("rendered")) == (5, len(KEYS) - 5)
+    assert sorted(batch.rendered) == sorted(KEYS)
+
+
+def test_changed_input_rebuilds_only_its_document(batch):
+    for i in range(2):
+        batch.run(shard=(i, 2))
+    changed = KEYS[7]
+    other_shard = 1 - shard_of(changed, 2)
+    checkpoint = os.path.join(batch.output, ".checkpoints", f"shard-{other_shard}-of-2.jsonl")
+    before = open(checkpoint).read()
+    batch.rendered.clear()
+
+    batch.digests[changed] = "v2"
+    results = [batch.run(shard=(i, 2)) for i in range(2)]
+    assert batch.rendered == [changed]
+    assert sum(r.total("skipped") for r in results) == len(KEYS) - 1
+    assert open(os.path.join(batch.output, f"{changed}.pdf"), "rb").read().endswith(b"v2")
+    assert open(checkpoint).read() == before
+    assert load_checkpoints(batch.output)[changed] == "v2"
+
+
+def test_missing_output_and_failures_are_rendered_again(batch):
+    batch.run()
+    os.unlink(os.path.join(batch.output, f"{KEYS[0]}.pdf"))
+    batch.rendered.clear()
+    render = batch.render
+
+    def flaky(key):
+        if key == KEYS[1]:
+            raise ValueError("bad recap")
+        return render(key)
+
+    batch.digests[KEYS[1]] = "v2"
+    result = run_batch(batch.items, flaky, batch.output, jobs=1)
+    assert batch.rendered == [KEYS[0]]
+    assert result.failures == [(KEYS[1], "ValueError: bad recap")]
+    assert batch.run().total("rendered") == 1
@@ -0,0 +1,34 @@
+"""
+Vector analytics charts (docgen.charts).
+"""
+
+import io
+
+import pytest
+from reportlab.platypus import SimpleDocTemplate
+
+from docgen import charts
+
+pypdf = pytest.importorskip("pypdf")
+
+
+def test_chart_is_abstract():
+    with pytest.raises(TypeError):
+        charts.Chart(100, 100)
+
+
+def test_cached_chart_renders_into_each_document():
+    def build():
+        chart = charts.WeekdayBars([10, 40, 25, 0, 5, 60, 30], 400, 150, title="By Weekday")
+        buffer = io.BytesIO()
+        SimpleDocTemplate(buffer).build([chart, chart])
+        return pypdf.PdfReader(buffer, strict=True)
+
+    charts.clear_cache()
+    first, second = build(), build()  # the second reuses the cached Drawing
+    for reader in (first, second):
+        page = reader.pages[0]
+        forms = page["/Resources"]["/XObject"]
+        assert len(forms) == 1  # both draws share one form
+        text = page.extract_text()
+        assert "PEAK · SAT" in text and "MON" in text
@@ -0,0 +1,108 @@
+"""
+Columnar transaction files (docgen.columnstore) and transaction_report.py
+reading them in place of JSON Lines.
+"""
+
+import json
+
+import pytest
+
+import transaction_report
+from bench_report_stats import COMPARED, close
+from bench_transaction_report import make_request, make_transactions
+from docgen import columnstore
+from docgen.columnstore import ColumnStore, ColumnStoreError, ColumnStoreWriter, is_column_store, write_column_store
+from docgen.report_columns import TransactionColumns, column_stats
+from test_report_stats import EDGE_CASES
+
+REQUEST = make_request()
+
+
+def stats(cols):
+    return column_stats(cols, REQUEST["currency"], REQUEST["rates"])
+
+
+def test_round_trip(tmp_path, monkeypatch):
+    # Small chunks so both the writer's spills and the reader's batches cross chunk boundaries.
+    monkeypatch.setattr(columnstore, "CHUNK_ROWS", 64)
+    transactions = list(make_transactions(500))
+    path = str(tmp_path / "tx.cols")
+    with ColumnStoreWriter(path, chunk_rows=64) as writer:
+        for tx in transactions:
+            writer.add(tx)
+
+    assert is_column_store(path)
+    with ColumnStore(path) as store:
+        assert len(store) == 500
+        assert store.manifest["splits"] == sum(len(tx.get("splits", ())) for tx in transactions)
+        rows = list(store)
+        assert [row for row, _ in rows] == list(range(500))
+        for original, (row, restored) in zip(transactions, rows):
+            assert {key: restored[key] for key in original} == original
+            assert store.get(row) == restored
+        expected = stats(TransactionColumns.from_transactions(transactions))
+        actual = stats(store.columns())
+        for name in COMPARED:
+            assert close(getattr(expected, name), getattr(actual, name)), name
+
+
+def test_invalid_rows_are_skipped(tmp_path):
+    path = str(tmp_path / "tx.cols")
+    manifest = write_column_store(path, [*EDGE_CASES, {"date": None, "amount": 5}, {"date": "2025-03-01"}])
+    assert manifest["rows"] == len(EDGE_CASES)
+    with ColumnStore(path) as store:
+        assert [tx["description"] for _, tx in store] == [tx["description"] for tx in EDGE_CASES]
+
+
+def test_no_transactions(tmp_path):
+    path = str(tmp_path / "empty.cols")
+    manifest = write_column_store(path, [])
+    assert (manifest["rows"], manifest["splits"]) == (0, 0)
+    with ColumnStore(path) as store:
+        assert len(store) == 0
+        assert list(store) == []
+        assert len(store.columns()) == 0
+        assert stats(store.columns()).total_expenses == 0
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / "empty.cols"
+    path.write_bytes(b"")
+    assert not is_column_store(str(path))
+    with pytest.raises(ColumnStoreError, match="empty file"):
+        ColumnStore(str(path))
+
+
+def test_not_a_column_store(tmp_path):
+    path = tmp_path / "tx.jsonl"
+    path.write_text('{"date": "2025-01-01", "amount": 1}\n')
+    assert not is_column_store(str(path))
+    with pytest.raises(ColumnStoreError, match="not a columnar transaction file"):
+        ColumnStore(str(path))
+
+
+def test_failed_write_leaves_no_file(tmp_path):
+    path = tmp_path / "tx.cols"
+
+    def transactions():
+        yield from make_transactions(10)
+        raise RuntimeError("export interrupted")
+
+    with pytest.raises(RuntimeError):
+        write_column_store(str(path), transactions())
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_report_from_columns_matches_jsonl(tmp_path):
+    request = tmp_path / "request.json"
+    request.write_text(json.dumps(REQUEST))
+    jsonl = tmp_path / "tx.jsonl"
+    with open(jsonl, "w") as f:
+        for tx in [*make_transactions(300), *EDGE_CASES]:
+            f.write(json.dumps(tx) + "\n")
+    columns, from_jsonl, from_columns = tmp_path / "tx.cols", tmp_path / "jsonl.pdf", tmp_path / "columns.pdf"
+
+    transaction_report.main([str(request), "--transactions", str(jsonl), "--save-columns", str(columns)])
+    transaction_report.main([str(request), "--transactions", str(jsonl), "-o", str(from_jsonl)])
+    transaction_report.main([str(request), "--transactions", str(columns), "-o", str(from_columns)])
+    assert from_jsonl.read_bytes() == from_columns.read_bytes()
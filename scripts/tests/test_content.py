@@ -0,0 +1,44 @@
+"""
+Compiling guide content to flowables (docgen.content).
+"""
+
+import io
+
+import pytest
+from reportlab.lib.pagesizes import A5
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle
+
+from docgen.content import _long_table
+
+pypdf = pytest.importorskip("pypdf")
+
+WIDTHS = [60, 180]
+STYLE = TableStyle([
+    ("FONTSIZE", (0, 0), (-1, -1), 10),
+    ("FONTSIZE", (0, 0), (-1, 0), 14),
+    ("LEFTPADDING", (0, 0), (-1, -1), 20),
+])
+
+
+def rows(count):
+    text = "a cell long enough to run past its column on one line " * 2
+    return [["Item", "Notes"]] + [[f"#{i}", f"{text}\nsecond line"] for i in range(count)]
+
+
+def pages(flowable):
+    buffer = io.BytesIO()
+    SimpleDocTemplate(buffer, pagesize=A5).build([flowable])
+    return [page.extract_text() for page in pypdf.PdfReader(buffer).pages]
+
+
+def test_row_height_is_measured_as_table_draws_it():
+    table = Table(rows(3), colWidths=WIDTHS, style=STYLE)
+    table.wrap(sum(WIDTHS), 0)
+    assert _long_table(rows(3), WIDTHS, 1, STYLE).row_height == table._rowHeights[1]
+
+
+def test_long_table_renders_like_a_table():
+    data = rows(60)
+    chunked = pages(_long_table(data, WIDTHS, 1, STYLE))
+    assert len(chunked) > 1
+    assert chunked == pages(Table(data, colWidths=WIDTHS, style=STYLE, repeatRows=1))
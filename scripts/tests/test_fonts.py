@@ -0,0 +1,83 @@
+"""
+TrueType fonts built on cached metrics (docgen.fonts).
+"""
+
+import contextlib
+import io
+import os
+
+import pytest
+
+from docgen import fonts
+
+
+@pytest.fixture(scope="module")
+def regular():
+    found = fonts.find_family()
+    if found is None:
+        pytest.skip("no Unicode font family installed")
+    return found[1][0]
+
+
+def face_state(face):
+    return {k: v for k, v in vars(face).items() if k not in ("_pos", "metrics") and not callable(v)}
+
+
+def test_cached_face_matches_a_parsed_face(regular):
+    from reportlab.pdfbase.ttfonts import TTFontFace
+
+    fonts.font_metrics(regular)
+    fonts._metrics.clear()  # restore from the file cache, not memory
+    cached = fonts._face_class()(regular)
+    parsed = TTFontFace(regular)
+    assert face_state(cached) == face_state(parsed)
+    assert [cached._pdfScale(x) for x in (0, 1, 2048)] == [parsed._pdfScale(x) for x in (0, 1, 2048)]
+
+
+def test_docgen_font_is_built_on_a_docgen_face(regular):
+    """TTFont.__init__ builds the face; catch a ReportLab upgrade bypassing the DocgenFace."""
+    from reportlab.pdfbase.ttfonts import TTFont, TTFontFace
+
+    ours = fonts._font_class()("DocgenTestFont", regular)
+    theirs = TTFont("DocgenTestFont", regular, shapable=False)
+    assert isinstance(ours.face, fonts._face_class())
+    assert TTFontFace is not fonts._face_class()
+    assert ours.stringWidth("Page 2 of 40 → ₹", 8) == theirs.stringWidth("Page 2 of 40 → ₹", 8)
+
+
+def draw_pdf(font_name, path):
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfgen.canvas import Canvas
+
+    pdfmetrics.registerFont(fonts._font_class()(font_name, path))
+    buffer = io.BytesIO()
+    canvas = Canvas(buffer, invariant=1)
+    canvas.setFont(font_name, 12)
+    canvas.drawString(72, 720, "Übersicht → ₹ 1.250,00")
+    canvas.save()
+    return buffer.getvalue().replace(font_name.encode(), b"F")
+
+
+def test_cold_and_warm_cache_draw_the_same_pdf(regular, monkeypatch):
+    from reportlab.pdfbase.ttfonts import TTFontFace
+
+    fonts._metrics.clear()
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(fonts._metrics_path(regular))
+    cold = draw_pdf("DocgenColdFont", regular)
+    assert os.path.exists(fonts._metrics_path(regular))
+
+    fonts._metrics.clear()
+    parses = []
+    monkeypatch.setattr(TTFontFace, "extractInfo", lambda *args: parses.append(args))
+    warm = draw_pdf("DocgenWarmFont", regular)
+    assert not parses
+    assert warm == cold
+
+
+def test_subsets_leave_out_name_table(regular):
+    font = fonts.load_font("DocgenTestSubset", regular)
+    subset = font.face.makeSubset([0, *map(ord, "Seite")])
+    num_tables = int.from_bytes(subset[4:6], "big")
+    tags = {subset[12 + 16 * i:16 + 16 * i] for i in range(num_tables)}
+    assert b"glyf" in tags and b"name" not in tags
@@ -0,0 +1,81 @@
+"""
+Manual sections extracted from the in-app guide's TSX (docgen.guide_source).
+"""
+
+import os
+
+from docgen.guide_source import extract_section_file, load_guide_sections
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "whats-new.tsx")
+
+
+def test_releases_do_not_depend_on_indentation():
+    section = extract_section_file(FIXTURE)
+    assert section["id"] == "whats-new"
+    assert section["title"] == "What's new"
+    assert section["blocks"] == [
+        ["heading", 3, "v2.61  •  May 13, 2026"],
+        ["para", None, "Install anywhere, gesture-first."],
+        ["bullet", "<b>Swipe-to-edit:</b> Swipe left to reveal <b>Edit</b> [and Delete]; it's quick."],
+        ["heading", 3, "v2.60  •  April 2, 2026"],
+        ["para", None, "Reminders that don't nag."],
+        ["bullet", "<b>Bill reminders:</b> Pick <i>1 day</i> or <i>3 days</i>."],
+        ["bullet", "<b>Quiet hours:</b> Nothing between 22:00 and 07:00."],
+        ["tip", "<b>Tip: Stay current</b> Updates install themselves."],
+    ]
+
+
+def test_section_markup(tmp_path):
+    path = tmp_path / "analytics.tsx"
+    path.write_text("""
+export function AnalyticsSection() {
+  return (
+    <GuideSection id="analytics" eyebrow="Understand" title="Analytics" intro="Charts that answer questions."
+      demo={<WhatIfSliderDemo />}>
+      <h3>What’s on the page</h3>
+      <p>Pick a <strong>date range</strong> first.</p>
+      <FactGrid>
+        <FactRow label="Spending trend">Current period vs prior.</FactRow>
+      </FactGrid>
+      <WhatIfSliderDemo />
+      <Callout type="warning">Figures are in your <em>base</em> currency.</Callout>
+    </GuideSection>
+  );
+}
+""", encoding="utf-8")
+    section = extract_section_file(str(path))
+    assert (section["id"], section["eyebrow"], section["intro"]) == ("analytics", "Understand",
+                                                                     "Charts that answer questions.")
+    kinds = [block[0] for block in section["blocks"]]
+    assert kinds == ["heading", "para", "bullet", "space", "chart", "tip"]
+    assert section["blocks"][2] == ["bullet", "<b>Spending trend:</b> Current period vs prior."]
+    assert section["blocks"][4] == ["chart", "trend", 170, 62]
+    assert section["blocks"][5] == ["tip", "<b>Heads up</b> Figures are in your <i>base</i> currency."]
+
+
+def guide_dir(tmp_path, intro):
+    (tmp_path / "sections").mkdir()
+    source = open(FIXTURE, encoding="utf-8").read().replace('intro="Recent releases."', f'intro="{intro}"')
+    (tmp_path / "sections" / "whats-new.tsx").write_text(source, encoding="utf-8")
+    (tmp_path / "sections-config.ts").write_text(
+        "export const GUIDE_SECTIONS = [\n"
+        "  { id: 'whats-new', title: 'What’s new', group: 'Releases', blurb: 'What shipped.' },\n"
+        "];\n", encoding="utf-8")
+    return str(tmp_path)
+
+
+def test_intro_drops_the_blurb_and_web_only_text(tmp_path):
+    intro = "What shipped. Most recent at the top. Tap an item to jump to its detailed section."
+    [section] = load_guide_sections(guide_dir(tmp_path, intro))
+    paras = [block for block in section.blocks if block[0] == "para"]
+    assert paras[1:3] == [["para", "blurb", "What shipped."], ["para", None, "Most recent at the top."]]
+
+
+def test_images_close_their_sub_section(tmp_path):
+    images = {"whats-new": [("top", "Top", 50, 40, None), ("bills", "Bills", 90, 60, "v2.60  •  April 2, 2026")]}
+    [section] = load_guide_sections(guide_dir(tmp_path, "Recent releases."), images=images)
+    kinds = [block[1] if block[0] == "image" else block[0] for block in section.blocks]
+    assert kinds == ["para", "heading", "rule", "para", "para", "top",
+                     "heading", "para", "bullet", "heading", "para", "bullet", "bullet", "tip", "bills",
+                     "pagebreak"]
+    assert ["image", "bills", 90, 60, "Bills"] in section.blocks
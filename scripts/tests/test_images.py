@@ -0,0 +1,30 @@
+"""
+Screenshot pre-processing (docgen.images).
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+from docgen.images import prepare_image
+
+
+def test_threads_preparing_one_rendition(tmp_path, monkeypatch):
+    source = tmp_path / "shot.png"
+    Image.new("RGB", (400, 800), (124, 58, 237)).save(source)
+
+    # Both threads finish writing before either moves its file into place.
+    written = threading.Barrier(2)
+    save = Image.Image.save
+
+    def save_together(self, fp, *args, **kwargs):
+        save(self, fp, *args, **kwargs)
+        written.wait(timeout=10)
+
+    monkeypatch.setattr(Image.Image, "save", save_together)
+    with ThreadPoolExecutor(2) as pool:
+        results = [f.result() for f in [pool.submit(prepare_image, str(source), 100, 200) for _ in range(2)]]
+    assert results[0] == results[1]
+    with Image.open(results[0][0]) as prepared:
+        assert prepared.size == (208, 417)
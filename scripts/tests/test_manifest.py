@@ -0,0 +1,62 @@
+"""
+Incremental-build fingerprints (docgen.manifest).
+"""
+
+import types
+
+from docgen.assets import AssetResolver
+from docgen.manifest import guide_fingerprint, record_build, should_build
+
+
+def make_guide(tmp_path, search_paths=()):
+    """A minimal guide module whose one screenshot lives in tmp_path/configured."""
+    configured = tmp_path / "configured"
+    configured.mkdir(exist_ok=True)
+    (configured / "shot.png").write_bytes(b"configured screenshot")
+    module = types.ModuleType("fake_guide")
+    module.SCREENSHOTS = {"shot": str(configured / "shot.png")}
+    module.LOGO_PATH = str(configured / "logo.png")
+    module.assets = AssetResolver([str(p) for p in search_paths], fallbacks=())
+    return module
+
+
+def test_asset_dir_override_rebuilds(tmp_path):
+    asset_dir = tmp_path / "assets"
+    asset_dir.mkdir()
+    module = make_guide(tmp_path, [asset_dir])
+    output = tmp_path / "guide.pdf"
+    output.write_bytes(b"%PDF")
+
+    # The configured copy is used until the asset directory provides one.
+    fingerprint = should_build("fake_guide", module, str(output))
+    record_build("fake_guide", fingerprint, str(output))
+    assert should_build("fake_guide", module, str(output)) is None
+
+    (asset_dir / "shot.png").write_bytes(b"override")
+    module.assets.resolve(module.SCREENSHOTS["shot"])  # the module's resolver may have cached the old answer
+    fingerprint = should_build("fake_guide", module, str(output))
+    assert fingerprint is not None
+    record_build("fake_guide", fingerprint, str(output))
+
+    (asset_dir / "shot.png").write_bytes(b"replaced override")
+    assert should_build("fake_guide", module, str(output)) is not None
+
+
+def test_search_directories_are_fingerprinted(tmp_path):
+    module = make_guide(tmp_path)
+    before = guide_fingerprint(module)
+    module.assets = AssetResolver([str(tmp_path / "elsewhere")], fallbacks=())
+    assert guide_fingerprint(module) != before
+
+
+def test_container_constants_are_fingerprinted(tmp_path):
+    module = make_guide(tmp_path)
+    module.DOC_INFO = {"Title": "Manual"}
+    module.SAMPLE_ANALYTICS = {"trend": [1, 2, 3]}
+    before = guide_fingerprint(module)
+    module.SAMPLE_ANALYTICS["trend"].append(4)
+    assert guide_fingerprint(module) != before
+    module.SAMPLE_ANALYTICS["trend"].pop()
+    assert guide_fingerprint(module) == before
+    module.DOC_INFO["Title"] = "Handbook"
+    assert guide_fingerprint(module) != before
@@ -0,0 +1,38 @@
+"""
+PDF post-optimizer (docgen.optimize) on an assembled manual.
+"""
+
+import shutil
+
+import pytest
+
+from docgen.optimize import optimize_pdf
+
+pypdf = pytest.importorskip("pypdf")
+
+
+def page_texts(path):
+    return [page.extract_text() for page in pypdf.PdfReader(path, strict=True).pages]
+
+
+@pytest.mark.parametrize("linearized", [True, False])
+def test_optimized_pdf_parses_strictly(assembled, tmp_path, linearized):
+    path = str(tmp_path / "optimized.pdf")
+    result = optimize_pdf(assembled, path, linearized=linearized)
+    assert result.after < result.before
+    # pypdf warns that a linearized file's first xref section does not start
+    # at object 0; it covers the first page's objects, as linearization requires.
+    reader = pypdf.PdfReader(path, strict=True)
+    assert reader.metadata.title == "Test Manual"
+    assert page_texts(path) == page_texts(assembled)
+    with open(path, "rb") as f:
+        assert (b"/Linearized 1" in f.read(1024)) == linearized
+
+
+def test_optimize_in_place(assembled, tmp_path):
+    path = tmp_path / "manual.pdf"
+    shutil.copyfile(assembled, path)
+    result = optimize_pdf(str(path))
+    assert result.path == str(path)
+    assert path.stat().st_size == result.after
+    assert page_texts(path) == page_texts(assembled)
@@ -0,0 +1,69 @@
+"""
+Memoized paragraphs (docgen.paragraphs) lay out exactly like ReportLab's.
+"""
+
+import io
+
+import pytest
+from reportlab.lib.enums import TA_JUSTIFY
+from reportlab.lib.pagesizes import A6
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.platypus import KeepTogether, PageBreak, SimpleDocTemplate, Table
+
+from docgen import paragraphs
+from docgen.paragraphs import Paragraph
+
+styles = getSampleStyleSheet()
+BODY = ParagraphStyle("MemoBody", parent=styles["Normal"], fontSize=9, leading=12)
+BULLET = ParagraphStyle("MemoBullet", parent=BODY, leftIndent=12, bulletIndent=2)
+JUSTIFIED = ParagraphStyle("MemoJustified", parent=BODY, alignment=TA_JUSTIFY)
+TIP = ParagraphStyle("MemoTip", parent=BODY, backColor="#EEF2FF", borderPadding=4)
+
+SHORT = "Transfers between your own accounts are not counted as spending."
+LONG = "Budgets reset on the first of the month; <b>carry-over</b> is off by default. " * 12
+
+
+@pytest.fixture(autouse=True)
+def memo():
+    yield
+    paragraphs.configure(enable=True)
+
+
+def build():
+    """A short document repeating paragraphs at several widths, with splits."""
+    story = []
+    for _ in range(3):
+        story += [
+            Paragraph("<b>Tip:</b> swipe left on a transaction to delete it.", TIP),
+            *[Paragraph("Step with <i>markup</i> &amp; an entity", BULLET, bulletText="•") for _ in range(3)],
+            Paragraph(LONG, BODY),  # splits across pages
+            Paragraph(LONG, JUSTIFIED),
+            Table([[Paragraph("Cell text that wraps in the narrow column", BODY), Paragraph(SHORT, BODY)]],
+                  colWidths=[80, 150]),
+            KeepTogether([Paragraph("Kept together", BODY), Paragraph(SHORT * 3, BODY)]),
+        ]
+        story.append(PageBreak())
+    buffer = io.BytesIO()
+    SimpleDocTemplate(buffer, pagesize=A6, invariant=1).build(story)
+    return buffer.getvalue()
+
+
+def test_memo_on_and_off_build_the_same_pdf():
+    paragraphs.configure(enable=False)
+    plain = build()
+    paragraphs.configure(enable=True)
+    cold = build()
+    warm = build()
+    assert paragraphs.stats()["parse"]["hits"] > 0 and paragraphs.stats()["wrap"]["hits"] > 0
+    assert cold == plain
+    assert warm == plain
+
+
+def test_evicting_cache_builds_the_same_pdf():
+    paragraphs.configure(enable=False)
+    plain = build()
+    paragraphs.configure(size=2, enable=True)
+    try:
+        assert build() == plain
+    finally:
+        paragraphs.configure(size=paragraphs.CACHE_SIZE)
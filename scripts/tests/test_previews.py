@@ -0,0 +1,77 @@
+"""
+Page previews drawn from content streams (docgen.previews).
+"""
+
+import io
+
+import pytest
+from reportlab.pdfgen.canvas import Canvas
+
+from docgen import fonts
+from docgen.pdfobj import PdfDocument
+from docgen.previews import PageRenderer, _dashes
+
+
+def render(draw, width=300, height=100, pixels=900):
+    """Preview (RGB image) of a page drawn by `draw(canvas)`."""
+    buffer = io.BytesIO()
+    canv = Canvas(buffer, pagesize=(width, height))
+    draw(canv)
+    canv.save()
+    doc = PdfDocument.from_bytes(buffer.getvalue())
+    return PageRenderer(doc, pixels).render(doc.page_refs()[0])
+
+
+def ink_runs(image, row_range, min_gap):
+    """Horizontal runs of non-white columns in a band of rows, split at gaps of `min_gap` columns."""
+    gray = image.convert("L")
+    columns = [any(gray.getpixel((x, y)) < 160 for y in row_range) for x in range(image.width)]
+    runs, gap = 0, min_gap
+    for ink in columns:
+        if ink:
+            if gap >= min_gap:
+                runs += 1
+            gap = 0
+        else:
+            gap += 1
+    return runs
+
+
+def test_base_font_words_keep_their_spaces():
+    if fonts.find_family() is None:
+        pytest.skip("no Unicode font family to stand in for Helvetica")
+    text = "Novira User Manual Page 4 of 40"
+
+    def draw(canv):
+        canv.setFont("Helvetica", 20)
+        canv.drawString(10, 50, text)
+
+    image = render(draw, width=400, pixels=800)
+    # 2 px per point: a space is about 12 px, letters are at most 5 px apart.
+    assert ink_runs(image, range(60, 105), min_gap=9) == len(text.split())
+
+
+def test_dash_pattern():
+    assert _dashes([(0, 0), (10, 0)], [2, 2], 0) == [[(0, 0), (2, 0)], [(4, 0), (6, 0)], [(8, 0), (10, 0)]]
+    assert _dashes([(0, 0), (5, 0), (5, 5)], [3], 1) == [[(0, 0), (2, 0)], [(5, 0), (5, 3)]]
+
+    def draw(canv):
+        canv.setDash(10, 10)
+        canv.setLineWidth(2)
+        canv.line(0, 50, 300, 50)
+
+    assert ink_runs(render(draw), range(145, 155), min_gap=5) == 15
+
+
+def test_clipping_path():
+    def draw(canv):
+        path = canv.beginPath()
+        path.rect(100, 0, 100, 100)
+        canv.clipPath(path, stroke=0, fill=0)
+        canv.setFillColorRGB(1, 0, 0)
+        canv.rect(0, 0, 300, 100, stroke=0, fill=1)
+
+    image = render(draw)
+    assert image.getpixel((150, 150)) == (255, 255, 255)
+    assert image.getpixel((450, 150)) == (255, 0, 0)
+    assert image.getpixel((750, 150)) == (255, 255, 255)
@@ -0,0 +1,94 @@
+"""
+The streaming transaction report (docgen.report): totals and page contents.
+"""
+
+import json
+import re
+from datetime import date
+
+import pytest
+
+from docgen.columnstore import ColumnStore, write_column_store
+from docgen.report import FOOTER_TEXT, JsonlTransactions, TransactionReport
+
+pypdf = pytest.importorskip("pypdf")
+
+TODAY = date(2025, 4, 1)
+
+# 120 expenses of 10..129 EUR spread over four weeks, plus one income.
+EXPENSES = [{"date": f"2025-03-{1 + i % 28:02d}", "description": f"Item {i:03d}", "category": "food",
+             "amount": 10 + i, "currency": "EUR", "payment_method": "Cash", "user_id": "u1"} for i in range(120)]
+SALARY = {"date": "2025-03-15", "description": "Salary", "category": "income", "amount": 2000, "is_income": True,
+          "currency": "EUR", "payment_method": "Bank Transfer", "user_id": "u1"}
+TRANSACTIONS = EXPENSES + [SALARY]
+
+
+def render(tmp_path, chunk_pages=50, source=None):
+    report = TransactionReport.from_request({"currency": "EUR", "transactions": TRANSACTIONS},
+                                            source=source, today=TODAY)
+    path = tmp_path / f"report-{chunk_pages}.pdf"
+    count = report.render(str(path), chunk_pages=chunk_pages)
+    return report, count, [page.extract_text() for page in pypdf.PdfReader(str(path)).pages]
+
+
+@pytest.fixture(scope="module")
+def rendered(tmp_path_factory):
+    return render(tmp_path_factory.mktemp("report"))
+
+
+def detail_pages(pages):
+    return [text for text in pages if "Date Description Category" in text]
+
+
+def test_overview_totals(rendered):
+    report, _, pages = rendered
+    assert report.stats.total_expenses == sum(range(10, 130))
+    assert report.stats.total_income == 2000
+    overview = pages[0]
+    for label, amount in [("TOTAL SPENT", 8340), ("TOTAL INCOME", 2000), ("NET CASH FLOW", -6340)]:
+        assert f"{label}\n{report.fmt(amount)}\n" in overview
+    assert "120 expenses" in overview
+
+
+def test_every_page_is_footed_with_the_final_count(rendered):
+    report, count, pages = rendered
+    assert len(pages) == count
+    summary = len(pages) - len(detail_pages(pages))
+    assert count == summary + report.detail_pages(report.detail_layout()[1])[2]
+    for number, text in enumerate(pages, start=1):
+        assert FOOTER_TEXT.format(page=number, count=count) in text
+
+
+def test_details_list_every_row_once_by_date(rendered):
+    report, _, pages = rendered
+    details = detail_pages(pages)
+    assert len(details) > 1
+    assert details[0].startswith("Transaction Details\n")
+    assert all(text.startswith("Date Description Category") for text in details[1:])
+
+    listed = [m.group(1) for text in details for m in re.finditer(r"^\S+ \d+, 25 (?:\S+ )?(Item \d{3}|Salary) ",
+                                                                   text, re.M)]
+    by_date = sorted(range(len(TRANSACTIONS)), key=lambda i: TRANSACTIONS[i]["date"])
+    assert listed == [TRANSACTIONS[i]["description"] for i in by_date]
+    assert f"Salary Income - Bank Transfer +{report.fmt(2000)}" in "".join(details)
+    assert "Income rows are shown with a + prefix" in details[-1]
+
+
+def test_chunking_does_not_change_the_pages(tmp_path, rendered):
+    _, count, pages = rendered
+    assert render(tmp_path, chunk_pages=1)[1:] == (count, pages)
+
+
+def test_jsonl_source_matches_inline_transactions(tmp_path, rendered):
+    path = tmp_path / "transactions.jsonl"
+    path.write_text("".join(json.dumps(tx) + "\n" for tx in TRANSACTIONS))
+    _, count, pages = rendered
+    assert render(tmp_path, source=JsonlTransactions(str(path)))[1:] == (count, pages)
+
+
+def test_column_store_source_matches_inline_transactions(tmp_path, rendered):
+    """Its totals come from docgen.report_columns instead of StatsBuilder."""
+    path = str(tmp_path / "transactions.cols")
+    write_column_store(path, TRANSACTIONS)
+    _, count, pages = rendered
+    assert render(tmp_path, source=ColumnStore(path))[1:] == (count, pages)
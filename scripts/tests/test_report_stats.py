@@ -0,0 +1,77 @@
+"""
+Row-by-row (docgen.report_stats.StatsBuilder) versus columnar
+(docgen.report_columns.column_stats) report statistics.
+"""
+
+from dataclasses import fields
+
+import pytest
+
+from bench_report_stats import COMPARED, close
+from bench_transaction_report import make_request, make_transactions
+from docgen.report_columns import TransactionColumns, column_stats
+from docgen.report_stats import ReportStats, StatsBuilder, make_converter
+
+REQUEST = make_request()
+
+BASE = {"user_id": "u1", "profile": {"full_name": "Alex Rivera"}, "payment_method": "Cash", "category": "food",
+        "currency": "EUR"}
+
+# Rows the synthetic exports never produce.
+EDGE_CASES = [
+    dict(BASE, date="2025-03-01", amount=10, description="Lunch"),
+    dict(BASE, date="2025-03-02", amount=-4.5, description="Refund"),
+    dict(BASE, date="2025-03-02", amount=100, category="income", description="Salary"),
+    dict(BASE, date="2025-03-03", amount=50, is_income=True, category="others", description="Gift"),
+    dict(BASE, date="2025-03-04", amount=200, is_transfer=True, transfer_pair_id="p1", description="To savings"),
+    dict(BASE, date="2025-03-05", amount=30, currency="USD", description="Converted"),
+    dict(BASE, date="2025-03-05", amount=30, currency="JPY", description="No rate"),
+    dict(BASE, date="2025-03-06", amount="12.5", description="Amount as text"),
+    dict(BASE, date="2025-03-06", amount=12, currency=None, description="No currency"),
+    dict(BASE, date="2025-03-07", amount=9, payment_method=None, category=None, description="Bare"),
+    dict(BASE, date="2025-03-08", amount=90, description="Split", splits=[
+        {"user_id": "u2", "amount": 30, "is_paid": False, "profile": {"full_name": "Sam Chen"}},
+        {"user_id": "u1", "amount": 30},
+    ]),
+    dict(BASE, date="2025-03-09", amount=7, is_recurring=True, description="Subscription"),
+    dict(BASE, date="2025-03-09", amount=7, currency="GBP", exchange_rate=2, base_currency="EUR",
+         converted_amount=3.5, description="Stored conversion"),
+]
+
+
+def builder_stats(transactions, rollups=None):
+    builder = StatsBuilder(REQUEST["currency"], make_converter(REQUEST["currency"], REQUEST["rates"]),
+                           REQUEST["buckets"], rollups=rollups)
+    for tx in transactions:
+        builder.add(tx)
+    return builder.finish()
+
+
+def assert_same_stats(transactions):
+    expected = builder_stats(transactions)
+    actual = column_stats(TransactionColumns.from_transactions(transactions), REQUEST["currency"], REQUEST["rates"])
+    for name in [*COMPARED, "transfer_count"]:
+        assert close(getattr(expected, name), getattr(actual, name)), name
+
+
+@pytest.mark.parametrize("rows", [0, 1, 2000])
+def test_synthetic_exports(rows):
+    assert_same_stats(list(make_transactions(rows)))
+
+
+def test_edge_cases():
+    assert_same_stats(EDGE_CASES)
+
+
+def test_edge_cases_among_synthetic_rows():
+    assert_same_stats([*make_transactions(300, seed=7), *EDGE_CASES])
+
+
+def test_builder_with_column_rollups():
+    """As docgen.report computes a columnar source's statistics."""
+    transactions = [*make_transactions(500, seed=3), *EDGE_CASES]
+    rollups = column_stats(TransactionColumns.from_transactions(transactions), REQUEST["currency"], REQUEST["rates"])
+    expected = builder_stats(transactions)
+    actual = builder_stats(transactions, rollups)
+    for name in [f.name for f in fields(ReportStats)]:
+        assert close(getattr(expected, name), getattr(actual, name)), name
@@ -0,0 +1,75 @@
+"""
+Section fragments assembled into one PDF (docgen.sections).
+"""
+
+import pytest
+
+from docgen import fonts
+from docgen.render import RenderError
+from docgen.sections import assemble, page_numbers, settle_toc
+
+pypdf = pytest.importorskip("pypdf")
+
+
+def test_assembled_pdf_parses_strictly(fragments, assembled):
+    reader = pypdf.PdfReader(assembled, strict=True)
+    assert len(reader.pages) == sum(f.pages for f in fragments) == 6
+    assert reader.metadata.title == "Test Manual"
+    texts = [page.extract_text() for page in reader.pages]
+    assert "Page" not in texts[0]
+    for number, text in enumerate(texts[1:], start=2):
+        assert text.rstrip().endswith(f"Page {number} of 6")
+    assert "Section 3" in texts[4]
+    for page in reader.pages:
+        for font in page["/Resources"]["/Font"].values():
+            assert font.get_object()["/Type"] == "/Font"
+
+
+def test_assemble_without_footer(fragments, tmp_path):
+    path = tmp_path / "plain.pdf"
+    assert assemble(fragments, str(path), {"Title": "Plain"}) == 6
+    reader = pypdf.PdfReader(path, strict=True)
+    assert all("Page" not in page.extract_text() for page in reader.pages)
+
+
+def test_page_numbers(fragments):
+    assert page_numbers(fragments, first_page=3) == {"1": 3, "1.1": 4, "2": 5, "2.1": 6, "3": 7, "3.1": 8}
+
+
+def footer_fonts(page):
+    """BaseFont names (without subset prefix) of the fonts the stamped footer uses."""
+    form = page["/Resources"]["/XObject"]["/FDocgenFooter"].get_object()
+    return {font.get_object()["/BaseFont"].split("+")[-1] for font in form["/Resources"]["/Font"].values()}
+
+
+def test_footer_uses_document_font(fragments, tmp_path):
+    family = fonts.unicode_family()
+    if family is None:
+        pytest.skip("no Unicode font family installed")
+    from reportlab.lib.colors import black
+    from reportlab.pdfbase import pdfmetrics
+
+    path = tmp_path / "cyrillic.pdf"
+    assemble(fragments, str(path), {"Title": "Руководство"},
+             footer=lambda n, count: (f"Страница {n} из {count}", 280, 40, 8, black))
+    reader = pypdf.PdfReader(path, strict=True)
+    expected = pdfmetrics.getFont(family[0]).face.name.decode("latin-1")
+    for number, page in enumerate(reader.pages, start=1):
+        assert page.extract_text().rstrip().endswith(f"Страница {number} из 6")
+        assert footer_fonts(page) == {expected}
+
+
+def test_settle_toc_repeats_until_numbers_match():
+    layouts = []
+
+    def layout(pages):
+        layouts.append(pages)
+        return {"1": 3, "2": 5 if len(layouts) < 2 else 6}
+
+    assert settle_toc(layout, {}) == {"1": 3, "2": 6}
+    assert len(layouts) == 3
+
+
+def test_settle_toc_fails_when_numbers_keep_moving():
+    with pytest.raises(RenderError):
+        settle_toc(lambda pages: {"1": pages.get("1", 0) + 1}, {})
@@ -0,0 +1,158 @@
+"""
+The local render service (docgen.server), run in-process on a free port.
+"""
+
+import http.client
+import json
+import textwrap
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from docgen.server import RETRY_AFTER, RenderService, make_server
+
+# A guide that renders once its gate file exists and logs every render, so
+# a test can hold renders in flight and count them.
+GUIDE = '''
+    import os
+    import time
+
+    from docgen.render import RenderError
+
+    HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+    def render(output, locale="en", variant="plain"):
+        if locale not in ("en", "de"):
+            raise RenderError(f"no catalog for locale {locale!r}")
+        while not os.path.exists(os.path.join(HERE, "gate")):
+            time.sleep(0.01)
+        with open(os.path.join(HERE, "renders.log"), "a") as log:
+            log.write(f"{locale} {variant}\\n")
+        output.write(f"%PDF-1.4 {locale} {variant}".encode())
+'''
+
+
+@pytest.fixture(scope="module")
+def guide_dir(tmp_path_factory):
+    path = tmp_path_factory.mktemp("guides")
+    (path / "served_guide.py").write_text(textwrap.dedent(GUIDE))
+    return path
+
+
+@pytest.fixture
+def gate(guide_dir, monkeypatch):
+    monkeypatch.syspath_prepend(str(guide_dir))
+    for name in ("gate", "renders.log"):
+        (guide_dir / name).unlink(missing_ok=True)
+    return guide_dir / "gate"
+
+
+def renders(gate):
+    log = gate.parent / "renders.log"
+    return log.read_text().splitlines() if log.exists() else []
+
+
+@pytest.fixture
+def serve(gate):
+    """Start a service with the given pool size and queue bound; return its (service, port)."""
+    started = []
+
+    def start(jobs=2, max_pending=None):
+        service = RenderService(["served_guide"], jobs=jobs, max_pending=max_pending).start()
+        server = make_server(service, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        started.append((server, service))
+        return service, server.server_port
+
+    yield start
+    gate.touch()  # let renders still in flight finish
+    for server, service in started:
+        server.shutdown()
+        server.server_close()
+        service.close()
+
+
+def get(port, path, headers=None):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    try:
+        connection.request("GET", path, headers=headers or {})
+        response = connection.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        connection.close()
+
+
+def wait_for(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_concurrent_identical_requests_share_one_render(serve, gate):
+    service, port = serve()
+    with ThreadPoolExecutor(4) as pool:
+        responses = [pool.submit(get, port, "/guides/served_guide.pdf?locale=de") for _ in range(4)]
+        wait_for(lambda: service.status()["shared"] == 3)
+        gate.touch()
+        responses = [r.result() for r in responses]
+
+    assert [status for status, _, _ in responses] == [200] * 4
+    assert {body for _, _, body in responses} == {b"%PDF-1.4 de plain"}
+    assert sorted(headers["X-Render-Shared"] for _, headers, _ in responses) == ["0", "1", "1", "1"]
+    assert renders(gate) == ["de plain"]
+    status = json.loads(get(port, "/health")[2])
+    assert (status["rendered"], status["shared"], status["pending"]) == (1, 3, 0)
+
+
+def test_different_options_render_separately(serve, gate):
+    _, port = serve()
+    gate.touch()
+    for path in ["/guides/served_guide.pdf", "/guides/served_guide.pdf?variant=print"]:
+        assert get(port, path)[0] == 200
+    assert renders(gate) == ["en plain", "en print"]
+
+
+def test_bad_requests(serve, gate):
+    service, port = serve()
+    gate.touch()
+    status, _, body = get(port, "/guides/served_guide.pdf?locale=xx")
+    assert (status, json.loads(body)) == (400, {"error": "no catalog for locale 'xx'"})
+    status, _, body = get(port, "/guides/served_guide.pdf?colour=red")
+    assert (status, json.loads(body)) == (400, {"error": "served_guide has no option(s) colour"})
+    assert get(port, "/guides/other_guide.pdf")[0] == 404
+    assert get(port, "/nothing")[0] == 404
+    assert renders(gate) == []
+    assert service.status()["failed"] == 1  # the locale is checked by the guide, in a worker
+
+
+def test_full_queue_is_turned_away(serve, gate):
+    service, port = serve(jobs=1, max_pending=1)
+    with ThreadPoolExecutor(1) as pool:
+        first = pool.submit(get, port, "/guides/served_guide.pdf")
+        wait_for(lambda: service.status()["pending"] == 1)
+        status, headers, _ = get(port, "/guides/served_guide.pdf?locale=de")
+        assert (status, headers["Retry-After"]) == (503, str(RETRY_AFTER))
+        gate.touch()
+        assert first.result()[0] == 200
+    assert service.status()["rejected"] == 1
+    assert get(port, "/guides/served_guide.pdf?locale=de")[0] == 200
+
+
+def test_etag_revalidation(serve, gate):
+    _, port = serve()
+    gate.touch()
+    status, headers, body = get(port, "/guides/served_guide.pdf")
+    assert status == 200 and body.startswith(b"%PDF")
+    status, _, body = get(port, "/guides/served_guide.pdf", {"If-None-Match": headers["ETag"]})
+    assert (status, body) == (304, b"")
+
+
+def test_guides_lists_options(serve):
+    _, port = serve()
+    assert json.loads(get(port, "/guides")[2]) == {
+        "served_guide": {"url": "/guides/served_guide.pdf", "options": {"locale": "en", "variant": "plain"}},
+    }
@@ -0,0 +1,48 @@
+"""
+Long tables laid out in page-sized batches (docgen.tables).
+"""
+
+import io
+import re
+
+import pytest
+from reportlab.lib.pagesizes import A6
+from reportlab.platypus import SimpleDocTemplate
+
+from docgen.tables import ChunkedTable
+
+pypdf = pytest.importorskip("pypdf")
+
+HEADER = [["Name", "Value"]]
+ROWS = [[f"row{i:03d}", str(i)] for i in range(120)]
+STYLE = [("FONTSIZE", (0, 0), (-1, -1), 8)]
+
+
+def build(flowable):
+    buffer = io.BytesIO()
+    SimpleDocTemplate(buffer, pagesize=A6).build([flowable])
+    return [page.extract_text() for page in pypdf.PdfReader(buffer).pages]
+
+
+def drawn_rows(pages):
+    return [row for text in pages for row in re.findall(r"row\d{3}", text)]
+
+
+def chunked(rows):
+    return ChunkedTable(rows, [100, 60], 14, header=HEADER, style=STYLE)
+
+
+@pytest.mark.parametrize("rows", [lambda: ROWS, lambda: iter(ROWS)], ids=["sequence", "iterator"])
+def test_every_row_once_under_a_header_on_every_page(rows):
+    pages = build(chunked(rows()))
+    assert len(pages) > 2
+    assert all(text.split()[:2] == ["Name", "Value"] for text in pages)
+    assert drawn_rows(pages) == [row for row, _ in ROWS]
+
+
+def test_discarded_split_keeps_iterator_rows():
+    table = chunked(iter(ROWS))
+    first, rest = table.split(200, 100)
+    again, _ = table.split(200, 300)
+    assert first._cellvalues[1][0] == again._cellvalues[1][0] == "row000"
+    assert drawn_rows(build(table)) == [row for row, _ in ROWS]
@@ -0,0 +1,29 @@
+"""
+The user manual's two build paths (generate_user_manual).
+"""
+
+import io
+
+import pytest
+
+import generate_user_manual as manual
+
+pypdf = pytest.importorskip("pypdf")
+
+
+def toc_pages(section_cache):
+    buffer = io.BytesIO()
+    manual.render(buffer, section_cache=section_cache)
+    reader = pypdf.PdfReader(buffer)
+    texts = [page.extract_text() for page in reader.pages]
+    body = next(i for i, text in enumerate(texts) if i > 1 and "\n1. Getting started\n" in text)
+    toc = texts[1:body]
+    # Above the footer, whitespace normalized: pypdf spaces text drawn through forms differently.
+    return len(reader.pages), [" ".join(text.rsplit(manual.DOC_INFO["Title"], 1)[0].split()) for text in toc]
+
+
+def test_toc_page_numbers_do_not_depend_on_the_section_cache():
+    pages, toc = toc_pages(section_cache=True)
+    assert (pages, toc) == toc_pages(section_cache=False)
+    assert toc[0].startswith("Table of Contents")
+    assert "1. Getting started 5 1.1" in toc[0]
@@ -0,0 +1,53 @@
+"""
+Image XObjects shared between documents (docgen.xobjects).
+"""
+
+import io
+
+import pytest
+from PIL import Image
+from reportlab.pdfgen.canvas import Canvas
+
+from docgen.xobjects import _document, draw_image
+
+pypdf = pytest.importorskip("pypdf")
+
+
+@pytest.fixture
+def logo(tmp_path):
+    """A small PNG with transparency, so it is embedded with a soft mask."""
+    path = tmp_path / "logo.png"
+    image = Image.new("RGBA", (16, 8), (124, 58, 237, 255))
+    image.putpixel((0, 0), (0, 0, 0, 0))
+    image.save(path)
+    return str(path)
+
+
+def render(logo, pages=2):
+    buffer = io.BytesIO()
+    canv = Canvas(buffer)
+    for _ in range(pages):
+        draw_image(canv, logo, 100, 100, 64, 32)
+        draw_image(canv, logo, 100, 200, 32, 16)
+        canv.showPage()
+    canv.save()
+    return pypdf.PdfReader(buffer, strict=True)
+
+
+def test_image_embedded_once_per_document(logo):
+    for reader in (render(logo), render(logo)):  # the second document reuses the loaded XObject
+        images = set()
+        for page in reader.pages:
+            xobjects = page["/Resources"]["/XObject"]
+            assert len(xobjects) == 1
+            for ref in xobjects.values():
+                image = ref.get_object()
+                assert image["/Subtype"] == "/Image" and "/SMask" in image
+                images.add(ref.idnum)
+        assert len(images) == 1
+
+
+def test_document_guard():
+    assert _document(Canvas(io.BytesIO())) is not None
+    with pytest.raises(RuntimeError):
+        _document(object())
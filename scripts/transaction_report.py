@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Novira Transaction Report PDF Generator
+Server-side counterpart of the in-app PDF export (generatePDF in
+utils/export-utils.ts) for date ranges too large to render on a phone.
+See docgen.report.
+
+The request is a JSON file with generatePDF's arguments:
+
+    {
+      "currency": "EUR",
+      "rates": {"USD": 1.08, "INR": 90.1},     units per 1 EUR, for conversions
+      "range": {"from": "2026-01-01", "to": "2026-03-31"},
+      "buckets": [...], "groups": [...],
+      "context": {"email": ..., "workspaceName": ..., "monthlyBudget": ...,
+                  "accounts": [...], "goals": [...], "recurringTemplates": [...],
+                  "isGroupScope": false},
+      "transactions": [...]                    optional, see --transactions
+    }
+
+Large exports should pass the transactions (with their "splits") as a JSON
+Lines file via --transactions; it is streamed instead of loaded. Exports
+reported on repeatedly can be converted once with --save-columns into a
+memory-mapped columnar file (see docgen.columnstore), which --transactions
+also reads.
+"""
+
+import argparse
+import json
+import os
+import time
+
+from docgen.columnstore import ColumnStore, is_column_store, write_column_store
+from docgen.report import CHUNK_PAGES, JsonlTransactions, TransactionReport
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a Novira transaction report PDF.")
+    parser.add_argument("request", help="JSON file with the report's currency, range and context")
+    parser.add_argument("-o", "--output", default="novira_financial_audit.pdf", help="output PDF path")
+    parser.add_argument("--transactions", help="JSON Lines file with one transaction per line, or a columnar file")
+    parser.add_argument("--save-columns", metavar="PATH",
+                        help="write the transactions to this columnar file and exit, without a report")
+    parser.add_argument("--chunk-pages", type=int, default=CHUNK_PAGES,
+                        help="pages drawn per canvas before they are flushed to the output")
+    args = parser.parse_args(argv)
+
+    with open(args.request, encoding="utf-8") as f:
+        request = json.load(f)
+    if not args.transactions:
+        source = None
+    elif is_column_store(args.transactions):
+        source = ColumnStore(args.transactions)
+    else:
+        source = JsonlTransactions(args.transactions)
+
+    if args.save_columns:
+        print("🗜  Writing columnar transactions...")
+        start = time.perf_counter()
+        if source is None:
+            transactions = request.get("transactions") or []
+        else:
+            transactions = (tx for _, tx in source)
+        manifest = write_column_store(args.save_columns, transactions)
+        size = os.path.getsize(args.save_columns)
+        print(f"\n✅ Columns saved to: {args.save_columns}")
+        print(f"   {manifest['rows']} transaction(s), {manifest['splits']} split(s), {size / 1024:.1f} KB "
+              f"({size / max(1, manifest['rows']):.0f} bytes/row), {time.perf_counter() - start:.1f}s")
+        return True
+
+    print("📄 Generating Novira transaction report...")
+    start = time.perf_counter()
+    report = TransactionReport.from_request(request, source)
+    print("  📊 Computing statistics...")
+    report.scan()
+    print(f"     {report.rows} transaction(s)")
+    print("  🔧 Rendering pages...")
+    pages = report.render(args.output, chunk_pages=args.chunk_pages)
+    elapsed = time.perf_counter() - start
+
+    print(f"\n✅ Report saved to: {args.output}")
+    print(f"   {pages} page(s), {os.path.getsize(args.output) / 1024:.1f} KB, {elapsed:.1f}s")
+    return True
+
+
+if __name__ == "__main__":
+    main()